@@ -1,24 +1,64 @@
-import os
 import json
-from typing import Any, Optional
+import time
+import asyncio
+import logging
+import contextvars
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
 
-from dotenv import load_dotenv
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
-load_dotenv()
+from app.core.circuit_breaker import CircuitBreaker, DependencyUnavailableError
+from app.core.config import get_settings
+from app.core.tracing import redis_timer
 
-REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
-CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+logger = logging.getLogger("app.cache")
 
 redis: Optional[Redis] = None
+redis_breaker = CircuitBreaker("redis")
+
+# Cache keys to delete ("delete"), version keys to bump ("bump") and pub/sub messages to send
+# ("publish", in order), deferred until the enclosing invalidation_scope() exits.
+_pending_invalidations: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "pending_invalidations", default=None
+)
+
+
+class RedisUnavailableError(DependencyUnavailableError):
+    def __init__(self, detail: str = ""):
+        super().__init__("redis", detail)
 
 
 async def init_redis() -> None:
+    """Create the client. Connections are opened lazily or by warm_redis()."""
     global redis
     if redis is None:
-        redis = Redis.from_url(REDIS_URL, decode_responses=True)
-        await redis.ping()
-        print("✅ Redis connected:", REDIS_URL)
+        settings = get_settings()
+        redis = Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            max_connections=settings.redis_max_connections,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_connect_timeout,
+            health_check_interval=settings.redis_health_check_interval,
+        )
+
+
+async def warm_redis(size: int) -> bool:
+    """
+    Open up to `size` pooled connections by running that many PINGs concurrently.
+    A failure does not abort startup: the breaker opens and the app serves from MySQL
+    until Redis answers a probe. Returns whether Redis answered.
+    """
+    size = max(1, min(size, get_settings().redis_max_connections))
+    try:
+        await asyncio.gather(*(_call("ping", lambda client: client.ping()) for _ in range(size)))
+    except RedisUnavailableError as e:
+        logger.warning("Redis not reachable at startup, continuing without cache: %s", e)
+        return False
+    logger.info("Redis connected: %s (%s connections)", get_settings().redis_url, size)
+    return True
 
 
 async def close_redis() -> None:
@@ -26,7 +66,35 @@ async def close_redis() -> None:
     if redis is not None:
         await redis.close()
         redis = None
-        print("❌ Redis disconnected")
+        logger.info("Redis disconnected")
+
+
+async def _call(command: str, fn: Callable[[Redis], Awaitable[Any]]) -> Any:
+    """
+    Run one Redis round trip through the circuit breaker.
+    Raises RedisUnavailableError when Redis is not configured, the breaker is open or the call fails.
+    """
+    if redis is None:
+        raise RedisUnavailableError("not initialized")
+    if not redis_breaker.allow():
+        raise RedisUnavailableError("circuit open")
+    try:
+        with redis_timer(command):
+            result = await fn(redis)
+    except (RedisError, OSError) as e:
+        redis_breaker.record_failure()
+        raise RedisUnavailableError(str(e)) from e
+    redis_breaker.record_success()
+    return result
+
+
+async def _pipeline(command: str, build: Callable[[Any], None]) -> list:
+    async def run(client: Redis):
+        async with client.pipeline(transaction=False) as pipe:
+            build(pipe)
+            return await pipe.execute()
+
+    return await _call(command, run)
 
 
 def _dumps(value: Any) -> str:
@@ -37,52 +105,220 @@ def _loads(value: str) -> Any:
     return json.loads(value)
 
 
+# Cache helpers fail open: when Redis is unavailable reads miss and writes are skipped,
+# so callers fall through to MySQL.
+
 async def cache_get(key: str):
-    if redis is None:
+    try:
+        val = await _call("get", lambda client: client.get(key))
+    except RedisUnavailableError:
         return None
-    val = await redis.get(key)
     return None if val is None else _loads(val)
 
 
-async def cache_set(key: str, value: Any, ttl: int = CACHE_TTL_SECONDS):
-    if redis is None:
-        return
-    await redis.set(key, _dumps(value), ex=ttl)
+async def cache_set(key: str, value: Any, ttl: int | None = None, nx: bool = False):
+    """
+    ttl defaults to CACHE_TTL_SECONDS. With nx=True an existing value is kept (a read-through
+    fill must not overwrite a fresher write).
+    """
+    ttl = ttl or get_settings().cache_ttl_seconds
+    try:
+        await _call("set", lambda client: client.set(key, _dumps(value), ex=ttl, nx=nx))
+    except RedisUnavailableError:
+        pass
 
 
 async def cache_del(*keys: str):
-    if redis is None or not keys:
+    if not keys:
         return
-    await redis.delete(*keys)
+    try:
+        await _call("delete", lambda client: client.delete(*keys))
+    except RedisUnavailableError as e:
+        logger.warning("Cache invalidation skipped for %s: %s", keys, e)
 
-async def redis_get_str(key: str) -> str | None:
-    if redis is None:
+
+async def cache_get_many(keys: List[str]) -> Dict[str, Any]:
+    """Fetch several cached values in one round trip. Missing keys are left out of the result."""
+    if not keys:
+        return {}
+    try:
+        values = await _call("mget", lambda client: client.mget(keys))
+    except RedisUnavailableError:
+        return {}
+    return {key: _loads(val) for key, val in zip(keys, values) if val is not None}
+
+
+async def cache_set_many(values: Dict[str, Any], ttl: int | None = None) -> None:
+    """Store several values with the same TTL (default CACHE_TTL_SECONDS) in one pipelined round trip."""
+    if not values:
+        return
+    ttl = ttl or get_settings().cache_ttl_seconds
+
+    def build(pipe):
+        for key, value in values.items():
+            pipe.set(key, _dumps(value), ex=ttl)
+
+    try:
+        await _pipeline("pipeline", build)
+    except RedisUnavailableError:
+        pass
+
+
+async def cache_invalidate(*keys: str) -> None:
+    """
+    Delete cache keys. Inside an invalidation_scope() the keys are buffered and deleted
+    together when the scope exits; otherwise they are deleted now in a single command.
+    """
+    pending = _pending_invalidations.get()
+    if pending is not None:
+        pending["delete"].update(keys)
+        return
+    await cache_del(*keys)
+
+
+def _queue_version_bump(pipe, key: str) -> None:
+    # A missing key starts from the current time rather than 0, so a version number is never
+    # handed out twice even after the key expired or Redis lost its data.
+    pipe.set(key, time.time_ns(), ex=get_settings().version_ttl_seconds, nx=True)
+    pipe.incr(key)
+
+
+async def version_bump(*keys: str) -> None:
+    """Advance version counters (used for ETags); buffered like cache_invalidate()."""
+    pending = _pending_invalidations.get()
+    if pending is not None:
+        pending["bump"].update(keys)
+        return
+    await _flush_invalidations((), keys)
+
+
+async def publish(channel: str, message: Any) -> None:
+    """
+    PUBLISH a JSON message. Inside an invalidation_scope() it is sent with the scope's flush,
+    i.e. only after the enclosing unit of work committed; a rolled-back change publishes nothing.
+    """
+    pending = _pending_invalidations.get()
+    if pending is not None:
+        pending["publish"].append((channel, _dumps(message)))
+        return
+    await _flush_invalidations((), (), [(channel, _dumps(message))])
+
+
+async def version_get(*keys: str) -> Optional[List[str]]:
+    """Current value of each version counter (initialized if missing), or None when Redis is unavailable."""
+    if not keys:
+        return []
+
+    version_ttl = get_settings().version_ttl_seconds
+
+    def build(pipe):
+        for key in keys:
+            pipe.set(key, time.time_ns(), ex=version_ttl, nx=True)
+            pipe.get(key)
+
+    try:
+        results = await _pipeline("pipeline", build)
+    except RedisUnavailableError:
         return None
-    return await redis.get(key)
+    return [str(value) for value in results[1::2]]
 
 
-async def redis_set_str(key: str, value: str, ttl: int = CACHE_TTL_SECONDS) -> None:
-    if redis is None:
+async def _flush_invalidations(
+    deletes: Iterable[str], bumps: Iterable[str], publishes: Iterable[tuple] = ()
+) -> None:
+    deletes, bumps, publishes = sorted(deletes), sorted(bumps), list(publishes)
+    if not deletes and not bumps and not publishes:
         return
-    await redis.set(key, value, ex=ttl)
 
+    def build(pipe):
+        if deletes:
+            pipe.delete(*deletes)
+        for key in bumps:
+            _queue_version_bump(pipe, key)
+        # Published after the invalidations, so a subscriber that refetches sees fresh data.
+        for channel, message in publishes:
+            pipe.publish(channel, message)
+
+    try:
+        await _pipeline("pipeline", build)
+    except RedisUnavailableError as e:
+        logger.warning(
+            "Cache invalidation skipped for %s (%s event(s) dropped): %s", deletes + bumps, len(publishes), e
+        )
+
+
+@asynccontextmanager
+async def invalidation_scope():
+    """
+    Buffer cache_invalidate(), version_bump() and publish() calls and flush them in one pipeline on exit.
+    Open it outside db.unit_of_work() so the flush happens after the commit:
 
-async def redis_incr(key: str, ttl: int = CACHE_TTL_SECONDS) -> int:
+        async with invalidation_scope(), db.unit_of_work():
+            ...
+    """
+    if _pending_invalidations.get() is not None:
+        yield
+        return
+
+    pending: Dict[str, Any] = {"delete": set(), "bump": set(), "publish": []}
+    token = _pending_invalidations.set(pending)
+    try:
+        yield
+    except BaseException:
+        # The unit of work rolled back: invalidating is harmless, announcing the change is not.
+        pending["publish"].clear()
+        raise
+    finally:
+        _pending_invalidations.reset(token)
+        await _flush_invalidations(pending["delete"], pending["bump"], pending["publish"])
+
+
+async def redis_get_str(key: str) -> str | None:
+    try:
+        return await _call("get", lambda client: client.get(key))
+    except RedisUnavailableError:
+        return None
+
+
+async def redis_set_str(key: str, value: str, ttl: int | None = None) -> None:
+    ttl = ttl or get_settings().cache_ttl_seconds
+    try:
+        await _call("set", lambda client: client.set(key, value, ex=ttl))
+    except RedisUnavailableError:
+        pass
+
+
+async def redis_incr(key: str, ttl: int | None = None) -> int:
     """
     Increment integer key in Redis.
     If key is new, it will also get TTL so it auto-expires.
+    Both steps go out in one pipelined round trip.
+    Unlike the cache helpers this raises RedisUnavailableError, because the caller
+    (rate limiting) decides whether to fail open or closed.
     """
-    if redis is None:
-        return 0
+    ttl = ttl or get_settings().cache_ttl_seconds
+
+    def build(pipe):
+        # SET NX only creates the key (with its TTL) when missing; INCR keeps the existing TTL.
+        pipe.set(key, 0, ex=ttl, nx=True)
+        pipe.incr(key)
 
-    val = await redis.incr(key)
-    # Ensure expiry exists
-    if await redis.ttl(key) == -1:
-        await redis.expire(key, ttl)
+    _, val = await _pipeline("pipeline", build)
     return int(val)
 
 
+async def redis_pipeline(build: Callable[[Any], None]) -> list:
+    """
+    Run the commands queued by build(pipe) in one round trip and return their results.
+    Raises RedisUnavailableError, so the caller picks its own failure policy.
+    """
+    return await _pipeline("pipeline", build)
+
+
 async def redis_del(*keys: str) -> None:
-    if redis is None or not keys:
+    if not keys:
         return
-    await redis.delete(*keys)
+    try:
+        await _call("delete", lambda client: client.delete(*keys))
+    except RedisUnavailableError:
+        pass
@@ -0,0 +1,156 @@
+"""
+Audit trail of admin actions.
+
+Routes call audit_log.record() after a change succeeded. Records are only appended to an
+in-process buffer, so an admin request never waits for an audit write; a background task
+writes the buffer to `audit_log` in multi-row INSERTs once AUDIT_FLUSH_SIZE records are
+pending or every AUDIT_FLUSH_SECONDS, and the lifespan flushes what is left on shutdown.
+
+If MySQL is unavailable the records stay buffered and are retried on the next flush. Each
+record carries a random record_id and the INSERT skips ids already stored, so a batch whose
+flush was cancelled after the INSERT committed is not written twice when it is retried. The
+buffer is capped at AUDIT_MAX_PENDING records; past that the oldest are logged and dropped
+(`audit_dropped_total`) rather than growing without limit.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import List, Optional
+
+from app.core.clock import utc_now
+from app.core.config import get_settings
+from app.core.metrics import registry
+from app.core.tracing import current_trace
+from app.repositories.user_repo import UserRepository
+
+logger = logging.getLogger("app.audit")
+
+AUDIT_RECORDS = registry.counter("audit_records_total", "Admin actions recorded")
+AUDIT_WRITTEN = registry.counter("audit_written_total", "Audit records written to MySQL")
+AUDIT_DROPPED = registry.counter("audit_dropped_total", "Audit records dropped because the buffer was full")
+AUDIT_PENDING = registry.gauge("audit_pending", "Audit records buffered in this process")
+AUDIT_FLUSH_SECONDS_HIST = registry.histogram("audit_flush_seconds", "Latency of one audit flush")
+AUDIT_PENDING.set(0)
+
+
+def diff(before: dict | None, after: dict | None) -> dict:
+    """{field: {"before": old, "after": new}} for every field whose value changed."""
+    before = before or {}
+    after = after or {}
+    changes = {}
+    for field in before.keys() | after.keys():
+        old, new = before.get(field), after.get(field)
+        if old != new:
+            changes[field] = {"before": old, "after": new}
+    return changes
+
+
+class AuditLog:
+    """Limits left as None follow AUDIT_FLUSH_SIZE, AUDIT_FLUSH_SECONDS and AUDIT_MAX_PENDING."""
+
+    def __init__(self, flush_size: int | None = None, flush_seconds: float | None = None,
+                 max_pending: int | None = None):
+        self._flush_size = flush_size
+        self._flush_seconds = flush_seconds
+        self._max_pending = max_pending
+        self._pending: List[dict] = []
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def flush_size(self) -> int:
+        return self._flush_size or get_settings().audit_flush_size
+
+    @property
+    def flush_seconds(self) -> float:
+        return self._flush_seconds or get_settings().audit_flush_seconds
+
+    @property
+    def max_pending(self) -> int:
+        return self._max_pending or get_settings().audit_max_pending
+
+    def record(self, admin: dict, action: str, target_type: str, target_id, changes: dict | None = None) -> None:
+        """Buffer one admin action; `admin` is the verify_admin token payload."""
+        trace = current_trace()
+        self._pending.append(
+            {
+                "record_id": uuid.uuid4().hex,
+                "actor_id": admin.get("id"),
+                "actor": admin.get("sub") or "unknown",
+                "action": action,
+                "target_type": target_type,
+                "target_id": str(target_id),
+                "changes": changes or None,
+                "request_id": trace.request_id if trace else None,
+                "created_at": utc_now().replace(microsecond=0),
+            }
+        )
+        AUDIT_RECORDS.inc(action=action)
+        self._trim()
+        if len(self._pending) >= self.flush_size:
+            self._wake.set()
+
+    def _trim(self) -> None:
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            for record in self._pending[:overflow]:
+                logger.error("audit buffer full, dropping record: %s", json.dumps(record, default=str))
+            del self._pending[:overflow]
+            AUDIT_DROPPED.inc(overflow)
+        AUDIT_PENDING.set(len(self._pending))
+
+    async def flush(self) -> int:
+        """Write everything buffered so far. Returns the number of records written."""
+        async with self._lock:
+            records, self._pending = self._pending, []
+            written = 0
+            started = time.perf_counter()
+            try:
+                while written < len(records):
+                    batch = records[written:written + self.flush_size]
+                    await UserRepository.insert_audit_records(batch)
+                    written += len(batch)
+            except Exception as e:
+                logger.warning("audit flush failed, %d records kept for retry: %s", len(records) - written, e)
+            finally:
+                # Keep what was not written (also on cancellation), ahead of anything recorded meanwhile.
+                self._pending = records[written:] + self._pending
+                AUDIT_FLUSH_SECONDS_HIST.observe(time.perf_counter() - started)
+                AUDIT_WRITTEN.inc(written)
+                self._trim()
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._pending:
+                await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write what is left; records that still cannot be written are logged."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        for record in self._pending:
+            logger.error("audit record lost at shutdown: %s", json.dumps(record, default=str))
+        self._pending = []
+        AUDIT_PENDING.set(0)
+
+
+audit_log = AuditLog()
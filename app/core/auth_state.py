@@ -0,0 +1,59 @@
+"""
+Per-customer auth state (token epoch and account status) cached in Redis under
+`auth:user:{id}`, so every authenticated request can check revocation and suspension
+with one GET instead of a MySQL query.
+
+Changes are written through after commit (publish_auth_state) and read-through fills use
+SET NX, so a fill that read the old row can never overwrite the newer state.
+"""
+from fastapi import HTTPException
+
+from app.cache.redis_client import cache_get, cache_set
+from app.core.config import get_settings
+from app.core.events import AUTH_CHANGED, publish_customer_event
+from app.repositories.user_repo import UserRepository
+
+DELETED = "deleted"
+
+
+def auth_state_key(user_id: int) -> str:
+    return f"auth:user:{user_id}"
+
+
+async def _load_auth_state(user_id: int) -> dict:
+    row = await UserRepository.get_auth_state(user_id)
+    if not row:
+        return {"auth_epoch": None, "account_status": DELETED}
+    return {"auth_epoch": row["auth_epoch"], "account_status": row["account_status"]}
+
+
+async def get_auth_state(user_id: int) -> dict:
+    cached = await cache_get(auth_state_key(user_id))
+    if cached is not None:
+        return cached
+    state = await _load_auth_state(user_id)
+    await cache_set(auth_state_key(user_id), state, ttl=get_settings().auth_state_ttl_seconds, nx=True)
+    return state
+
+
+async def prime_auth_state(user_id: int, auth_epoch: int, account_status: str | None) -> None:
+    """Seed the cache from the login query so the first authenticated request skips MySQL."""
+    state = {"auth_epoch": auth_epoch, "account_status": account_status}
+    await cache_set(auth_state_key(user_id), state, ttl=get_settings().auth_state_ttl_seconds, nx=True)
+
+
+async def publish_auth_state(user_id: int) -> None:
+    """Call after committing a status change, password change or deletion."""
+    state = await _load_auth_state(user_id)
+    await cache_set(auth_state_key(user_id), state, ttl=get_settings().auth_state_ttl_seconds)
+    # Open event sockets re-check their token right away instead of at the next request.
+    await publish_customer_event(user_id, AUTH_CHANGED)
+
+
+async def check_customer_token(payload: dict) -> None:
+    state = await get_auth_state(payload.get("id"))
+    # Tokens issued before auth_epoch existed carry no claim and match the initial epoch 0.
+    if state["account_status"] == DELETED or state["auth_epoch"] != payload.get("epoch", 0):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    if state["account_status"] == "suspended":
+        raise HTTPException(status_code=403, detail="Account is suspended")
@@ -0,0 +1,107 @@
+import time
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = registry.gauge("circuit_breaker_state", "Breaker state (0=closed, 1=half_open, 2=open)")
+BREAKER_TRANSITIONS = registry.counter("circuit_breaker_transitions_total", "Breaker state transitions")
+BREAKER_REJECTIONS = registry.counter("circuit_breaker_rejections_total", "Calls rejected while the breaker was open")
+BREAKER_FAILURES = registry.counter("circuit_breaker_failures_total", "Failures recorded by the breaker")
+
+
+class DependencyUnavailableError(Exception):
+    """Raised when a backing service (MySQL, Redis) cannot be used right now."""
+
+    def __init__(self, dependency: str, detail: str = ""):
+        self.dependency = dependency
+        super().__init__(f"{dependency} unavailable{': ' + detail if detail else ''}")
+
+
+class CircuitOpenError(DependencyUnavailableError):
+    def __init__(self, dependency: str):
+        super().__init__(dependency, "circuit open")
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed:    calls pass; `failure_threshold` consecutive failures open the breaker.
+    open:      calls fail fast until `reset_timeout` has elapsed.
+    half_open: up to `half_open_max_calls` probe calls pass; a success closes the breaker,
+               a failure opens it again.
+
+    Limits left as None follow CB_FAILURE_THRESHOLD, CB_RESET_TIMEOUT_SECONDS and
+    CB_HALF_OPEN_MAX_CALLS from the current settings.
+    """
+
+    def __init__(self, name: str, failure_threshold: int | None = None, reset_timeout: float | None = None,
+                 half_open_max_calls: int | None = None):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0  # time of the last transition
+        self._probes = 0
+        BREAKER_STATE.set(_STATE_VALUES[CLOSED], breaker=name)
+
+    @property
+    def failure_threshold(self) -> int:
+        return get_settings().cb_failure_threshold if self._failure_threshold is None else self._failure_threshold
+
+    @property
+    def reset_timeout(self) -> float:
+        return get_settings().cb_reset_timeout_seconds if self._reset_timeout is None else self._reset_timeout
+
+    @property
+    def half_open_max_calls(self) -> int:
+        return get_settings().cb_half_open_max_calls if self._half_open_max_calls is None else self._half_open_max_calls
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        BREAKER_TRANSITIONS.inc(breaker=self.name, to=state)
+        BREAKER_STATE.set(_STATE_VALUES[state], breaker=self.name)
+        self.state = state
+        self._opened_at = time.monotonic()
+        self._probes = 0
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                BREAKER_REJECTIONS.inc(breaker=self.name)
+                return False
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_max_calls and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # A probe never reported back (e.g. it was cancelled); let a new one through.
+                self._opened_at = time.monotonic()
+                self._probes = 0
+            if self._probes >= self.half_open_max_calls:
+                BREAKER_REJECTIONS.inc(breaker=self.name)
+                return False
+            self._probes += 1
+        return True
+
+    def check(self) -> None:
+        """Raise CircuitOpenError instead of returning False."""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        BREAKER_FAILURES.inc(breaker=self.name)
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._transition(OPEN)
@@ -0,0 +1,14 @@
+"""
+The application's clock.
+
+Times the application stores, or compares with stored times, are naive UTC datetimes: the
+values DATETIME columns hold and that NOW() returns on the pool's connections, whose session
+time zone is UTC (see Database.connect). Use utc_now() instead of datetime.utcnow(), which is
+deprecated, or datetime.now(), which is local time.
+"""
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    """The current UTC time as a naive datetime."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,117 @@
+"""
+Response compression (brotli when the `brotli` package is installed, otherwise gzip).
+
+Only compressible content types above COMPRESSION_MIN_SIZE bytes are compressed; small
+bodies cost more CPU to compress than they save on the wire.
+"""
+import gzip
+import zlib
+
+from app.core.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+_COMPRESSIBLE_TYPES = (b"application/json", b"text/", b"application/xml", b"application/javascript")
+
+
+def _accepted_encoding(scope) -> str | None:
+    for name, value in scope.get("headers", []):
+        if name == b"accept-encoding":
+            offered = {part.split(";")[0].strip() for part in value.decode("latin-1").lower().split(",")}
+            if brotli is not None and "br" in offered:
+                return "br"
+            if "gzip" in offered:
+                return "gzip"
+    return None
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=get_settings().brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(get_settings().gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) if self._brotli else self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._brotli.finish() if self._brotli else self._zlib.flush()
+
+
+def compress_body(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=get_settings().brotli_quality)
+    return gzip.compress(body, compresslevel=get_settings().gzip_level)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware; single-message bodies are compressed in one go, streams incrementally."""
+
+    def __init__(self, app, minimum_size: int | None = None):
+        # None: COMPRESSION_MIN_SIZE from the current settings.
+        self.app = app
+        self.minimum_size = minimum_size
+
+    def _minimum_size(self) -> int:
+        return get_settings().compression_min_size if self.minimum_size is None else self.minimum_size
+
+    async def __call__(self, scope, receive, send):
+        encoding = _accepted_encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = start_message.get("headers", [])
+                content_type = next((v for k, v in headers if k == b"content-type"), b"")
+                already_encoded = any(k == b"content-encoding" for k, _ in headers)
+                compressible = content_type.startswith(_COMPRESSIBLE_TYPES)
+                if already_encoded or not compressible or (not more_body and len(body) < self._minimum_size()):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                headers = [(k, v) for k, v in headers if k != b"content-length"]
+                headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"vary", b"Accept-Encoding"))
+                if not more_body:
+                    compressed = compress_body(encoding, body)
+                    headers.append((b"content-length", str(len(compressed)).encode()))
+                    await send({**start_message, "headers": headers})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                compressor = _StreamCompressor(encoding)
+                await send({**start_message, "headers": headers})
+
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+        if start_message is not None and compressor is None and not passthrough:
+            # Response ended without a body message (e.g. 304); send the start untouched.
+            await send(start_message)
@@ -1,28 +1,258 @@
+"""
+Configuration.
+
+Settings holds the whole configuration (connections, pools, cache, JWT, SMTP, rate limits,
+breakers, feature limits, jobs, logging) as one validated object. It is built on first use with
+get_settings() and read at the point of use (`get_settings().cache_ttl_seconds`), so
+reload_settings() (SIGHUP, see main.py) takes effect without a restart. Pool sizes and
+connection targets only apply to pools created afterwards, CORS origins and the server's
+bind address and worker count only on restart, and DEFAULT_CURRENCY is fixed for the life of
+a process (see app.core.fx).
+
+.env is read once, here. Variables the process was started with win over .env (serve.py
+exports per-worker pool sizes).
+"""
+import logging
 import os
-from typing import List
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Literal, Mapping, Optional, Tuple
+
+from dotenv import dotenv_values
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator, model_validator
+
+logger = logging.getLogger("app.config")
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+RATE_LIMIT_POLICY_PREFIX = "RATE_LIMIT_FAIL_POLICY_"
+
+# Values this module copied from .env into os.environ, so a reload can tell them apart from
+# variables set by the process environment.
+_from_dotenv: Dict[str, str] = {}
+
+
+def _read_env_file(path: Path) -> Tuple[Dict[str, str], List[str]]:
+    """
+    What loading .env would change: the variables to set and the ones to remove (dropped from
+    .env since it was last loaded). Variables the process environment set are left alone.
+    """
+    values = {name: value for name, value in dotenv_values(path).items() if value is not None}
+    removed = [name for name, value in _from_dotenv.items() if name not in values and os.environ.get(name) == value]
+    updates = {
+        name: value
+        for name, value in values.items()
+        if name not in os.environ or os.environ[name] == _from_dotenv.get(name)
+    }
+    return updates, removed
+
+
+def _apply_env_file(updates: Dict[str, str], removed: List[str]) -> None:
+    for name in removed:
+        del os.environ[name]
+        del _from_dotenv[name]
+    os.environ.update(updates)
+    _from_dotenv.update(updates)
+
+
+def load_env_file(path: Path = ENV_PATH) -> None:
+    """Copy .env into os.environ without replacing variables the process environment set."""
+    _apply_env_file(*_read_env_file(path))
+
+
+load_env_file()
+
+
+class Settings(BaseModel):
+    """Field `name` is read from the environment variable `NAME`."""
+
+    model_config = ConfigDict(frozen=True)
+
+    # MySQL
+    db_host: str = "localhost"
+    db_port: int = Field(3306, ge=1, le=65535)
+    db_user: str = "root"
+    db_password: str = ""
+    db_name: str = "secure_bank"
+    db_pool_max_size: int = Field(10, ge=1)
+    db_pool_warm_size: int = Field(5, ge=0)
+    db_acquire_timeout: float = Field(2.0, ge=0.01)
+    db_connect_timeout: float = Field(5.0, ge=0.1)
+    db_statement_timeout: float = Field(10.0, ge=0.0)
+    # Batch jobs (postings, statements, ledger checks, daily stats, purge) run set-wise
+    # statements that may legitimately take longer; 0 leaves them without a timeout.
+    job_statement_timeout: float = Field(0.0, ge=0.0)
+
+    # Schema migrations (app.database.migrate): how long to wait for the migration lock, and how
+    # long a DDL statement may wait for its metadata lock. The latter is kept short so a migration
+    # queued behind a long-running transaction gives up instead of blocking every query after it.
+    migration_lock_timeout: int = Field(60, ge=0)
+    migration_lock_wait_timeout: int = Field(5, ge=1)
+
+    # Redis and cache
+    redis_url: str = "redis://127.0.0.1:6379/0"
+    redis_max_connections: int = Field(50, ge=1)
+    redis_pool_warm_size: int = Field(5, ge=0)
+    redis_socket_timeout: float = Field(0.5, ge=0.01)
+    redis_connect_timeout: float = Field(1.0, ge=0.01)
+    redis_health_check_interval: int = Field(30, ge=0)
+    cache_ttl_seconds: int = Field(60, ge=1)
+    # Version keys expire so that a bump lost during a Redis outage cannot serve stale 304s forever.
+    version_ttl_seconds: int = Field(3600, ge=1)
+
+    # Circuit breakers in front of MySQL and Redis
+    cb_failure_threshold: int = Field(5, ge=1)
+    cb_reset_timeout_seconds: float = Field(5.0, ge=0.1)
+    cb_half_open_max_calls: int = Field(1, ge=1)
+
+    # serve.py: worker count (default: available CPUs), bind address, and connection budgets
+    # for all workers together, divided across them.
+    web_concurrency: Optional[int] = Field(None, ge=1)
+    host: str = "0.0.0.0"
+    port: int = Field(8000, ge=1, le=65535)
+    db_pool_budget: int = Field(40, ge=1)
+    redis_pool_budget: int = Field(200, ge=1)
+
+    # HTTP
+    cors_allow_origins: List[str] = []
+    compression_min_size: int = Field(1024, ge=0)
+    gzip_level: int = Field(6, ge=1, le=9)
+    brotli_quality: int = Field(4, ge=0, le=11)
+    slow_query_ms: int = Field(200, ge=1)
+
+    # JWT
+    secret_key: str = Field(min_length=1)
+    algorithm: Literal["HS256", "HS384", "HS512"] = "HS256"
+    access_token_expire_minutes: int = Field(60, ge=1)
+
+    # SMTP (admin OTP and notification emails)
+    smtp_server: str = "smtp.gmail.com"
+    smtp_port: int = Field(587, ge=1, le=65535)
+    smtp_email: Optional[str] = None
+    smtp_password: Optional[str] = None
+
+    # Customer auth state and event push. The auth state TTL bounds staleness if a
+    # write-through was lost while Redis was unreachable.
+    auth_state_ttl_seconds: int = Field(300, ge=1)
+    events_buffer_size: int = Field(100, ge=1)
+    events_heartbeat_seconds: float = Field(30.0, ge=1.0)
+    events_max_connections_per_customer: int = Field(5, ge=1)
+
+    # Base currency of limits, statistics and new customers' accounts.
+    default_currency: str = Field("USD", pattern="^[A-Z]{3}$")
+    max_accounts_per_customer: int = Field(5, ge=1)
+    fx_refresh_seconds: float = Field(60.0, ge=1.0)
+
+    # Holds, scheduled transfers and screening
+    hold_default_ttl_seconds: int = Field(7 * 24 * 3600, ge=60)
+    hold_max_ttl_seconds: int = Field(30 * 24 * 3600, ge=60)
+    schedule_max_attempts: int = Field(3, ge=1)
+    schedule_retry_base_seconds: int = Field(60, ge=1)
+    schedule_lease_seconds: int = Field(120, ge=10)
+    screening_rule_timeout_ms: int = Field(50, ge=1)
+    screening_refresh_seconds: float = Field(10.0, ge=1.0)
+    screening_payee_memory_days: int = Field(180, ge=1)
+
+    # Admin audit log buffer
+    audit_flush_size: int = Field(100, ge=1)
+    audit_flush_seconds: float = Field(1.0, ge=0.05)
+    audit_max_pending: int = Field(10000, ge=1)
+
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
+
+    # Batch jobs: app.jobs.postings and app.jobs.statements
+    interest_annual_rate: Decimal = Field(Decimal("0.01"), ge=0)
+    interest_day_count: Decimal = Field(Decimal("365"), gt=0)
+    monthly_fee: Decimal = Field(Decimal("2.00"), ge=0)
+    fee_waiver_min_balance: Decimal = Field(Decimal("1000.00"), ge=0)
+    statements_output_dir: str = Field("statements", min_length=1)
+    statement_formats: List[Literal["csv", "pdf"]] = Field(["csv", "pdf"], min_length=1)
+
+    # Customer purge job: app.jobs.customer_purge
+    purge_grace_hours: float = Field(24.0, ge=0.0)
+    purge_batch_size: int = Field(200, ge=1)
+    purge_pause_ms: int = Field(50, ge=0)
+    purge_lock_wait_timeout_seconds: int = Field(2, ge=1)
+
+    # Rate limiting when Redis is unavailable: RATE_LIMIT_FAIL_POLICY, and per route
+    # RATE_LIMIT_FAIL_POLICY_<ROUTE> (collected into rate_limit_fail_policies by route name).
+    rate_limit_fail_policy: Literal["open", "closed"] = "open"
+    rate_limit_fail_policies: Dict[str, Literal["open", "closed"]] = {}
+
+    @model_validator(mode="before")
+    @classmethod
+    def _default_warm_sizes(cls, data: dict) -> dict:
+        # Warm at most five connections unless asked otherwise, and never more than the pool holds.
+        data = dict(data)
+        for warm, size, default in (
+            ("db_pool_warm_size", "db_pool_max_size", 10),
+            ("redis_pool_warm_size", "redis_max_connections", 50),
+        ):
+            if warm not in data:
+                try:
+                    data[warm] = min(5, int(data.get(size, default)))
+                except ValueError:
+                    pass  # the pool size itself fails validation
+        return data
+
+    @field_validator("cors_allow_origins", "statement_formats", mode="before")
+    @classmethod
+    def _split_list(cls, value):
+        # Comma-separated in the environment: "csv, pdf".
+        return [item.strip() for item in value.split(",") if item.strip()] if isinstance(value, str) else value
+
+    @field_validator("default_currency", "log_level", mode="before")
+    @classmethod
+    def _upper(cls, value):
+        return value.upper() if isinstance(value, str) else value
+
+    @field_validator("rate_limit_fail_policy", mode="before")
+    @classmethod
+    def _lower_policy(cls, value):
+        return value.lower() if isinstance(value, str) else value
 
-from dotenv import load_dotenv
+    @field_validator("rate_limit_fail_policies", mode="before")
+    @classmethod
+    def _lower_policies(cls, value):
+        return {route: policy.lower() for route, policy in value.items()} if isinstance(value, dict) else value
 
-load_dotenv()
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] | None = None) -> "Settings":
+        """Settings from `environ` (default: os.environ)."""
+        environ = os.environ if environ is None else environ
+        values = {name: environ[name.upper()] for name in cls.model_fields if name.upper() in environ}
+        values["rate_limit_fail_policies"] = {
+            name[len(RATE_LIMIT_POLICY_PREFIX):].lower(): value
+            for name, value in environ.items()
+            if name.startswith(RATE_LIMIT_POLICY_PREFIX) and value
+        }
+        try:
+            return cls.model_validate(values)
+        except ValidationError as e:
+            raise RuntimeError(f"Invalid settings: {e}") from e
 
 
-def get_required_env(name: str) -> str:
-    value = os.getenv(name)
-    if not value:
-        raise RuntimeError(f"{name} is required")
-    return value
+_settings: Optional[Settings] = None
 
 
-def get_int_env(name: str, default: int, min_value: int | None = None) -> int:
-    raw = os.getenv(name)
-    value = int(raw) if raw is not None else default
-    if min_value is not None and value < min_value:
-        raise RuntimeError(f"{name} must be >= {min_value}")
-    return value
+def get_settings() -> Settings:
+    """The current settings; also usable as a FastAPI dependency (Depends(get_settings))."""
+    global _settings
+    if _settings is None:
+        _settings = Settings.from_env()
+    return _settings
 
 
-def get_list_env(name: str, default: List[str] | None = None) -> List[str]:
-    raw = os.getenv(name)
-    if raw is None:
-        return list(default) if default is not None else []
-    return [item.strip() for item in raw.split(",") if item.strip()]
+def reload_settings() -> Settings:
+    """
+    Re-read .env and the environment. An invalid configuration raises RuntimeError and
+    leaves both the current settings and os.environ untouched.
+    """
+    global _settings
+    updates, removed = _read_env_file(ENV_PATH)
+    environ = {name: value for name, value in os.environ.items() if name not in removed}
+    environ.update(updates)
+    settings = Settings.from_env(environ)
+    _apply_env_file(updates, removed)
+    _settings = settings
+    logger.info("Settings reloaded")
+    return _settings
@@ -0,0 +1,49 @@
+"""
+Conditional GET support: weak ETags built from cheap version values, so a matching
+If-None-Match is answered with 304 before the expensive query runs.
+"""
+import hashlib
+
+from fastapi import Request, Response
+
+from app.cache.redis_client import version_get
+
+CUSTOMERS_VERSION_KEY = "ver:customers"
+
+
+def customer_version_key(user_id: int) -> str:
+    return f"ver:customer:{user_id}"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    # Weak: the same representation may be sent gzip- or brotli-encoded.
+    return f'W/"{digest}"'
+
+
+async def version_etag(*parts, keys) -> str | None:
+    """ETag from Redis version counters plus request parameters; None when Redis is unavailable."""
+    versions = await version_get(*keys)
+    if versions is None:
+        return None
+    return make_etag(*parts, *versions)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == wanted for candidate in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def set_etag(response: Response, etag: str | None) -> None:
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
@@ -0,0 +1,175 @@
+"""
+Per-customer event push (balance and transaction changes) over WebSockets.
+
+Writers call publish_customer_event() inside the invalidation_scope() of the change, so the
+message goes out on `events:customer:{id}` only after the commit. Each worker process keeps a
+single Redis pub/sub connection (pattern-subscribed to every customer channel) and fans
+messages out to its local sockets through an EventHub; a customer connected to any worker
+gets events published by any other worker or job.
+
+Every socket has a bounded queue of EVENTS_BUFFER_SIZE messages. A client that falls that far
+behind is disconnected instead of buffering without limit; it reconnects and refetches.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Optional, Set
+
+from redis.exceptions import RedisError
+
+from app.cache import redis_client
+from app.cache.redis_client import publish
+from app.core.config import get_settings
+from app.core.metrics import registry
+
+logger = logging.getLogger("app.events")
+
+EVENTS_MAX_BACKOFF_SECONDS = 5.0
+
+CHANNEL_PREFIX = "events:customer:"
+
+# Internal event: the customer's auth state changed, sockets re-check their token.
+AUTH_CHANGED = "auth_changed"
+# Sent to every local socket after the pub/sub connection was re-established: events may have been missed.
+RESYNC = "resync"
+
+EVENTS_SUBSCRIBERS = registry.gauge("events_subscribers", "Open event sockets in this process")
+EVENTS_DELIVERED = registry.counter("events_delivered_total", "Events queued to a local socket")
+EVENTS_OVERFLOWS = registry.counter("events_overflows_total", "Sockets closed because their send buffer was full")
+EVENTS_SUBSCRIBERS.set(0)
+
+
+def customer_channel(user_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+async def publish_customer_event(user_id: int, event_type: str, **data) -> None:
+    await publish(customer_channel(user_id), {"type": event_type, "user_id": user_id, **data})
+
+
+class Subscriber:
+    """One socket's bounded send buffer; `overflowed` is set when a message had to be dropped."""
+
+    __slots__ = ("user_id", "queue", "overflowed")
+
+    def __init__(self, user_id: int, size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self.overflowed = False
+
+    def offer(self, event: dict, text: str) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait((event, text))
+        except asyncio.QueueFull:
+            self.overflowed = True
+            EVENTS_OVERFLOWS.inc()
+            # Wake the sender even though the queue is full, so it closes the socket promptly.
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return
+        EVENTS_DELIVERED.inc()
+
+
+class EventHub:
+    def __init__(self, buffer_size: int | None = None):
+        self.buffer_size = buffer_size  # None: EVENTS_BUFFER_SIZE from the current settings
+        self._subscribers: Dict[int, Set[Subscriber]] = defaultdict(set)
+        self._count = 0
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+
+    def subscribe(self, user_id: int) -> Optional[Subscriber]:
+        """Register a socket; None when the customer already has the maximum number open here."""
+        local = self._subscribers[user_id]
+        settings = get_settings()
+        if len(local) >= settings.events_max_connections_per_customer:
+            return None
+        subscriber = Subscriber(user_id, self.buffer_size or settings.events_buffer_size)
+        local.add(subscriber)
+        self._count += 1
+        EVENTS_SUBSCRIBERS.set(self._count)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        local = self._subscribers.get(subscriber.user_id)
+        if local is None or subscriber not in local:
+            return
+        local.discard(subscriber)
+        if not local:
+            del self._subscribers[subscriber.user_id]
+        self._count -= 1
+        EVENTS_SUBSCRIBERS.set(self._count)
+
+    def dispatch(self, user_id: int, event: dict, text: str) -> None:
+        for subscriber in tuple(self._subscribers.get(user_id, ())):
+            subscriber.offer(event, text)
+
+    def dispatch_all(self, event: dict) -> None:
+        text = json.dumps(event)
+        for local in tuple(self._subscribers.values()):
+            for subscriber in tuple(local):
+                subscriber.offer(event, text)
+
+    def _handle(self, message: dict) -> None:
+        channel = message["channel"]
+        try:
+            user_id = int(channel[len(CHANNEL_PREFIX):])
+        except ValueError:
+            return
+        if user_id not in self._subscribers:
+            return
+        text = message["data"]
+        self.dispatch(user_id, json.loads(text), text)
+
+    async def _listen(self) -> None:
+        """Keep one pattern subscription open, reconnecting with backoff."""
+        backoff = 0.25
+        missed = False
+        while True:
+            pubsub = None
+            try:
+                if redis_client.redis is None:
+                    raise RuntimeError("redis not initialized")
+                pubsub = redis_client.redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                self.connected = True
+                backoff = 0.25
+                if missed:
+                    self.dispatch_all({"type": RESYNC})
+                while True:
+                    message = await pubsub.get_message(timeout=get_settings().events_heartbeat_seconds)
+                    if message is not None and message["type"] == "pmessage":
+                        self._handle(message)
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError, RuntimeError) as e:
+                logger.warning("Event subscription lost, retrying in %.2fs: %s", backoff, e)
+            finally:
+                self.connected = False
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except (RedisError, OSError):
+                        pass
+            missed = True
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, EVENTS_MAX_BACKOFF_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+event_hub = EventHub()
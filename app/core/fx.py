@@ -0,0 +1,58 @@
+"""
+In-memory FX rate cache.
+
+Rates live in the fx_rates table and every process keeps a copy here, refreshed every
+FX_REFRESH_SECONDS (see FxService), so converting an amount inside a transfer transaction
+costs a dict lookup instead of a query.
+"""
+import time
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.core.config import get_settings
+
+# Read once: balances, limits and stored snapshots are denominated in it, so a reload must not change it.
+DEFAULT_CURRENCY = get_settings().default_currency
+
+_CENT = Decimal("0.01")
+
+
+class FxRates:
+    def __init__(self):
+        self._rates: Dict[Tuple[str, str], Decimal] = {}
+        self.loaded_at: Optional[float] = None
+
+    def replace(self, rows: Iterable[dict]) -> None:
+        """Swap in a full set of rates (rows with base_currency, quote_currency, rate)."""
+        self._rates = {
+            (row["base_currency"], row["quote_currency"]): Decimal(str(row["rate"])) for row in rows
+        }
+        self.loaded_at = time.time()
+
+    def rate(self, base: str, quote: str) -> Optional[Decimal]:
+        if base == quote:
+            return Decimal(1)
+        direct = self._rates.get((base, quote))
+        if direct is not None:
+            return direct
+        inverse = self._rates.get((quote, base))
+        return Decimal(1) / inverse if inverse else None
+
+    def convert(self, amount: Decimal, base: str, quote: str) -> Optional[Decimal]:
+        """Amount in `quote`, rounded half-even to cents; None when no rate is known."""
+        rate = self.rate(base, quote)
+        if rate is None:
+            return None
+        return (amount * rate).quantize(_CENT, rounding=ROUND_HALF_EVEN)
+
+    def snapshot(self) -> dict:
+        return {
+            "loaded_at": self.loaded_at,
+            "rates": [
+                {"base_currency": base, "quote_currency": quote, "rate": rate}
+                for (base, quote), rate in sorted(self._rates.items())
+            ],
+        }
+
+
+fx_rates = FxRates()
@@ -0,0 +1,90 @@
+import logging
+import time
+import uuid
+
+from starlette.routing import Match
+
+from app.core.metrics import registry
+from app.core.tracing import current_trace, end_trace, start_trace
+
+logger = logging.getLogger("app.request")
+
+HTTP_REQUEST_SECONDS = registry.histogram("http_request_duration_seconds", "HTTP request latency by route")
+HTTP_REQUESTS = registry.counter("http_requests_total", "HTTP requests by route and status")
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    app = scope.get("app")
+    for candidate in getattr(getattr(app, "router", None), "routes", []):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return getattr(candidate, "path", scope["path"])
+    return "unmatched"
+
+
+class RequestTracingMiddleware:
+    """
+    Attach a request id (taken from X-Request-ID when present) to every HTTP request,
+    echo it in the response and log a per-request summary of DB, Redis and bcrypt time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = start_trace(request_id)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            trace = current_trace()
+            end_trace(token)
+
+            route = _route_template(scope)
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status_code))
+
+            summary = trace.summary() if trace else {"request_id": request_id}
+            logger.info(
+                "%s %s %s %.1fms db=%sms/%s stmts pool_wait=%sms redis=%sms/%s cmds bcrypt=%sms request_id=%s",
+                scope["method"],
+                route,
+                status_code,
+                elapsed * 1000,
+                summary.get("db_ms"),
+                summary.get("db_statements"),
+                summary.get("pool_wait_ms"),
+                summary.get("redis_ms"),
+                summary.get("redis_commands"),
+                summary.get("bcrypt_ms"),
+                request_id,
+            )
+            if trace and logger.isEnabledFor(logging.DEBUG):
+                for statement, ms, rows in trace.statements:
+                    logger.debug("request_id=%s %.2fms rows=%s %s", request_id, ms, rows, statement)
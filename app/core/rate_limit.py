@@ -0,0 +1,49 @@
+import logging
+
+from fastapi import HTTPException
+
+from app.cache.redis_client import RedisUnavailableError, redis_incr
+from app.core.config import get_settings
+
+logger = logging.getLogger("app.rate_limit")
+
+FAIL_OPEN = "open"
+FAIL_CLOSED = "closed"
+
+# Brute-force protection on admin credentials matters more than availability.
+_DEFAULT_ROUTE_POLICIES = {
+    "admin_login": FAIL_CLOSED,
+    "admin_otp": FAIL_CLOSED,
+}
+
+
+def get_fail_policy(route: str) -> str:
+    """
+    Policy when Redis cannot be reached: RATE_LIMIT_FAIL_POLICY_<ROUTE> overrides
+    the route default, which falls back to RATE_LIMIT_FAIL_POLICY (default "open").
+    """
+    settings = get_settings()
+    return (
+        settings.rate_limit_fail_policies.get(route)
+        or _DEFAULT_ROUTE_POLICIES.get(route)
+        or settings.rate_limit_fail_policy
+    )
+
+
+async def enforce_rate_limit(route: str, identifier: str, limit: int, window_seconds: int, detail: str) -> str:
+    """
+    Count one attempt for (route, identifier) and raise 429 once `limit` is exceeded within the window.
+    Returns the Redis key so callers can reset it after a successful attempt.
+    """
+    key = f"rl:{route}:{identifier}"
+    try:
+        attempts = await redis_incr(key, ttl=window_seconds)
+    except RedisUnavailableError as e:
+        if get_fail_policy(route) == FAIL_CLOSED:
+            logger.warning("Rate limiter unavailable for %s, rejecting request: %s", route, e)
+            raise HTTPException(status_code=503, detail="Service temporarily unavailable. Try again later.")
+        return key
+
+    if attempts > limit:
+        raise HTTPException(status_code=429, detail=detail)
+    return key
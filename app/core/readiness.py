@@ -0,0 +1,89 @@
+"""
+Startup warmup and the state behind /health/ready.
+
+The lifespan handler starts warm_up() in the background so the process answers liveness
+probes immediately; readiness flips once the schema check passed, the pools are warm and
+the FX rates and screening rules are loaded.
+"""
+import asyncio
+import logging
+import time
+
+from app.cache.redis_client import warm_redis
+from app.core.circuit_breaker import OPEN
+from app.core.config import get_settings
+from app.core.events import event_hub
+from app.core.metrics import registry
+from app.database.database import db
+from app.database.migrate import pending_migrations
+from app.services.fx_service import FxService
+from app.services.screening_service import ScreeningService
+
+logger = logging.getLogger("app.readiness")
+
+WARMUP_MAX_BACKOFF_SECONDS = 5.0
+
+APP_READY = registry.gauge("app_ready", "1 once the schema check passed and the pools are warm")
+APP_WARMUP_SECONDS = registry.gauge("app_warmup_seconds", "Seconds spent in startup warmup")
+APP_READY.set(0)
+
+
+class Readiness:
+    def __init__(self):
+        self.ready = False
+        self.mysql_connections = 0
+        self.redis = False
+        self.warmup_seconds = None
+        self.last_error = None
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "mysql_connections": self.mysql_connections,
+            "mysql_breaker": db.breaker.state,
+            "redis": self.redis,
+            "events_subscription": event_hub.connected,
+            "warmup_seconds": self.warmup_seconds,
+            "last_error": self.last_error,
+        }
+
+    def is_ready(self) -> bool:
+        # Redis is optional (the app degrades to MySQL); an open MySQL breaker is not.
+        return self.ready and db.breaker.state != OPEN
+
+
+readiness = Readiness()
+
+
+async def warm_up() -> None:
+    """Check the schema and warm both pools, retrying with backoff until MySQL answers."""
+    started = time.perf_counter()
+    settings = get_settings()
+    backoff = 0.25
+    while True:
+        try:
+            pending = await pending_migrations()
+            if pending:
+                versions = ", ".join(f"{m.version:04d}_{m.name}" for m in pending)
+                raise RuntimeError(f"pending migrations {versions}; run python -m app.database.migrate")
+            if settings.db_pool_warm_size:
+                readiness.mysql_connections = await db.warm_pool(settings.db_pool_warm_size)
+            # Transfers convert and screen with in-memory copies of these tables; load them before ready.
+            await FxService.refresh()
+            await ScreeningService.refresh()
+            break
+        except Exception as e:
+            readiness.last_error = str(e)
+            logger.warning("Warmup failed, retrying in %.2fs: %s", backoff, e)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, WARMUP_MAX_BACKOFF_SECONDS)
+
+    if settings.redis_pool_warm_size:
+        readiness.redis = await warm_redis(settings.redis_pool_warm_size)
+
+    readiness.last_error = None
+    readiness.warmup_seconds = round(time.perf_counter() - started, 3)
+    readiness.ready = True
+    APP_READY.set(1)
+    APP_WARMUP_SECONDS.set(readiness.warmup_seconds)
+    logger.info("Ready after %.3fs warmup", readiness.warmup_seconds)
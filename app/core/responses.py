@@ -0,0 +1,15 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class: rendered by pydantic-core's serializer instead of json.dumps.
+    Decimal is written as an exact string and datetime as ISO 8601, the same way response
+    models serialize them, so cached dicts and freshly built models produce identical JSON.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -1,18 +1,13 @@
-import os
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
 
 from fastapi.security import APIKeyHeader
 from jose import jwt
 from passlib.context import CryptContext
 
-from app.core.config import get_int_env, get_required_env
-
-SECRET_KEY = get_required_env("SECRET_KEY")
-ALGORITHM = get_required_env("ALGORITHM") if "ALGORITHM" in os.environ else "HS256"
-if ALGORITHM not in {"HS256", "HS384", "HS512"}:
-    raise RuntimeError("ALGORITHM must be one of: HS256, HS384, HS512")
-ACCESS_TOKEN_EXPIRE_MINUTES = get_int_env("ACCESS_TOKEN_EXPIRE_MINUTES", 60, min_value=1)
+from app.core.clock import utc_now
+from app.core.config import get_settings
+from app.core.tracing import bcrypt_timer
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -21,17 +16,20 @@ oauth2_scheme = APIKeyHeader(name="Authorization", auto_error=False)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with bcrypt_timer("verify"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with bcrypt_timer("hash"):
+        return pwd_context.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    settings = get_settings()
     to_encode = data.copy()
-    now = datetime.utcnow()
-    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    now = utc_now()
+    expire = now + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
     to_encode.update({"iat": now})
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
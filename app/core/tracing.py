@@ -0,0 +1,133 @@
+"""
+Per-request trace context.
+
+The tracing middleware opens a RequestTrace for every HTTP request; the database wrapper,
+the Redis client and the password hashing helpers add their timings to whichever trace is
+active. Outside a request (jobs, CLI) nothing is attributed but metrics are still recorded.
+"""
+import contextvars
+import logging
+import re
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Optional
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+
+logger = logging.getLogger("app.tracing")
+
+DB_STATEMENT_SECONDS = registry.histogram("db_statement_duration_seconds", "SQL statement latency by fingerprint")
+DB_POOL_WAIT_SECONDS = registry.histogram("db_pool_wait_seconds", "Time spent waiting for a pooled MySQL connection")
+DB_SLOW_QUERIES = registry.counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_MS")
+REDIS_COMMAND_SECONDS = registry.histogram("redis_command_duration_seconds", "Redis command latency")
+BCRYPT_SECONDS = registry.histogram("bcrypt_duration_seconds", "Password hashing and verification latency")
+
+
+class RequestTrace:
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.db_seconds = 0.0
+        self.db_statements = 0
+        self.db_rows = 0
+        self.pool_wait_seconds = 0.0
+        self.redis_seconds = 0.0
+        self.redis_commands = 0
+        self.bcrypt_seconds = 0.0
+        self.statements: List[tuple] = []
+
+    def summary(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "db_statements": self.db_statements,
+            "db_rows": self.db_rows,
+            "pool_wait_ms": round(self.pool_wait_seconds * 1000, 2),
+            "redis_ms": round(self.redis_seconds * 1000, 2),
+            "redis_commands": self.redis_commands,
+            "bcrypt_ms": round(self.bcrypt_seconds * 1000, 2),
+        }
+
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("request_trace", default=None)
+
+
+def start_trace(request_id: str):
+    return _current_trace.set(RequestTrace(request_id))
+
+
+def end_trace(token) -> None:
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\b\d+(?:\.\d+)?\b|%s")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql: str) -> str:
+    """Normalize a statement so that executions differing only in literals share one fingerprint."""
+    normalized = _WHITESPACE.sub(" ", sql).strip()
+    normalized = _LITERALS.sub("?", normalized)
+    normalized = _IN_LIST.sub("(...)", normalized)
+    return normalized[:200]
+
+
+def record_statement(sql: str, seconds: float, rows: int) -> None:
+    statement = fingerprint(sql)
+    DB_STATEMENT_SECONDS.observe(seconds, statement=statement)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.db_seconds += seconds
+        trace.db_statements += 1
+        trace.db_rows += max(rows, 0)
+        trace.statements.append((statement, round(seconds * 1000, 2), rows))
+    if seconds * 1000 >= get_settings().slow_query_ms:
+        DB_SLOW_QUERIES.inc()
+        logger.warning(
+            "slow query %.1fms rows=%s request_id=%s: %s",
+            seconds * 1000,
+            rows,
+            trace.request_id if trace else "-",
+            statement,
+        )
+
+
+def record_pool_wait(seconds: float) -> None:
+    DB_POOL_WAIT_SECONDS.observe(seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.pool_wait_seconds += seconds
+
+
+@contextmanager
+def redis_timer(command: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        REDIS_COMMAND_SECONDS.observe(elapsed, command=command)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.redis_seconds += elapsed
+            trace.redis_commands += 1
+
+
+@contextmanager
+def bcrypt_timer(operation: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        BCRYPT_SECONDS.observe(elapsed, operation=operation)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.bcrypt_seconds += elapsed
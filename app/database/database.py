@@ -1,69 +1,160 @@
-import os
+import asyncio
+import contextvars
+import logging
+from contextlib import asynccontextmanager, contextmanager
 
 import aiomysql
-from dotenv import load_dotenv
 
-load_dotenv()
+from app.core.circuit_breaker import CircuitBreaker, DependencyUnavailableError
+from app.core.config import get_settings
+from app.database.instrumentation import InstrumentedAcquire
+from app.database.unit_of_work import (
+    JoinedAcquire,
+    UnitOfWork,
+    current_unit_of_work,
+    reset_unit_of_work,
+    set_unit_of_work,
+)
+
+logger = logging.getLogger("app.database")
+
+# Passed as statement_timeout to use the enclosing Database.statement_timeout() scope, or
+# Settings.db_statement_timeout outside one.
+DEFAULT_STATEMENT_TIMEOUT = "default"
+
+_statement_timeout: contextvars.ContextVar = contextvars.ContextVar("statement_timeout", default=DEFAULT_STATEMENT_TIMEOUT)
 
 
 class Database:
     def __init__(self):
         self.pool = None
+        self.breaker = CircuitBreaker("mysql")
 
     async def connect(self):
+        """Create the pool without opening connections; see warm_pool() and app.database.migrate."""
         if self.pool:
             return
 
+        settings = get_settings()
         try:
             self.pool = await aiomysql.create_pool(
-                host=os.getenv("DB_HOST", "localhost"),
-                port=int(os.getenv("DB_PORT", 3306)),
-                user=os.getenv("DB_USER", "root"),
-                password=os.getenv("DB_PASSWORD", ""),
-                db=os.getenv("DB_NAME", "secure_bank"),
-                minsize=1,
-                maxsize=10,
+                host=settings.db_host,
+                port=settings.db_port,
+                user=settings.db_user,
+                password=settings.db_password,
+                db=settings.db_name,
+                minsize=0,
+                maxsize=settings.db_pool_max_size,
                 autocommit=False,
+                connect_timeout=settings.db_connect_timeout,
+                # NOW() and TIMESTAMP columns in UTC, like app.core.clock.utc_now().
+                init_command="SET time_zone = '+00:00'",
             )
-            await self._ensure_schema()
-            print("--- Connection to MySQL established ---")
         except Exception as e:
-            print(f"--- Error connecting to Database: {e} ---")
+            logger.error("Error creating MySQL pool: %s", e)
             raise
 
+    async def warm_pool(self, size: int) -> int:
+        """
+        Open connections until the pool holds `size` of them (capped at maxsize) and park them
+        as free connections. Returns the resulting pool size.
+        """
+        pool = self.pool
+        target = min(size, pool.maxsize)
+        if pool.size >= target:
+            return pool.size
+
+        # Hold every free connection plus the missing ones at once, so the pool has to open
+        # new connections instead of handing the same free one out again; then give them back.
+        wanted = target - (pool.size - pool.freesize)
+        # aiomysql opens connections one at a time, so the last acquire waits for all the handshakes.
+        timeout = get_settings().db_connect_timeout * wanted
+        results = await asyncio.gather(
+            *(asyncio.wait_for(pool.acquire(), timeout) for _ in range(wanted)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if not isinstance(result, BaseException):
+                pool.release(result)
+
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            self.breaker.record_failure()
+            raise DependencyUnavailableError("mysql", f"{len(errors)} of {wanted} connections failed: {errors[0]!r}")
+        self.breaker.record_success()
+        logger.info("MySQL pool warmed to %s connections", pool.size)
+        return pool.size
+
     async def disconnect(self):
         if self.pool:
             self.pool.close()
             await self.pool.wait_closed()
             self.pool = None
 
-    async def get_conn(self):
+    @contextmanager
+    def statement_timeout(self, seconds: float | None):
+        """
+        Time out statements on connections acquired inside the block after `seconds`
+        (None or 0: never) instead of DB_STATEMENT_TIMEOUT. Batch jobs use this for their
+        set-wise statements; tasks started inside the block inherit it.
+        """
+        token = _statement_timeout.set(seconds)
+        try:
+            yield
+        finally:
+            _statement_timeout.reset(token)
+
+    def _acquire(self, statement_timeout=DEFAULT_STATEMENT_TIMEOUT) -> InstrumentedAcquire:
+        settings = get_settings()
+        if statement_timeout == DEFAULT_STATEMENT_TIMEOUT:
+            statement_timeout = _statement_timeout.get()
+        if statement_timeout == DEFAULT_STATEMENT_TIMEOUT:
+            statement_timeout = settings.db_statement_timeout
+        return InstrumentedAcquire(self.pool, self.breaker, settings.db_acquire_timeout, statement_timeout)
+
+    async def get_conn(self, statement_timeout=DEFAULT_STATEMENT_TIMEOUT):
+        """
+        Used as: async with await db.get_conn() as conn:
+        statement_timeout overrides the statement timeout for this connection (None: never).
+        Inside a unit of work the shared connection keeps the unit of work's timeout.
+        """
+        if not self.pool:
+            raise DependencyUnavailableError("mysql", "pool not initialized")
+        uow = current_unit_of_work()
+        if uow is not None:
+            return JoinedAcquire(uow)
+        return self._acquire(statement_timeout)
+
+    @asynccontextmanager
+    async def unit_of_work(self, transaction: bool = False, statement_timeout=DEFAULT_STATEMENT_TIMEOUT):
+        """
+        Run several repository calls on one pooled connection.
+        With transaction=True they also share one transaction, committed when the block exits
+        and rolled back if it raises or a repository rolled back inside it. Nested blocks join
+        the outermost unit of work.
+        statement_timeout is as for get_conn().
+        """
+        if current_unit_of_work() is not None:
+            yield current_unit_of_work()
+            return
+
         if not self.pool:
-            await self.connect()
-        # NOTE: your code uses: async with await db.get_conn() as conn:
-        # This returns pool.acquire() which is awaitable; you already use it correctly in your repo.
-        return self.pool.acquire()
-
-    async def _ensure_schema(self):
-        async with self.pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS transactions (
-                        transaction_id INT AUTO_INCREMENT PRIMARY KEY,
-                        user_id INT NOT NULL,
-                        account_number VARCHAR(30) NOT NULL,
-                        transaction_type VARCHAR(20) NOT NULL,
-                        amount DECIMAL(18, 2) NOT NULL,
-                        balance_after DECIMAL(18, 2) NOT NULL,
-                        related_account VARCHAR(30) NULL,
-                        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                        INDEX idx_transactions_user_created (user_id, created_at),
-                        INDEX idx_transactions_account_created (account_number, created_at)
-                    )
-                    """
-                )
-                await conn.commit()
+            raise DependencyUnavailableError("mysql", "pool not initialized")
+        async with self._acquire(statement_timeout) as conn:
+            uow = UnitOfWork(conn, transaction)
+            token = set_unit_of_work(uow)
+            try:
+                yield uow
+                if uow.rollback_only:
+                    await conn.rollback()
+                elif transaction:
+                    await conn.commit()
+            except BaseException:
+                if not conn.closed:
+                    await conn.rollback()
+                raise
+            finally:
+                reset_unit_of_work(token)
 
 
 db = Database()
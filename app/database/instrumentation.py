@@ -0,0 +1,143 @@
+"""
+Thin wrappers around aiomysql pool connections and cursors that time every statement
+and the wait for a pooled connection (see app.core.tracing), and report connection-level
+failures to the MySQL circuit breaker.
+"""
+import asyncio
+import time
+
+import aiomysql
+
+from app.core.circuit_breaker import CircuitBreaker, DependencyUnavailableError
+from app.core.tracing import record_pool_wait, record_statement
+
+# Client-side error codes that mean the server could not be reached or the connection died.
+_CONNECTION_ERROR_CODES = {2003, 2006, 2013, 2055}
+
+
+def _is_connection_error(exc: BaseException) -> bool:
+    return isinstance(exc, aiomysql.OperationalError) and bool(exc.args) and exc.args[0] in _CONNECTION_ERROR_CODES
+
+
+class InstrumentedCursor:
+    def __init__(self, cursor, breaker: CircuitBreaker | None = None, timeout: float | None = None):
+        self._cursor = cursor
+        self._breaker = breaker
+        self._timeout = timeout
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    async def _run(self, method, query, args):
+        started = time.perf_counter()
+        try:
+            if self._timeout:
+                return await asyncio.wait_for(method(query, args), self._timeout)
+            return await method(query, args)
+        except asyncio.TimeoutError as e:
+            # The protocol state of an interrupted query is unknown; never reuse this connection.
+            self._cursor.connection.close()
+            if self._breaker is not None:
+                self._breaker.record_failure()
+            raise DependencyUnavailableError("mysql", "statement timeout") from e
+        except aiomysql.OperationalError as e:
+            if self._breaker is not None and _is_connection_error(e):
+                self._breaker.record_failure()
+            raise
+        finally:
+            record_statement(query, time.perf_counter() - started, self._cursor.rowcount)
+
+    async def execute(self, query, args=None):
+        return await self._run(self._cursor.execute, query, args)
+
+    async def executemany(self, query, args):
+        return await self._run(self._cursor.executemany, query, args)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._cursor.close()
+
+
+class _CursorContext:
+    """Supports both `async with conn.cursor() as cur` and `cur = await conn.cursor()`."""
+
+    def __init__(self, context, breaker: CircuitBreaker | None, timeout: float | None):
+        self._context = context
+        self._breaker = breaker
+        self._timeout = timeout
+
+    def __await__(self):
+        cursor = yield from self._context.__await__()
+        return InstrumentedCursor(cursor, self._breaker, self._timeout)
+
+    async def __aenter__(self):
+        return InstrumentedCursor(await self._context.__aenter__(), self._breaker, self._timeout)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._context.__aexit__(exc_type, exc, tb)
+
+
+class InstrumentedConnection:
+    def __init__(self, conn, breaker: CircuitBreaker | None = None, statement_timeout: float | None = None):
+        self._conn = conn
+        self.breaker = breaker
+        self.statement_timeout = statement_timeout
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    @property
+    def raw(self):
+        return self._conn
+
+    def cursor(self, *cursors):
+        return _CursorContext(self._conn.cursor(*cursors), self.breaker, self.statement_timeout)
+
+
+class InstrumentedAcquire:
+    """
+    Async context manager returned by Database.get_conn(): acquire, time the wait, release.
+    With a breaker, acquisition fails fast while it is open and times out after `timeout` seconds;
+    statements on the connection time out after `statement_timeout` seconds.
+    """
+
+    def __init__(self, pool, breaker: CircuitBreaker | None = None, timeout: float | None = None,
+                 statement_timeout: float | None = None):
+        self._pool = pool
+        self._breaker = breaker
+        self._timeout = timeout
+        self._statement_timeout = statement_timeout
+        self._conn = None
+
+    async def __aenter__(self):
+        if self._breaker is not None and not self._breaker.allow():
+            raise DependencyUnavailableError("mysql", "circuit open")
+
+        started = time.perf_counter()
+        try:
+            self._conn = await asyncio.wait_for(self._pool.acquire(), self._timeout)
+        except (asyncio.TimeoutError, OSError, aiomysql.OperationalError) as e:
+            if self._breaker is not None:
+                self._breaker.record_failure()
+            raise DependencyUnavailableError("mysql", str(e) or type(e).__name__) from e
+        finally:
+            record_pool_wait(time.perf_counter() - started)
+
+        if self._breaker is not None:
+            self._breaker.record_success()
+        return InstrumentedConnection(self._conn, self._breaker, self._statement_timeout)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        # With autocommit off even a plain SELECT leaves a transaction open, and the pool
+        # closes connections released mid-transaction. End it here so the connection is reused.
+        if not conn.closed and conn.get_transaction_status():
+            try:
+                await conn.rollback()
+            except Exception:
+                conn.close()
+        await self._pool.release(conn)
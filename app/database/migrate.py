@@ -0,0 +1,122 @@
+"""
+Versioned schema migrations (see app/database/migrations), run once per deploy instead of
+on every worker boot:
+
+    python -m app.database.migrate           # apply pending migrations in order
+    python -m app.database.migrate --check   # exit 1 if any migration is pending
+    python -m app.database.migrate --list    # show applied and pending versions
+
+Applied versions are recorded in `schema_migrations`. A named MySQL lock keeps two deploys
+from migrating at the same time.
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import aiomysql
+
+from app.core.config import get_settings
+from app.database.database import db
+from app.database.migrations import Migration, load_migrations
+
+MIGRATION_LOCK_NAME = "schema_migrations"
+
+_NO_SUCH_TABLE = 1146
+
+
+async def _applied_versions(cur) -> set:
+    try:
+        await cur.execute("SELECT version FROM schema_migrations")
+    except aiomysql.ProgrammingError as e:
+        if e.args and e.args[0] == _NO_SUCH_TABLE:
+            return set()
+        raise
+    return {row[0] for row in await cur.fetchall()}
+
+
+async def pending_migrations() -> List[Migration]:
+    """Single query; cheap enough to run at every boot."""
+    async with await db.get_conn() as conn:
+        async with conn.cursor() as cur:
+            applied = await _applied_versions(cur)
+    return [migration for migration in load_migrations() if migration.version not in applied]
+
+
+async def apply_pending() -> List[Migration]:
+    """Apply every pending migration in version order. Returns the migrations applied."""
+    applied_now = []
+    # A raw pool connection: DDL on a large table may legitimately run longer than DB_STATEMENT_TIMEOUT.
+    settings = get_settings()
+    async with db.pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SET SESSION lock_wait_timeout = %s", (settings.migration_lock_wait_timeout,))
+            await cur.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK_NAME, settings.migration_lock_timeout))
+            if (await cur.fetchone())[0] != 1:
+                raise RuntimeError("Another process is running migrations")
+            try:
+                await cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS schema_migrations (
+                        version INT PRIMARY KEY,
+                        name VARCHAR(100) NOT NULL,
+                        duration_ms INT NOT NULL,
+                        applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
+                )
+                applied = await _applied_versions(cur)
+                for migration in load_migrations():
+                    if migration.version in applied:
+                        continue
+                    print(f"--- Applying {migration.version:04d}_{migration.name}: {migration.description} ---")
+                    started = time.perf_counter()
+                    await migration.upgrade(cur)
+                    await cur.execute(
+                        "INSERT INTO schema_migrations (version, name, duration_ms) VALUES (%s, %s, %s)",
+                        (migration.version, migration.name, int((time.perf_counter() - started) * 1000)),
+                    )
+                    await conn.commit()
+                    applied_now.append(migration)
+            finally:
+                await cur.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK_NAME,))
+                await conn.commit()
+    return applied_now
+
+
+async def run(check: bool, list_only: bool) -> int:
+    await db.connect()
+    try:
+        if list_only:
+            async with await db.get_conn() as conn:
+                async with conn.cursor() as cur:
+                    applied = await _applied_versions(cur)
+            for migration in load_migrations():
+                state = "applied" if migration.version in applied else "pending"
+                print(f"{migration.version:04d}_{migration.name:<32} {state:<8} {migration.description}")
+            return 0
+        if not check:
+            applied_now = await apply_pending()
+            print(f"--- Applied {len(applied_now)} migration(s) ---")
+        pending = await pending_migrations()
+    finally:
+        await db.disconnect()
+
+    if pending:
+        print(f"--- Pending migrations: {', '.join(f'{m.version:04d}_{m.name}' for m in pending)} ---")
+        return 1
+    print("--- Schema is up to date ---")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or check versioned schema migrations")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--check", action="store_true", help="exit 1 if any migration is pending")
+    group.add_argument("--list", action="store_true", help="list migrations and whether they are applied")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args.check, args.list)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Baseline schema: users, accounts and the ledger/maintenance tables."""
+from app.database.migrations.ops import add_column
+
+
+async def upgrade(cur):
+    # Matches what database/database_file.sql plus its follow-up ALTERs produced, so existing
+    # databases are left as they are and new ones get the same columns in one step.
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(50) UNIQUE NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            password_hash VARCHAR(255) NULL,
+            role VARCHAR(20) DEFAULT 'customer',
+            otp_code VARCHAR(6) NULL,
+            otp_expires_at DATETIME NULL,
+            otp_attempts INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+        """
+    )
+    # Databases built from the old script received these through separate ALTERs.
+    await add_column(cur, "users", "role", "VARCHAR(20) DEFAULT 'customer'")
+    await add_column(cur, "users", "otp_code", "VARCHAR(6) NULL")
+    await add_column(cur, "users", "otp_expires_at", "DATETIME NULL")
+    await add_column(cur, "users", "otp_attempts", "INT NOT NULL DEFAULT 0")
+
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS accounts (
+            account_id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            account_number VARCHAR(20) UNIQUE NOT NULL,
+            balance DECIMAL(15, 2) NOT NULL DEFAULT 0.00,
+            status ENUM('active', 'suspended') DEFAULT 'active',
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+        """
+    )
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS transactions (
+            transaction_id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            account_number VARCHAR(30) NOT NULL,
+            transaction_type VARCHAR(20) NOT NULL,
+            amount DECIMAL(18, 2) NOT NULL,
+            balance_after DECIMAL(18, 2) NOT NULL,
+            related_account VARCHAR(30) NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_transactions_user_created (user_id, created_at),
+            INDEX idx_transactions_account_created (account_number, created_at)
+        ) ENGINE=InnoDB
+        """
+    )
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reconciliation_checkpoints (
+            account_id INT PRIMARY KEY,
+            account_number VARCHAR(30) NOT NULL,
+            last_transaction_id INT NOT NULL DEFAULT 0,
+            last_created_at TIMESTAMP NULL,
+            last_balance DECIMAL(18, 2) NOT NULL DEFAULT 0.00,
+            status VARCHAR(20) NOT NULL DEFAULT 'ok',
+            detail VARCHAR(255) NULL,
+            verified_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_reconciliation_status (status)
+        ) ENGINE=InnoDB
+        """
+    )
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS hot_accounts (
+            account_number VARCHAR(30) PRIMARY KEY,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+        """
+    )
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pending_credits (
+            credit_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            account_number VARCHAR(30) NOT NULL,
+            user_id INT NOT NULL,
+            amount DECIMAL(18, 2) NOT NULL,
+            related_account VARCHAR(30) NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_pending_credits_account (account_number, credit_id)
+        ) ENGINE=InnoDB
+        """
+    )
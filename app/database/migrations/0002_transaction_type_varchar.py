@@ -0,0 +1,15 @@
+"""Store transactions.transaction_type as VARCHAR instead of the legacy ENUM."""
+from app.database.migrations.ops import column_type
+
+
+async def upgrade(cur):
+    # database_file.sql once turned the column into ENUM('deposit', 'withdrawal', 'transfer'),
+    # which rejects the 'withdraw'/'transfer_in'/'transfer_out' values the code writes.
+    current = await column_type(cur, "transactions", "transaction_type")
+    if current is None or not current.lower().startswith("enum"):
+        return
+    # A type change cannot be done in place: the table is copied and writes wait until it finishes.
+    await cur.execute(
+        "ALTER TABLE transactions MODIFY COLUMN transaction_type VARCHAR(20) NOT NULL, ALGORITHM=COPY, LOCK=SHARED"
+    )
+    await cur.execute("UPDATE transactions SET transaction_type = 'withdraw' WHERE transaction_type = 'withdrawal'")
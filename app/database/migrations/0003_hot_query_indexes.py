@@ -0,0 +1,11 @@
+"""Indexes for the account lookup, admin listing and statistics queries."""
+from app.database.migrations.ops import add_index
+
+
+async def upgrade(cur):
+    # Profile, withdraw-by-user and transfer-sender lookups; usually already covered by the foreign key index.
+    await add_index(cur, "accounts", "idx_accounts_user", ["user_id"])
+    # Admin statistics: COUNT(*) ... WHERE status = 'active'.
+    await add_index(cur, "accounts", "idx_accounts_status", ["status"])
+    # Admin customer listing/search: WHERE role = 'customer' ORDER BY created_at DESC.
+    await add_index(cur, "users", "idx_users_role_created", ["role", "created_at"])
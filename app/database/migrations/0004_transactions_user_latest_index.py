@@ -0,0 +1,8 @@
+"""Index for the transaction-history ETag lookup: MAX(transaction_id) per user."""
+from app.database.migrations.ops import add_index
+
+
+async def upgrade(cur):
+    # (user_id, created_at) serves the history page but not MAX(transaction_id), which would scan
+    # every row of the user; with transaction_id second the maximum is read from the index edge.
+    await add_index(cur, "transactions", "idx_transactions_user_id", ["user_id", "transaction_id"])
@@ -0,0 +1,6 @@
+"""users.auth_epoch: bumped to revoke every token issued before a password change or suspension."""
+from app.database.migrations.ops import add_column
+
+
+async def upgrade(cur):
+    await add_column(cur, "users", "auth_epoch", "INT NOT NULL DEFAULT 0")
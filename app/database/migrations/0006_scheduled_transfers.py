@@ -0,0 +1,31 @@
+"""Standing orders: one row per schedule, claimed by the scheduled-transfer worker when due."""
+
+
+async def upgrade(cur):
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scheduled_transfers (
+            schedule_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            to_account_number VARCHAR(30) NOT NULL,
+            amount DECIMAL(15, 2) NOT NULL,
+            frequency VARCHAR(10) NOT NULL,
+            first_run_at DATETIME NOT NULL,
+            end_at DATETIME NULL,
+            next_run_at DATETIME NULL,
+            occurrence INT NOT NULL DEFAULT 0,
+            run_count INT NOT NULL DEFAULT 0,
+            status VARCHAR(20) NOT NULL DEFAULT 'active',
+            attempts INT NOT NULL DEFAULT 0,
+            failure_count INT NOT NULL DEFAULT 0,
+            last_error VARCHAR(255) NULL,
+            last_run_at DATETIME NULL,
+            locked_by VARCHAR(64) NULL,
+            locked_until DATETIME NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_scheduled_due (status, next_run_at),
+            INDEX idx_scheduled_user (user_id, created_at),
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+        """
+    )
@@ -0,0 +1,30 @@
+"""
+Authorization holds: funds reserved on an account until they are captured, released or expire.
+
+accounts.held_balance is the sum of the account's pending holds, so the available balance
+(balance - held_balance) is checked on the account row itself without reading the holds table.
+This replaces the legacy transactions.status 'pending' value, which nothing ever wrote.
+"""
+from app.database.migrations.ops import add_column
+
+
+async def upgrade(cur):
+    await add_column(cur, "accounts", "held_balance", "DECIMAL(15, 2) NOT NULL DEFAULT 0.00")
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS holds (
+            hold_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            account_number VARCHAR(30) NOT NULL,
+            amount DECIMAL(15, 2) NOT NULL,
+            captured_amount DECIMAL(15, 2) NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending',
+            reference VARCHAR(64) NULL,
+            expires_at DATETIME NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            resolved_at DATETIME NULL,
+            INDEX idx_holds_expiry (status, expires_at),
+            INDEX idx_holds_user_created (user_id, created_at)
+        ) ENGINE=InnoDB
+        """
+    )
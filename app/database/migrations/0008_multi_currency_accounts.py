@@ -0,0 +1,27 @@
+"""
+Multiple accounts per customer with a currency each, and the fx_rates table.
+
+Existing accounts are assigned USD. The default is fixed so the schema does not depend on the
+environment of whoever migrates; new accounts are always inserted with an explicit currency
+(DEFAULT_CURRENCY). A deployment whose single-currency accounts were in another currency
+updates `accounts.currency` once after migrating. A customer's
+primary account is the one with the lowest account_id (the one opened at registration).
+"""
+from app.database.migrations.ops import add_column, add_index
+
+
+async def upgrade(cur):
+    await add_column(cur, "accounts", "currency", "CHAR(3) NOT NULL DEFAULT 'USD'")
+    # Account listing and per-currency lookups for a customer.
+    await add_index(cur, "accounts", "idx_accounts_user_currency", ["user_id", "currency"])
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fx_rates (
+            base_currency CHAR(3) NOT NULL,
+            quote_currency CHAR(3) NOT NULL,
+            rate DECIMAL(18, 8) NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (base_currency, quote_currency)
+        ) ENGINE=InnoDB
+        """
+    )
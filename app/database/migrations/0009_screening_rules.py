@@ -0,0 +1,32 @@
+"""
+Screening rule configuration for withdrawals and transfers, seeded with the default rules.
+
+Limits are in DEFAULT_CURRENCY. Rows are edited at runtime (PUT /admin/screening-rules/{rule})
+and picked up by every process within SCREENING_REFRESH_SECONDS.
+"""
+import json
+
+_DEFAULT_RULES = [
+    ("daily_limit", {"limit": "10000.00"}),
+    ("new_payee", {"max_amount": "1000.00", "max_per_day": 5}),
+    ("burst", {"count": 5, "seconds": 60}),
+]
+
+
+async def upgrade(cur):
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS screening_rules (
+            rule_name VARCHAR(40) PRIMARY KEY,
+            enabled BOOLEAN NOT NULL DEFAULT TRUE,
+            fail_policy VARCHAR(10) NOT NULL DEFAULT 'open',
+            params TEXT NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+        """
+    )
+    for name, params in _DEFAULT_RULES:
+        await cur.execute(
+            "INSERT IGNORE INTO screening_rules (rule_name, params) VALUES (%s, %s)",
+            (name, json.dumps(params)),
+        )
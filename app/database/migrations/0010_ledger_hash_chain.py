@@ -0,0 +1,29 @@
+"""
+Per-account hash chain over the ledger, plus checkpoints for the incremental verifier.
+
+transactions.row_hash = sha256(previous row's hash | row fields), and accounts.ledger_hash
+holds the newest row's hash. Rows written before this migration keep row_hash NULL. Each
+account's chain starts at its first row written afterwards.
+"""
+from app.database.migrations.ops import add_column
+
+
+async def upgrade(cur):
+    await add_column(cur, "transactions", "row_hash", "CHAR(64) NULL")
+    await add_column(cur, "accounts", "ledger_hash", "CHAR(64) NULL")
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ledger_chain_checkpoints (
+            account_id INT PRIMARY KEY,
+            account_number VARCHAR(30) NOT NULL,
+            last_transaction_id INT NOT NULL DEFAULT 0,
+            last_created_at TIMESTAMP NULL,
+            last_hash CHAR(64) NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'ok',
+            detail VARCHAR(255) NULL,
+            verified_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_ledger_chain_status (status)
+        ) ENGINE=InnoDB
+        """
+    )
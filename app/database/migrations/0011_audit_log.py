@@ -0,0 +1,28 @@
+"""
+Audit trail of admin actions (app/core/audit.py buffers records and writes them here in batches).
+
+`changes` holds a JSON {field: {"before": ..., "after": ...}} diff. The indexes serve
+GET /admin/audit-log, which filters by actor, action or target and pages by audit_id.
+"""
+
+
+async def upgrade(cur):
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS audit_log (
+            audit_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            actor_id INT NULL,
+            actor VARCHAR(50) NOT NULL,
+            action VARCHAR(40) NOT NULL,
+            target_type VARCHAR(20) NOT NULL,
+            target_id VARCHAR(64) NOT NULL,
+            changes TEXT NULL,
+            request_id VARCHAR(64) NULL,
+            created_at DATETIME NOT NULL,
+            INDEX idx_audit_actor (actor_id, audit_id),
+            INDEX idx_audit_action (action, audit_id),
+            INDEX idx_audit_target (target_type, target_id, audit_id),
+            INDEX idx_audit_created (created_at)
+        ) ENGINE=InnoDB
+        """
+    )
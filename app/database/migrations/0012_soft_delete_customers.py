@@ -0,0 +1,13 @@
+"""
+Soft delete for customers: users.deleted_at marks a deleted customer and users.purged_at
+records when app.jobs.customer_purge anonymized it. Rows are never removed, so the ledger
+keeps its link to the (anonymized) customer.
+"""
+from app.database.migrations.ops import add_column, add_index
+
+
+async def upgrade(cur):
+    await add_column(cur, "users", "deleted_at", "DATETIME NULL")
+    await add_column(cur, "users", "purged_at", "DATETIME NULL")
+    # The purge job's queue: deleted (deleted_at set) but not yet purged (purged_at NULL).
+    await add_index(cur, "users", "idx_users_purge", ["purged_at", "deleted_at"])
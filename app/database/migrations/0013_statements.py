@@ -0,0 +1,26 @@
+"""
+Monthly statements: one row per (period, account) written by app.jobs.statements once the
+account's files are rendered. The table is also the generator's progress, so an interrupted
+run resumes with the accounts that have no row for the period yet.
+"""
+
+
+async def upgrade(cur):
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS statements (
+            period CHAR(7) NOT NULL,
+            account_id INT NOT NULL,
+            account_number VARCHAR(30) NOT NULL,
+            user_id INT NOT NULL,
+            currency CHAR(3) NOT NULL,
+            opening_balance DECIMAL(18, 2) NOT NULL,
+            closing_balance DECIMAL(18, 2) NOT NULL,
+            transaction_count INT NOT NULL,
+            files VARCHAR(255) NOT NULL,
+            generated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (period, account_id),
+            INDEX idx_statements_user (user_id, period)
+        ) ENGINE=InnoDB
+        """
+    )
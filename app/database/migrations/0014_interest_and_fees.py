@@ -0,0 +1,14 @@
+"""
+Batch postings (app.jobs.postings): interest accrual and monthly maintenance fees.
+
+accounts.interest_accrued carries the sub-cent part of the daily interest between runs;
+interest_posted_on and fee_charged_for record the last run date applied to the account,
+which makes every run idempotent per account no matter how the work was chunked.
+"""
+from app.database.migrations.ops import add_column
+
+
+async def upgrade(cur):
+    await add_column(cur, "accounts", "interest_accrued", "DECIMAL(18, 6) NOT NULL DEFAULT 0")
+    await add_column(cur, "accounts", "interest_posted_on", "DATE NULL")
+    await add_column(cur, "accounts", "fee_charged_for", "DATE NULL")
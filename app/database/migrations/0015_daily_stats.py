@@ -0,0 +1,36 @@
+"""
+Daily snapshot tables for the admin trend charts (app.jobs.daily_stats).
+
+daily_stats holds one row per day; daily_balances the end-of-day total per currency. Each day
+is derived from the previous one plus that day's activity, which the two new indexes let the
+job read as a range: ledger rows by created_at, deleted customers by deleted_at.
+"""
+from app.database.migrations.ops import add_index
+
+
+async def upgrade(cur):
+    await add_index(cur, "transactions", "idx_transactions_created", ["created_at"])
+    await add_index(cur, "users", "idx_users_deleted", ["deleted_at"])
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            day DATE PRIMARY KEY,
+            new_customers INT NOT NULL,
+            deleted_customers INT NOT NULL,
+            total_customers INT NOT NULL,
+            active_accounts INT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+        """
+    )
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_balances (
+            day DATE NOT NULL,
+            currency CHAR(3) NOT NULL,
+            net_flow DECIMAL(20, 2) NOT NULL,
+            total_balance DECIMAL(20, 2) NOT NULL,
+            PRIMARY KEY (day, currency)
+        ) ENGINE=InnoDB
+        """
+    )
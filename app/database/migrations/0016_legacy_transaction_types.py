@@ -0,0 +1,35 @@
+"""
+Rewrite transaction types left over from the legacy ENUM('deposit', 'withdrawal', 'transfer').
+
+0002 renamed 'withdrawal' only when it converted the ENUM column, and left 'transfer' rows
+alone, so databases that had already switched to VARCHAR kept both. A legacy 'transfer' row
+does not say which side of the transfer it records; the direction is read from the account's
+balance, as the sending side is the row whose balance_after is below the previous row's.
+Only rows from before the hash chain (row_hash NULL) can carry these types.
+"""
+
+
+async def upgrade(cur):
+    await cur.execute(
+        "UPDATE transactions SET transaction_type = 'withdraw' "
+        "WHERE transaction_type = 'withdrawal' AND row_hash IS NULL"
+    )
+    # Accounts open with a zero balance, so an account's first row is compared with 0.
+    await cur.execute(
+        """
+        UPDATE transactions t
+        JOIN (
+            SELECT transaction_id,
+                   balance_after - LAG(balance_after, 1, 0)
+                       OVER (PARTITION BY account_number ORDER BY transaction_id) AS delta
+            FROM transactions
+            WHERE account_number IN (
+                SELECT account_number FROM (
+                    SELECT DISTINCT account_number FROM transactions WHERE transaction_type = 'transfer'
+                ) legacy
+            )
+        ) d ON d.transaction_id = t.transaction_id
+        SET t.transaction_type = IF(d.delta < 0, 'transfer_out', 'transfer_in')
+        WHERE t.transaction_type = 'transfer' AND t.row_hash IS NULL
+        """
+    )
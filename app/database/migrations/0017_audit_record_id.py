@@ -0,0 +1,14 @@
+"""
+Idempotent audit writes: every buffered record carries a random record_id, and a batch that
+is written again (a flush cancelled after its INSERT committed) leaves the stored rows alone.
+Rows written before this migration keep record_id NULL, which the unique index allows.
+"""
+from app.database.migrations.ops import add_column, index_covers
+
+
+async def upgrade(cur):
+    await add_column(cur, "audit_log", "record_id", "CHAR(32) NULL")
+    if not await index_covers(cur, "audit_log", ["record_id"]):
+        await cur.execute(
+            "ALTER TABLE audit_log ADD UNIQUE INDEX uq_audit_record (record_id), ALGORITHM=INPLACE, LOCK=NONE"
+        )
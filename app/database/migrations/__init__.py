@@ -0,0 +1,38 @@
+"""
+Versioned schema migrations, applied in order by `python -m app.database.migrate`.
+
+Each module is named `<4-digit version>_<name>.py`, has a one-line docstring and defines
+`async def upgrade(cur)`. Versions are never renumbered or edited once released; add a new one.
+"""
+import importlib
+import pkgutil
+import re
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List
+
+_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    description: str
+    upgrade: Callable[..., Awaitable[None]]
+
+
+def load_migrations() -> List[Migration]:
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        description = (module.__doc__ or "").strip().splitlines()[0] if module.__doc__ else match.group(2)
+        migrations.append(Migration(int(match.group(1)), match.group(2), description, module.upgrade))
+
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return migrations
@@ -0,0 +1,70 @@
+"""
+Helpers for writing migrations that are safe to re-run and do not block traffic.
+
+Every migration may be interrupted half way (MySQL DDL commits implicitly), so each helper
+checks information_schema first and only issues the DDL that is still missing.
+"""
+from typing import Sequence
+
+
+async def table_exists(cur, table: str) -> bool:
+    await cur.execute(
+        "SELECT 1 FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        (table,),
+    )
+    return await cur.fetchone() is not None
+
+
+async def column_type(cur, table: str, column: str) -> str | None:
+    """COLUMN_TYPE as MySQL reports it (e.g. "varchar(20)", "enum('a','b')"), or None if missing."""
+    await cur.execute(
+        """
+        SELECT column_type FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """,
+        (table, column),
+    )
+    row = await cur.fetchone()
+    return row[0] if row else None
+
+
+async def add_column(cur, table: str, column: str, definition: str) -> bool:
+    if await column_type(cur, table, column) is not None:
+        return False
+    await cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}, ALGORITHM=INPLACE, LOCK=NONE")
+    return True
+
+
+async def index_covers(cur, table: str, columns: Sequence[str]) -> str | None:
+    """Name of an existing index whose leading columns are exactly `columns`, if any."""
+    await cur.execute(
+        """
+        SELECT index_name, column_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s
+        ORDER BY index_name, seq_in_index
+        """,
+        (table,),
+    )
+    indexes = {}
+    for index_name, column_name in await cur.fetchall():
+        indexes.setdefault(index_name, []).append(column_name.lower())
+    wanted = [column.lower() for column in columns]
+    for index_name, index_columns in indexes.items():
+        if index_columns[: len(wanted)] == wanted:
+            return index_name
+    return None
+
+
+async def add_index(cur, table: str, name: str, columns: Sequence[str]) -> bool:
+    """
+    Online index build: concurrent reads and writes continue while InnoDB builds it.
+    Skipped when an index with the same leading columns already exists (for example the
+    implicit index MySQL creates for a foreign key). MySQL rejects the statement rather
+    than silently taking a table lock if the change cannot be done in place.
+    """
+    if await index_covers(cur, table, columns):
+        return False
+    await cur.execute(
+        f"ALTER TABLE {table} ADD INDEX {name} ({', '.join(columns)}), ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    return True
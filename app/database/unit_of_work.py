@@ -0,0 +1,65 @@
+"""
+Request-scoped connection sharing.
+
+Inside `async with db.unit_of_work():` every `await db.get_conn()` joins the same pooled
+connection instead of acquiring a new one. With `transaction=True` the repository-level
+commit() and rollback() calls are deferred and the whole block commits (or rolls back) once on exit.
+"""
+import contextvars
+from typing import Optional
+
+from app.database.instrumentation import InstrumentedConnection
+
+
+class _TransactionalConnection(InstrumentedConnection):
+    """Connection handed to repositories inside a transactional unit of work."""
+
+    rollback_only = False
+
+    async def commit(self):
+        # The unit of work commits once when the block exits.
+        return None
+
+    async def rollback(self):
+        # Rolling back here would silently undo the earlier statements of the block while it
+        # carries on. The unit of work rolls the whole block back when it exits instead.
+        self.rollback_only = True
+
+
+class UnitOfWork:
+    def __init__(self, conn: InstrumentedConnection, transaction: bool):
+        self.transaction = transaction
+        self.connection = _TransactionalConnection(conn.raw, conn.breaker, conn.statement_timeout) if transaction else conn
+
+    @property
+    def rollback_only(self) -> bool:
+        """True once a repository asked for a rollback inside a transactional unit of work."""
+        return self.transaction and self.connection.rollback_only
+
+
+_current_uow: contextvars.ContextVar[Optional[UnitOfWork]] = contextvars.ContextVar("unit_of_work", default=None)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    return _current_uow.get()
+
+
+def set_unit_of_work(uow: Optional[UnitOfWork]):
+    return _current_uow.set(uow)
+
+
+def reset_unit_of_work(token) -> None:
+    _current_uow.reset(token)
+
+
+class JoinedAcquire:
+    """Async context manager returned by Database.get_conn() while a unit of work is active."""
+
+    def __init__(self, uow: UnitOfWork):
+        self._uow = uow
+
+    async def __aenter__(self):
+        return self._uow.connection
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
@@ -0,0 +1,61 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, List, Tuple
+
+from app.core.config import get_settings
+from app.database.database import db
+
+
+def split_id_range(min_id: int, max_id: int, parts: int) -> List[Tuple[int, int]]:
+    """
+    Split the inclusive id range [min_id, max_id] into at most `parts` half-open ranges (lo, hi],
+    so that every id belongs to exactly one range.
+    """
+    if max_id < min_id:
+        return []
+    parts = max(1, min(parts, max_id - min_id + 1))
+    span = max_id - min_id + 1
+    bounds = [min_id - 1 + (span * i) // parts for i in range(parts + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts)]
+
+
+def _run_in_worker(job: Callable[..., Awaitable[dict]], args: tuple) -> dict:
+    async def _main():
+        await db.connect()
+        try:
+            with db.statement_timeout(get_settings().job_statement_timeout):
+                return await job(*args)
+        finally:
+            await db.disconnect()
+
+    return asyncio.run(_main())
+
+
+def run_partitioned(job: Callable[..., Awaitable[dict]], ranges: List[Tuple[int, int]], workers: int, *extra) -> List[dict]:
+    """
+    Run `job(lo, hi, *extra)` for every range, spread across `workers` processes.
+    Each process opens its own connection pool; with workers <= 1 everything runs in this process.
+    Statements time out after JOB_STATEMENT_TIMEOUT rather than DB_STATEMENT_TIMEOUT.
+    """
+    if workers <= 1:
+        return [_run_in_worker(job, (lo, hi, *extra)) for lo, hi in ranges]
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(_run_in_worker, job, (lo, hi, *extra)) for lo, hi in ranges]
+        return [f.result() for f in futures]
+
+
+class Throughput:
+    """Wall-clock rate reporter for batch jobs."""
+
+    def __init__(self, unit: str):
+        self.unit = unit
+        self.started = time.perf_counter()
+
+    def report(self, count: int) -> dict:
+        elapsed = time.perf_counter() - self.started
+        rate = count / elapsed if elapsed > 0 else 0.0
+        return {self.unit: count, "elapsed_seconds": round(elapsed, 3), f"{self.unit}_per_second": round(rate, 1)}
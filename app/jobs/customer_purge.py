@@ -0,0 +1,165 @@
+"""
+Purge of soft-deleted customers.
+
+DELETE /admin/customers/{id} only marks the customer deleted. This job picks up customers
+deleted more than --grace-hours ago and, per customer, releases its pending holds, deletes
+its standing orders and finally anonymizes the user row. Every step runs in transactions of
+at most --batch-size rows with --pause-ms between them, and each transaction gives up after
+--lock-wait-timeout seconds instead of queueing behind live traffic; a customer whose batch
+timed out is retried on the next sweep. Accounts and ledger rows are never removed.
+
+`customer_purge_rows_total` and `customer_purge_lock_wait_seconds` are written to
+--metrics-file (Prometheus text format, for a node-exporter textfile collector) after every sweep.
+
+Usage:
+    python -m app.jobs.customer_purge --interval 60
+    python -m app.jobs.customer_purge --once --grace-hours 0
+"""
+import argparse
+import asyncio
+import json
+import os
+from datetime import timedelta
+
+import aiomysql
+
+from app.core.clock import utc_now
+from app.core.config import get_settings
+from app.core.metrics import registry
+from app.database.database import db
+from app.jobs.common import Throughput
+from app.repositories.user_repo import UserRepository
+
+# ER_LOCK_WAIT_TIMEOUT and ER_LOCK_DEADLOCK: the batch lost to live traffic and is retried later.
+_LOCK_ERROR_CODES = {1205, 1213}
+
+PURGE_ROWS = registry.counter("customer_purge_rows_total", "Rows released, deleted or anonymized by the purge job")
+PURGE_CUSTOMERS = registry.counter("customer_purge_customers_total", "Customers fully purged")
+PURGE_LOCK_WAIT = registry.histogram(
+    "customer_purge_lock_wait_seconds",
+    "Time a purge batch spent acquiring its row locks",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0),
+)
+PURGE_LOCK_TIMEOUTS = registry.counter("customer_purge_lock_timeouts_total", "Purge batches abandoned on a lock wait")
+
+
+class Purger:
+    def __init__(self, batch_size: int, pause_ms: int, lock_wait_timeout: int):
+        self.batch_size = batch_size
+        self.pause = pause_ms / 1000
+        self.lock_wait_timeout = lock_wait_timeout
+        self.stats = {"customers": 0, "rows": 0, "lock_timeouts": 0, "lock_wait_seconds_max": 0.0}
+
+    async def _batches(self, table: str, step) -> None:
+        """Run `step()` until it touches fewer than batch_size rows, pausing between batches."""
+        while True:
+            result = await step()
+            PURGE_ROWS.inc(result["rows"], table=table)
+            PURGE_LOCK_WAIT.observe(result["lock_wait_seconds"], table=table)
+            self.stats["rows"] += result["rows"]
+            self.stats["lock_wait_seconds_max"] = max(self.stats["lock_wait_seconds_max"], result["lock_wait_seconds"])
+            if result["rows"] < self.batch_size:
+                return
+            await asyncio.sleep(self.pause)
+
+    async def purge_customer(self, user_id: int) -> bool:
+        """Purge one customer. Returns False when a batch gave up on a lock (retried next sweep)."""
+        try:
+            await self._batches(
+                "holds",
+                lambda: UserRepository.release_customer_holds(
+                    user_id, utc_now(), self.batch_size, self.lock_wait_timeout
+                ),
+            )
+            await self._batches(
+                "scheduled_transfers",
+                lambda: UserRepository.delete_customer_schedules(user_id, self.batch_size, self.lock_wait_timeout),
+            )
+            result = await UserRepository.anonymize_customer(user_id, self.lock_wait_timeout)
+        except aiomysql.OperationalError as e:
+            if not e.args or e.args[0] not in _LOCK_ERROR_CODES:
+                raise
+            PURGE_LOCK_TIMEOUTS.inc()
+            self.stats["lock_timeouts"] += 1
+            return False
+
+        PURGE_ROWS.inc(result["rows"], table="users")
+        PURGE_LOCK_WAIT.observe(result["lock_wait_seconds"], table="users")
+        self.stats["rows"] += result["rows"]
+        if result["rows"]:
+            PURGE_CUSTOMERS.inc()
+            self.stats["customers"] += 1
+        return True
+
+    async def sweep(self, grace_hours: float) -> dict:
+        """Purge every customer deleted before now - grace_hours."""
+        meter = Throughput("rows")
+        deleted_before = utc_now() - timedelta(hours=grace_hours)
+        skipped = set()
+        while True:
+            user_ids = [
+                user_id
+                for user_id in await UserRepository.get_customers_to_purge(deleted_before, self.batch_size)
+                if user_id not in skipped
+            ]
+            if not user_ids:
+                break
+            for user_id in user_ids:
+                if not await self.purge_customer(user_id):
+                    skipped.add(user_id)
+                await asyncio.sleep(self.pause)
+        summary = dict(self.stats)
+        summary.update(meter.report(self.stats["rows"]))
+        return summary
+
+
+def write_metrics(path: str) -> None:
+    # Written to a temporary file and renamed, so the collector never reads a partial file.
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+
+
+async def run(interval: float, once: bool, grace_hours: float, batch_size: int, pause_ms: int,
+              lock_wait_timeout: int, metrics_file: str | None) -> None:
+    await db.connect()
+    try:
+        while True:
+            purger = Purger(batch_size, pause_ms, lock_wait_timeout)
+            # Batches are bounded by --lock-wait-timeout, not the request statement timeout.
+            with db.statement_timeout(get_settings().job_statement_timeout):
+                summary = await purger.sweep(grace_hours)
+            if summary["customers"] or summary["lock_timeouts"]:
+                print(f"--- Purged {summary['customers']} customer(s) ---")
+                print(json.dumps(summary, indent=2))
+            if metrics_file:
+                write_metrics(metrics_file)
+            if once:
+                return
+            await asyncio.sleep(interval)
+    finally:
+        await db.disconnect()
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Release, delete and anonymize data of soft-deleted customers")
+    parser.add_argument("--interval", type=float, default=60.0, help="seconds between sweeps")
+    parser.add_argument("--once", action="store_true", help="run a single sweep and exit")
+    parser.add_argument("--grace-hours", type=float, default=settings.purge_grace_hours,
+                        help="only purge customers deleted at least this long ago")
+    parser.add_argument("--batch-size", type=int, default=settings.purge_batch_size, help="rows per transaction")
+    parser.add_argument("--pause-ms", type=int, default=settings.purge_pause_ms, help="pause between transactions")
+    parser.add_argument("--lock-wait-timeout", type=int, default=settings.purge_lock_wait_timeout_seconds,
+                        help="seconds a batch waits for a row lock before giving up")
+    parser.add_argument("--metrics-file", default=None, help="write Prometheus metrics here after every sweep")
+    args = parser.parse_args()
+    asyncio.run(
+        run(args.interval, args.once, args.grace_hours, args.batch_size, args.pause_ms,
+            args.lock_wait_timeout, args.metrics_file)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Daily snapshots for the admin trend charts (GET /admin/stats/history).
+
+One daily_stats row per day (new, deleted and total customers, active accounts) and one
+daily_balances row per day and currency (net ledger flow, end-of-day posted balance). A day
+is the previous day's snapshot plus that day's activity, read as index ranges over
+users.created_at / users.deleted_at and transactions.created_at, so each run costs the same
+no matter how large the tables grow. Days are UTC.
+
+Only the very first run aggregates the whole tables once, in one consistent snapshot:
+yesterday is the current totals minus everything that happened after it. --backfill-days
+then walks backwards from the earliest snapshot by subtracting each day's activity.
+active_accounts has no history (status changes are not logged), so it is the count at the
+time a day is written and NULL for backfilled days.
+
+Usage:
+    python -m app.jobs.daily_stats --once                     # after midnight UTC (cron)
+    python -m app.jobs.daily_stats --once --backfill-days 730
+    python -m app.jobs.daily_stats --interval 3600
+"""
+import argparse
+import asyncio
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from app.core.clock import utc_now
+from app.core.config import get_settings
+from app.database.database import db
+from app.repositories.user_repo import UserRepository
+
+
+def _start_of(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def _apply(balances: dict, flows: dict, sign: int) -> dict:
+    """balances + sign * flows, per currency."""
+    result = dict(balances)
+    for currency, flow in flows.items():
+        result[currency] = result.get(currency, Decimal("0.00")) + sign * flow
+    return result
+
+
+async def _seed(day: date) -> None:
+    """Write the first snapshot, for `day`, from the current totals."""
+    current = await UserRepository.get_current_totals(_start_of(day + timedelta(days=1)))
+    after = current["since"]
+    activity = await UserRepository.get_activity(_start_of(day), _start_of(day + timedelta(days=1)))
+    stats = {
+        "new_customers": activity["new_customers"],
+        "deleted_customers": activity["deleted_customers"],
+        "total_customers": current["total_customers"] - after["new_customers"] + after["deleted_customers"],
+        "active_accounts": await UserRepository.count_active_accounts(),
+    }
+    balances = _apply(current["balances"], after["flows"], -1)
+    await UserRepository.save_daily_stats(day, stats, balances, activity["flows"])
+
+
+async def roll_forward(until: date) -> int:
+    """Write every day after the latest snapshot up to `until`. Returns the number of days written."""
+    latest = await UserRepository.get_latest_daily_stats()
+    if latest is None:
+        await _seed(until)
+        return 1
+
+    written = 0
+    day = latest["day"] + timedelta(days=1)
+    total_customers = latest["total_customers"]
+    balances = latest["balances"]
+    active_accounts = await UserRepository.count_active_accounts() if day <= until else None
+    while day <= until:
+        activity = await UserRepository.get_activity(_start_of(day), _start_of(day + timedelta(days=1)))
+        total_customers += activity["new_customers"] - activity["deleted_customers"]
+        balances = _apply(balances, activity["flows"], 1)
+        stats = {
+            "new_customers": activity["new_customers"],
+            "deleted_customers": activity["deleted_customers"],
+            "total_customers": total_customers,
+            "active_accounts": active_accounts,
+        }
+        await UserRepository.save_daily_stats(day, stats, balances, activity["flows"])
+        written += 1
+        day += timedelta(days=1)
+    return written
+
+
+async def backfill(days: int) -> int:
+    """Write up to `days` days before the earliest snapshot. Returns the number of days written."""
+    earliest = await UserRepository.get_earliest_daily_stats_day()
+    if earliest is None or days <= 0:
+        return 0
+    rows = await UserRepository.get_daily_stats_range(earliest, earliest)
+    total_customers = rows[0]["total_customers"]
+    balances = rows[0]["balances"]
+    later = await UserRepository.get_activity(_start_of(earliest), _start_of(earliest + timedelta(days=1)))
+
+    written = 0
+    day = earliest
+    for _ in range(days):
+        # End of `day` = end of the day after it minus that day's activity.
+        total_customers -= later["new_customers"] - later["deleted_customers"]
+        balances = _apply(balances, later["flows"], -1)
+        day -= timedelta(days=1)
+        activity = await UserRepository.get_activity(_start_of(day), _start_of(day + timedelta(days=1)))
+        stats = {
+            "new_customers": activity["new_customers"],
+            "deleted_customers": activity["deleted_customers"],
+            "total_customers": total_customers,
+            "active_accounts": None,
+        }
+        await UserRepository.save_daily_stats(day, stats, balances, activity["flows"])
+        written += 1
+        later = activity
+    return written
+
+
+async def run(interval: float, once: bool, backfill_days: int) -> None:
+    await db.connect()
+    try:
+        while True:
+            yesterday = utc_now().date() - timedelta(days=1)
+            # The first run aggregates the whole tables once.
+            with db.statement_timeout(get_settings().job_statement_timeout):
+                summary = {"until": yesterday.isoformat(), "days_written": await roll_forward(yesterday)}
+                if backfill_days:
+                    summary["days_backfilled"] = await backfill(backfill_days)
+                    backfill_days = 0
+            if summary["days_written"] or summary.get("days_backfilled"):
+                print(f"--- Daily stats written up to {summary['until']} ---")
+                print(json.dumps(summary, indent=2))
+            if once:
+                return
+            await asyncio.sleep(interval)
+    finally:
+        await db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write daily customer and balance snapshots incrementally")
+    parser.add_argument("--interval", type=float, default=3600.0, help="seconds between passes")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--backfill-days", type=int, default=0,
+                        help="also write this many days before the earliest snapshot")
+    args = parser.parse_args()
+    asyncio.run(run(args.interval, args.once, args.backfill_days))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Load FX rates from a JSON file into the fx_rates table.
+
+The file holds {"rates": [{"base_currency": "EUR", "quote_currency": "USD", "rate": "1.0842"}, ...]}.
+Running API processes and transfer workers pick the new rates up within FX_REFRESH_SECONDS.
+
+Usage:
+    python -m app.jobs.fx_rates --file rates.json
+"""
+import argparse
+import asyncio
+import json
+
+from app.database.database import db
+from app.models.user import FxRatesUpdate
+from app.services.fx_service import FxService
+
+
+async def load(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        payload = FxRatesUpdate.model_validate(json.load(f))
+
+    await db.connect()
+    try:
+        snapshot = await FxService.update_rates(
+            [(r.base_currency, r.quote_currency, r.rate) for r in payload.rates]
+        )
+    finally:
+        await db.disconnect()
+    return len(snapshot["rates"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upsert FX rates from a JSON file")
+    parser.add_argument("--file", required=True, help="JSON file with a 'rates' list")
+    args = parser.parse_args()
+    pairs = asyncio.run(load(args.file))
+    print(f"--- FX rates loaded: {pairs} pair(s) now known ---")
+
+
+if __name__ == "__main__":
+    main()
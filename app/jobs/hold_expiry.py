@@ -0,0 +1,61 @@
+"""
+Sweeper for expired authorization holds.
+
+Releases holds whose `expires_at` has passed, in batches of --batch-size per transaction, and
+gives the reserved funds back to the available balance. Several sweepers can run at once:
+each batch is claimed with FOR UPDATE SKIP LOCKED.
+
+Usage:
+    python -m app.jobs.hold_expiry --interval 5
+    python -m app.jobs.hold_expiry --once
+"""
+import argparse
+import asyncio
+
+from app.cache.redis_client import close_redis, init_redis, invalidation_scope
+from app.core.clock import utc_now
+from app.database.database import db
+from app.repositories.user_repo import UserRepository
+from app.services.user_service import UserService
+
+
+async def expire_all(batch_size: int) -> int:
+    """Release every hold that is expired now. Returns the number of holds released."""
+    total = 0
+    while True:
+        rows = await UserRepository.expire_holds(utc_now(), batch_size)
+        async with invalidation_scope():
+            for user_id in {row["user_id"] for row in rows}:
+                await UserService.invalidate_customer_caches(user_id)
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+
+
+async def run(interval: float, once: bool, batch_size: int) -> None:
+    await db.connect()
+    await init_redis()
+    try:
+        while True:
+            expired = await expire_all(batch_size)
+            if expired:
+                print(f"--- Released {expired} expired hold(s) ---")
+            if once:
+                return
+            await asyncio.sleep(interval)
+    finally:
+        await close_redis()
+        await db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Release expired authorization holds")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between sweeps")
+    parser.add_argument("--batch-size", type=int, default=500, help="holds released per transaction")
+    parser.add_argument("--once", action="store_true", help="run a single sweep and exit")
+    args = parser.parse_args()
+    asyncio.run(run(args.interval, args.once, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Periodic folder for hot-account pending credits.
+
+Transfers into accounts listed in `hot_accounts` are queued in `pending_credits` instead of
+locking the account row. This job moves them into `accounts.balance` (debits also fold first).
+
+Usage:
+    python -m app.jobs.hot_accounts --interval 1
+    python -m app.jobs.hot_accounts --once
+"""
+import argparse
+import asyncio
+
+from app.cache.redis_client import close_redis, init_redis
+from app.database.database import db
+from app.repositories.user_repo import UserRepository
+from app.services.user_service import UserService
+
+
+async def fold_all() -> int:
+    """Fold every account that currently has pending credits. Returns the number of accounts folded."""
+    account_numbers = await UserRepository.get_accounts_with_pending_credits()
+    for account_number in account_numbers:
+        await UserRepository.fold_pending_credits(account_number)
+        # The folded balance shows up in the profile and admin listing, so their ETags must change.
+        customer = await UserRepository.get_customer_by_account_number(account_number)
+        if customer:
+            await UserService.invalidate_customer_caches(customer["user_id"])
+    return len(account_numbers)
+
+
+async def run(interval: float, once: bool) -> None:
+    await db.connect()
+    await init_redis()
+    try:
+        while True:
+            folded = await fold_all()
+            if folded:
+                print(f"--- Folded pending credits for {folded} account(s) ---")
+            if once:
+                return
+            await asyncio.sleep(interval)
+    finally:
+        await close_redis()
+        await db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fold pending credits of hot accounts into their balance")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between folding passes")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    args = parser.parse_args()
+    asyncio.run(run(args.interval, args.once))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Batch posting engine for interest accrual and monthly maintenance fees.
+
+Works set-wise on chunks of --chunk-size account ids: each chunk is one transaction with one
+locking read, one multi-row ledger INSERT (`interest` or `fee` rows, hash-chained like every
+other ledger row) and one multi-row account UPDATE. Account-id ranges are spread over
+--workers processes; chunks never overlap and run under READ COMMITTED, so workers do not
+block each other.
+
+Each account records the last interest date and fee month applied to it, so a run is
+idempotent per date: rerunning it, or resuming after a crash, only touches accounts that were
+not posted yet. A run accrues exactly one day (or charges one month) and missed days are not
+backfilled: run every missed --date in order, oldest first, before the next nightly run. A
+--date (--month) before the latest one already posted is rejected.
+
+Usage:
+    python -m app.jobs.postings interest --date 2026-10-18 --workers 4   # nightly (default: yesterday)
+    python -m app.jobs.postings fee --month 2026-10 --workers 4          # monthly (default: this month)
+"""
+import argparse
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from app.cache.redis_client import close_redis, init_redis, invalidation_scope
+from app.core.clock import utc_now
+from app.core.config import get_settings
+from app.database.database import db
+from app.jobs.common import Throughput, run_partitioned, split_id_range
+from app.repositories.user_repo import UserRepository
+from app.services.user_service import UserService
+
+
+async def post_range(lo: int, hi: int, kind: str, run_date: date, chunk_size: int) -> dict:
+    """Post `kind` for run_date to accounts with account_id in (lo, hi], chunk_size ids per transaction."""
+    stats = {"accounts": 0, "postings": 0, "amount": Decimal("0.00"), "chunks": 0}
+    settings = get_settings()
+    daily_rate = settings.interest_annual_rate / settings.interest_day_count
+    await init_redis()
+    try:
+        cursor = lo
+        while cursor < hi:
+            upper = min(cursor + chunk_size, hi)
+            if kind == "interest":
+                chunk = await UserRepository.post_interest_chunk(run_date, cursor, upper, daily_rate)
+            else:
+                chunk = await UserRepository.post_fee_chunk(
+                    run_date, cursor, upper, settings.monthly_fee, settings.fee_waiver_min_balance
+                )
+            # Balances changed after commit; one Redis pipeline per chunk.
+            async with invalidation_scope():
+                for user_id in chunk["user_ids"]:
+                    await UserService.invalidate_customer_caches(user_id)
+            for key in ("accounts", "postings", "amount"):
+                stats[key] += chunk[key]
+            stats["chunks"] += 1
+            cursor = upper
+    finally:
+        await close_redis()
+    return stats
+
+
+async def _get_plan():
+    await db.connect()
+    try:
+        return await UserRepository.get_account_id_bounds(), await UserRepository.get_last_posting_dates()
+    finally:
+        await db.disconnect()
+
+
+def run(kind: str, run_date: date, workers: int = 1, chunk_size: int = 1000) -> dict:
+    """Raises ValueError if `kind` was already posted for a later date than run_date."""
+    bounds, last_posted = asyncio.run(_get_plan())
+    latest = last_posted[kind] if last_posted else None
+    if latest is not None and run_date < latest:
+        # Accounts already posted for `latest` would be skipped; only newer accounts would be posted.
+        raise ValueError(
+            f"{kind} was already posted for {latest.isoformat()}; {run_date.isoformat()} is earlier. "
+            "Missed days are not backfilled once a later day has run."
+        )
+    if not bounds or bounds["min_id"] is None:
+        return {"kind": kind, "run_date": run_date.isoformat(), "postings": 0, "amount": "0.00",
+                "accounts": 0, "elapsed_seconds": 0.0, "accounts_per_second": 0.0}
+
+    meter = Throughput("accounts")
+    ranges = split_id_range(bounds["min_id"], bounds["max_id"], max(workers, 1))
+    results = run_partitioned(post_range, ranges, workers, kind, run_date, chunk_size)
+
+    postings = sum(r["postings"] for r in results)
+    summary = {
+        "kind": kind,
+        "run_date": run_date.isoformat(),
+        "postings": postings,
+        "amount": str(sum((r["amount"] for r in results), Decimal("0.00"))),
+        "chunks": sum(r["chunks"] for r in results),
+    }
+    summary.update(meter.report(sum(r["accounts"] for r in results)))
+    elapsed = summary["elapsed_seconds"]
+    summary["postings_per_second"] = round(postings / elapsed, 1) if elapsed > 0 else 0.0
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Post interest accruals or monthly maintenance fees in batches")
+    parser.add_argument("kind", choices=["interest", "fee"])
+    parser.add_argument("--date", default=None,
+                        help="interest: accrual day YYYY-MM-DD (default: yesterday, UTC); one day per run, "
+                             "not before the latest day posted, missed days are not backfilled")
+    parser.add_argument("--month", default=None,
+                        help="fee: YYYY-MM (default: current month, UTC); not before the latest month charged")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes (account-id ranges)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="account ids per transaction")
+    args = parser.parse_args()
+
+    today = utc_now().date()
+    try:
+        if args.kind == "interest":
+            run_date = date.fromisoformat(args.date) if args.date else today - timedelta(days=1)
+        else:
+            run_date = datetime.strptime(args.month, "%Y-%m").date() if args.month else today.replace(day=1)
+    except ValueError:
+        parser.error("--date must be YYYY-MM-DD and --month YYYY-MM")
+
+    try:
+        summary = run(args.kind, run_date, args.workers, args.chunk_size)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"--- {args.kind} for {summary['run_date']}: {summary['postings']} posting(s) ---")
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Incremental ledger reconciliation.
+
+Checks that every account's `balance_after` chain in `transactions` is consistent and that
+`accounts.balance` matches the last ledger row. Progress is kept per account in
+`reconciliation_checkpoints`, so each run only reads ledger rows written since the previous one.
+
+Usage:
+    python -m app.jobs.reconciliation --workers 4
+"""
+import argparse
+import asyncio
+import json
+
+from app.database.database import db
+from app.jobs.common import Throughput, run_partitioned, split_id_range
+from app.repositories.user_repo import UserRepository
+
+
+async def reconcile_range(lo: int, hi: int, chunk_size: int = 500, batch_size: int = 1000) -> dict:
+    """Reconcile accounts with account_id in (lo, hi]."""
+    stats = {"accounts": 0, "rows": 0, "diverged": []}
+    cursor = lo
+    while cursor < hi:
+        chunk = await UserRepository.reconcile_account_chunk(cursor, hi, chunk_size, batch_size)
+        if chunk["last_account_id"] is None:
+            break
+        stats["accounts"] += chunk["accounts"]
+        stats["rows"] += chunk["rows"]
+        stats["diverged"].extend(chunk["diverged"])
+        cursor = chunk["last_account_id"]
+    return stats
+
+
+async def _get_bounds():
+    await db.connect()
+    try:
+        return await UserRepository.get_account_id_bounds()
+    finally:
+        await db.disconnect()
+
+
+def run(workers: int = 1, chunk_size: int = 500, batch_size: int = 1000,
+        min_account_id: int | None = None, max_account_id: int | None = None) -> dict:
+    if min_account_id is None or max_account_id is None:
+        bounds = asyncio.run(_get_bounds())
+        if not bounds or bounds["min_id"] is None:
+            return {"accounts": 0, "rows": 0, "diverged": [], "elapsed_seconds": 0.0, "rows_per_second": 0.0}
+        min_account_id = bounds["min_id"] if min_account_id is None else min_account_id
+        max_account_id = bounds["max_id"] if max_account_id is None else max_account_id
+
+    meter = Throughput("rows")
+    ranges = split_id_range(min_account_id, max_account_id, max(workers, 1))
+    results = run_partitioned(reconcile_range, ranges, workers, chunk_size, batch_size)
+
+    summary = {
+        "accounts": sum(r["accounts"] for r in results),
+        "diverged": [d for r in results for d in r["diverged"]],
+    }
+    summary.update(meter.report(sum(r["rows"] for r in results)))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally reconcile account balances against the ledger")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes (account-id ranges)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="accounts verified per transaction")
+    parser.add_argument("--batch-size", type=int, default=1000, help="ledger rows fetched per query")
+    parser.add_argument("--min-account-id", type=int, default=None)
+    parser.add_argument("--max-account-id", type=int, default=None)
+    args = parser.parse_args()
+
+    summary = run(args.workers, args.chunk_size, args.batch_size, args.min_account_id, args.max_account_id)
+    print(json.dumps(summary, indent=2, default=str))
+    raise SystemExit(1 if summary["diverged"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Scheduled-transfer worker.
+
+Claims due schedules in batches (SELECT ... FOR UPDATE SKIP LOCKED plus a lease) and runs each
+one through the regular screened transfer path (UserService.screened_transfer and
+execute_transfer). Any number of these processes, on any number of hosts, can run side by side;
+they never claim the same schedule twice.
+
+Usage:
+    python -m app.jobs.scheduled_transfers                 # poll forever
+    python -m app.jobs.scheduled_transfers --once          # drain everything due now, then exit
+    python -m app.jobs.scheduled_transfers --processes 4   # several worker processes on this host
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from app.cache.redis_client import close_redis, init_redis
+from app.database.database import db
+from app.jobs.common import Throughput
+from app.services.fx_service import FxService
+from app.services.screening_service import ScreeningService
+from app.services.scheduled_transfer_service import EXECUTED, FAILED, ScheduledTransferService
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+async def drain(worker_id: str, batch_size: int, concurrency: int, interval: float, once: bool) -> dict:
+    """Claim and execute batches until nothing is due (with once=True) or forever."""
+    stats = {EXECUTED: 0, FAILED: 0, "skipped": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def execute(schedule):
+        async with semaphore:
+            return await ScheduledTransferService.execute(schedule, worker_id)
+
+    while True:
+        batch = await ScheduledTransferService.claim_due(worker_id, batch_size)
+        if batch:
+            for outcome in await asyncio.gather(*(execute(schedule) for schedule in batch)):
+                stats[outcome if outcome in stats else "skipped"] += 1
+            continue
+        if once:
+            return stats
+        await asyncio.sleep(interval)
+
+
+async def run(batch_size: int, concurrency: int, interval: float, once: bool) -> dict:
+    await db.connect()
+    await init_redis()
+    await FxService.refresh()
+    await ScreeningService.refresh()
+    refreshers = [
+        asyncio.create_task(FxService.refresh_loop()),
+        asyncio.create_task(ScreeningService.refresh_loop()),
+    ]
+    try:
+        return await drain(new_worker_id(), batch_size, concurrency, interval, once)
+    finally:
+        for task in refreshers:
+            task.cancel()
+        await close_redis()
+        await db.disconnect()
+
+
+def _run_process(batch_size: int, concurrency: int, interval: float, once: bool) -> dict:
+    return asyncio.run(run(batch_size, concurrency, interval, once))
+
+
+def run_processes(processes: int, batch_size: int, concurrency: int, interval: float, once: bool) -> dict:
+    meter = Throughput("schedules")
+    if processes <= 1:
+        results = [_run_process(batch_size, concurrency, interval, once)]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=ctx) as pool:
+            futures = [pool.submit(_run_process, batch_size, concurrency, interval, once) for _ in range(processes)]
+            results = [f.result() for f in futures]
+
+    summary = {key: sum(r[key] for r in results) for key in (EXECUTED, FAILED, "skipped")}
+    summary.update(meter.report(summary[EXECUTED] + summary[FAILED]))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Execute due scheduled transfers")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes on this host")
+    parser.add_argument("--batch-size", type=int, default=100, help="schedules claimed per query")
+    parser.add_argument("--concurrency", type=int, default=8, help="transfers in flight per process")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between polls when idle")
+    parser.add_argument("--once", action="store_true", help="drain due schedules and exit")
+    args = parser.parse_args()
+
+    summary = run_processes(args.processes, args.batch_size, args.concurrency, args.interval, args.once)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
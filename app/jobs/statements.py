@@ -0,0 +1,159 @@
+"""
+Monthly statement generator.
+
+For every account, streams the month's ledger rows (idx_transactions_account_created) and
+writes `{output_dir}/{period}/{account_number}.csv` and/or `.pdf` with the opening balance,
+the transactions and the closing balance. Both balances come from `balance_after`: the
+opening balance is the first row's balance_after minus its amount (or the last earlier
+row's balance_after when the month has no rows), the closing balance is the last row's.
+
+Account-id ranges are spread over --workers processes. An account counts as done once its
+row is in `statements`, so an interrupted run resumes where it stopped.
+
+Usage:
+    python -m app.jobs.statements --period 2026-09 --workers 4
+    python -m app.jobs.statements                   # previous month
+"""
+import argparse
+import asyncio
+import json
+import os
+from datetime import datetime
+from decimal import Decimal
+
+from app.core.clock import utc_now
+from app.core.config import get_settings
+from app.database.database import db
+from app.jobs.common import Throughput, run_partitioned, split_id_range
+from app.repositories.user_repo import UserRepository
+from app.repositories.user_repo_transactions import signed_amount
+from app.utils.statement_files import StatementWriter
+
+def period_bounds(period: str):
+    """[start, end) of a 'YYYY-MM' period."""
+    start = datetime.strptime(period, "%Y-%m")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def previous_period(now: datetime | None = None) -> str:
+    now = now or utc_now()
+    year, month = (now.year - 1, 12) if now.month == 1 else (now.year, now.month - 1)
+    return f"{year:04d}-{month:02d}"
+
+
+async def generate_statement(account: dict, period: str, start: datetime, end: datetime,
+                             directory: str, formats, batch_size: int) -> dict:
+    """Render one account's statement; returns the row to record in `statements`."""
+    rows = await UserRepository.get_statement_rows(account["account_number"], start, end, None, batch_size)
+    if rows:
+        first = rows[0]
+        opening = Decimal(str(first["balance_after"])) - signed_amount(
+            first["transaction_type"], Decimal(str(first["amount"]))
+        )
+    else:
+        opening = Decimal(str(await UserRepository.get_balance_before(account["account_number"], start) or "0.00"))
+
+    header = dict(account, period=period, opening_balance=opening)
+    writer = StatementWriter(os.path.join(directory, account["account_number"]), formats, header)
+    closing, count = opening, 0
+    while rows:
+        writer.rows(rows)
+        count += len(rows)
+        last = rows[-1]
+        closing = Decimal(str(last["balance_after"]))
+        if len(rows) < batch_size:
+            break
+        rows = await UserRepository.get_statement_rows(
+            account["account_number"], start, end, (last["created_at"], last["transaction_id"]), batch_size
+        )
+    writer.close(closing, count)
+
+    return {
+        "account_id": account["account_id"],
+        "account_number": account["account_number"],
+        "user_id": account["user_id"],
+        "currency": account["currency"],
+        "opening_balance": opening,
+        "closing_balance": closing,
+        "transaction_count": count,
+        "files": ",".join(os.path.basename(path) for path in writer.paths),
+    }
+
+
+async def generate_range(lo: int, hi: int, period: str, output_dir: str, formats,
+                         chunk_size: int = 200, batch_size: int = 1000) -> dict:
+    """Generate statements for accounts with account_id in (lo, hi] that do not have one yet."""
+    start, end = period_bounds(period)
+    directory = os.path.join(output_dir, period)
+    os.makedirs(directory, exist_ok=True)
+    stats = {"accounts": 0, "rows": 0}
+    cursor = lo
+    while cursor < hi:
+        accounts = await UserRepository.get_statement_accounts(period, cursor, hi, chunk_size)
+        if not accounts:
+            break
+        done = []
+        for account in accounts:
+            done.append(await generate_statement(account, period, start, end, directory, formats, batch_size))
+        # Recorded per chunk: a crash redoes at most one chunk, whose files are simply rewritten.
+        await UserRepository.record_statements(period, done)
+        stats["accounts"] += len(done)
+        stats["rows"] += sum(statement["transaction_count"] for statement in done)
+        cursor = accounts[-1]["account_id"]
+    return stats
+
+
+async def _get_bounds():
+    await db.connect()
+    try:
+        return await UserRepository.get_account_id_bounds()
+    finally:
+        await db.disconnect()
+
+
+def run(period: str, workers: int = 1, output_dir: str | None = None, formats=None,
+        chunk_size: int = 200, batch_size: int = 1000) -> dict:
+    """Defaults: STATEMENTS_OUTPUT_DIR and STATEMENT_FORMATS."""
+    period_bounds(period)  # validate before starting any worker
+    output_dir = output_dir or get_settings().statements_output_dir
+    formats = formats or get_settings().statement_formats
+    bounds = asyncio.run(_get_bounds())
+    if not bounds or bounds["min_id"] is None:
+        return {"period": period, "rows": 0, "accounts": 0, "elapsed_seconds": 0.0, "accounts_per_second": 0.0}
+
+    meter = Throughput("accounts")
+    ranges = split_id_range(bounds["min_id"], bounds["max_id"], max(workers, 1))
+    results = run_partitioned(generate_range, ranges, workers, period, output_dir, tuple(formats), chunk_size, batch_size)
+
+    summary = {"period": period, "rows": sum(r["rows"] for r in results)}
+    summary.update(meter.report(sum(r["accounts"] for r in results)))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate monthly account statements")
+    parser.add_argument("--period", default=None, help="YYYY-MM (default: previous month)")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes (account-id ranges)")
+    parser.add_argument("--output-dir", default=None, help="default: STATEMENTS_OUTPUT_DIR")
+    parser.add_argument("--formats", default=",".join(get_settings().statement_formats),
+                        help="comma-separated: csv, pdf")
+    parser.add_argument("--chunk-size", type=int, default=200, help="accounts recorded per progress write")
+    parser.add_argument("--batch-size", type=int, default=1000, help="ledger rows fetched per query")
+    args = parser.parse_args()
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = set(formats) - {"csv", "pdf"}
+    if unknown or not formats:
+        parser.error(f"unsupported formats: {', '.join(sorted(unknown)) or 'none given'}")
+    try:
+        period_bounds(args.period or previous_period())
+    except ValueError:
+        parser.error("--period must be YYYY-MM")
+
+    summary = run(args.period or previous_period(), args.workers, args.output_dir, formats, args.chunk_size, args.batch_size)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
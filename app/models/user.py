@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 from decimal import Decimal
 
 from pydantic import BaseModel, EmailStr, Field
@@ -31,14 +31,34 @@ class AccountStatusUpdate(BaseModel):
     status: str = Field(..., pattern="^(active|suspended)$")
 
 
+class HotAccountUpdate(BaseModel):
+    hot: bool
+
+
+# Response models use plain str for emails: stored values were validated on the way in,
+# and re-running email validation on every response is slow.
 class CustomerProfileResponse(BaseModel):
     user_id: int
     username: str
-    email: EmailStr
+    email: str
     role: str
     account_created_at: Optional[datetime] = None
     account_number: Optional[str] = None
     current_balance: Optional[Decimal] = None
+    available_balance: Optional[Decimal] = None  # current_balance minus pending holds
+    currency: Optional[str] = None
+    account_status: Optional[str] = None
+
+
+class CustomerSummaryResponse(BaseModel):
+    user_id: int
+    username: str
+    email: str
+    role: str
+    created_at: Optional[datetime] = None
+    account_number: Optional[str] = None
+    balance: Optional[Decimal] = None
+    currency: Optional[str] = None
     account_status: Optional[str] = None
 
 
@@ -47,6 +67,14 @@ class CashDepositRequest(BaseModel):
     amount: Decimal = Field(..., gt=0)
 
 
+class CashDepositResponse(BaseModel):
+    status: str
+    message: str
+    account_number: str
+    amount_added: Decimal
+    new_balance: Decimal
+
+
 class CashWithdrawRequest(BaseModel):
     account_number: str = Field(..., min_length=6, max_length=30)
     amount: Decimal = Field(..., gt=0)
@@ -54,11 +82,13 @@ class CashWithdrawRequest(BaseModel):
 
 class CashWithdrawAmountRequest(BaseModel):
     amount: Decimal = Field(..., gt=0)
+    account_number: Optional[str] = Field(None, min_length=6, max_length=30)  # default: primary account
 
 
 class TransferRequest(BaseModel):
     to_account_number: str = Field(..., min_length=6, max_length=30)
-    amount: Decimal = Field(..., gt=0)
+    amount: Decimal = Field(..., gt=0)  # in the currency of the source account
+    from_account_number: Optional[str] = Field(None, min_length=6, max_length=30)  # default: primary account
 
 
 class TransactionHistoryItem(BaseModel):
@@ -70,3 +100,106 @@ class TransactionHistoryItem(BaseModel):
     related_account: Optional[str] = None
     created_at: datetime
 
+
+class BalanceUpdateResponse(BaseModel):
+    status: str
+    new_balance: Decimal
+
+
+class ScheduledTransferCreate(BaseModel):
+    to_account_number: str = Field(..., min_length=6, max_length=30)
+    amount: Decimal = Field(..., gt=0)
+    frequency: Literal["once", "daily", "weekly", "monthly"]
+    first_run_at: Optional[datetime] = None  # default: now
+    end_at: Optional[datetime] = None
+
+
+class ScheduledTransferResponse(BaseModel):
+    schedule_id: int
+    to_account_number: str
+    amount: Decimal
+    frequency: str
+    first_run_at: datetime
+    end_at: Optional[datetime] = None
+    next_run_at: Optional[datetime] = None
+    run_count: int
+    status: str
+    failure_count: int
+    last_error: Optional[str] = None
+    last_run_at: Optional[datetime] = None
+    created_at: datetime
+
+
+class HoldCreate(BaseModel):
+    amount: Decimal = Field(..., gt=0)
+    expires_in_seconds: Optional[int] = Field(None, gt=0)  # default: HOLD_DEFAULT_TTL_SECONDS
+    reference: Optional[str] = Field(None, max_length=64)
+    account_number: Optional[str] = Field(None, min_length=6, max_length=30)  # default: primary account
+
+
+class HoldCapture(BaseModel):
+    amount: Optional[Decimal] = Field(None, gt=0)  # default: the full held amount
+
+
+class HoldCaptureResponse(BalanceUpdateResponse):
+    captured_amount: Decimal
+
+
+class HoldResponse(BaseModel):
+    hold_id: int
+    account_number: str
+    amount: Decimal
+    captured_amount: Optional[Decimal] = None
+    status: str
+    reference: Optional[str] = None
+    expires_at: datetime
+    created_at: datetime
+    resolved_at: Optional[datetime] = None
+
+
+class AccountCreate(BaseModel):
+    currency: str = Field(..., pattern="^[A-Z]{3}$")
+
+
+class AccountResponse(BaseModel):
+    account_number: str
+    currency: str
+    balance: Decimal
+    available_balance: Decimal
+    account_status: str
+
+
+class FxRate(BaseModel):
+    base_currency: str = Field(..., pattern="^[A-Z]{3}$")
+    quote_currency: str = Field(..., pattern="^[A-Z]{3}$")
+    rate: Decimal = Field(..., gt=0)
+
+
+class FxRatesUpdate(BaseModel):
+    rates: List[FxRate] = Field(..., min_length=1)
+
+
+class ScreeningRuleUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    fail_policy: Optional[Literal["open", "closed"]] = None
+    params: Optional[Dict[str, Any]] = None
+
+
+class ScreeningRuleResponse(BaseModel):
+    rule_name: str
+    enabled: bool
+    fail_policy: str
+    params: Dict[str, Any]
+    updated_at: datetime
+
+
+class AuditLogEntry(BaseModel):
+    audit_id: int
+    actor_id: Optional[int] = None
+    actor: str
+    action: str
+    target_type: str
+    target_id: str
+    changes: Dict[str, Any]
+    request_id: Optional[str] = None
+    created_at: datetime
@@ -1,6 +1,18 @@
 from app.repositories.user_repo_accounts import UserRepoAccountsMixin
 from app.repositories.user_repo_admin import UserRepoAdminMixin
+from app.repositories.user_repo_audit import UserRepoAuditMixin
+from app.repositories.user_repo_daily_stats import UserRepoDailyStatsMixin
+from app.repositories.user_repo_fx import UserRepoFxMixin
+from app.repositories.user_repo_holds import UserRepoHoldsMixin
+from app.repositories.user_repo_hot_accounts import UserRepoHotAccountsMixin
+from app.repositories.user_repo_ledger_chain import UserRepoLedgerChainMixin
 from app.repositories.user_repo_otp import UserRepoOtpMixin
+from app.repositories.user_repo_postings import UserRepoPostingsMixin
+from app.repositories.user_repo_purge import UserRepoPurgeMixin
+from app.repositories.user_repo_reconciliation import UserRepoReconciliationMixin
+from app.repositories.user_repo_scheduled import UserRepoScheduledTransfersMixin
+from app.repositories.user_repo_screening import UserRepoScreeningMixin
+from app.repositories.user_repo_statements import UserRepoStatementsMixin
 from app.repositories.user_repo_transactions import UserRepoTransactionsMixin
 from app.repositories.user_repo_users import UserRepoUsersMixin
 
@@ -11,5 +23,17 @@ class UserRepository(
     UserRepoAdminMixin,
     UserRepoAccountsMixin,
     UserRepoTransactionsMixin,
+    UserRepoReconciliationMixin,
+    UserRepoLedgerChainMixin,
+    UserRepoHotAccountsMixin,
+    UserRepoScheduledTransfersMixin,
+    UserRepoHoldsMixin,
+    UserRepoFxMixin,
+    UserRepoScreeningMixin,
+    UserRepoAuditMixin,
+    UserRepoPurgeMixin,
+    UserRepoStatementsMixin,
+    UserRepoPostingsMixin,
+    UserRepoDailyStatsMixin,
 ):
     pass
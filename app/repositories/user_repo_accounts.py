@@ -2,19 +2,84 @@ from decimal import Decimal
 
 import aiomysql
 
+from app.core.fx import DEFAULT_CURRENCY, fx_rates
 from app.database.database import db
+from app.repositories.user_repo_hot_accounts import _fold_pending_credits, _insert_pending_credit
 from app.repositories.user_repo_transactions import _insert_transaction
 
+# Pending credits of hot accounts are part of the balance the customer sees.
+_PENDING_CREDITS_SQL = (
+    "COALESCE((SELECT SUM(p.amount) FROM pending_credits p WHERE p.account_number = a.account_number), 0)"
+)
+
+# The primary account is the one opened at registration; it is used when a request names no account.
+_PRIMARY_ACCOUNT_SQL = "(SELECT MIN(p.account_id) FROM accounts p WHERE p.user_id = u.user_id)"
+
+
+async def _lock_customer_account(cur, user_id: int, account_number: str | None):
+    """Lock the named account of the customer (or the primary one) together with its hot flag."""
+    account_filter = "AND a.account_number = %s" if account_number else ""
+    await cur.execute(
+        f"""
+        SELECT a.account_number, a.balance, a.held_balance, a.status, a.currency,
+               h.account_number IS NOT NULL AS is_hot
+        FROM accounts a
+        LEFT JOIN hot_accounts h ON h.account_number = a.account_number
+        WHERE a.user_id = %s {account_filter}
+        ORDER BY a.account_id
+        LIMIT 1
+        FOR UPDATE OF a
+        """,
+        (user_id, account_number) if account_number else (user_id,),
+    )
+    return await cur.fetchone()
+
 
 class UserRepoAccountsMixin:
     @staticmethod
-    async def create_account(user_id: int, account_number: str):
+    async def create_account(user_id: int, account_number: str, currency: str = DEFAULT_CURRENCY):
         async with await db.get_conn() as conn:
             async with conn.cursor() as cur:
-                sql = "INSERT INTO accounts (user_id, account_number, balance) VALUES (%s, %s, %s)"
-                await cur.execute(sql, (user_id, account_number, "0.00"))
+                sql = "INSERT INTO accounts (user_id, account_number, balance, currency) VALUES (%s, %s, %s, %s)"
+                await cur.execute(sql, (user_id, account_number, "0.00", currency))
                 await conn.commit()
 
+    @staticmethod
+    async def get_accounts_by_user_id(user_id: int):
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                sql = """
+                    SELECT
+                        a.account_number,
+                        a.currency,
+                        a.balance + {pending} as balance,
+                        a.balance + {pending} - a.held_balance as available_balance,
+                        a.status as account_status
+                    FROM accounts a
+                    WHERE a.user_id = %s
+                    ORDER BY a.account_id
+                """.format(pending=_PENDING_CREDITS_SQL)
+                await cur.execute(sql, (user_id,))
+                return await cur.fetchall()
+
+    @staticmethod
+    async def get_customer_account(user_id: int, account_number: str | None = None):
+        """The named account of the customer, or the primary one; None if there is no such account."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                account_filter = "AND account_number = %s" if account_number else ""
+                await cur.execute(
+                    f"""
+                    SELECT account_number, currency, status as account_status
+                    FROM accounts
+                    WHERE user_id = %s {account_filter}
+                    ORDER BY account_id
+                    LIMIT 1
+                    """,
+                    (user_id, account_number) if account_number else (user_id,),
+                )
+                return await cur.fetchone()
+
     @staticmethod
     async def get_customer_profile_by_user_id(user_id: int):
         async with await db.get_conn() as conn:
@@ -27,12 +92,14 @@ class UserRepoAccountsMixin:
                         u.role,
                         u.created_at as account_created_at,
                         a.account_number,
-                        a.balance as current_balance,
+                        a.balance + {pending} as current_balance,
+                        a.balance + {pending} - a.held_balance as available_balance,
+                        a.currency,
                         a.status as account_status
                     FROM users u
-                    LEFT JOIN accounts a ON u.user_id = a.user_id
-                    WHERE u.user_id = %s AND u.role = 'customer'
-                """
+                    LEFT JOIN accounts a ON a.account_id = {primary}
+                    WHERE u.user_id = %s AND u.role = 'customer' AND u.deleted_at IS NULL
+                """.format(pending=_PENDING_CREDITS_SQL, primary=_PRIMARY_ACCOUNT_SQL)
                 await cur.execute(sql, (user_id,))
                 return await cur.fetchone()
 
@@ -49,13 +116,14 @@ class UserRepoAccountsMixin:
                         u.role,
                         u.created_at,
                         a.account_number,
-                        a.balance,
+                        a.balance + {pending} as balance,
+                        a.currency,
                         a.status as account_status
                     FROM users u
                     INNER JOIN accounts a ON u.user_id = a.user_id
                     WHERE a.account_number = %s AND u.role = 'customer'
                     LIMIT 1
-                """
+                """.format(pending=_PENDING_CREDITS_SQL)
                 await cur.execute(sql, (account_number,))
                 return await cur.fetchone()
 
@@ -102,12 +170,18 @@ class UserRepoAccountsMixin:
         Returns:
           - new_balance (Decimal) on success
           - "NOT_FOUND" if account doesn't exist
-          - "INSUFFICIENT" if balance < amount
+          - "INSUFFICIENT" if the available balance (balance minus holds) < amount
         """
         async with await db.get_conn() as conn:
             async with conn.cursor(aiomysql.DictCursor) as cur:
                 await cur.execute(
-                    "SELECT user_id, balance FROM accounts WHERE account_number = %s FOR UPDATE",
+                    """
+                    SELECT a.user_id, a.balance, a.held_balance, h.account_number IS NOT NULL AS is_hot
+                    FROM accounts a
+                    LEFT JOIN hot_accounts h ON h.account_number = a.account_number
+                    WHERE a.account_number = %s
+                    FOR UPDATE OF a
+                    """,
                     (account_number,),
                 )
                 row = await cur.fetchone()
@@ -116,7 +190,10 @@ class UserRepoAccountsMixin:
                     return "NOT_FOUND"
 
                 current_balance = Decimal(str(row["balance"]))
-                if current_balance < amount:
+                if row["is_hot"]:
+                    current_balance = await _fold_pending_credits(cur, account_number, current_balance)
+                # Funds reserved by pending holds cannot be withdrawn.
+                if current_balance - Decimal(str(row["held_balance"])) < amount:
                     await conn.rollback()
                     return "INSUFFICIENT"
 
@@ -148,22 +225,18 @@ class UserRepoAccountsMixin:
                 return balance_after
 
     @staticmethod
-    async def withdraw_cash_by_user_id(user_id: int, amount: Decimal):
+    async def withdraw_cash_by_user_id(user_id: int, amount: Decimal, account_number: str | None = None):
         """
-        Atomic withdraw for a customer's own account.
+        Atomic withdraw from one of the customer's own accounts (the primary one if none is named).
         Returns:
           - Decimal(new_balance) on success
           - "NOT_FOUND" if no account for user
           - "SUSPENDED" if account is not active
-          - "INSUFFICIENT" if balance < amount
+          - "INSUFFICIENT" if the available balance (balance minus holds) < amount
         """
         async with await db.get_conn() as conn:
             async with conn.cursor(aiomysql.DictCursor) as cur:
-                await cur.execute(
-                    "SELECT account_number, status FROM accounts WHERE user_id = %s LIMIT 1 FOR UPDATE",
-                    (user_id,),
-                )
-                row = await cur.fetchone()
+                row = await _lock_customer_account(cur, user_id, account_number)
                 if not row:
                     await conn.rollback()
                     return "NOT_FOUND"
@@ -172,15 +245,18 @@ class UserRepoAccountsMixin:
                     await conn.rollback()
                     return "SUSPENDED"
 
+                if row["is_hot"]:
+                    await _fold_pending_credits(cur, row["account_number"], Decimal(str(row["balance"])))
+
                 await cur.execute(
                     """
                     UPDATE accounts
                     SET balance = balance - %s
-                    WHERE user_id = %s
+                    WHERE account_number = %s
                       AND status = 'active'
-                      AND balance >= %s
+                      AND balance - held_balance >= %s
                     """,
-                    (str(amount), user_id, str(amount)),
+                    (str(amount), row["account_number"], str(amount)),
                 )
 
                 if cur.rowcount == 0:
@@ -188,8 +264,8 @@ class UserRepoAccountsMixin:
                     return "INSUFFICIENT"
 
                 await cur.execute(
-                    "SELECT balance FROM accounts WHERE user_id = %s LIMIT 1",
-                    (user_id,),
+                    "SELECT balance FROM accounts WHERE account_number = %s",
+                    (row["account_number"],),
                 )
                 row2 = await cur.fetchone()
                 if not row2:
@@ -210,23 +286,24 @@ class UserRepoAccountsMixin:
                 return balance_after
 
     @staticmethod
-    async def transfer_between_accounts(from_user_id: int, to_account_number: str, amount: Decimal):
+    async def transfer_between_accounts(
+        from_user_id: int, to_account_number: str, amount: Decimal, from_account_number: str | None = None
+    ):
         """
-        Transfer funds from a customer's account to another account number.
+        Transfer funds from one of the customer's accounts (the primary one if none is named) to
+        another account number. `amount` is in the sender's currency; a receiver in another
+        currency is credited the amount converted at the cached FX rate.
         Returns:
           - Decimal(new_balance) on success
           - "NOT_FOUND" if sender or receiver account is missing
           - "SUSPENDED" if either account is not active
-          - "INSUFFICIENT" if sender balance < amount
+          - "INSUFFICIENT" if the sender's available balance < amount
           - "SAME_ACCOUNT" if sender and receiver are the same account
+          - "NO_RATE" if no FX rate is known for the currency pair
         """
         async with await db.get_conn() as conn:
             async with conn.cursor(aiomysql.DictCursor) as cur:
-                await cur.execute(
-                    "SELECT account_number, balance, status FROM accounts WHERE user_id = %s LIMIT 1 FOR UPDATE",
-                    (from_user_id,),
-                )
-                sender = await cur.fetchone()
+                sender = await _lock_customer_account(cur, from_user_id, from_account_number)
                 if not sender:
                     await conn.rollback()
                     return "NOT_FOUND"
@@ -234,8 +311,18 @@ class UserRepoAccountsMixin:
                     await conn.rollback()
                     return "SUSPENDED"
 
+                # One read for every receiver. The receiver row is not locked here: a hot receiver's
+                # credit is queued in pending_credits, and any other receiver is locked by the guarded
+                # credit below. The shared lock on the hot flag keeps it from changing until commit.
                 await cur.execute(
-                    "SELECT user_id, account_number, status FROM accounts WHERE account_number = %s LIMIT 1 FOR UPDATE",
+                    """
+                    SELECT a.user_id, a.account_number, a.status, a.currency, h.account_number IS NOT NULL AS is_hot
+                    FROM accounts a
+                    LEFT JOIN hot_accounts h ON h.account_number = a.account_number
+                    WHERE a.account_number = %s
+                    LIMIT 1
+                    FOR SHARE OF h
+                    """,
                     (to_account_number,),
                 )
                 receiver = await cur.fetchone()
@@ -250,19 +337,58 @@ class UserRepoAccountsMixin:
                     await conn.rollback()
                     return "SAME_ACCOUNT"
 
+                # Converted from the in-memory rate cache: no extra query inside the locked section.
+                credited = amount
+                if sender["currency"] != receiver["currency"]:
+                    credited = fx_rates.convert(amount, sender["currency"], receiver["currency"])
+                    if credited is None:
+                        await conn.rollback()
+                        return "NO_RATE"
+
                 current_balance = Decimal(str(sender["balance"]))
-                if current_balance < amount:
+                if sender["is_hot"]:
+                    current_balance = await _fold_pending_credits(cur, sender["account_number"], current_balance)
+                if current_balance - Decimal(str(sender["held_balance"])) < amount:
                     await conn.rollback()
                     return "INSUFFICIENT"
 
+                if receiver.get("is_hot"):
+                    await cur.execute(
+                        "UPDATE accounts SET balance = balance - %s WHERE account_number = %s",
+                        (str(amount), sender["account_number"]),
+                    )
+                    sender_balance = current_balance - amount
+                    await _insert_transaction(
+                        cur,
+                        user_id=from_user_id,
+                        account_number=sender["account_number"],
+                        transaction_type="transfer_out",
+                        amount=amount,
+                        balance_after=sender_balance,
+                        related_account=receiver["account_number"],
+                    )
+                    await _insert_pending_credit(
+                        cur,
+                        account_number=receiver["account_number"],
+                        user_id=int(receiver["user_id"]),
+                        amount=credited,
+                        related_account=sender["account_number"],
+                    )
+                    await conn.commit()
+                    return sender_balance
+
                 await cur.execute(
                     "UPDATE accounts SET balance = balance - %s WHERE account_number = %s",
                     (str(amount), sender["account_number"]),
                 )
                 await cur.execute(
-                    "UPDATE accounts SET balance = balance + %s WHERE account_number = %s",
-                    (str(amount), receiver["account_number"]),
+                    "UPDATE accounts SET balance = balance + %s WHERE account_number = %s AND status = 'active'",
+                    (str(credited), receiver["account_number"]),
                 )
+                if cur.rowcount == 0:
+                    # Suspended after it was read above.
+                    await conn.rollback()
+                    return "SUSPENDED"
 
                 await cur.execute(
                     "SELECT balance FROM accounts WHERE account_number = %s",
@@ -297,7 +423,7 @@ class UserRepoAccountsMixin:
                     user_id=int(receiver["user_id"]),
                     account_number=receiver["account_number"],
                     transaction_type="transfer_in",
-                    amount=amount,
+                    amount=credited,
                     balance_after=receiver_balance,
                     related_account=sender["account_number"],
                 )
@@ -1,6 +1,11 @@
+from collections import defaultdict
+from decimal import Decimal
+
 import aiomysql
 
+from app.core.fx import DEFAULT_CURRENCY, fx_rates
 from app.database.database import db
+from app.repositories.user_repo_accounts import _PENDING_CREDITS_SQL, _PRIMARY_ACCOUNT_SQL
 
 
 class UserRepoAdminMixin:
@@ -16,13 +21,14 @@ class UserRepoAdminMixin:
                         u.role,
                         u.created_at,
                         a.account_number,
-                        a.balance,
+                        a.currency,
+                        a.balance + {pending} as balance,
                         a.status as account_status
                     FROM users u
-                    LEFT JOIN accounts a ON u.user_id = a.user_id
-                    WHERE u.role = 'customer'
+                    LEFT JOIN accounts a ON a.account_id = {primary}
+                    WHERE u.role = 'customer' AND u.deleted_at IS NULL
                     ORDER BY u.created_at DESC
-                """
+                """.format(pending=_PENDING_CREDITS_SQL, primary=_PRIMARY_ACCOUNT_SQL)
                 await cur.execute(sql)
                 return await cur.fetchall()
 
@@ -38,17 +44,19 @@ class UserRepoAdminMixin:
                         u.role,
                         u.created_at,
                         a.account_number,
-                        a.balance,
+                        a.currency,
+                        a.balance + {pending} as balance,
                         a.status as account_status
                     FROM users u
-                    LEFT JOIN accounts a ON u.user_id = a.user_id
-                    WHERE u.user_id = %s AND u.role = 'customer'
-                """
+                    LEFT JOIN accounts a ON a.account_id = {primary}
+                    WHERE u.user_id = %s AND u.role = 'customer' AND u.deleted_at IS NULL
+                """.format(pending=_PENDING_CREDITS_SQL, primary=_PRIMARY_ACCOUNT_SQL)
                 await cur.execute(sql, (user_id,))
                 return await cur.fetchone()
 
     @staticmethod
     async def search_customers(search_term: str):
+        """One row per customer, with its primary account; the term may match any of its account numbers."""
         async with await db.get_conn() as conn:
             async with conn.cursor(aiomysql.DictCursor) as cur:
                 sql = """
@@ -59,18 +67,22 @@ class UserRepoAdminMixin:
                         u.role,
                         u.created_at,
                         a.account_number,
-                        a.balance,
+                        a.currency,
+                        a.balance + {pending} as balance,
                         a.status as account_status
                     FROM users u
-                    LEFT JOIN accounts a ON u.user_id = a.user_id
-                    WHERE u.role = 'customer' 
+                    LEFT JOIN accounts a ON a.account_id = {primary}
+                    WHERE u.role = 'customer' AND u.deleted_at IS NULL
                     AND (
                         u.username LIKE %s 
                         OR u.email LIKE %s 
-                        OR a.account_number LIKE %s
+                        OR EXISTS (
+                            SELECT 1 FROM accounts s
+                            WHERE s.user_id = u.user_id AND s.account_number LIKE %s
+                        )
                     )
                     ORDER BY u.created_at DESC
-                """
+                """.format(pending=_PENDING_CREDITS_SQL, primary=_PRIMARY_ACCOUNT_SQL)
                 search_pattern = f"%{search_term}%"
                 await cur.execute(sql, (search_pattern, search_pattern, search_pattern))
                 return await cur.fetchall()
@@ -79,12 +91,27 @@ class UserRepoAdminMixin:
     async def get_statistics():
         async with await db.get_conn() as conn:
             async with conn.cursor(aiomysql.DictCursor) as cur:
-                await cur.execute("SELECT COUNT(*) as total FROM users WHERE role='customer'")
+                await cur.execute("SELECT COUNT(*) as total FROM users WHERE role='customer' AND deleted_at IS NULL")
                 total_customers = (await cur.fetchone())["total"]
 
-                await cur.execute("SELECT SUM(balance) as total_balance FROM accounts")
-                result = await cur.fetchone()
-                total_balance = float(result["total_balance"]) if result["total_balance"] else 0.0
+                balances = defaultdict(Decimal)
+                await cur.execute("SELECT currency, SUM(balance) as total FROM accounts GROUP BY currency")
+                for row in await cur.fetchall():
+                    balances[row["currency"]] += Decimal(str(row["total"]))
+                await cur.execute(
+                    """
+                    SELECT a.currency, SUM(pc.amount) as total
+                    FROM pending_credits pc
+                    JOIN accounts a ON a.account_number = pc.account_number
+                    GROUP BY a.currency
+                    """
+                )
+                for row in await cur.fetchall():
+                    balances[row["currency"]] += Decimal(str(row["total"]))
+
+                # The headline total is in DEFAULT_CURRENCY; currencies without a rate are left out of it.
+                converted = (fx_rates.convert(total, currency, DEFAULT_CURRENCY) for currency, total in balances.items())
+                total_balance = float(sum(amount for amount in converted if amount is not None))
 
                 await cur.execute("SELECT COUNT(*) as active FROM accounts WHERE status='active'")
                 active_accounts = (await cur.fetchone())["active"]
@@ -92,6 +119,8 @@ class UserRepoAdminMixin:
                 return {
                     "total_customers": total_customers,
                     "total_balance": total_balance,
+                    "currency": DEFAULT_CURRENCY,
+                    "balances_by_currency": {currency: float(total) for currency, total in sorted(balances.items())},
                     "active_accounts": active_accounts,
                 }
 
@@ -113,12 +142,14 @@ class UserRepoAdminMixin:
                 if password_hash:
                     update_fields.append("password_hash = %s")
                     params.append(password_hash)
+                    # Tokens issued under the old password stop working.
+                    update_fields.append("auth_epoch = auth_epoch + 1")
 
                 if not update_fields:
                     return False
 
                 params.append(user_id)
-                sql = f"UPDATE users SET {', '.join(update_fields)} WHERE user_id = %s AND role = 'customer'"
+                sql = f"UPDATE users SET {', '.join(update_fields)} WHERE user_id = %s AND role = 'customer' AND deleted_at IS NULL"
 
                 await cur.execute(sql, params)
                 await conn.commit()
@@ -128,22 +159,49 @@ class UserRepoAdminMixin:
     async def update_account_status(user_id: int, status: str):
         async with await db.get_conn() as conn:
             async with conn.cursor() as cur:
-                sql = "UPDATE accounts SET status = %s WHERE user_id = %s"
+                # A deleted customer's accounts stay suspended.
+                sql = """
+                    UPDATE accounts a
+                    JOIN users u ON u.user_id = a.user_id
+                    SET a.status = %s
+                    WHERE a.user_id = %s AND u.deleted_at IS NULL
+                """
                 await cur.execute(sql, (status, user_id))
+                updated = cur.rowcount > 0
+                if updated and status == "suspended":
+                    # Revoke outstanding tokens; reactivation then requires a fresh login.
+                    await cur.execute("UPDATE users SET auth_epoch = auth_epoch + 1 WHERE user_id = %s", (user_id,))
                 await conn.commit()
-                return cur.rowcount > 0
+                return updated
 
     @staticmethod
     async def delete_customer(user_id: int):
+        """
+        Soft delete: mark the customer deleted, revoke its tokens, suspend its accounts and cancel
+        its standing orders in one short transaction. Nothing is removed, so the ledger keeps its
+        link; app.jobs.customer_purge anonymizes the customer later in small batches.
+        """
         async with await db.get_conn() as conn:
             async with conn.cursor() as cur:
-                await cur.execute("SELECT role FROM users WHERE user_id = %s", (user_id,))
-                result = await cur.fetchone()
-
-                if not result or result[0] != "customer":
+                await cur.execute(
+                    """
+                    UPDATE users SET deleted_at = NOW(), auth_epoch = auth_epoch + 1
+                    WHERE user_id = %s AND role = 'customer' AND deleted_at IS NULL
+                    """,
+                    (user_id,),
+                )
+                if cur.rowcount == 0:
+                    await conn.rollback()
                     return False
 
-                sql = "DELETE FROM users WHERE user_id = %s AND role = 'customer'"
-                await cur.execute(sql, (user_id,))
+                await cur.execute("UPDATE accounts SET status = 'suspended' WHERE user_id = %s", (user_id,))
+                await cur.execute(
+                    """
+                    UPDATE scheduled_transfers
+                    SET status = 'cancelled', next_run_at = NULL
+                    WHERE user_id = %s AND status = 'active'
+                    """,
+                    (user_id,),
+                )
                 await conn.commit()
-                return cur.rowcount > 0
+                return True
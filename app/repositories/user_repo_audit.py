@@ -0,0 +1,93 @@
+import json
+from typing import List
+
+import aiomysql
+
+from app.database.database import db
+
+
+class UserRepoAuditMixin:
+    @staticmethod
+    async def insert_audit_records(records: List[dict]) -> None:
+        """
+        Write buffered audit records; executemany turns this into one multi-row INSERT.
+        Records whose record_id is already stored are skipped, so a batch can be retried safely.
+        """
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.executemany(
+                    """
+                    INSERT INTO audit_log (
+                        record_id, actor_id, actor, action, target_type, target_id, changes, request_id, created_at
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE audit_id = audit_id
+                    """,
+                    [
+                        (
+                            record["record_id"],
+                            record["actor_id"],
+                            record["actor"],
+                            record["action"],
+                            record["target_type"],
+                            record["target_id"],
+                            json.dumps(record["changes"], default=str) if record["changes"] else None,
+                            record["request_id"],
+                            record["created_at"],
+                        )
+                        for record in records
+                    ],
+                )
+                await conn.commit()
+
+    @staticmethod
+    async def get_audit_log(
+        actor_id: int | None = None,
+        action: str | None = None,
+        target_type: str | None = None,
+        target_id: str | None = None,
+        before_id: int | None = None,
+        limit: int = 50,
+    ):
+        """
+        Newest audit records first, `limit` per page. Pass the last audit_id of a page as
+        `before_id` to get the next one. No filter reads the primary key backwards; actor_id,
+        action, or target_type with target_id read their (..., audit_id) index in page order,
+        and further filters are checked on the rows that index returns. target_type alone
+        sorts every match, and target_id alone scans the primary key until `limit` rows match.
+        """
+        conditions = []
+        values = []
+        if actor_id is not None:
+            conditions.append("actor_id = %s")
+            values.append(actor_id)
+        if action is not None:
+            conditions.append("action = %s")
+            values.append(action)
+        if target_type is not None:
+            conditions.append("target_type = %s")
+            values.append(target_type)
+        if target_id is not None:
+            conditions.append("target_id = %s")
+            values.append(target_id)
+        if before_id is not None:
+            conditions.append("audit_id < %s")
+            values.append(before_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    f"""
+                    SELECT audit_id, actor_id, actor, action, target_type, target_id, changes, request_id, created_at
+                    FROM audit_log
+                    {where}
+                    ORDER BY audit_id DESC
+                    LIMIT %s
+                    """,
+                    (*values, limit),
+                )
+                rows = await cur.fetchall()
+                for row in rows:
+                    row["changes"] = json.loads(row["changes"]) if row["changes"] else {}
+                return rows
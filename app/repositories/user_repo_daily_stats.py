@@ -0,0 +1,157 @@
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+
+import aiomysql
+
+from app.database.database import db
+from app.repositories.user_repo_transactions import CREDIT_TRANSACTION_TYPES
+
+_CREDIT_TYPES_SQL = ", ".join(f"'{transaction_type}'" for transaction_type in sorted(CREDIT_TRANSACTION_TYPES))
+
+
+async def _activity(cur, start: datetime, end: datetime):
+    await cur.execute(
+        """
+        SELECT COUNT(*) AS new_customers FROM users
+        WHERE role = 'customer' AND created_at >= %s AND created_at < %s
+        """,
+        (start, end),
+    )
+    new_customers = (await cur.fetchone())["new_customers"]
+    await cur.execute(
+        """
+        SELECT COUNT(*) AS deleted_customers FROM users
+        WHERE deleted_at >= %s AND deleted_at < %s AND role = 'customer'
+        """,
+        (start, end),
+    )
+    deleted_customers = (await cur.fetchone())["deleted_customers"]
+    await cur.execute(
+        f"""
+        SELECT a.currency,
+               SUM(CASE WHEN t.transaction_type IN ({_CREDIT_TYPES_SQL}) THEN t.amount
+                        ELSE -t.amount END) AS net_flow
+        FROM transactions t
+        JOIN accounts a ON a.account_number = t.account_number
+        WHERE t.created_at >= %s AND t.created_at < %s
+        GROUP BY a.currency
+        """,
+        (start, end),
+    )
+    flows = {row["currency"]: Decimal(str(row["net_flow"])) for row in await cur.fetchall()}
+    return {"new_customers": new_customers, "deleted_customers": deleted_customers, "flows": flows}
+
+
+class UserRepoDailyStatsMixin:
+    @staticmethod
+    async def get_activity(start: datetime, end: datetime):
+        """
+        New and deleted customers and the net ledger flow per currency in [start, end), read as
+        index ranges (idx_users_role_created, idx_users_deleted, idx_transactions_created).
+        """
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                return await _activity(cur, start, end)
+
+    @staticmethod
+    async def get_current_totals(since: datetime):
+        """
+        Customers and balances per currency right now, plus the activity since `since`, from one
+        consistent snapshot. A full aggregate, used only to seed the first daily snapshot.
+        """
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                await cur.execute(
+                    "SELECT COUNT(*) AS total FROM users WHERE role = 'customer' AND deleted_at IS NULL"
+                )
+                total_customers = (await cur.fetchone())["total"]
+                await cur.execute("SELECT currency, SUM(balance) AS total FROM accounts GROUP BY currency ORDER BY currency")
+                balances = {row["currency"]: Decimal(str(row["total"])) for row in await cur.fetchall()}
+                activity = await _activity(cur, since, datetime.max)
+                await conn.rollback()
+                return {"total_customers": total_customers, "balances": balances, "since": activity}
+
+    @staticmethod
+    async def count_active_accounts() -> int:
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT COUNT(*) FROM accounts WHERE status = 'active'")
+                return (await cur.fetchone())[0]
+
+    @staticmethod
+    async def get_latest_daily_stats():
+        """The newest snapshot with its balances per currency, or None before the first run."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute("SELECT * FROM daily_stats ORDER BY day DESC LIMIT 1")
+                latest = await cur.fetchone()
+                if not latest:
+                    return None
+                await cur.execute("SELECT currency, total_balance FROM daily_balances WHERE day = %s", (latest["day"],))
+                latest["balances"] = {row["currency"]: Decimal(str(row["total_balance"])) for row in await cur.fetchall()}
+                return latest
+
+    @staticmethod
+    async def get_earliest_daily_stats_day():
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT MIN(day) FROM daily_stats")
+                return (await cur.fetchone())[0]
+
+    @staticmethod
+    async def save_daily_stats(day: date, stats: dict, balances: dict, flows: dict) -> None:
+        """Upsert one day: `balances` and `flows` map currency to the end-of-day total and the day's net flow."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    INSERT INTO daily_stats (day, new_customers, deleted_customers, total_customers, active_accounts)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        new_customers = VALUES(new_customers),
+                        deleted_customers = VALUES(deleted_customers),
+                        total_customers = VALUES(total_customers),
+                        active_accounts = VALUES(active_accounts)
+                    """,
+                    (day, stats["new_customers"], stats["deleted_customers"], stats["total_customers"],
+                     stats["active_accounts"]),
+                )
+                if balances:
+                    await cur.executemany(
+                        """
+                        INSERT INTO daily_balances (day, currency, net_flow, total_balance)
+                        VALUES (%s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE net_flow = VALUES(net_flow), total_balance = VALUES(total_balance)
+                        """,
+                        [
+                            (day, currency, str(flows.get(currency, Decimal("0.00"))), str(total))
+                            for currency, total in sorted(balances.items())
+                        ],
+                    )
+                await conn.commit()
+
+    @staticmethod
+    async def get_daily_stats_range(start: date, end: date):
+        """Snapshots with day in [start, end], oldest first, each with a currency -> total_balance dict."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    """
+                    SELECT day, new_customers, deleted_customers, total_customers, active_accounts
+                    FROM daily_stats WHERE day >= %s AND day <= %s ORDER BY day
+                    """,
+                    (start, end),
+                )
+                days = await cur.fetchall()
+                await cur.execute(
+                    "SELECT day, currency, total_balance FROM daily_balances WHERE day >= %s AND day <= %s",
+                    (start, end),
+                )
+                balances = defaultdict(dict)
+                for row in await cur.fetchall():
+                    balances[row["day"]][row["currency"]] = Decimal(str(row["total_balance"]))
+                for row in days:
+                    row["balances"] = balances.get(row["day"], {})
+                return days
@@ -0,0 +1,35 @@
+from decimal import Decimal
+from typing import List, Tuple
+
+import aiomysql
+
+from app.database.database import db
+
+
+class UserRepoFxMixin:
+    @staticmethod
+    async def get_fx_rates():
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute("SELECT base_currency, quote_currency, rate, updated_at FROM fx_rates")
+                return await cur.fetchall()
+
+    @staticmethod
+    async def upsert_fx_rates(rates: List[Tuple[str, str, Decimal]]) -> int:
+        """Insert or update (base, quote, rate) rows in one multi-row statement."""
+        if not rates:
+            return 0
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                placeholders = ", ".join(["(%s, %s, %s)"] * len(rates))
+                params = [value for base, quote, rate in rates for value in (base, quote, str(rate))]
+                await cur.execute(
+                    f"""
+                    INSERT INTO fx_rates (base_currency, quote_currency, rate)
+                    VALUES {placeholders}
+                    ON DUPLICATE KEY UPDATE rate = VALUES(rate)
+                    """,
+                    params,
+                )
+                await conn.commit()
+                return len(rates)
@@ -0,0 +1,221 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+import aiomysql
+
+from app.database.database import db
+from app.repositories.user_repo_transactions import _insert_transaction
+
+_HOLD_COLUMNS = """
+    hold_id, account_number, amount, captured_amount, status, reference, expires_at, created_at, resolved_at
+"""
+
+
+async def _lock_pending_hold(cur, user_id: int, hold_id: int, now: datetime):
+    """Lock the hold row; returns it, or "NOT_FOUND"/"NOT_PENDING"."""
+    await cur.execute(
+        "SELECT hold_id, account_number, amount, status, expires_at FROM holds WHERE hold_id = %s AND user_id = %s FOR UPDATE",
+        (hold_id, user_id),
+    )
+    hold = await cur.fetchone()
+    if not hold:
+        return "NOT_FOUND"
+    # An expired hold is released by the sweeper and can no longer be captured.
+    if hold["status"] != "pending" or hold["expires_at"] <= now:
+        return "NOT_PENDING"
+    hold["amount"] = Decimal(str(hold["amount"]))
+    return hold
+
+
+class UserRepoHoldsMixin:
+    @staticmethod
+    async def create_hold(
+        user_id: int, amount: Decimal, expires_at: datetime, reference: str | None = None, account_number: str | None = None
+    ):
+        """
+        Reserve `amount` on one of the customer's accounts (the primary one if none is named).
+        Returns:
+          - hold_id (int) on success
+          - "NOT_FOUND" if no such account for user
+          - "SUSPENDED" if account is not active
+          - "INSUFFICIENT" if the available balance < amount
+        """
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                account_filter = "AND account_number = %s" if account_number else ""
+                await cur.execute(
+                    f"SELECT account_number FROM accounts WHERE user_id = %s {account_filter} ORDER BY account_id LIMIT 1",
+                    (user_id, account_number) if account_number else (user_id,),
+                )
+                account = await cur.fetchone()
+                if not account:
+                    await conn.rollback()
+                    return "NOT_FOUND"
+                account_number = account["account_number"]
+
+                # One conditional UPDATE, like the withdraw guard: concurrent holds cannot over-reserve.
+                # Pending credits of hot accounts are not available for holds until folded.
+                await cur.execute(
+                    """
+                    UPDATE accounts
+                    SET held_balance = held_balance + %s
+                    WHERE account_number = %s
+                      AND status = 'active'
+                      AND balance - held_balance >= %s
+                    """,
+                    (str(amount), account_number, str(amount)),
+                )
+                if cur.rowcount == 0:
+                    await cur.execute("SELECT status FROM accounts WHERE account_number = %s", (account_number,))
+                    row = await cur.fetchone()
+                    await conn.rollback()
+                    if not row:
+                        return "NOT_FOUND"
+                    return "SUSPENDED" if row["status"] != "active" else "INSUFFICIENT"
+
+                await cur.execute(
+                    """
+                    INSERT INTO holds (user_id, account_number, amount, reference, expires_at)
+                    VALUES (%s, %s, %s, %s, %s)
+                    """,
+                    (user_id, account_number, str(amount), reference, expires_at),
+                )
+                hold_id = cur.lastrowid
+                await conn.commit()
+                return hold_id
+
+    @staticmethod
+    async def get_hold(user_id: int, hold_id: int):
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    f"SELECT {_HOLD_COLUMNS} FROM holds WHERE hold_id = %s AND user_id = %s",
+                    (hold_id, user_id),
+                )
+                return await cur.fetchone()
+
+    @staticmethod
+    async def get_holds_by_user_id(user_id: int, limit: int = 50, offset: int = 0):
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    f"""
+                    SELECT {_HOLD_COLUMNS} FROM holds
+                    WHERE user_id = %s
+                    ORDER BY created_at DESC
+                    LIMIT %s OFFSET %s
+                    """,
+                    (user_id, limit, offset),
+                )
+                return await cur.fetchall()
+
+    @staticmethod
+    async def capture_hold(user_id: int, hold_id: int, amount: Decimal | None, now: datetime):
+        """
+        Debit up to the held amount and release the rest of the reservation.
+        Returns:
+          - Decimal(new_balance) on success
+          - "NOT_FOUND" if the hold does not exist for this customer
+          - "NOT_PENDING" if it was already captured, released or has expired
+          - "EXCEEDS_HOLD" if amount is larger than the hold
+        """
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                hold = await _lock_pending_hold(cur, user_id, hold_id, now)
+                if isinstance(hold, str):
+                    await conn.rollback()
+                    return hold
+                captured = hold["amount"] if amount is None else amount
+                if captured > hold["amount"]:
+                    await conn.rollback()
+                    return "EXCEEDS_HOLD"
+
+                await cur.execute(
+                    """
+                    UPDATE accounts
+                    SET balance = balance - %s, held_balance = held_balance - %s
+                    WHERE account_number = %s
+                    """,
+                    (str(captured), str(hold["amount"]), hold["account_number"]),
+                )
+                await cur.execute(
+                    "SELECT balance FROM accounts WHERE account_number = %s",
+                    (hold["account_number"],),
+                )
+                balance_after = Decimal(str((await cur.fetchone())["balance"]))
+                await cur.execute(
+                    "UPDATE holds SET status = 'captured', captured_amount = %s, resolved_at = %s WHERE hold_id = %s",
+                    (str(captured), now, hold_id),
+                )
+                await _insert_transaction(
+                    cur,
+                    user_id=user_id,
+                    account_number=hold["account_number"],
+                    transaction_type="hold_capture",
+                    amount=captured,
+                    balance_after=balance_after,
+                )
+                await conn.commit()
+                return balance_after
+
+    @staticmethod
+    async def release_hold(user_id: int, hold_id: int, now: datetime):
+        """Returns True, "NOT_FOUND" or "NOT_PENDING"."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                hold = await _lock_pending_hold(cur, user_id, hold_id, now)
+                if isinstance(hold, str):
+                    await conn.rollback()
+                    return hold
+                await cur.execute(
+                    "UPDATE accounts SET held_balance = held_balance - %s WHERE account_number = %s",
+                    (str(hold["amount"]), hold["account_number"]),
+                )
+                await cur.execute(
+                    "UPDATE holds SET status = 'released', resolved_at = %s WHERE hold_id = %s",
+                    (now, hold_id),
+                )
+                await conn.commit()
+                return True
+
+    @staticmethod
+    async def expire_holds(now: datetime, limit: int):
+        """
+        Release up to `limit` expired holds in one transaction. SKIP LOCKED keeps the sweeper off
+        holds that are being captured or released right now. Returns the expired hold rows.
+        """
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    """
+                    SELECT hold_id, user_id, account_number, amount
+                    FROM holds
+                    WHERE status = 'pending' AND expires_at <= %s
+                    ORDER BY expires_at
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    (now, limit),
+                )
+                rows = await cur.fetchall()
+                if not rows:
+                    await conn.rollback()
+                    return []
+
+                placeholders = ", ".join(["%s"] * len(rows))
+                await cur.execute(
+                    f"UPDATE holds SET status = 'expired', resolved_at = %s WHERE hold_id IN ({placeholders})",
+                    (now, *(row["hold_id"] for row in rows)),
+                )
+                released = defaultdict(Decimal)
+                for row in rows:
+                    released[row["account_number"]] += Decimal(str(row["amount"]))
+                # Sorted so two sweepers never lock the same accounts in opposite order.
+                for account_number in sorted(released):
+                    await cur.execute(
+                        "UPDATE accounts SET held_balance = held_balance - %s WHERE account_number = %s",
+                        (str(released[account_number]), account_number),
+                    )
+                await conn.commit()
+                return rows
@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+import aiomysql
+
+from app.database.database import db
+from app.repositories.user_repo_transactions import _insert_transactions
+
+
+async def _insert_pending_credit(cur, account_number: str, user_id: int, amount: Decimal, related_account: str | None):
+    await cur.execute(
+        """
+        INSERT INTO pending_credits (account_number, user_id, amount, related_account)
+        VALUES (%s, %s, %s, %s)
+        """,
+        (account_number, user_id, str(amount), related_account),
+    )
+
+
+async def _fold_pending_credits(cur, account_number: str, balance: Decimal) -> Decimal:
+    """
+    Move pending credits of a hot account into accounts.balance.
+    The caller must hold the row lock on the account; `balance` is its locked balance.
+    Each credit gets its own transfer_in ledger row so the balance_after chain stays intact.
+    Returns the balance after folding.
+    """
+    await cur.execute(
+        """
+        SELECT credit_id, user_id, amount, related_account
+        FROM pending_credits
+        WHERE account_number = %s
+        ORDER BY credit_id
+        FOR UPDATE
+        """,
+        (account_number,),
+    )
+    credits = await cur.fetchall()
+    if not credits:
+        return balance
+
+    rows = []
+    for credit in credits:
+        amount = Decimal(str(credit["amount"]))
+        balance += amount
+        rows.append(
+            {
+                "user_id": int(credit["user_id"]),
+                "transaction_type": "transfer_in",
+                "amount": amount,
+                "balance_after": balance,
+                "related_account": credit["related_account"],
+            }
+        )
+    # One multi-row insert and one chain-head update for the whole batch.
+    await _insert_transactions(cur, account_number, rows)
+
+    await cur.execute(
+        "UPDATE accounts SET balance = %s WHERE account_number = %s",
+        (str(balance), account_number),
+    )
+    await cur.execute(
+        "DELETE FROM pending_credits WHERE account_number = %s AND credit_id <= %s",
+        (account_number, credits[-1]["credit_id"]),
+    )
+    return balance
+
+
+class UserRepoHotAccountsMixin:
+    @staticmethod
+    async def set_hot_account(account_number: str, hot: bool):
+        """Flag or unflag an account as hot. Returns False if the account does not exist."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT 1 FROM accounts WHERE account_number = %s", (account_number,))
+                if not await cur.fetchone():
+                    return False
+
+                if hot:
+                    await cur.execute("INSERT IGNORE INTO hot_accounts (account_number) VALUES (%s)", (account_number,))
+                else:
+                    await cur.execute("DELETE FROM hot_accounts WHERE account_number = %s", (account_number,))
+                await conn.commit()
+                return True
+
+    @staticmethod
+    async def get_accounts_with_pending_credits(limit: int = 1000):
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "SELECT DISTINCT account_number FROM pending_credits ORDER BY account_number LIMIT %s",
+                    (limit,),
+                )
+                return [row[0] for row in await cur.fetchall()]
+
+    @staticmethod
+    async def fold_pending_credits(account_number: str):
+        """Fold pending credits of one account into its balance. Returns the new balance or None."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    "SELECT balance FROM accounts WHERE account_number = %s FOR UPDATE",
+                    (account_number,),
+                )
+                row = await cur.fetchone()
+                if not row:
+                    await conn.rollback()
+                    return None
+
+                balance = await _fold_pending_credits(cur, account_number, Decimal(str(row["balance"])))
+                await conn.commit()
+                return balance
@@ -0,0 +1,160 @@
+import aiomysql
+
+from app.database.database import db
+from app.repositories.user_repo_transactions import GENESIS_HASH, ledger_row_hash
+
+
+def _verify_chain_rows(prev_hash: str | None, rows):
+    """
+    Walk ledger rows in transaction order and recompute the hash chain. prev_hash None means
+    the account's chain has not started yet; rows before its start carry no hash.
+    Returns (last_good_row, prev_hash, unchained_rows, error) where error is None when the chain holds.
+    """
+    last_good = None
+    unchained = 0
+    for row in rows:
+        if row["row_hash"] is None:
+            if prev_hash is not None:
+                return last_good, prev_hash, unchained, f"transaction {row['transaction_id']}: hash removed"
+            unchained += 1
+        else:
+            expected = ledger_row_hash(prev_hash or GENESIS_HASH, row)
+            if expected != row["row_hash"]:
+                return last_good, prev_hash, unchained, f"transaction {row['transaction_id']}: hash mismatch"
+            prev_hash = expected
+        last_good = row
+    return last_good, prev_hash, unchained, None
+
+
+class UserRepoLedgerChainMixin:
+    @staticmethod
+    async def verify_ledger_chain_chunk(after_account_id: int, max_account_id: int, chunk_size: int, batch_size: int):
+        """
+        Verify the hash chain of up to `chunk_size` accounts with account_id in (after_account_id, max_account_id].
+        Only rows after each account's checkpoint are read, `batch_size` rows at a time. The checkpointed
+        row is re-checked, and the last row must match accounts.ledger_hash, so deleting or rewriting
+        already-verified rows is also caught. All reads share one consistent snapshot.
+        Returns a dict with last_account_id, accounts, rows, unchained_rows and the list of tampered accounts.
+        """
+        result = {"last_account_id": None, "accounts": 0, "rows": 0, "unchained_rows": 0, "tampered": []}
+
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                await cur.execute(
+                    """
+                    SELECT
+                        a.account_id,
+                        a.account_number,
+                        a.ledger_hash,
+                        c.last_transaction_id,
+                        c.last_created_at,
+                        c.last_hash
+                    FROM accounts a
+                    LEFT JOIN ledger_chain_checkpoints c ON c.account_id = a.account_id
+                    WHERE a.account_id > %s AND a.account_id <= %s
+                    ORDER BY a.account_id
+                    LIMIT %s
+                    """,
+                    (after_account_id, max_account_id, chunk_size),
+                )
+                accounts = await cur.fetchall()
+                if not accounts:
+                    await conn.rollback()
+                    return result
+
+                checkpoints = []
+                for account in accounts:
+                    last_id = int(account["last_transaction_id"] or 0)
+                    last_created_at = account["last_created_at"]
+                    prev_hash = account["last_hash"]
+                    error = None
+
+                    if last_id and prev_hash is not None:
+                        await cur.execute("SELECT row_hash FROM transactions WHERE transaction_id = %s", (last_id,))
+                        anchor = await cur.fetchone()
+                        if not anchor or anchor["row_hash"] != prev_hash:
+                            error = f"transaction {last_id}: verified row was changed or deleted"
+
+                    while error is None:
+                        if last_created_at is None:
+                            await cur.execute(
+                                """
+                                SELECT transaction_id, user_id, account_number, transaction_type, amount,
+                                       balance_after, related_account, created_at, row_hash
+                                FROM transactions
+                                WHERE account_number = %s AND transaction_id > %s
+                                ORDER BY transaction_id
+                                LIMIT %s
+                                """,
+                                (account["account_number"], last_id, batch_size),
+                            )
+                        else:
+                            await cur.execute(
+                                """
+                                SELECT transaction_id, user_id, account_number, transaction_type, amount,
+                                       balance_after, related_account, created_at, row_hash
+                                FROM transactions
+                                WHERE account_number = %s AND created_at >= %s AND transaction_id > %s
+                                ORDER BY transaction_id
+                                LIMIT %s
+                                """,
+                                (account["account_number"], last_created_at, last_id, batch_size),
+                            )
+                        rows = await cur.fetchall()
+                        if not rows:
+                            break
+
+                        result["rows"] += len(rows)
+                        last_good, prev_hash, unchained, error = _verify_chain_rows(prev_hash, rows)
+                        result["unchained_rows"] += unchained
+                        if last_good is not None:
+                            last_id = int(last_good["transaction_id"])
+                            last_created_at = last_good["created_at"]
+                        if len(rows) < batch_size:
+                            break
+
+                    if error is None and prev_hash != account["ledger_hash"]:
+                        error = "chain head does not match accounts.ledger_hash (rows removed or added)"
+
+                    if error:
+                        result["tampered"].append(
+                            {
+                                "account_id": account["account_id"],
+                                "account_number": account["account_number"],
+                                "detail": error,
+                            }
+                        )
+                    checkpoints.append(
+                        (
+                            account["account_id"],
+                            account["account_number"],
+                            last_id,
+                            last_created_at,
+                            prev_hash,
+                            "tampered" if error else "ok",
+                            error[:255] if error else None,
+                        )
+                    )
+
+                await cur.executemany(
+                    """
+                    INSERT INTO ledger_chain_checkpoints (
+                        account_id, account_number, last_transaction_id, last_created_at, last_hash, status, detail
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        account_number = VALUES(account_number),
+                        last_transaction_id = VALUES(last_transaction_id),
+                        last_created_at = VALUES(last_created_at),
+                        last_hash = VALUES(last_hash),
+                        status = VALUES(status),
+                        detail = VALUES(detail)
+                    """,
+                    checkpoints,
+                )
+                await conn.commit()
+
+                result["last_account_id"] = int(accounts[-1]["account_id"])
+                result["accounts"] = len(accounts)
+                return result
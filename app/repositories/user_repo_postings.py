@@ -0,0 +1,158 @@
+from datetime import date
+from decimal import ROUND_DOWN, Decimal
+
+import aiomysql
+
+from app.database.database import db
+from app.repositories.user_repo_transactions import (
+    _INSERT_LEDGER_SQL,
+    GENESIS_HASH,
+    _chain_ledger_values,
+    signed_amount,
+)
+
+CENT = Decimal("0.01")
+# Scale of accounts.interest_accrued.
+ACCRUAL_QUANTUM = Decimal("0.000001")
+
+
+async def _post_chunk(after_account_id: int, max_account_id: int, condition: str, params: tuple,
+                      state_columns: tuple, compute):
+    """
+    Apply one batch posting to the accounts with account_id in (after_account_id, max_account_id]
+    that match `condition`, in a single transaction: one locking read of the chunk, one multi-row
+    ledger INSERT and one UPDATE of the chunk's accounts joined to the new values.
+
+    compute(account) returns (posting, state): posting is (transaction_type, amount) or None, and
+    state holds the new values of `state_columns`, which must make `condition` false for the
+    account, so a rerun skips it.
+    """
+    async with await db.get_conn() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            # READ COMMITTED takes no gap locks, so chunks running in parallel never wait on each other.
+            await cur.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            await cur.execute(
+                f"""
+                SELECT account_id, user_id, account_number, balance, held_balance, interest_accrued,
+                       ledger_hash, NOW() AS now
+                FROM accounts
+                WHERE account_id > %s AND account_id <= %s AND {condition}
+                ORDER BY account_id
+                FOR UPDATE
+                """,
+                (after_account_id, max_account_id, *params),
+            )
+            accounts = await cur.fetchall()
+            result = {"accounts": len(accounts), "postings": 0, "amount": Decimal("0.00"), "user_ids": set()}
+            if not accounts:
+                await conn.rollback()
+                return result
+
+            ledger_values = []
+            account_values = []
+            for account in accounts:
+                posting, state = compute(account)
+                balance = Decimal(str(account["balance"]))
+                ledger_hash = account["ledger_hash"]
+                if posting is not None:
+                    transaction_type, amount = posting
+                    balance += signed_amount(transaction_type, amount)
+                    values, ledger_hash = _chain_ledger_values(
+                        ledger_hash or GENESIS_HASH,
+                        account["account_number"],
+                        [
+                            {
+                                "user_id": account["user_id"],
+                                "transaction_type": transaction_type,
+                                "amount": amount,
+                                "balance_after": balance,
+                                "related_account": None,
+                            }
+                        ],
+                        account["now"],
+                    )
+                    ledger_values.extend(values)
+                    result["postings"] += 1
+                    result["amount"] += amount
+                    result["user_ids"].add(account["user_id"])
+                account_values.extend(
+                    (account["account_id"], str(balance), ledger_hash, *(state[column] for column in state_columns))
+                )
+
+            if ledger_values:
+                await cur.executemany(_INSERT_LEDGER_SQL, ledger_values)
+            columns = ("balance", "ledger_hash", *state_columns)
+            row = "SELECT %s AS account_id, " + ", ".join(f"%s AS {column}" for column in columns)
+            await cur.execute(
+                f"""
+                UPDATE accounts a
+                JOIN ({' UNION ALL '.join([row] * len(accounts))}) v ON v.account_id = a.account_id
+                SET {', '.join(f'a.{column} = v.{column}' for column in columns)}
+                """,
+                account_values,
+            )
+            await conn.commit()
+            return result
+
+
+class UserRepoPostingsMixin:
+    @staticmethod
+    async def get_last_posting_dates():
+        """Latest interest date and fee month applied to any account (None if never)."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    "SELECT MAX(interest_posted_on) AS interest, MAX(fee_charged_for) AS fee FROM accounts"
+                )
+                return await cur.fetchone()
+
+    @staticmethod
+    async def post_interest_chunk(run_date: date, after_account_id: int, max_account_id: int, daily_rate: Decimal):
+        """
+        Accrue one day of interest (balance * daily_rate) on every positive balance in the chunk
+        that has not been accrued for `run_date` yet. Whole cents are posted as an `interest`
+        ledger row; the remainder is carried in accounts.interest_accrued.
+        """
+
+        def compute(account):
+            accrued = Decimal(str(account["interest_accrued"])) + Decimal(str(account["balance"])) * daily_rate
+            accrued = accrued.quantize(ACCRUAL_QUANTUM, rounding=ROUND_DOWN)
+            posted = accrued.quantize(CENT, rounding=ROUND_DOWN)
+            state = {"interest_accrued": str(accrued - posted), "interest_posted_on": run_date}
+            return (("interest", posted) if posted > 0 else None), state
+
+        return await _post_chunk(
+            after_account_id,
+            max_account_id,
+            "balance > 0 AND (interest_posted_on IS NULL OR interest_posted_on < %s)",
+            (run_date,),
+            ("interest_accrued", "interest_posted_on"),
+            compute,
+        )
+
+    @staticmethod
+    async def post_fee_chunk(month: date, after_account_id: int, max_account_id: int, fee: Decimal,
+                             waiver_min_balance: Decimal):
+        """
+        Charge the monthly maintenance fee for `month` (its first day) on every active account in
+        the chunk that was not charged for it yet. Accounts holding at least `waiver_min_balance`
+        are waived, and accounts whose available balance does not cover the fee are skipped for
+        the month rather than overdrawn; both are still marked as done.
+        """
+
+        def compute(account):
+            state = {"fee_charged_for": month}
+            balance = Decimal(str(account["balance"]))
+            available = balance - Decimal(str(account["held_balance"]))
+            if balance >= waiver_min_balance or available < fee:
+                return None, state
+            return ("fee", fee), state
+
+        return await _post_chunk(
+            after_account_id,
+            max_account_id,
+            "status = 'active' AND (fee_charged_for IS NULL OR fee_charged_for < %s)",
+            (month,),
+            ("fee_charged_for",),
+            compute,
+        )
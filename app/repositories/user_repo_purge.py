@@ -0,0 +1,119 @@
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal
+
+import aiomysql
+
+from app.database.database import db
+
+
+@asynccontextmanager
+async def _purge_transaction(lock_wait_timeout: int):
+    """
+    Connection and DictCursor for one purge batch. The session lock wait is shortened so a
+    batch that queues behind live traffic gives up (error 1205) instead of holding the queue;
+    it is reset before the connection goes back to the pool.
+    """
+    async with await db.get_conn() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute("SET SESSION innodb_lock_wait_timeout = %s", (lock_wait_timeout,))
+            try:
+                yield conn, cur
+            finally:
+                await conn.rollback()
+                await cur.execute("SET SESSION innodb_lock_wait_timeout = DEFAULT")
+
+
+class UserRepoPurgeMixin:
+    @staticmethod
+    async def get_customers_to_purge(deleted_before: datetime, limit: int):
+        """User ids of customers soft-deleted before `deleted_before` and not purged yet, oldest first."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    SELECT user_id FROM users
+                    WHERE purged_at IS NULL AND deleted_at <= %s
+                    ORDER BY deleted_at
+                    LIMIT %s
+                    """,
+                    (deleted_before, limit),
+                )
+                return [row[0] for row in await cur.fetchall()]
+
+    @staticmethod
+    async def release_customer_holds(user_id: int, now: datetime, limit: int, lock_wait_timeout: int):
+        """
+        Release up to `limit` pending holds of a deleted customer in one transaction.
+        Returns {"rows": released, "lock_wait_seconds": time spent acquiring the row locks}.
+        """
+        async with _purge_transaction(lock_wait_timeout) as (conn, cur):
+            started = time.perf_counter()
+            await cur.execute(
+                """
+                SELECT hold_id, account_number, amount
+                FROM holds
+                WHERE user_id = %s AND status = 'pending'
+                LIMIT %s
+                FOR UPDATE
+                """,
+                (user_id, limit),
+            )
+            rows = await cur.fetchall()
+            lock_wait = time.perf_counter() - started
+            if not rows:
+                return {"rows": 0, "lock_wait_seconds": lock_wait}
+
+            placeholders = ", ".join(["%s"] * len(rows))
+            await cur.execute(
+                f"UPDATE holds SET status = 'released', resolved_at = %s WHERE hold_id IN ({placeholders})",
+                (now, *(row["hold_id"] for row in rows)),
+            )
+            released = defaultdict(Decimal)
+            for row in rows:
+                released[row["account_number"]] += Decimal(str(row["amount"]))
+            for account_number in sorted(released):
+                await cur.execute(
+                    "UPDATE accounts SET held_balance = held_balance - %s WHERE account_number = %s",
+                    (str(released[account_number]), account_number),
+                )
+            await conn.commit()
+            return {"rows": len(rows), "lock_wait_seconds": lock_wait}
+
+    @staticmethod
+    async def delete_customer_schedules(user_id: int, limit: int, lock_wait_timeout: int):
+        """Delete up to `limit` standing orders of a deleted customer (they were cancelled at deletion)."""
+        async with _purge_transaction(lock_wait_timeout) as (conn, cur):
+            started = time.perf_counter()
+            await cur.execute("DELETE FROM scheduled_transfers WHERE user_id = %s LIMIT %s", (user_id, limit))
+            deleted = cur.rowcount
+            await conn.commit()
+            return {"rows": deleted, "lock_wait_seconds": time.perf_counter() - started}
+
+    @staticmethod
+    async def anonymize_customer(user_id: int, lock_wait_timeout: int):
+        """
+        Replace a deleted customer's personal data and mark it purged. The user row itself stays
+        so ledger rows, accounts and balances remain attributable.
+        """
+        async with _purge_transaction(lock_wait_timeout) as (conn, cur):
+            started = time.perf_counter()
+            await cur.execute(
+                """
+                UPDATE users
+                SET username = CONCAT('deleted_', user_id),
+                    email = CONCAT('deleted_', user_id, '@deleted.invalid'),
+                    password_hash = NULL,
+                    otp_code = NULL,
+                    otp_expires_at = NULL,
+                    otp_attempts = 0,
+                    purged_at = NOW()
+                WHERE user_id = %s AND deleted_at IS NOT NULL AND purged_at IS NULL
+                """,
+                (user_id,),
+            )
+            purged = cur.rowcount
+            await conn.commit()
+            return {"rows": purged, "lock_wait_seconds": time.perf_counter() - started}
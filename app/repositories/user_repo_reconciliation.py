@@ -0,0 +1,162 @@
+from decimal import Decimal
+
+import aiomysql
+
+from app.database.database import db
+from app.repositories.user_repo_transactions import signed_amount
+
+
+def _verify_ledger_rows(prev_balance: Decimal, rows):
+    """
+    Walk ledger rows in transaction order and check the balance_after chain.
+    Returns (last_good_row, error) where error is None when the chain holds.
+    """
+    last_good = None
+    for row in rows:
+        amount = Decimal(str(row["amount"]))
+        balance_after = Decimal(str(row["balance_after"]))
+        try:
+            expected = prev_balance + signed_amount(row["transaction_type"], amount)
+        except ValueError:
+            return last_good, f"transaction {row['transaction_id']}: unknown type {row['transaction_type']}"
+        if expected != balance_after:
+            return last_good, (
+                f"transaction {row['transaction_id']}: expected balance_after {expected}, found {balance_after}"
+            )
+        prev_balance = balance_after
+        last_good = row
+    return last_good, None
+
+
+class UserRepoReconciliationMixin:
+    @staticmethod
+    async def get_account_id_bounds():
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute("SELECT MIN(account_id) AS min_id, MAX(account_id) AS max_id FROM accounts")
+                return await cur.fetchone()
+
+    @staticmethod
+    async def reconcile_account_chunk(after_account_id: int, max_account_id: int, chunk_size: int, batch_size: int):
+        """
+        Verify up to `chunk_size` accounts with account_id in (after_account_id, max_account_id].
+        Only ledger rows newer than each account's checkpoint are read, `batch_size` rows at a time.
+        All reads share one consistent snapshot, so balances and ledger rows agree with each other.
+        Returns a dict with last_account_id, accounts, rows and the list of diverged accounts.
+        """
+        result = {"last_account_id": None, "accounts": 0, "rows": 0, "diverged": []}
+
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                await cur.execute(
+                    """
+                    SELECT
+                        a.account_id,
+                        a.account_number,
+                        a.balance,
+                        c.last_transaction_id,
+                        c.last_created_at,
+                        c.last_balance
+                    FROM accounts a
+                    LEFT JOIN reconciliation_checkpoints c ON c.account_id = a.account_id
+                    WHERE a.account_id > %s AND a.account_id <= %s
+                    ORDER BY a.account_id
+                    LIMIT %s
+                    """,
+                    (after_account_id, max_account_id, chunk_size),
+                )
+                accounts = await cur.fetchall()
+                if not accounts:
+                    await conn.rollback()
+                    return result
+
+                checkpoints = []
+                for account in accounts:
+                    last_id = int(account["last_transaction_id"] or 0)
+                    last_created_at = account["last_created_at"]
+                    prev_balance = Decimal(str(account["last_balance"] or "0.00"))
+                    error = None
+
+                    while True:
+                        if last_created_at is None:
+                            await cur.execute(
+                                """
+                                SELECT transaction_id, transaction_type, amount, balance_after, created_at
+                                FROM transactions
+                                WHERE account_number = %s AND transaction_id > %s
+                                ORDER BY transaction_id
+                                LIMIT %s
+                                """,
+                                (account["account_number"], last_id, batch_size),
+                            )
+                        else:
+                            await cur.execute(
+                                """
+                                SELECT transaction_id, transaction_type, amount, balance_after, created_at
+                                FROM transactions
+                                WHERE account_number = %s AND created_at >= %s AND transaction_id > %s
+                                ORDER BY transaction_id
+                                LIMIT %s
+                                """,
+                                (account["account_number"], last_created_at, last_id, batch_size),
+                            )
+                        rows = await cur.fetchall()
+                        if not rows:
+                            break
+
+                        result["rows"] += len(rows)
+                        last_good, error = _verify_ledger_rows(prev_balance, rows)
+                        if last_good is not None:
+                            last_id = int(last_good["transaction_id"])
+                            last_created_at = last_good["created_at"]
+                            prev_balance = Decimal(str(last_good["balance_after"]))
+                        if error or len(rows) < batch_size:
+                            break
+
+                    current_balance = Decimal(str(account["balance"]))
+                    if error is None and prev_balance != current_balance:
+                        error = f"account balance {current_balance} does not match ledger balance {prev_balance}"
+
+                    status = "diverged" if error else "ok"
+                    if error:
+                        result["diverged"].append(
+                            {
+                                "account_id": account["account_id"],
+                                "account_number": account["account_number"],
+                                "detail": error,
+                            }
+                        )
+                    checkpoints.append(
+                        (
+                            account["account_id"],
+                            account["account_number"],
+                            last_id,
+                            last_created_at,
+                            str(prev_balance),
+                            status,
+                            error[:255] if error else None,
+                        )
+                    )
+
+                await cur.executemany(
+                    """
+                    INSERT INTO reconciliation_checkpoints (
+                        account_id, account_number, last_transaction_id, last_created_at, last_balance, status, detail
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        account_number = VALUES(account_number),
+                        last_transaction_id = VALUES(last_transaction_id),
+                        last_created_at = VALUES(last_created_at),
+                        last_balance = VALUES(last_balance),
+                        status = VALUES(status),
+                        detail = VALUES(detail)
+                    """,
+                    checkpoints,
+                )
+                await conn.commit()
+
+                result["last_account_id"] = int(accounts[-1]["account_id"])
+                result["accounts"] = len(accounts)
+                return result
@@ -0,0 +1,164 @@
+from datetime import datetime
+from decimal import Decimal
+
+import aiomysql
+
+from app.database.database import db
+
+_SCHEDULE_COLUMNS = """
+    schedule_id, user_id, to_account_number, amount, frequency, first_run_at, end_at,
+    next_run_at, occurrence, run_count, status, attempts, failure_count, last_error, last_run_at, created_at
+"""
+
+
+class UserRepoScheduledTransfersMixin:
+    @staticmethod
+    async def create_scheduled_transfer(
+        user_id: int,
+        to_account_number: str,
+        amount: Decimal,
+        frequency: str,
+        first_run_at: datetime,
+        end_at: datetime | None,
+    ) -> int:
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    INSERT INTO scheduled_transfers (
+                        user_id, to_account_number, amount, frequency, first_run_at, end_at, next_run_at
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    (user_id, to_account_number, str(amount), frequency, first_run_at, end_at, first_run_at),
+                )
+                schedule_id = cur.lastrowid
+                await conn.commit()
+                return schedule_id
+
+    @staticmethod
+    async def get_scheduled_transfer(user_id: int, schedule_id: int):
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    f"SELECT {_SCHEDULE_COLUMNS} FROM scheduled_transfers WHERE schedule_id = %s AND user_id = %s",
+                    (schedule_id, user_id),
+                )
+                return await cur.fetchone()
+
+    @staticmethod
+    async def get_scheduled_transfers_by_user_id(user_id: int, limit: int = 50, offset: int = 0):
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    f"""
+                    SELECT {_SCHEDULE_COLUMNS} FROM scheduled_transfers
+                    WHERE user_id = %s
+                    ORDER BY created_at DESC
+                    LIMIT %s OFFSET %s
+                    """,
+                    (user_id, limit, offset),
+                )
+                return await cur.fetchall()
+
+    @staticmethod
+    async def cancel_scheduled_transfer(user_id: int, schedule_id: int) -> bool:
+        """A worker that already claimed the schedule finds it cancelled and does not run it."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    UPDATE scheduled_transfers
+                    SET status = 'cancelled', next_run_at = NULL
+                    WHERE schedule_id = %s AND user_id = %s AND status = 'active'
+                    """,
+                    (schedule_id, user_id),
+                )
+                await conn.commit()
+                return cur.rowcount > 0
+
+    @staticmethod
+    async def claim_due_scheduled_transfers(worker_id: str, now: datetime, lease_until: datetime, limit: int):
+        """
+        Lease up to `limit` due schedules to this worker. SKIP LOCKED lets any number of workers
+        claim concurrently without waiting on each other; a lease that expires (worker died) is
+        claimable again.
+        """
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    """
+                    SELECT schedule_id, user_id, to_account_number, amount, frequency,
+                           first_run_at, end_at, occurrence, attempts
+                    FROM scheduled_transfers
+                    WHERE status = 'active' AND next_run_at <= %s
+                      AND (locked_until IS NULL OR locked_until < %s)
+                    ORDER BY next_run_at
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    (now, now, limit),
+                )
+                rows = await cur.fetchall()
+                if rows:
+                    placeholders = ", ".join(["%s"] * len(rows))
+                    await cur.execute(
+                        f"""
+                        UPDATE scheduled_transfers SET locked_by = %s, locked_until = %s
+                        WHERE schedule_id IN ({placeholders})
+                        """,
+                        (worker_id, lease_until, *(row["schedule_id"] for row in rows)),
+                    )
+                await conn.commit()
+                for row in rows:
+                    row["amount"] = Decimal(str(row["amount"]))
+                return rows
+
+    @staticmethod
+    async def complete_scheduled_run(
+        schedule_id: int, worker_id: str, occurrence: int, next_run_at: datetime | None, status: str, now: datetime
+    ) -> bool:
+        """
+        Advance a leased schedule past the occurrence it just ran. Run inside the transfer's
+        transaction, so the transfer and the advance commit together. Returns False if the
+        lease was lost or the schedule was cancelled meanwhile.
+        """
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    UPDATE scheduled_transfers
+                    SET occurrence = %s, next_run_at = %s, status = %s, run_count = run_count + 1,
+                        attempts = 0, last_error = NULL, last_run_at = %s, locked_by = NULL, locked_until = NULL
+                    WHERE schedule_id = %s AND locked_by = %s AND status = 'active'
+                    """,
+                    (occurrence, next_run_at, status, now, schedule_id, worker_id),
+                )
+                await conn.commit()
+                return cur.rowcount > 0
+
+    @staticmethod
+    async def record_scheduled_failure(
+        schedule_id: int,
+        worker_id: str,
+        error: str,
+        attempts: int,
+        occurrence: int,
+        next_run_at: datetime | None,
+        status: str,
+        now: datetime,
+    ) -> bool:
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    UPDATE scheduled_transfers
+                    SET attempts = %s, failure_count = failure_count + 1, last_error = %s,
+                        occurrence = %s, next_run_at = %s, status = %s, last_run_at = %s,
+                        locked_by = NULL, locked_until = NULL
+                    WHERE schedule_id = %s AND locked_by = %s AND status = 'active'
+                    """,
+                    (attempts, error[:255], occurrence, next_run_at, status, now, schedule_id, worker_id),
+                )
+                await conn.commit()
+                return cur.rowcount > 0
@@ -0,0 +1,52 @@
+import json
+
+import aiomysql
+
+from app.database.database import db
+
+_RULE_COLUMNS = "rule_name, enabled, fail_policy, params, updated_at"
+
+
+def _decode(row):
+    if row:
+        row["enabled"] = bool(row["enabled"])
+        row["params"] = json.loads(row["params"])
+    return row
+
+
+class UserRepoScreeningMixin:
+    @staticmethod
+    async def get_screening_rules():
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(f"SELECT {_RULE_COLUMNS} FROM screening_rules ORDER BY rule_name")
+                return [_decode(row) for row in await cur.fetchall()]
+
+    @staticmethod
+    async def update_screening_rule(
+        rule_name: str, enabled: bool | None = None, fail_policy: str | None = None, params: dict | None = None
+    ):
+        """Update the given fields of one rule; returns the updated row, or None if there is no such rule."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                update_fields = []
+                values = []
+                if enabled is not None:
+                    update_fields.append("enabled = %s")
+                    values.append(enabled)
+                if fail_policy is not None:
+                    update_fields.append("fail_policy = %s")
+                    values.append(fail_policy)
+                if params is not None:
+                    update_fields.append("params = %s")
+                    values.append(json.dumps(params))
+
+                if update_fields:
+                    await cur.execute(
+                        f"UPDATE screening_rules SET {', '.join(update_fields)} WHERE rule_name = %s",
+                        (*values, rule_name),
+                    )
+                await cur.execute(f"SELECT {_RULE_COLUMNS} FROM screening_rules WHERE rule_name = %s", (rule_name,))
+                row = await cur.fetchone()
+                await conn.commit()
+                return _decode(row)
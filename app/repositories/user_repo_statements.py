@@ -0,0 +1,143 @@
+from datetime import datetime
+
+import aiomysql
+
+from app.database.database import db
+
+_STATEMENT_ROW_COLUMNS = (
+    "transaction_id, transaction_type, amount, balance_after, related_account, created_at"
+)
+
+
+class UserRepoStatementsMixin:
+    @staticmethod
+    async def get_statement_accounts(period: str, after_account_id: int, max_account_id: int, limit: int):
+        """
+        Up to `limit` accounts with account_id in (after_account_id, max_account_id] that have no
+        statement for `period` yet, in account_id order.
+        """
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    """
+                    SELECT a.account_id, a.account_number, a.user_id, a.currency, u.username
+                    FROM accounts a
+                    JOIN users u ON u.user_id = a.user_id
+                    LEFT JOIN statements s ON s.period = %s AND s.account_id = a.account_id
+                    WHERE a.account_id > %s AND a.account_id <= %s AND s.account_id IS NULL
+                    ORDER BY a.account_id
+                    LIMIT %s
+                    """,
+                    (period, after_account_id, max_account_id, limit),
+                )
+                return await cur.fetchall()
+
+    @staticmethod
+    async def get_balance_before(account_number: str, before: datetime):
+        """balance_after of the account's last ledger row created before `before`, or None."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    SELECT balance_after FROM transactions
+                    WHERE account_number = %s AND created_at < %s
+                    ORDER BY created_at DESC, transaction_id DESC
+                    LIMIT 1
+                    """,
+                    (account_number, before),
+                )
+                row = await cur.fetchone()
+                return row[0] if row else None
+
+    @staticmethod
+    async def get_statement_rows(
+        account_number: str,
+        start: datetime,
+        end: datetime,
+        after: tuple | None,
+        limit: int,
+    ):
+        """
+        Ledger rows of one account created in [start, end), in ledger order, `limit` at a time.
+        `after` is (created_at, transaction_id) of the last row of the previous batch; the scan
+        follows idx_transactions_account_created, whose entries end with the primary key.
+        """
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                if after is None:
+                    await cur.execute(
+                        f"""
+                        SELECT {_STATEMENT_ROW_COLUMNS}
+                        FROM transactions
+                        WHERE account_number = %s AND created_at >= %s AND created_at < %s
+                        ORDER BY created_at, transaction_id
+                        LIMIT %s
+                        """,
+                        (account_number, start, end, limit),
+                    )
+                else:
+                    last_created_at, last_id = after
+                    await cur.execute(
+                        f"""
+                        SELECT {_STATEMENT_ROW_COLUMNS}
+                        FROM transactions
+                        WHERE account_number = %s AND created_at >= %s AND created_at < %s
+                          AND (created_at > %s OR (created_at = %s AND transaction_id > %s))
+                        ORDER BY created_at, transaction_id
+                        LIMIT %s
+                        """,
+                        (account_number, last_created_at, end, last_created_at, last_created_at, last_id, limit),
+                    )
+                return await cur.fetchall()
+
+    @staticmethod
+    async def record_statements(period: str, statements) -> None:
+        """Mark rendered statements as done; `statements` are dicts as built by app.jobs.statements."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.executemany(
+                    """
+                    INSERT INTO statements (
+                        period, account_id, account_number, user_id, currency,
+                        opening_balance, closing_balance, transaction_count, files
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        opening_balance = VALUES(opening_balance),
+                        closing_balance = VALUES(closing_balance),
+                        transaction_count = VALUES(transaction_count),
+                        files = VALUES(files),
+                        generated_at = CURRENT_TIMESTAMP
+                    """,
+                    [
+                        (
+                            period,
+                            s["account_id"],
+                            s["account_number"],
+                            s["user_id"],
+                            s["currency"],
+                            str(s["opening_balance"]),
+                            str(s["closing_balance"]),
+                            s["transaction_count"],
+                            s["files"],
+                        )
+                        for s in statements
+                    ],
+                )
+                await conn.commit()
+
+    @staticmethod
+    async def get_statement_progress(period: str):
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    """
+                    SELECT COUNT(*) AS generated, MAX(generated_at) AS last_generated_at
+                    FROM statements WHERE period = %s
+                    """,
+                    (period,),
+                )
+                progress = await cur.fetchone()
+                await cur.execute("SELECT COUNT(*) AS accounts FROM accounts")
+                progress["accounts"] = (await cur.fetchone())["accounts"]
+                return progress
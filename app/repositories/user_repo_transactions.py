@@ -1,9 +1,102 @@
+import hashlib
 from decimal import Decimal
+from typing import List
 
 import aiomysql
 
 from app.database.database import db
 
+CREDIT_TRANSACTION_TYPES = frozenset({"deposit", "transfer_in", "interest"})
+DEBIT_TRANSACTION_TYPES = frozenset({"withdraw", "transfer_out", "hold_capture", "fee"})
+# Names from the legacy ENUM schema. Migration 0016 rewrites them; 'transfer' has no direction
+# of its own, so a row the migration has not rewritten yet cannot be signed.
+LEGACY_TRANSACTION_TYPES = {"withdrawal": "withdraw"}
+
+# prev_hash of the first chained row of an account.
+GENESIS_HASH = "0" * 64
+
+
+def signed_amount(transaction_type: str, amount: Decimal) -> Decimal:
+    """Return the ledger amount with the sign it applies to the account balance."""
+    transaction_type = LEGACY_TRANSACTION_TYPES.get(transaction_type, transaction_type)
+    if transaction_type in CREDIT_TRANSACTION_TYPES:
+        return amount
+    if transaction_type in DEBIT_TRANSACTION_TYPES:
+        return -amount
+    if transaction_type == "transfer":
+        raise ValueError("Legacy transaction type 'transfer' has no direction; apply migration 0016")
+    raise ValueError(f"Unknown transaction type: {transaction_type}")
+
+
+def ledger_row_hash(prev_hash: str, row) -> str:
+    """
+    Hash of one ledger row chained to the previous row of the same account.
+    `row` needs account_number, user_id, transaction_type, amount, balance_after, related_account
+    and created_at; the encoding is fixed, so stored hashes stay verifiable.
+    """
+    payload = "|".join(
+        (
+            prev_hash,
+            row["account_number"],
+            str(row["user_id"]),
+            row["transaction_type"],
+            f"{Decimal(str(row['amount'])):.2f}",
+            f"{Decimal(str(row['balance_after'])):.2f}",
+            row["related_account"] or "",
+            row["created_at"].strftime("%Y-%m-%d %H:%M:%S"),
+        )
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _chain_ledger_values(prev_hash: str, account_number: str, rows: List[dict], created_at):
+    """INSERT values for one account's new ledger rows, chained from prev_hash; returns (values, new_head)."""
+    values = []
+    for row in rows:
+        row = dict(row, account_number=account_number, created_at=created_at)
+        prev_hash = ledger_row_hash(prev_hash, row)
+        values.append(
+            (
+                row["user_id"],
+                account_number,
+                row["transaction_type"],
+                str(row["amount"]),
+                str(row["balance_after"]),
+                row["related_account"],
+                row["created_at"],
+                prev_hash,
+            )
+        )
+    return values, prev_hash
+
+
+_INSERT_LEDGER_SQL = """
+    INSERT INTO transactions (
+        user_id, account_number, transaction_type, amount, balance_after, related_account, created_at, row_hash
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+async def _insert_transactions(cur, account_number: str, rows: List[dict]) -> None:
+    """
+    Append ledger rows of one account and extend its hash chain (accounts.ledger_hash holds
+    the hash of the newest row). Each row is a dict with user_id, transaction_type, amount,
+    balance_after and related_account. `cur` must be a DictCursor inside the caller's
+    transaction, which already locked or updated the account row, so this lock never waits.
+    """
+    await cur.execute(
+        "SELECT ledger_hash, NOW() AS now FROM accounts WHERE account_number = %s FOR UPDATE",
+        (account_number,),
+    )
+    head = await cur.fetchone()
+    values, prev_hash = _chain_ledger_values(head["ledger_hash"] or GENESIS_HASH, account_number, rows, head["now"])
+    await cur.executemany(_INSERT_LEDGER_SQL, values)
+    await cur.execute(
+        "UPDATE accounts SET ledger_hash = %s WHERE account_number = %s",
+        (prev_hash, account_number),
+    )
+
 
 async def _insert_transaction(
     cur,
@@ -14,21 +107,18 @@ async def _insert_transaction(
     balance_after: Decimal,
     related_account: str | None = None,
 ):
-    await cur.execute(
-        """
-        INSERT INTO transactions (
-            user_id, account_number, transaction_type, amount, balance_after, related_account
-        )
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """,
-        (
-            user_id,
-            account_number,
-            transaction_type,
-            str(amount),
-            str(balance_after),
-            related_account,
-        ),
+    await _insert_transactions(
+        cur,
+        account_number,
+        [
+            {
+                "user_id": user_id,
+                "transaction_type": transaction_type,
+                "amount": amount,
+                "balance_after": balance_after,
+                "related_account": related_account,
+            }
+        ],
     )
 
 
@@ -1,6 +1,7 @@
 import aiomysql
 
 from app.database.database import db
+from app.repositories.user_repo_accounts import _PRIMARY_ACCOUNT_SQL
 
 
 class UserRepoUsersMixin:
@@ -21,6 +22,39 @@ class UserRepoUsersMixin:
                 await cur.execute("SELECT * FROM users WHERE username = %s", (username,))
                 return await cur.fetchone()
 
+    @staticmethod
+    async def get_customer_login(username: str):
+        """Credentials, token epoch and primary account status for a customer login in one query."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    """
+                    SELECT u.user_id, u.username, u.password_hash, u.role, u.auth_epoch,
+                           a.status AS account_status
+                    FROM users u
+                    LEFT JOIN accounts a ON a.account_id = {primary}
+                    WHERE u.username = %s AND u.deleted_at IS NULL
+                    """.format(primary=_PRIMARY_ACCOUNT_SQL),
+                    (username,),
+                )
+                return await cur.fetchone()
+
+    @staticmethod
+    async def get_auth_state(user_id: int):
+        """Token epoch and primary account status of a customer, or None if the customer was deleted."""
+        async with await db.get_conn() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(
+                    """
+                    SELECT u.auth_epoch, a.status AS account_status
+                    FROM users u
+                    LEFT JOIN accounts a ON a.account_id = {primary}
+                    WHERE u.user_id = %s AND u.role = 'customer' AND u.deleted_at IS NULL
+                    """.format(primary=_PRIMARY_ACCOUNT_SQL),
+                    (user_id,),
+                )
+                return await cur.fetchone()
+
     @staticmethod
     async def get_user_by_email(email: str):
         async with await db.get_conn() as conn:
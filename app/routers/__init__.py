@@ -1,2 +1,4 @@
 from .admin_router import router as admin_router
+from .health_router import router as health_router
+from .metrics_router import router as metrics_router
 from .user_router import router as user_router
@@ -1,10 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from jose import JWTError, jwt
 from app.cache.redis_client import cache_get, cache_set
 
-from app.core.security import ALGORITHM, SECRET_KEY, oauth2_scheme
-from app.models.user import AccountStatusUpdate, OTPVerify, UserCreate, UserLogin, CustomerUpdate, CashDepositRequest
+from app.core.audit import audit_log, diff
+from app.core.auth_state import publish_auth_state
+from app.core.config import get_settings
+from app.core.fx import fx_rates
+from app.core.etag import CUSTOMERS_VERSION_KEY, etag_matches, not_modified, set_etag, version_etag
+from app.core.security import oauth2_scheme
+from app.models.user import (
+    AccountStatusUpdate,
+    AuditLogEntry,
+    CashDepositRequest,
+    CashDepositResponse,
+    CustomerSummaryResponse,
+    CustomerUpdate,
+    FxRatesUpdate,
+    HoldCapture,
+    HoldCaptureResponse,
+    HotAccountUpdate,
+    OTPVerify,
+    ScreeningRuleResponse,
+    ScreeningRuleUpdate,
+    UserCreate,
+    UserLogin,
+)
 from app.services.admin_service import AdminService
+from app.services.fx_service import FxService
+from app.services.hold_service import HoldService
+from app.services.screening_service import ScreeningService
+from app.services.statement_service import StatementService
+from app.services.stats_service import StatsService
 from app.services.user_service import UserService
 from app.repositories.user_repo import UserRepository
 
@@ -17,7 +46,8 @@ def verify_admin(token: str = Depends(oauth2_scheme)):
 
     try:
         token_str = token.replace("Bearer ", "") if "Bearer " in token else token
-        payload = jwt.decode(token_str, SECRET_KEY, algorithms=[ALGORITHM])
+        settings = get_settings()
+        payload = jwt.decode(token_str, settings.secret_key, algorithms=[settings.algorithm])
 
         if payload.get("role") != "admin":
             raise HTTPException(status_code=403, detail="Admin permission required")
@@ -44,17 +74,27 @@ async def login_step_2(details: OTPVerify):
 @router.post("/customers")
 async def create_customer(details: UserCreate, admin=Depends(verify_admin)):
     # Admin creates customers (customers cannot self-register)
-    return await UserService.register_customer(details.username, details.email, details.password)
+    result = await UserService.register_customer(details.username, details.email, details.password)
+    audit_log.record(
+        admin, "create_customer", "customer", result["user_id"],
+        diff(None, {"username": details.username, "email": details.email}),
+    )
+    return result
+
 
+@router.get("/customers", response_model=List[CustomerSummaryResponse])
+async def get_customers(request: Request, response: Response, search: str = Query(None), admin=Depends(verify_admin)):
+    etag = await version_etag("customers", search or "", keys=[CUSTOMERS_VERSION_KEY])
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
 
-@router.get("/customers")
-async def get_customers(search: str = Query(None), admin=Depends(verify_admin)):
     if search:
         return await UserRepository.search_customers(search)
     return await UserRepository.get_all_customers()
 
 
-@router.get("/customers/by-account/{account_number}")
+@router.get("/customers/by-account/{account_number}", response_model=CustomerSummaryResponse)
 async def get_customer_by_account(account_number: str, admin=Depends(verify_admin)):
     customer = await UserRepository.get_customer_by_account_number(account_number)
     if not customer:
@@ -62,9 +102,13 @@ async def get_customer_by_account(account_number: str, admin=Depends(verify_admi
     return customer
 
 
-@router.post("/customers/add-cash")
+@router.post("/customers/add-cash", response_model=CashDepositResponse)
 async def add_cash_to_customer(payload: CashDepositRequest, admin=Depends(verify_admin)):
     result = await UserService.add_cash(payload.account_number, payload.amount)
+    audit_log.record(
+        admin, "add_cash", "account", payload.account_number,
+        diff({"balance": result["new_balance"] - payload.amount}, {"balance": result["new_balance"]}),
+    )
 
     return {
         "status": "success",
@@ -83,6 +127,7 @@ async def update_customer(user_id: int, details: CustomerUpdate, admin=Depends(v
         from app.core.security import get_password_hash
         password_hash = get_password_hash(details.password)
 
+    before = await UserRepository.get_customer_by_id(user_id)
     updated = await UserRepository.update_customer(
         user_id=user_id,
         username=details.username,
@@ -92,25 +137,77 @@ async def update_customer(user_id: int, details: CustomerUpdate, admin=Depends(v
 
     if not updated:
         raise HTTPException(status_code=400, detail="Customer not updated")
+    await UserService.invalidate_customer_caches(user_id)
+    if password_hash:
+        await publish_auth_state(user_id)
+
+    fields = {"username": details.username, "email": details.email}
+    changed = {field: value for field, value in fields.items() if value is not None}
+    changes = diff({field: before[field] for field in changed} if before else None, changed)
+    if password_hash:
+        # Never store hashes in the audit trail, only that the password changed.
+        changes["password"] = {"before": "[redacted]", "after": "[redacted]"}
+    audit_log.record(admin, "update_customer", "customer", user_id, changes)
     return {"status": "success", "message": "Customer updated"}
 
 
 @router.patch("/customers/{user_id}/status")
 async def update_status(user_id: int, details: AccountStatusUpdate, admin=Depends(verify_admin)):
+    before = await UserRepository.get_customer_by_id(user_id)
     updated = await UserRepository.update_account_status(user_id, details.status)
     if not updated:
         raise HTTPException(status_code=400, detail="Status not updated")
+    await UserService.invalidate_customer_caches(user_id)
+    await publish_auth_state(user_id)
+    audit_log.record(
+        admin, "update_status", "customer", user_id,
+        diff({"status": before["account_status"] if before else None}, {"status": details.status}),
+    )
     return {"status": "success", "message": f"Account status updated to {details.status}"}
 
 
 @router.delete("/customers/{user_id}")
 async def delete_customer(user_id: int, admin=Depends(verify_admin)):
+    before = await UserRepository.get_customer_by_id(user_id)
     deleted = await UserRepository.delete_customer(user_id)
     if not deleted:
         raise HTTPException(status_code=400, detail="Customer not deleted")
+    await UserService.invalidate_customer_caches(user_id)
+    await publish_auth_state(user_id)
+    snapshot = {field: before[field] for field in ("username", "email", "account_number", "balance")} if before else None
+    audit_log.record(admin, "delete_customer", "customer", user_id, diff(snapshot, None))
     return {"status": "success", "message": "Customer deleted"}
 
 
+@router.post("/customers/{user_id}/holds/{hold_id}/capture", response_model=HoldCaptureResponse)
+async def capture_hold(user_id: int, hold_id: int, payload: HoldCapture, admin=Depends(verify_admin)):
+    # Capturing moves the customer's money, so it is not a customer action; customers can only release.
+    result = await HoldService.capture_hold(user_id, hold_id, payload.amount)
+    audit_log.record(
+        admin, "capture_hold", "hold", hold_id,
+        {
+            "status": {"before": "pending", "after": "captured"},
+            "captured_amount": {"before": None, "after": result["captured_amount"]},
+        },
+    )
+    return result
+
+
+@router.patch("/accounts/{account_number}/hot")
+async def update_hot_account(account_number: str, details: HotAccountUpdate, admin=Depends(verify_admin)):
+    updated = await UserRepository.set_hot_account(account_number, details.hot)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Account not found")
+    audit_log.record(admin, "update_hot_account", "account", account_number, {"hot": {"before": None, "after": details.hot}})
+    if not details.hot:
+        # Credits queued while the account was hot must not wait for the periodic folder.
+        await UserRepository.fold_pending_credits(account_number)
+        customer = await UserRepository.get_customer_by_account_number(account_number)
+        if customer:
+            await UserService.invalidate_customer_caches(customer["user_id"])
+    return {"status": "success", "message": f"Hot-account mode {'enabled' if details.hot else 'disabled'}"}
+
+
 @router.get("/stats")
 async def stats(admin=Depends(verify_admin)):
     cache_key = "admin:stats"
@@ -122,3 +219,81 @@ async def stats(admin=Depends(verify_admin)):
     data = await UserRepository.get_statistics()
     await cache_set(cache_key, data, ttl=30)  # 30 seconds cache
     return data
+
+
+@router.get("/stats/history")
+async def stats_history(
+    start: date = Query(None, description="first day, YYYY-MM-DD (default: 90 days before end)"),
+    end: date = Query(None, description="last day, YYYY-MM-DD (default: yesterday, UTC)"),
+    max_points: int = Query(366, ge=2, le=2000),
+    admin=Depends(verify_admin),
+):
+    # Served from the daily snapshot tables written by app.jobs.daily_stats.
+    return await StatsService.get_history(start, end, max_points)
+
+
+# ==================== FX RATES ====================
+
+@router.get("/fx-rates")
+async def get_fx_rates(admin=Depends(verify_admin)):
+    # What this process converts with; other processes converge within FX_REFRESH_SECONDS.
+    return fx_rates.snapshot()
+
+
+@router.put("/fx-rates")
+async def update_fx_rates(details: FxRatesUpdate, admin=Depends(verify_admin)):
+    result = await FxService.update_rates([(r.base_currency, r.quote_currency, r.rate) for r in details.rates])
+    audit_log.record(
+        admin, "update_fx_rates", "fx_rates", "*",
+        {f"{r.base_currency}/{r.quote_currency}": {"before": None, "after": str(r.rate)} for r in details.rates},
+    )
+    return result
+
+
+# ==================== SCREENING ====================
+
+@router.get("/screening-rules", response_model=List[ScreeningRuleResponse])
+async def get_screening_rules(admin=Depends(verify_admin)):
+    return await ScreeningService.list_rules()
+
+
+@router.put("/screening-rules/{rule_name}", response_model=ScreeningRuleResponse)
+async def update_screening_rule(rule_name: str, details: ScreeningRuleUpdate, admin=Depends(verify_admin)):
+    rule = await ScreeningService.update_rule(rule_name, details.enabled, details.fail_policy, details.params)
+    audit_log.record(
+        admin, "update_screening_rule", "screening_rule", rule_name,
+        {field: {"before": None, "after": value} for field, value in details.model_dump(exclude_none=True).items()},
+    )
+    return rule
+
+
+# ==================== STATEMENTS ====================
+
+@router.post("/statements/{period}", status_code=202)
+async def generate_statements(period: str, workers: int = Query(2, ge=1, le=32), admin=Depends(verify_admin)):
+    result = await StatementService.start_generation(period, workers)
+    audit_log.record(admin, "generate_statements", "statements", period)
+    return result
+
+
+@router.get("/statements/{period}")
+async def get_statement_progress(period: str, admin=Depends(verify_admin)):
+    return await StatementService.get_progress(period)
+
+
+# ==================== AUDIT LOG ====================
+
+@router.get("/audit-log", response_model=List[AuditLogEntry])
+async def get_audit_log(
+    actor_id: int = Query(None),
+    action: str = Query(None),
+    target_type: str = Query(None),
+    target_id: str = Query(None),
+    before_id: int = Query(None, ge=1, description="audit_id of the last entry of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    admin=Depends(verify_admin),
+):
+    # Newest first. Records reach the table within AUDIT_FLUSH_SECONDS of the action.
+    if target_id is not None and target_type is None:
+        raise HTTPException(status_code=400, detail="target_id requires target_type")
+    return await UserRepository.get_audit_log(actor_id, action, target_type, target_id, before_id, limit)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.readiness import readiness
+
+router = APIRouter(prefix="/health", tags=["Monitoring"])
+
+
+@router.get("/live")
+async def live():
+    """The process is up and serving; never touches MySQL or Redis."""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def ready():
+    """200 once the schema check passed and the pools are warm, 503 before that or while MySQL is down."""
+    state = readiness.snapshot()
+    if not state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "starting", **state})
+    return {"status": "ready", **state}
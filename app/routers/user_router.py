@@ -1,57 +1,215 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
 from jose import JWTError, jwt
 
-from app.core.security import ALGORITHM, SECRET_KEY, oauth2_scheme
-from app.models.user import CashWithdrawAmountRequest, TransferRequest, UserLogin
+from app.core.auth_state import check_customer_token
+from app.core.config import get_settings
+from app.core.events import AUTH_CHANGED, event_hub
+from app.core.etag import customer_version_key, etag_matches, not_modified, set_etag, version_etag
+from app.core.security import oauth2_scheme
+from app.models.user import (
+    AccountCreate,
+    AccountResponse,
+    BalanceUpdateResponse,
+    CashWithdrawAmountRequest,
+    CustomerProfileResponse,
+    HoldCreate,
+    HoldResponse,
+    ScheduledTransferCreate,
+    ScheduledTransferResponse,
+    TransactionHistoryItem,
+    TransferRequest,
+    UserLogin,
+)
+from app.services.hold_service import HoldService
+from app.services.scheduled_transfer_service import ScheduledTransferService
 from app.services.user_service import UserService
 
 router = APIRouter(prefix="/customers", tags=["Customer"])
 
 
-def verify_customer(token: str = Depends(oauth2_scheme)):
+async def verify_customer(token: str = Depends(oauth2_scheme)):
     if not token:
         raise HTTPException(status_code=401, detail="Authorization token required")
 
     try:
         token_str = token.replace("Bearer ", "") if "Bearer " in token else token
-        payload = jwt.decode(token_str, SECRET_KEY, algorithms=[ALGORITHM])
+        settings = get_settings()
+        payload = jwt.decode(token_str, settings.secret_key, algorithms=[settings.algorithm])
 
         if payload.get("role") != "customer":
             raise HTTPException(status_code=403, detail="Customer permission required")
-
-        return payload
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+    # Suspension and revocation take effect immediately: one Redis GET per request.
+    await check_customer_token(payload)
+    return payload
+
+
+async def _send_events(websocket: WebSocket, subscriber, customer: dict) -> None:
+    while True:
+        try:
+            item = await asyncio.wait_for(subscriber.queue.get(), get_settings().events_heartbeat_seconds)
+        except asyncio.TimeoutError:
+            # Also how a silently dropped client is noticed: the send fails.
+            await websocket.send_text('{"type": "ping"}')
+            continue
+        if item is None or subscriber.overflowed:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Event buffer overflow")
+            return
+        event, text = item
+        if event["type"] == AUTH_CHANGED:
+            try:
+                await check_customer_token(customer)
+            except HTTPException as e:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+                return
+            continue
+        await websocket.send_text(text)
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    # Clients do not send anything; reading only notices the close frame.
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/events")
+async def events(websocket: WebSocket, token: str | None = Query(None)):
+    """
+    Push balance and transaction events to the customer. Browsers cannot set headers on a
+    WebSocket, so the token may also be passed as ?token=.
+    """
+    try:
+        customer = await verify_customer(token or websocket.headers.get("authorization"))
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+        return
+
+    subscriber = event_hub.subscribe(customer.get("id"))
+    if subscriber is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many event connections")
+        return
+    try:
+        await websocket.accept()
+        sender = asyncio.create_task(_send_events(websocket, subscriber, customer))
+        receiver = asyncio.create_task(_wait_for_disconnect(websocket))
+        done, pending = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        error = next((task.exception() for task in done if task.exception()), None)
+        # Sending to a client that just went away raises; that is a normal end of the stream.
+        if error is not None and not isinstance(error, (WebSocketDisconnect, RuntimeError, OSError)):
+            raise error
+    finally:
+        event_hub.unsubscribe(subscriber)
+
 
 @router.post("/login")
 async def login(details: UserLogin):
     return await UserService.login_customer(details.username, details.password)
 
 
-@router.get("/profile")
-async def profile(customer=Depends(verify_customer)):
+@router.get("/profile", response_model=CustomerProfileResponse)
+async def profile(request: Request, response: Response, customer=Depends(verify_customer)):
     user_id = customer.get("id")
+    etag = await version_etag("profile", user_id, keys=[customer_version_key(user_id)])
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return await UserService.get_customer_profile(user_id)
 
 
-@router.post("/withdraw")
+@router.post("/withdraw", response_model=BalanceUpdateResponse)
 async def withdraw(payload: CashWithdrawAmountRequest, customer=Depends(verify_customer)):
     user_id = customer.get("id")
-    return await UserService.withdraw_cash_by_user_id(user_id, payload.amount)
+    return await UserService.withdraw_cash_by_user_id(user_id, payload.amount, payload.account_number)
 
 
-@router.post("/transfer")
+@router.post("/transfer", response_model=BalanceUpdateResponse)
 async def transfer(payload: TransferRequest, customer=Depends(verify_customer)):
     user_id = customer.get("id")
-    return await UserService.transfer_to_account(user_id, payload.to_account_number, payload.amount)
+    return await UserService.transfer_to_account(
+        user_id, payload.to_account_number, payload.amount, payload.from_account_number
+    )
 
 
-@router.get("/transactions")
+@router.get("/accounts", response_model=List[AccountResponse])
+async def accounts(customer=Depends(verify_customer)):
+    user_id = customer.get("id")
+    return await UserService.get_accounts(user_id)
+
+
+@router.post("/accounts")
+async def open_account(payload: AccountCreate, customer=Depends(verify_customer)):
+    user_id = customer.get("id")
+    return await UserService.open_account(user_id, payload.currency)
+
+
+@router.get("/transactions", response_model=List[TransactionHistoryItem])
 async def transactions(
+    request: Request,
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     customer=Depends(verify_customer),
 ):
     user_id = customer.get("id")
+    # Every ledger write for the customer bumps its version counter after the write commits.
+    etag = await version_etag("history", user_id, limit, offset, keys=[customer_version_key(user_id)])
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return await UserService.get_transaction_history(user_id, limit=limit, offset=offset)
+
+
+@router.post("/scheduled-transfers", response_model=ScheduledTransferResponse)
+async def create_scheduled_transfer(payload: ScheduledTransferCreate, customer=Depends(verify_customer)):
+    user_id = customer.get("id")
+    return await ScheduledTransferService.create_schedule(
+        user_id, payload.to_account_number, payload.amount, payload.frequency, payload.first_run_at, payload.end_at
+    )
+
+
+@router.get("/scheduled-transfers", response_model=List[ScheduledTransferResponse])
+async def scheduled_transfers(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    customer=Depends(verify_customer),
+):
+    user_id = customer.get("id")
+    return await ScheduledTransferService.list_schedules(user_id, limit=limit, offset=offset)
+
+
+@router.delete("/scheduled-transfers/{schedule_id}")
+async def cancel_scheduled_transfer(schedule_id: int, customer=Depends(verify_customer)):
+    user_id = customer.get("id")
+    return await ScheduledTransferService.cancel_schedule(user_id, schedule_id)
+
+
+@router.post("/holds", response_model=HoldResponse)
+async def create_hold(payload: HoldCreate, customer=Depends(verify_customer)):
+    user_id = customer.get("id")
+    return await HoldService.create_hold(
+        user_id, payload.amount, payload.expires_in_seconds, payload.reference, payload.account_number
+    )
+
+
+@router.get("/holds", response_model=List[HoldResponse])
+async def holds(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    customer=Depends(verify_customer),
+):
+    user_id = customer.get("id")
+    return await HoldService.list_holds(user_id, limit=limit, offset=offset)
+
+
+@router.post("/holds/{hold_id}/release")
+async def release_hold(hold_id: int, customer=Depends(verify_customer)):
+    user_id = customer.get("id")
+    return await HoldService.release_hold(user_id, hold_id)
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from decimal import Decimal
+from typing import List, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import get_settings
+from app.core.fx import fx_rates
+from app.repositories.user_repo import UserRepository
+
+logger = logging.getLogger("app.fx")
+
+
+class FxService:
+    @staticmethod
+    async def refresh() -> int:
+        """Reload the in-memory rates from the fx_rates table. Returns the number of pairs."""
+        rows = await UserRepository.get_fx_rates()
+        fx_rates.replace(rows)
+        return len(rows)
+
+    @staticmethod
+    async def refresh_loop() -> None:
+        """Keep this process's copy fresh; a failed refresh keeps serving the previous rates."""
+        while True:
+            await asyncio.sleep(get_settings().fx_refresh_seconds)
+            try:
+                await FxService.refresh()
+            except Exception as e:
+                logger.warning("FX rate refresh failed: %s", e)
+
+    @staticmethod
+    async def update_rates(rates: List[Tuple[str, str, Decimal]]):
+        for base, quote, rate in rates:
+            if base == quote:
+                raise HTTPException(status_code=400, detail=f"Rate {base}/{quote} converts a currency to itself")
+            if rate <= 0:
+                raise HTTPException(status_code=400, detail=f"Rate {base}/{quote} must be greater than 0")
+
+        await UserRepository.upsert_fx_rates(rates)
+        # Other processes pick the new rates up within FX_REFRESH_SECONDS.
+        await FxService.refresh()
+        return fx_rates.snapshot()
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from fastapi import HTTPException
+
+from app.cache.redis_client import invalidation_scope
+from app.core.clock import utc_now
+from app.core.config import get_settings
+from app.database.database import db
+from app.repositories.user_repo import UserRepository
+from app.services.user_service import UserService
+
+
+def _raise_for_hold_result(result) -> None:
+    if result == "NOT_FOUND":
+        raise HTTPException(status_code=404, detail="Hold not found")
+    if result == "NOT_PENDING":
+        raise HTTPException(status_code=409, detail="Hold is no longer pending")
+    if result == "EXCEEDS_HOLD":
+        raise HTTPException(status_code=400, detail="Capture amount exceeds the held amount")
+
+
+class HoldService:
+    @staticmethod
+    async def create_hold(
+        user_id: int,
+        amount: Decimal,
+        expires_in_seconds: int | None,
+        reference: str | None,
+        account_number: str | None = None,
+    ):
+        if amount <= 0:
+            raise HTTPException(status_code=400, detail="Amount must be greater than 0")
+        settings = get_settings()
+        ttl = expires_in_seconds or settings.hold_default_ttl_seconds
+        if ttl > settings.hold_max_ttl_seconds:
+            raise HTTPException(
+                status_code=400, detail=f"Holds expire after at most {settings.hold_max_ttl_seconds} seconds"
+            )
+
+        result = await UserRepository.create_hold(
+            user_id, amount, utc_now() + timedelta(seconds=ttl), reference, account_number
+        )
+
+        if result == "NOT_FOUND":
+            raise HTTPException(status_code=404, detail="Account not found")
+
+        if result == "SUSPENDED":
+            raise HTTPException(status_code=403, detail="Account is suspended")
+
+        if result == "INSUFFICIENT":
+            raise HTTPException(status_code=400, detail="Insufficient available funds")
+
+        await UserService.invalidate_customer_caches(user_id)
+        return await UserRepository.get_hold(user_id, result)
+
+    @staticmethod
+    async def list_holds(user_id: int, limit: int = 50, offset: int = 0):
+        return await UserRepository.get_holds_by_user_id(user_id, limit=limit, offset=offset)
+
+    @staticmethod
+    async def capture_hold(user_id: int, hold_id: int, amount: Decimal | None):
+        """Returns the new balance and the amount captured (the full hold when amount is None)."""
+        async with invalidation_scope(), db.unit_of_work():
+            result = await UserRepository.capture_hold(user_id, hold_id, amount, utc_now())
+            _raise_for_hold_result(result)
+            hold = await UserRepository.get_hold(user_id, hold_id)
+            await UserService.invalidate_customer_caches(user_id)
+            await UserService._publish_transaction(
+                user_id, "hold_capture", hold["account_number"], amount=hold["captured_amount"], balance=result
+            )
+        return {"status": "success", "new_balance": result, "captured_amount": hold["captured_amount"]}
+
+    @staticmethod
+    async def release_hold(user_id: int, hold_id: int):
+        result = await UserRepository.release_hold(user_id, hold_id, utc_now())
+        _raise_for_hold_result(result)
+        await UserService.invalidate_customer_caches(user_id)
+        return {"status": "success", "message": "Hold released"}
@@ -0,0 +1,177 @@
+import calendar
+import logging
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi import HTTPException
+
+from app.cache.redis_client import invalidation_scope
+from app.core.clock import utc_now
+from app.core.config import get_settings
+from app.database.database import db
+from app.repositories.user_repo import UserRepository
+from app.services.user_service import UserService
+
+logger = logging.getLogger("app.scheduled_transfers")
+
+FREQUENCIES = ("once", "daily", "weekly", "monthly")
+
+# Outcomes of execute()
+EXECUTED = "executed"
+FAILED = "failed"
+LEASE_LOST = "lease_lost"
+
+
+class _LeaseLost(Exception):
+    """Another worker took the schedule over after this one's lease expired."""
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    # Rent on the 31st is paid on the last day of shorter months, and on the 31st again after.
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def _utc_naive(value: datetime | None) -> datetime | None:
+    # Schedule times are stored as naive UTC, like the rest of the schema.
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def occurrence_at(first_run_at: datetime, frequency: str, occurrence: int) -> datetime | None:
+    """Time of the n-th occurrence (0-based), always derived from the first run so days never drift."""
+    if occurrence == 0:
+        return first_run_at
+    if frequency == "daily":
+        return first_run_at + timedelta(days=occurrence)
+    if frequency == "weekly":
+        return first_run_at + timedelta(weeks=occurrence)
+    if frequency == "monthly":
+        return _add_months(first_run_at, occurrence)
+    return None
+
+
+def next_occurrence(schedule: dict, now: datetime) -> tuple[int, datetime | None, str]:
+    """
+    (occurrence, next_run_at, status) after the current occurrence is done. Occurrences missed
+    while no worker ran are skipped rather than paid in a burst.
+    """
+    occurrence = schedule["occurrence"] + 1
+    run_at = occurrence_at(schedule["first_run_at"], schedule["frequency"], occurrence)
+    while run_at is not None and run_at <= now:
+        occurrence += 1
+        run_at = occurrence_at(schedule["first_run_at"], schedule["frequency"], occurrence)
+    if run_at is None or (schedule["end_at"] and run_at > schedule["end_at"]):
+        return occurrence, None, "completed"
+    return occurrence, run_at, "active"
+
+
+class ScheduledTransferService:
+    @staticmethod
+    async def create_schedule(
+        user_id: int,
+        to_account_number: str,
+        amount: Decimal,
+        frequency: str,
+        first_run_at: datetime | None,
+        end_at: datetime | None,
+    ):
+        if amount <= 0:
+            raise HTTPException(status_code=400, detail="Amount must be greater than 0")
+        if frequency not in FREQUENCIES:
+            raise HTTPException(status_code=400, detail=f"Frequency must be one of: {', '.join(FREQUENCIES)}")
+
+        now = utc_now()
+        first_run_at, end_at = _utc_naive(first_run_at) or now, _utc_naive(end_at)
+        if first_run_at < now - timedelta(minutes=1):
+            raise HTTPException(status_code=400, detail="First run must not be in the past")
+        if end_at and end_at < first_run_at:
+            raise HTTPException(status_code=400, detail="End date must be after the first run")
+
+        async with db.unit_of_work():
+            sender = await UserRepository.get_customer_profile_by_user_id(user_id)
+            recipient = await UserRepository.get_customer_by_account_number(to_account_number)
+            if not sender or not sender.get("account_number"):
+                raise HTTPException(status_code=404, detail="Account not found")
+            if not recipient:
+                raise HTTPException(status_code=404, detail="Recipient account not found")
+            if recipient["account_number"] == sender["account_number"]:
+                raise HTTPException(status_code=400, detail="Cannot transfer to the same account")
+
+            schedule_id = await UserRepository.create_scheduled_transfer(
+                user_id, to_account_number, amount, frequency, first_run_at, end_at
+            )
+            return await UserRepository.get_scheduled_transfer(user_id, schedule_id)
+
+    @staticmethod
+    async def list_schedules(user_id: int, limit: int = 50, offset: int = 0):
+        return await UserRepository.get_scheduled_transfers_by_user_id(user_id, limit=limit, offset=offset)
+
+    @staticmethod
+    async def cancel_schedule(user_id: int, schedule_id: int):
+        if not await UserRepository.cancel_scheduled_transfer(user_id, schedule_id):
+            raise HTTPException(status_code=404, detail="Active scheduled transfer not found")
+        return {"status": "success", "message": "Scheduled transfer cancelled"}
+
+    @staticmethod
+    async def claim_due(worker_id: str, limit: int):
+        now = utc_now()
+        lease_until = now + timedelta(seconds=get_settings().schedule_lease_seconds)
+        return await UserRepository.claim_due_scheduled_transfers(worker_id, now, lease_until, limit)
+
+    @staticmethod
+    async def execute(schedule: dict, worker_id: str) -> str:
+        """
+        Run one claimed schedule through the regular transfer path. The transfer and the schedule
+        advance share one transaction, so an occurrence is paid at most once even if the worker
+        dies right after the commit. Screening happens before that transaction opens and its
+        side effects apply only after it committed.
+        """
+        now = utc_now()
+        occurrence, next_run_at, status = next_occurrence(schedule, now)
+        user_id, to_account_number, amount = schedule["user_id"], schedule["to_account_number"], schedule["amount"]
+        try:
+            async with UserService.screened_transfer(user_id, to_account_number, amount) as from_account_number:
+                async with invalidation_scope(), db.unit_of_work(transaction=True):
+                    if not await UserRepository.complete_scheduled_run(
+                        schedule["schedule_id"], worker_id, occurrence, next_run_at, status, now
+                    ):
+                        # Raised, not returned, so screening gives its reservations back.
+                        raise _LeaseLost()
+                    await UserService.execute_transfer(user_id, to_account_number, amount, from_account_number)
+            return EXECUTED
+        except _LeaseLost:
+            return LEASE_LOST
+        except HTTPException as e:
+            error = str(e.detail)
+        except Exception as e:
+            logger.exception("Scheduled transfer %s failed", schedule["schedule_id"])
+            error = f"{type(e).__name__}: {e}"
+
+        await ScheduledTransferService._record_failure(schedule, worker_id, error, now)
+        return FAILED
+
+    @staticmethod
+    async def _record_failure(schedule: dict, worker_id: str, error: str, now: datetime) -> None:
+        settings = get_settings()
+        attempts = schedule["attempts"] + 1
+        if attempts < settings.schedule_max_attempts:
+            # Retry the same occurrence with exponential backoff.
+            retry_at = now + timedelta(seconds=settings.schedule_retry_base_seconds * 2 ** (attempts - 1))
+            occurrence, next_run_at, status = schedule["occurrence"], retry_at, "active"
+        else:
+            # Give up on this occurrence; a recurring schedule carries on with the next one.
+            attempts = 0
+            occurrence, next_run_at, status = next_occurrence(schedule, now)
+            if schedule["frequency"] == "once":
+                status = "failed"
+        try:
+            await UserRepository.record_scheduled_failure(
+                schedule["schedule_id"], worker_id, error, attempts, occurrence, next_run_at, status, now
+            )
+        except Exception:
+            # The lease expires and another worker retries the occurrence.
+            logger.exception("Could not record failure of scheduled transfer %s", schedule["schedule_id"])
@@ -0,0 +1,347 @@
+"""
+Pre-commit screening of withdrawals and transfers (limit and velocity rules).
+
+Every enabled rule runs concurrently against Redis counters, each within
+SCREENING_RULE_TIMEOUT_MS, so no ledger rows are read. A rule that errors or runs out of
+time passes or declines according to its own fail_policy. Rule settings live in the
+screening_rules table; every process reloads them every SCREENING_REFRESH_SECONDS.
+
+Rules can reserve a counter, for example the day's amount. The reservation is released
+when another rule declines the operation or the operation itself fails.
+
+Adding a rule: subclass Rule, call register_rule(), and insert its row in a migration.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+
+from app.cache.redis_client import redis_pipeline
+from app.core.clock import utc_now
+from app.core.config import get_settings
+from app.core.fx import DEFAULT_CURRENCY, fx_rates
+from app.core.metrics import registry
+from app.core.rate_limit import FAIL_CLOSED, FAIL_OPEN
+from app.repositories.user_repo import UserRepository
+
+logger = logging.getLogger("app.screening")
+
+WITHDRAW = "withdraw"
+TRANSFER = "transfer"
+
+_DAY_SECONDS = 24 * 3600
+
+SCREENING_RULE_SECONDS = registry.histogram(
+    "screening_rule_seconds",
+    "Time spent evaluating one screening rule",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+SCREENING_DECISIONS = registry.counter(
+    "screening_decisions_total", "Screening rule outcomes (pass, decline, error_open, error_closed)"
+)
+
+
+class ScreeningError(Exception):
+    """A rule cannot reach a verdict; its fail_policy decides."""
+
+
+def _cents(amount: Decimal) -> int:
+    return int(amount.scaleb(2).to_integral_value())
+
+
+class ScreeningRequest:
+    __slots__ = ("operation", "user_id", "account_number", "currency", "amount", "payee", "day", "reservations")
+
+    def __init__(self, operation: str, user_id: int, account: dict, amount: Decimal, payee: str | None = None):
+        self.operation = operation
+        self.user_id = user_id
+        self.account_number = account["account_number"]
+        self.currency = account["currency"]
+        self.amount = amount
+        self.payee = payee
+        self.day = utc_now().strftime("%Y%m%d")
+        # rule name -> what to give back on abort
+        self.reservations: Dict[str, object] = {}
+
+    def amount_in_default_currency(self) -> Decimal:
+        converted = fx_rates.convert(self.amount, self.currency, DEFAULT_CURRENCY)
+        if converted is None:
+            raise ScreeningError(f"no FX rate for {self.currency}/{DEFAULT_CURRENCY}")
+        return converted
+
+
+class Rule(ABC):
+    name = ""
+    operations = (WITHDRAW, TRANSFER)
+
+    def parse(self, params: dict) -> dict:
+        """Validate stored params; raises ValueError, KeyError or ArithmeticError when they are invalid."""
+        return params
+
+    @abstractmethod
+    async def evaluate(self, request: ScreeningRequest, params: dict) -> Optional[str]:
+        """Return a decline reason, or None to pass."""
+
+    async def commit(self, request: ScreeningRequest, params: dict) -> None:
+        pass
+
+    async def abort(self, request: ScreeningRequest, params: dict) -> None:
+        pass
+
+
+class DailyLimitRule(Rule):
+    """Total withdrawn and transferred out of one account per UTC day."""
+
+    name = "daily_limit"
+
+    def parse(self, params: dict) -> dict:
+        limit = Decimal(str(params["limit"]))
+        if limit <= 0:
+            raise ValueError("limit must be greater than 0")
+        return {"limit": limit}
+
+    def _key(self, request: ScreeningRequest) -> str:
+        return f"scr:daily:{request.account_number}:{request.day}"
+
+    async def evaluate(self, request, params):
+        key, cents = self._key(request), _cents(request.amount_in_default_currency())
+
+        def build(pipe):
+            pipe.incrby(key, cents)
+            pipe.expire(key, 2 * _DAY_SECONDS)
+
+        # Reserve first and check after, so concurrent requests cannot all slip under the limit.
+        total, _ = await redis_pipeline(build)
+        if total > _cents(params["limit"]):
+            await redis_pipeline(lambda pipe: pipe.decrby(key, cents))
+            return "daily limit exceeded"
+        request.reservations[self.name] = cents
+        return None
+
+    async def abort(self, request, params):
+        cents = request.reservations.pop(self.name, None)
+        if cents:
+            await redis_pipeline(lambda pipe: pipe.decrby(self._key(request), cents))
+
+
+class NewPayeeRule(Rule):
+    """Caps the amount sent to an account this account never paid before, and how many new payees a day."""
+
+    name = "new_payee"
+    operations = (TRANSFER,)
+
+    def parse(self, params: dict) -> dict:
+        parsed = {"max_amount": Decimal(str(params["max_amount"])), "max_per_day": int(params["max_per_day"])}
+        if parsed["max_amount"] < 0 or parsed["max_per_day"] < 0:
+            raise ValueError("max_amount and max_per_day must be >= 0")
+        return parsed
+
+    def _count_key(self, request: ScreeningRequest) -> str:
+        return f"scr:new_payees:{request.account_number}:{request.day}"
+
+    async def evaluate(self, request, params):
+        known_key = f"scr:payees:{request.account_number}"
+        (known,) = await redis_pipeline(lambda pipe: pipe.sismember(known_key, request.payee))
+        if known:
+            return None
+        if request.amount_in_default_currency() > params["max_amount"]:
+            return "amount exceeds the limit for a new payee"
+
+        count_key = self._count_key(request)
+
+        def build(pipe):
+            pipe.incr(count_key)
+            pipe.expire(count_key, 2 * _DAY_SECONDS)
+
+        count, _ = await redis_pipeline(build)
+        if count > params["max_per_day"]:
+            await redis_pipeline(lambda pipe: pipe.decr(count_key))
+            return "too many new payees today"
+        request.reservations[self.name] = True
+        return None
+
+    async def commit(self, request, params):
+        known_key = f"scr:payees:{request.account_number}"
+
+        def build(pipe):
+            pipe.sadd(known_key, request.payee)
+            pipe.expire(known_key, get_settings().screening_payee_memory_days * _DAY_SECONDS)
+
+        await redis_pipeline(build)
+
+    async def abort(self, request, params):
+        if request.reservations.pop(self.name, None):
+            await redis_pipeline(lambda pipe: pipe.decr(self._count_key(request)))
+
+
+class BurstRule(Rule):
+    """At most `count` withdrawals and transfers per account in any `seconds` long sliding window."""
+
+    name = "burst"
+
+    def parse(self, params: dict) -> dict:
+        parsed = {"count": int(params["count"]), "seconds": int(params["seconds"])}
+        if parsed["count"] < 1 or parsed["seconds"] < 1:
+            raise ValueError("count and seconds must be >= 1")
+        return parsed
+
+    async def evaluate(self, request, params):
+        key = f"scr:burst:{request.account_number}"
+        now = time.time()
+
+        def build(pipe):
+            pipe.zremrangebyscore(key, 0, now - params["seconds"])
+            pipe.zadd(key, {f"{now:.6f}:{uuid.uuid4().hex[:8]}": now})
+            pipe.zcard(key)
+            pipe.expire(key, params["seconds"])
+
+        # Declined attempts stay in the window: hammering the endpoint does not reset it.
+        _, _, count, _ = await redis_pipeline(build)
+        if count > params["count"]:
+            return f"more than {params['count']} operations in {params['seconds']} seconds"
+        return None
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def register_rule(rule: Rule) -> None:
+    RULES[rule.name] = rule
+
+
+for _rule in (DailyLimitRule(), NewPayeeRule(), BurstRule()):
+    register_rule(_rule)
+
+
+class ScreeningConfig:
+    """This process's copy of the enabled rules: name -> {"fail_policy", "params"} (params parsed)."""
+
+    def __init__(self):
+        self.rules: Dict[str, dict] = {}
+        self.loaded_at: Optional[float] = None
+
+    def replace(self, rows) -> None:
+        rules = {}
+        for row in rows:
+            rule = RULES.get(row["rule_name"])
+            if rule is None or not row["enabled"]:
+                continue
+            try:
+                rules[rule.name] = {"fail_policy": row["fail_policy"], "params": rule.parse(row["params"])}
+            except (ValueError, KeyError, TypeError, ArithmeticError) as e:
+                logger.warning("Screening rule %s has invalid params and is skipped: %s", rule.name, e)
+        self.rules = rules
+        self.loaded_at = time.time()
+
+
+screening_config = ScreeningConfig()
+
+
+async def _evaluate(rule: Rule, config: dict, request: ScreeningRequest) -> Optional[str]:
+    started = time.perf_counter()
+    outcome = "pass"
+    try:
+        timeout = get_settings().screening_rule_timeout_ms / 1000
+        reason = await asyncio.wait_for(rule.evaluate(request, config["params"]), timeout)
+        if reason:
+            outcome = "decline"
+        return reason
+    except Exception as e:
+        # A timed-out rule may have reserved without recording it; that only over-counts.
+        if config["fail_policy"] == FAIL_CLOSED:
+            outcome = "error_closed"
+            logger.warning("Screening rule %s failed, declining: %r", rule.name, e)
+            raise HTTPException(status_code=503, detail="Service temporarily unavailable. Try again later.")
+        outcome = "error_open"
+        logger.warning("Screening rule %s failed, passing: %r", rule.name, e)
+        return None
+    finally:
+        SCREENING_RULE_SECONDS.observe(time.perf_counter() - started, rule=rule.name)
+        SCREENING_DECISIONS.inc(rule=rule.name, outcome=outcome)
+
+
+async def _settle(method: str, request: ScreeningRequest, active) -> None:
+    """Run commit() or abort() of every rule; failures are logged, never raised."""
+    results = await asyncio.gather(
+        *(getattr(rule, method)(request, config["params"]) for rule, config in active), return_exceptions=True
+    )
+    for (rule, _), result in zip(active, results):
+        if isinstance(result, Exception):
+            logger.warning("Screening rule %s %s failed: %r", rule.name, method, result)
+
+
+class ScreeningService:
+    @staticmethod
+    async def refresh() -> int:
+        screening_config.replace(await UserRepository.get_screening_rules())
+        return len(screening_config.rules)
+
+    @staticmethod
+    async def refresh_loop() -> None:
+        """Keep this process's rules fresh; a failed refresh keeps the previous ones."""
+        while True:
+            await asyncio.sleep(get_settings().screening_refresh_seconds)
+            try:
+                await ScreeningService.refresh()
+            except Exception as e:
+                logger.warning("Screening rule refresh failed: %s", e)
+
+    @staticmethod
+    async def list_rules():
+        return await UserRepository.get_screening_rules()
+
+    @staticmethod
+    async def update_rule(rule_name: str, enabled: bool | None, fail_policy: str | None, params: dict | None):
+        rule = RULES.get(rule_name)
+        if rule is None:
+            raise HTTPException(status_code=404, detail="Screening rule not found")
+        if fail_policy is not None and fail_policy not in (FAIL_OPEN, FAIL_CLOSED):
+            raise HTTPException(status_code=400, detail="fail_policy must be 'open' or 'closed'")
+        if params is not None:
+            try:
+                rule.parse(params)
+            except (ValueError, KeyError, TypeError, ArithmeticError) as e:
+                raise HTTPException(status_code=400, detail=f"Invalid params for {rule_name}: {e}")
+
+        row = await UserRepository.update_screening_rule(rule_name, enabled, fail_policy, params)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Screening rule not found")
+        # Other processes pick the change up within SCREENING_REFRESH_SECONDS.
+        await ScreeningService.refresh()
+        return row
+
+    @staticmethod
+    @asynccontextmanager
+    async def screened(operation: str, user_id: int, account: dict, amount: Decimal, payee: str | None = None):
+        """
+        Screen the operation before the block runs it. Raises 403 when a rule declines. Reservations
+        are released if the block raises and committed otherwise.
+        """
+        request = ScreeningRequest(operation, user_id, account, amount, payee)
+        active = [
+            (RULES[name], config)
+            for name, config in screening_config.rules.items()
+            if operation in RULES[name].operations
+        ]
+        results = await asyncio.gather(*(_evaluate(rule, config, request) for rule, config in active), return_exceptions=True)
+
+        failure = next((r for r in results if isinstance(r, BaseException)), None)
+        reason = next((r for r in results if isinstance(r, str)), None)
+        if failure is not None or reason is not None:
+            await _settle("abort", request, active)
+            if failure is not None:
+                raise failure
+            raise HTTPException(status_code=403, detail=f"Transaction declined: {reason}")
+
+        try:
+            yield
+        except BaseException:
+            await _settle("abort", request, active)
+            raise
+        await _settle("commit", request, active)
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import sys
+from typing import Dict
+
+from fastapi import HTTPException
+
+from app.core.clock import utc_now
+from app.jobs.statements import period_bounds
+from app.repositories.user_repo import UserRepository
+
+logger = logging.getLogger("app.statements")
+
+# Generator processes started by this API worker, by period.
+_runs: Dict[str, asyncio.subprocess.Process] = {}
+
+
+def _validate_period(period: str) -> None:
+    try:
+        _, end = period_bounds(period)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Period must be YYYY-MM")
+    if end > utc_now():
+        raise HTTPException(status_code=400, detail="Statements are generated only for months that have ended")
+
+
+def _is_running(period: str) -> bool:
+    process = _runs.get(period)
+    return process is not None and process.returncode is None
+
+
+class StatementService:
+    @staticmethod
+    async def start_generation(period: str, workers: int):
+        """
+        Start `python -m app.jobs.statements` for the period in a child process, so the
+        generator's process pool and CPU use stay out of the API worker. Progress is in
+        `statements`, so a run started again after a failure only does what is left.
+        """
+        _validate_period(period)
+        if _is_running(period):
+            raise HTTPException(status_code=409, detail=f"Statements for {period} are already being generated")
+
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "app.jobs.statements", "--period", period, "--workers", str(workers)
+        )
+        _runs[period] = process
+        logger.info("statement generation for %s started (pid %s)", period, process.pid)
+        return {"status": "started", "period": period, "pid": process.pid}
+
+    @staticmethod
+    async def get_progress(period: str):
+        _validate_period(period)
+        progress = await UserRepository.get_statement_progress(period)
+        process = _runs.get(period)
+        return {
+            "period": period,
+            "generated": progress["generated"],
+            "accounts": progress["accounts"],
+            "last_generated_at": progress["last_generated_at"],
+            "running": _is_running(period),
+            "exit_code": process.returncode if process is not None else None,
+        }
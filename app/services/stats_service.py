@@ -0,0 +1,63 @@
+import math
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi import HTTPException
+
+from app.cache.redis_client import cache_get, cache_set
+from app.core.clock import utc_now
+from app.core.fx import DEFAULT_CURRENCY, fx_rates
+from app.repositories.user_repo import UserRepository
+
+# Snapshots only change when app.jobs.daily_stats writes a day.
+HISTORY_CACHE_TTL_SECONDS = 300
+
+
+def _point(bucket: list) -> dict:
+    """One chart point: levels as of the last day of the bucket, flows summed over it."""
+    last = bucket[-1]
+    # Balances are in DEFAULT_CURRENCY at today's rates; currencies without a rate are left out.
+    converted = (fx_rates.convert(total, currency, DEFAULT_CURRENCY) for currency, total in last["balances"].items())
+    return {
+        "day": last["day"].isoformat(),
+        "days": len(bucket),
+        "new_customers": sum(row["new_customers"] for row in bucket),
+        "deleted_customers": sum(row["deleted_customers"] for row in bucket),
+        "total_customers": last["total_customers"],
+        "active_accounts": last["active_accounts"],
+        "total_balance": float(sum((amount for amount in converted if amount is not None), Decimal("0.00"))),
+    }
+
+
+class StatsService:
+    @staticmethod
+    async def get_history(start: date | None, end: date | None, max_points: int):
+        """
+        Daily snapshots in [start, end] (default: the last 90 days), downsampled to at most
+        max_points points of ceil(days / max_points) days each. A range is one primary-key range
+        read of at most one row per day, so even years of history stay cheap.
+        """
+        end = end or utc_now().date() - timedelta(days=1)
+        start = start or end - timedelta(days=89)
+        if start > end:
+            raise HTTPException(status_code=400, detail="start must not be after end")
+
+        cache_key = f"admin:stats:history:{start}:{end}:{max_points}"
+        cached = await cache_get(cache_key)
+        if cached:
+            return cached
+
+        rows = await UserRepository.get_daily_stats_range(start, end)
+        bucket_days = max(1, math.ceil(((end - start).days + 1) / max_points))
+        buckets = {}
+        for row in rows:
+            buckets.setdefault((row["day"] - start).days // bucket_days, []).append(row)
+        data = {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "bucket_days": bucket_days,
+            "currency": DEFAULT_CURRENCY,
+            "points": [_point(bucket) for _, bucket in sorted(buckets.items())],
+        }
+        await cache_set(cache_key, data, ttl=HISTORY_CACHE_TTL_SECONDS)
+        return data
@@ -1,12 +1,28 @@
 import random
 import re
+from contextlib import asynccontextmanager
 from decimal import Decimal
 
 from fastapi import HTTPException
-from app.cache.redis_client import cache_get, cache_set, redis_del, redis_incr
-
+from app.cache.redis_client import (
+    cache_get,
+    cache_invalidate,
+    cache_set,
+    invalidation_scope,
+    redis_del,
+    version_bump,
+)
+
+from app.core.auth_state import prime_auth_state
+from app.core.config import get_settings
+from app.core.fx import DEFAULT_CURRENCY, fx_rates
+from app.core.events import publish_customer_event
+from app.core.etag import CUSTOMERS_VERSION_KEY, customer_version_key
+from app.core.rate_limit import enforce_rate_limit
 from app.core.security import create_access_token, get_password_hash, verify_password
+from app.database.database import db
 from app.repositories.user_repo import UserRepository
+from app.services.screening_service import TRANSFER, WITHDRAW, ScreeningService
 
 
 class UserService:
@@ -24,51 +40,71 @@ class UserService:
 
     @staticmethod
     async def _invalidate_customer_profile_cache(user_id: int) -> None:
-        await redis_del(f"customer:profile:{user_id}")
+        await cache_invalidate(f"customer:profile:{user_id}")
+        # Profile and admin customer-list ETags change with every balance or profile update.
+        await version_bump(customer_version_key(user_id), CUSTOMERS_VERSION_KEY)
 
     @staticmethod
-    async def register_customer(username: str, email: str, password: str):
-        if await UserRepository.get_user_by_username(username):
-            raise HTTPException(status_code=400, detail="Username already exists")
-
-        if await UserRepository.get_user_by_email(email):
-            raise HTTPException(status_code=400, detail="Email already exists")
+    async def invalidate_customer_caches(user_id: int) -> None:
+        await UserService._invalidate_customer_profile_cache(user_id)
 
-        UserService._validate_password_strength(password)
-        password_hash = get_password_hash(password)
-        user_id = await UserRepository.create_user(username, email, password_hash)
+    @staticmethod
+    async def _publish_transaction(user_id: int, transaction_type: str, account_number: str, **details) -> None:
+        """Push a transaction event to the customer's sockets once the change has committed."""
+        await publish_customer_event(
+            user_id, "transaction", transaction_type=transaction_type, account_number=account_number, **details
+        )
 
+    @staticmethod
+    async def _create_account(user_id: int, currency: str) -> str:
         # Create a unique account number (retry a few times to avoid collisions).
         for _ in range(5):
             account_number = str(random.randint(1000000000, 9999999999))
             if not await UserRepository.get_customer_by_account_number(account_number):
-                await UserRepository.create_account(user_id, account_number)
-                break
-        else:
-            raise HTTPException(status_code=500, detail="Failed to generate a unique account number")
+                await UserRepository.create_account(user_id, account_number, currency)
+                return account_number
+        raise HTTPException(status_code=500, detail="Failed to generate a unique account number")
+
+    @staticmethod
+    async def register_customer(username: str, email: str, password: str):
+        UserService._validate_password_strength(password)
+        # Hash before taking a connection: bcrypt is slow and must not hold a pool slot.
+        password_hash = get_password_hash(password)
+
+        # User and account are created in one transaction so a failure never leaves a user without an account.
+        async with db.unit_of_work(transaction=True):
+            if await UserRepository.get_user_by_username(username):
+                raise HTTPException(status_code=400, detail="Username already exists")
 
+            if await UserRepository.get_user_by_email(email):
+                raise HTTPException(status_code=400, detail="Email already exists")
+
+            user_id = await UserRepository.create_user(username, email, password_hash)
+            await UserService._create_account(user_id, DEFAULT_CURRENCY)
+
+        await version_bump(CUSTOMERS_VERSION_KEY)
         return {"status": "success", "message": "Customer registered successfully", "user_id": user_id}
 
     @staticmethod
     async def login_customer(username: str, password: str):
-        rate_key = f"rl:customer_login:{username}"
-        attempts = await redis_incr(rate_key, ttl=600)
-        if attempts > 5:
-            raise HTTPException(status_code=429, detail="Too many login attempts. Try again later.")
+        rate_key = await enforce_rate_limit(
+            "customer_login", username, limit=5, window_seconds=600,
+            detail="Too many login attempts. Try again later.",
+        )
 
-        user = await UserRepository.get_user_by_username(username)
+        user = await UserRepository.get_customer_login(username)
 
         if not user or user.get("role") != "customer" or not verify_password(password, user.get("password_hash", "")):
             raise HTTPException(status_code=401, detail="Invalid customer credentials")
 
         # Check account status
-        customer = await UserRepository.get_customer_profile_by_user_id(user["user_id"])
-        if customer and customer.get("account_status") == "suspended":
+        if user.get("account_status") == "suspended":
             raise HTTPException(status_code=403, detail="Account is suspended")
 
         token = create_access_token(
-            data={"sub": user["username"], "id": user["user_id"], "role": "customer"}
+            data={"sub": user["username"], "id": user["user_id"], "role": "customer", "epoch": user["auth_epoch"]}
         )
+        await prime_auth_state(user["user_id"], user["auth_epoch"], user["account_status"])
         await redis_del(rate_key)
         return {"status": "success", "access_token": token, "token_type": "bearer"}
 
@@ -91,12 +127,16 @@ class UserService:
     async def add_cash(account_number: str, amount: Decimal):
         if amount <= 0:
             raise HTTPException(status_code=400, detail="Amount must be greater than 0")
-        new_balance = await UserRepository.add_cash_by_account(account_number, amount)
-        if new_balance is None:
-            raise HTTPException(status_code=404, detail="Account not found")
-        customer = await UserRepository.get_customer_by_account_number(account_number)
-        if customer:
-            await UserService._invalidate_customer_profile_cache(customer["user_id"])
+        async with invalidation_scope(), db.unit_of_work():
+            new_balance = await UserRepository.add_cash_by_account(account_number, amount)
+            if new_balance is None:
+                raise HTTPException(status_code=404, detail="Account not found")
+            customer = await UserRepository.get_customer_by_account_number(account_number)
+            if customer:
+                await UserService._invalidate_customer_profile_cache(customer["user_id"])
+                await UserService._publish_transaction(
+                    customer["user_id"], "deposit", account_number, amount=amount, balance=new_balance
+                )
         return {"status": "success", "new_balance": new_balance}
 
 
@@ -105,63 +145,122 @@ class UserService:
         if amount <= 0:
             raise HTTPException(status_code=400, detail="Amount must be greater than 0")
 
-        result = await UserRepository.withdraw_cash_by_account(account_number, amount)
+        async with invalidation_scope(), db.unit_of_work():
+            result = await UserRepository.withdraw_cash_by_account(account_number, amount)
 
-        if result == "NOT_FOUND":
-            raise HTTPException(status_code=404, detail="Account not found")
+            if result == "NOT_FOUND":
+                raise HTTPException(status_code=404, detail="Account not found")
 
-        if result == "INSUFFICIENT":
-            raise HTTPException(status_code=400, detail="Insufficient funds")
+            if result == "INSUFFICIENT":
+                raise HTTPException(status_code=400, detail="Insufficient funds")
 
-        customer = await UserRepository.get_customer_by_account_number(account_number)
-        if customer:
-            await UserService._invalidate_customer_profile_cache(customer["user_id"])
+            customer = await UserRepository.get_customer_by_account_number(account_number)
+            if customer:
+                await UserService._invalidate_customer_profile_cache(customer["user_id"])
+                await UserService._publish_transaction(
+                    customer["user_id"], "withdraw", account_number, amount=amount, balance=result
+                )
         return {"status": "success", "new_balance": result}
 
     @staticmethod
-    async def withdraw_cash_by_user_id(user_id: int, amount: Decimal):
+    async def withdraw_cash_by_user_id(user_id: int, amount: Decimal, account_number: str | None = None):
         if amount <= 0:
             raise HTTPException(status_code=400, detail="Amount must be greater than 0")
 
-        result = await UserRepository.withdraw_cash_by_user_id(user_id, amount)
-
-        if result == "NOT_FOUND":
+        account = await UserRepository.get_customer_account(user_id, account_number)
+        if not account:
             raise HTTPException(status_code=404, detail="Account not found")
+        account_number = account["account_number"]
 
-        if result == "SUSPENDED":
-            raise HTTPException(status_code=403, detail="Account is suspended")
+        async with ScreeningService.screened(WITHDRAW, user_id, account, amount):
+            result = await UserRepository.withdraw_cash_by_user_id(user_id, amount, account_number)
 
-        if result == "INSUFFICIENT":
-            raise HTTPException(status_code=400, detail="Insufficient funds")
+            if result == "NOT_FOUND":
+                raise HTTPException(status_code=404, detail="Account not found")
 
-        await UserService._invalidate_customer_profile_cache(user_id)
+            if result == "SUSPENDED":
+                raise HTTPException(status_code=403, detail="Account is suspended")
+
+            if result == "INSUFFICIENT":
+                raise HTTPException(status_code=400, detail="Insufficient funds")
+
+        async with invalidation_scope():
+            await UserService._invalidate_customer_profile_cache(user_id)
+            await UserService._publish_transaction(user_id, "withdraw", account_number, amount=amount, balance=result)
         return {"status": "success", "new_balance": result}
 
     @staticmethod
-    async def transfer_to_account(from_user_id: int, to_account_number: str, amount: Decimal):
+    async def transfer_to_account(
+        from_user_id: int, to_account_number: str, amount: Decimal, from_account_number: str | None = None
+    ):
         if amount <= 0:
             raise HTTPException(status_code=400, detail="Amount must be greater than 0")
 
-        result = await UserRepository.transfer_between_accounts(from_user_id, to_account_number, amount)
+        async with UserService.screened_transfer(from_user_id, to_account_number, amount, from_account_number) as account:
+            result = await UserService.execute_transfer(from_user_id, to_account_number, amount, account)
+        return {"status": "success", "new_balance": result}
 
-        if result == "NOT_FOUND":
+    @staticmethod
+    @asynccontextmanager
+    async def screened_transfer(
+        from_user_id: int, to_account_number: str, amount: Decimal, from_account_number: str | None = None
+    ):
+        """
+        Resolve the sender account and screen the transfer; yields the sender account number.
+        Enter it before any unit of work, so no connection or row lock is held while Redis answers
+        and the rules' side effects (the new-payee record) are applied only after the block, i.e.
+        after the transfer committed.
+        """
+        account = await UserRepository.get_customer_account(from_user_id, from_account_number)
+        if not account:
             raise HTTPException(status_code=404, detail="Sender or recipient account not found")
 
-        if result == "SUSPENDED":
-            raise HTTPException(status_code=403, detail="Sender or recipient account is suspended")
+        async with ScreeningService.screened(TRANSFER, from_user_id, account, amount, payee=to_account_number):
+            yield account["account_number"]
 
-        if result == "SAME_ACCOUNT":
-            raise HTTPException(status_code=400, detail="Cannot transfer to the same account")
+    @staticmethod
+    async def execute_transfer(from_user_id: int, to_account_number: str, amount: Decimal, from_account_number: str):
+        """
+        Move the money of a transfer screened with screened_transfer(). Joins the caller's unit of
+        work and invalidation scope when there is one; otherwise both profile invalidations go out
+        in one pipeline once the transfer has committed. Returns the sender's new balance.
+        """
+        async with invalidation_scope(), db.unit_of_work():
+            result = await UserRepository.transfer_between_accounts(
+                from_user_id, to_account_number, amount, from_account_number
+            )
 
-        if result == "INSUFFICIENT":
-            raise HTTPException(status_code=400, detail="Insufficient funds")
+            if result == "NOT_FOUND":
+                raise HTTPException(status_code=404, detail="Sender or recipient account not found")
 
-        await UserService._invalidate_customer_profile_cache(from_user_id)
-        recipient = await UserRepository.get_customer_by_account_number(to_account_number)
-        if recipient:
-            await UserService._invalidate_customer_profile_cache(recipient["user_id"])
+            if result == "SUSPENDED":
+                raise HTTPException(status_code=403, detail="Sender or recipient account is suspended")
 
-        return {"status": "success", "new_balance": result}
+            if result == "SAME_ACCOUNT":
+                raise HTTPException(status_code=400, detail="Cannot transfer to the same account")
+
+            if result == "INSUFFICIENT":
+                raise HTTPException(status_code=400, detail="Insufficient funds")
+
+            if result == "NO_RATE":
+                raise HTTPException(status_code=400, detail="No exchange rate available for this currency pair")
+
+            recipient = await UserRepository.get_customer_by_account_number(to_account_number)
+            await UserService._invalidate_customer_profile_cache(from_user_id)
+            await UserService._publish_transaction(
+                from_user_id,
+                "transfer_out",
+                from_account_number,
+                amount=amount,
+                balance=result,
+                related_account=to_account_number,
+            )
+            if recipient:
+                await UserService._invalidate_customer_profile_cache(recipient["user_id"])
+                # The credited amount may be converted or still pending on a hot account: clients refetch.
+                await UserService._publish_transaction(recipient["user_id"], "transfer_in", to_account_number)
+
+        return result
 
     @staticmethod
     async def get_transaction_history(user_id: int, limit: int = 50, offset: int = 0):
@@ -170,3 +269,26 @@ class UserService:
         if offset < 0:
             raise HTTPException(status_code=400, detail="Offset must be >= 0")
         return await UserRepository.get_transaction_history_by_user_id(user_id, limit=limit, offset=offset)
+
+    @staticmethod
+    async def get_accounts(user_id: int):
+        return await UserRepository.get_accounts_by_user_id(user_id)
+
+    @staticmethod
+    async def open_account(user_id: int, currency: str):
+        # A currency without a rate could hold money but never be converted or totalled.
+        if fx_rates.rate(currency, DEFAULT_CURRENCY) is None:
+            raise HTTPException(status_code=400, detail=f"Unsupported currency: {currency}")
+        async with db.unit_of_work(transaction=True):
+            accounts = await UserRepository.get_accounts_by_user_id(user_id)
+            if not accounts:
+                raise HTTPException(status_code=404, detail="Customer not found")
+            if any(a["account_status"] != "active" for a in accounts):
+                raise HTTPException(status_code=403, detail="Account is suspended")
+            max_accounts = get_settings().max_accounts_per_customer
+            if len(accounts) >= max_accounts:
+                raise HTTPException(status_code=400, detail=f"A customer can hold at most {max_accounts} accounts")
+            account_number = await UserService._create_account(user_id, currency)
+
+        await UserService.invalidate_customer_caches(user_id)
+        return {"status": "success", "account_number": account_number, "currency": currency}
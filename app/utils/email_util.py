@@ -1,16 +1,15 @@
-import os
 import smtplib
 from email.message import EmailMessage
 
-from dotenv import load_dotenv
 from fastapi import HTTPException
 
-load_dotenv()
+from app.core.config import get_settings
 
 
 def send_email(to_email: str, subject: str, body: str) -> None:
-    email_address = os.getenv("EMAIL_ADDRESS")
-    email_password = os.getenv("EMAIL_PASSWORD")
+    settings = get_settings()
+    email_address = settings.smtp_email
+    email_password = settings.smtp_password
 
     if not email_address or not email_password:
         raise HTTPException(status_code=500, detail="Email service is not configured")
@@ -22,7 +21,7 @@ def send_email(to_email: str, subject: str, body: str) -> None:
     msg.set_content(body)
 
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as smtp:
+        with smtplib.SMTP(settings.smtp_server, settings.smtp_port) as smtp:
             smtp.starttls()
             smtp.login(email_address, email_password)
             smtp.send_message(msg)
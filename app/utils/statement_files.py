@@ -0,0 +1,134 @@
+"""
+Statement file writers. Both stream: rows are written as the generator reads them, so a
+statement's size does not depend on memory. The PDF writer emits plain PDF 1.4 (Courier text
+pages) without a PDF library.
+"""
+import csv
+from decimal import Decimal
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+LINES_PER_PAGE = 60
+LINE_HEIGHT = 12
+
+
+def _pdf_escape(text: str) -> bytes:
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("latin-1", "replace")
+
+
+class TextPdf:
+    """Minimal streaming PDF: one monospaced text line at a time, paginated."""
+
+    # Object ids 1-3 are the catalog, the page tree and the font; pages follow.
+    _CATALOG, _PAGES, _FONT = 1, 2, 3
+
+    def __init__(self, path: str):
+        self._file = open(path, "wb")
+        self._offsets = {}
+        self._page_ids = []
+        self._lines = []
+        self._next_id = 4
+        self._file.write(b"%PDF-1.4\n")
+        self._object(self._FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>")
+
+    def _object(self, obj_id: int, body: bytes) -> None:
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+    def line(self, text: str = "") -> None:
+        self._lines.append(text)
+        if len(self._lines) == LINES_PER_PAGE:
+            self._flush_page()
+
+    def _flush_page(self) -> None:
+        top = PAGE_HEIGHT - 40
+        content = b"BT /F1 9 Tf %d TL 40 %d Td\n" % (LINE_HEIGHT, top + LINE_HEIGHT)
+        content += b"".join(b"(" + _pdf_escape(line) + b") '\n" for line in self._lines)
+        content += b"ET"
+        content_id, page_id = self._next_id, self._next_id + 1
+        self._next_id += 2
+        self._object(content_id, b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        self._object(
+            page_id,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 %d 0 R >> >> "
+            b"/Contents %d 0 R >>" % (self._PAGES, PAGE_WIDTH, PAGE_HEIGHT, self._FONT, content_id),
+        )
+        self._page_ids.append(page_id)
+        self._lines = []
+
+    def close(self) -> None:
+        if self._lines or not self._page_ids:
+            self._flush_page()
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self._page_ids)
+        self._object(self._PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_ids)))
+        self._object(self._CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self._PAGES)
+
+        xref_offset = self._file.tell()
+        size = self._next_id
+        self._file.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for obj_id in range(1, size):
+            self._file.write(b"%010d 00000 n \n" % self._offsets[obj_id])
+        self._file.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, self._CATALOG, xref_offset))
+        self._file.close()
+
+
+def _money(value) -> str:
+    return f"{Decimal(str(value)):,.2f}"
+
+
+class StatementWriter:
+    """Writes one account's statement to `{base_path}.csv` and/or `{base_path}.pdf`."""
+
+    def __init__(self, base_path: str, formats, header: dict):
+        self.paths = []
+        self._csv_file = self._csv = self._pdf = None
+        if "csv" in formats:
+            self.paths.append(f"{base_path}.csv")
+            self._csv_file = open(self.paths[-1], "w", newline="")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(["account_number", header["account_number"]])
+            self._csv.writerow(["customer", header["username"]])
+            self._csv.writerow(["period", header["period"]])
+            self._csv.writerow(["currency", header["currency"]])
+            self._csv.writerow(["opening_balance", header["opening_balance"]])
+            self._csv.writerow([])
+            self._csv.writerow(["date", "transaction_id", "type", "amount", "balance_after", "related_account"])
+        if "pdf" in formats:
+            self.paths.append(f"{base_path}.pdf")
+            self._pdf = TextPdf(self.paths[-1])
+            self._pdf.line(f"Statement {header['period']}  Account {header['account_number']}  ({header['currency']})")
+            self._pdf.line(f"Customer: {header['username']}")
+            self._pdf.line()
+            self._pdf.line(f"Opening balance: {_money(header['opening_balance'])}")
+            self._pdf.line()
+            self._pdf.line(f"{'Date':<20}{'Type':<14}{'Amount':>16}{'Balance':>18}  Related")
+
+    def rows(self, rows) -> None:
+        for row in rows:
+            if self._csv is not None:
+                self._csv.writerow(
+                    [
+                        row["created_at"].strftime("%Y-%m-%d %H:%M:%S"),
+                        row["transaction_id"],
+                        row["transaction_type"],
+                        row["amount"],
+                        row["balance_after"],
+                        row["related_account"] or "",
+                    ]
+                )
+            if self._pdf is not None:
+                self._pdf.line(
+                    f"{row['created_at'].strftime('%Y-%m-%d %H:%M'):<20}{row['transaction_type']:<14}"
+                    f"{_money(row['amount']):>16}{_money(row['balance_after']):>18}  {row['related_account'] or ''}"
+                )
+
+    def close(self, closing_balance, transaction_count: int) -> None:
+        if self._csv is not None:
+            self._csv.writerow([])
+            self._csv.writerow(["closing_balance", closing_balance])
+            self._csv.writerow(["transactions", transaction_count])
+            self._csv_file.close()
+        if self._pdf is not None:
+            self._pdf.line()
+            self._pdf.line(f"Closing balance: {_money(closing_balance)}   Transactions: {transaction_count}")
+            self._pdf.close()
@@ -0,0 +1,108 @@
+"""
+Cold-start benchmark: boot `uvicorn main:app` in a fresh process and time
+  - spawn -> first 200 from /health/live
+  - spawn -> first 200 from /health/ready (schema checked, pools warm)
+  - latency of the first and second DB-backed request after ready (a failed customer login)
+
+Each warm size in --warm-sizes is run --runs times (DB_POOL_WARM_SIZE=0 keeps the old lazy behaviour,
+where the first requests pay the MySQL handshakes). The schema must already be applied with
+`python -m app.database.migrate`.
+
+Example:
+    DB_NAME=secure_bank_bench python -m benchmarks.bench_cold_start --warm-sizes 0,5,10 --runs 5
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from statistics import median
+
+from benchmarks.harness import environment_info, require_bench_database, save_results
+
+POLL_INTERVAL = 0.01
+
+
+def _request(port: int, method: str, path: str, body: dict | None = None) -> int:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        payload = json.dumps(body) if body is not None else None
+        headers = {"content-type": "application/json"} if body is not None else {}
+        conn.request(method, path, body=payload, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def _wait_for(port: int, path: str, started: float, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        try:
+            if _request(port, "GET", path) == 200:
+                return time.perf_counter() - started
+        except OSError:
+            pass
+        time.sleep(POLL_INTERVAL)
+    raise RuntimeError(f"{path} not ready after {timeout}s")
+
+
+def _timed_login(port: int) -> float:
+    started = time.perf_counter()
+    _request(port, "POST", "/customers/login", {"username": f"cold_{uuid.uuid4().hex[:8]}", "password": "x" * 8})
+    return (time.perf_counter() - started) * 1000
+
+
+def run_once(port: int, warm_size: int, timeout: float) -> dict:
+    env = dict(os.environ, DB_POOL_WARM_SIZE=str(warm_size), LOG_LEVEL="WARNING")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        live = _wait_for(port, "/health/live", started, timeout)
+        ready = _wait_for(port, "/health/ready", started, timeout)
+        first = _timed_login(port)
+        second = _timed_login(port)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return {
+        "time_to_live_ms": round(live * 1000, 1),
+        "time_to_ready_ms": round(ready * 1000, 1),
+        "first_request_ms": round(first, 2),
+        "second_request_ms": round(second, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start time to first request")
+    parser.add_argument("--warm-sizes", default="0,5", help="comma separated DB_POOL_WARM_SIZE values")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--force", action="store_true", help="allow a database not named *bench")
+    args = parser.parse_args()
+
+    require_bench_database(args.force)
+    results = {"benchmark": "cold_start", "environment": environment_info(), "config": vars(args), "warm_sizes": {}}
+    for warm_size in (int(size) for size in args.warm_sizes.split(",")):
+        runs = [run_once(args.port, warm_size, args.timeout) for _ in range(args.runs)]
+        summary = {metric: round(median(run[metric] for run in runs), 2) for metric in runs[0]}
+        results["warm_sizes"][str(warm_size)] = {"median": summary, "runs": runs}
+        print(
+            f"warm={warm_size:<3} live={summary['time_to_live_ms']}ms ready={summary['time_to_ready_ms']}ms "
+            f"first={summary['first_request_ms']}ms second={summary['second_request_ms']}ms"
+        )
+
+    if args.output:
+        save_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
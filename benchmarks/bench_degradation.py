@@ -0,0 +1,149 @@
+"""
+Degradation drill: run profile and login requests while a local fault-injecting proxy
+breaks Redis and then MySQL, and check that the app degrades instead of hanging.
+
+Expectations checked (exit code 1 if any fails):
+  - Redis blackholed or slow: profile and customer login still succeed (cache fails open)
+    and p99 stays under --budget-ms once the breaker has opened
+  - Redis restored: the redis breaker closes again
+  - MySQL connections reset: requests fail fast with 503 instead of hanging
+
+Example:
+    DB_NAME=secure_bank_bench python -m benchmarks.bench_degradation --requests 50
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from urllib.parse import urlparse, urlunparse
+
+from benchmarks.fault_proxy import FaultProxy
+from benchmarks.harness import ASGIClient, EndpointStats, require_bench_database, save_results, seed_customers, timed_call
+
+PASSWORD = "BenchPass123"
+
+
+def _redirect_env(redis_port: int, mysql_port: int):
+    from app.core.config import Settings
+
+    # Built from the environment as it is now; get_settings() is first called once it points at the proxies.
+    settings = Settings.from_env()
+    redis_url = urlparse(settings.redis_url)
+    redis_target = (redis_url.hostname or "127.0.0.1", redis_url.port or 6379)
+    netloc = f"{redis_url.username or ''}{':' + redis_url.password if redis_url.password else ''}"
+    netloc = f"{netloc}@" if netloc else ""
+    os.environ["REDIS_URL"] = urlunparse(redis_url._replace(netloc=f"{netloc}127.0.0.1:{redis_port}"))
+
+    mysql_target = (settings.db_host, settings.db_port)
+    os.environ["DB_HOST"] = "127.0.0.1"
+    os.environ["DB_PORT"] = str(mysql_port)
+    return redis_target, mysql_target
+
+
+async def run_phase(client: ASGIClient, customer: dict, token: str, requests: int) -> dict:
+    results = {}
+    for name, call in (
+        ("profile", lambda: client.request("GET", "/customers/profile", headers={"authorization": f"Bearer {token}"})),
+        ("login", lambda: client.request(
+            "POST", "/customers/login", {"username": customer["username"], "password": PASSWORD})),
+    ):
+        stats = EndpointStats()
+        statuses = {}
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await timed_call(stats, call)
+            statuses[response["status"]] = statuses.get(response["status"], 0) + 1
+        summary = stats.summary(time.perf_counter() - started)
+        summary["statuses"] = {str(k): v for k, v in statuses.items()}
+        results[name] = summary
+    return results
+
+
+async def main_async(args) -> dict:
+    redis_target, mysql_target = _redirect_env(args.redis_proxy_port, args.mysql_proxy_port)
+    redis_proxy = FaultProxy(args.redis_proxy_port, *redis_target)
+    mysql_proxy = FaultProxy(args.mysql_proxy_port, *mysql_target)
+    await redis_proxy.start()
+    await mysql_proxy.start()
+
+    from app.cache.redis_client import redis_breaker
+    from app.core.config import get_settings
+    from app.core.security import create_access_token
+    from app.database.database import db
+    from main import app
+
+    client = ASGIClient(app)
+    await client.startup()
+    phases = {}
+    failures = []
+    try:
+        customer = (await seed_customers(1, 1, f"bench_deg_{uuid.uuid4().hex[:6]}", PASSWORD))[0]
+        token = create_access_token({"sub": customer["username"], "id": customer["user_id"], "role": "customer"})
+
+        plan = [
+            ("healthy", "pass", 0, "pass"),
+            ("redis_blackhole", "blackhole", 0, "pass"),
+            ("redis_slow", "delay", args.redis_delay_ms, "pass"),
+            ("redis_restored", "pass", 0, "pass"),
+            ("mysql_reset", "pass", 0, "reset"),
+        ]
+        for name, redis_mode, delay_ms, mysql_mode in plan:
+            redis_proxy.set_mode(redis_mode, delay_ms)
+            mysql_proxy.set_mode(mysql_mode)
+            if name == "redis_restored":
+                await asyncio.sleep(get_settings().cb_reset_timeout_seconds + 0.1)
+            phase = await run_phase(client, customer, token, args.requests)
+            phase["redis_breaker"] = redis_breaker.state
+            phase["mysql_breaker"] = db.breaker.state
+            phases[name] = phase
+            print(
+                f"{name:<16} profile p50={phase['profile']['p50_ms']}ms p99={phase['profile']['p99_ms']}ms "
+                f"{phase['profile']['statuses']} | login p99={phase['login']['p99_ms']}ms {phase['login']['statuses']} "
+                f"| breakers redis={phase['redis_breaker']} mysql={phase['mysql_breaker']}"
+            )
+
+        for name in ("redis_blackhole", "redis_slow"):
+            for endpoint in ("profile", "login"):
+                row = phases[name][endpoint]
+                if row["statuses"].get("200", 0) != args.requests:
+                    failures.append(f"{name}/{endpoint}: expected all 200, got {row['statuses']}")
+            if phases[name]["profile"]["p99_ms"] > args.budget_ms:
+                failures.append(f"{name}/profile: p99 {phases[name]['profile']['p99_ms']}ms > {args.budget_ms}ms")
+        if phases["redis_restored"]["redis_breaker"] != "closed":
+            failures.append("redis_restored: breaker did not close")
+        mysql_row = phases["mysql_reset"]["profile"]
+        if mysql_row["statuses"].get("503", 0) == 0 or mysql_row["p99_ms"] > args.budget_ms:
+            failures.append(f"mysql_reset: expected fast 503s, got {mysql_row['statuses']} p99={mysql_row['p99_ms']}ms")
+    finally:
+        redis_proxy.set_mode("pass")
+        mysql_proxy.set_mode("pass")
+        await client.shutdown()
+        await redis_proxy.stop()
+        await mysql_proxy.stop()
+
+    return {"benchmark": "degradation", "config": vars(args), "phases": phases, "failures": failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redis/MySQL degradation drill through a fault-injecting proxy")
+    parser.add_argument("--requests", type=int, default=30, help="requests per endpoint per phase")
+    parser.add_argument("--redis-proxy-port", type=int, default=16379)
+    parser.add_argument("--mysql-proxy-port", type=int, default=13306)
+    parser.add_argument("--redis-delay-ms", type=int, default=2000)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="p99 budget while a dependency is failing")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--force", action="store_true", help="allow seeding a database not named *bench")
+    args = parser.parse_args()
+
+    require_bench_database(args.force)
+    results = asyncio.run(main_async(args))
+    if args.output:
+        save_results(args.output, results)
+    for failure in results["failures"]:
+        print(f"FAIL {failure}")
+    raise SystemExit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Mixed-workload benchmark for the HTTP API, driven in-process through `main.app`.
+
+Example:
+    DB_NAME=secure_bank_bench python -m benchmarks.bench_endpoints \
+        --customers 200 --ledger-rows 5000 --requests 5000 --concurrency 32 \
+        --output bench_results/endpoints.json --baseline bench_results/baseline.json
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from benchmarks.harness import (
+    ASGIClient,
+    EndpointStats,
+    compare_to_baseline,
+    environment_info,
+    install_statement_counter,
+    require_bench_database,
+    save_results,
+    seed_customers,
+    timed_call,
+)
+
+PASSWORD = "BenchPass123"
+
+# Relative weights of each operation in the mixed workload.
+WORKLOAD = {
+    "login": 5,
+    "profile": 30,
+    "withdraw": 10,
+    "transfer": 15,
+    "history": 25,
+    "admin_search": 5,
+    "admin_stats": 10,
+}
+
+
+async def run_workload(client: ASGIClient, customers, admin_token: str, total_requests: int,
+                       concurrency: int, seed: int, workload: dict = WORKLOAD):
+    from app.core.security import create_access_token
+
+    rng = random.Random(seed)
+    tokens = {
+        c["user_id"]: create_access_token({"sub": c["username"], "id": c["user_id"], "role": "customer"})
+        for c in customers
+    }
+    names = list(workload)
+    weights = [workload[n] for n in names]
+    plan = [(rng.choices(names, weights)[0], rng.choice(customers), rng.choice(customers)) for _ in range(total_requests)]
+    stats = {name: EndpointStats() for name in names}
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    def auth(token):
+        return {"authorization": f"Bearer {token}"}
+
+    def call(op, customer, other):
+        token = tokens[customer["user_id"]]
+        if op == "login":
+            return client.request("POST", "/customers/login", {"username": customer["username"], "password": PASSWORD})
+        if op == "profile":
+            return client.request("GET", "/customers/profile", headers=auth(token))
+        if op == "withdraw":
+            return client.request("POST", "/customers/withdraw", {"amount": "1.00"}, headers=auth(token))
+        if op == "transfer":
+            return client.request(
+                "POST",
+                "/customers/transfer",
+                {"to_account_number": other["account_number"], "amount": "1.00"},
+                headers=auth(token),
+            )
+        if op == "history":
+            offset = rng.choice([0, 0, 0, 50, 100])
+            return client.request("GET", "/customers/transactions", headers=auth(token),
+                                  query=f"limit=50&offset={offset}")
+        if op == "admin_search":
+            return client.request("GET", "/admin/customers", headers=auth(admin_token),
+                                  query=f"search={customer['username'][-3:]}")
+        return client.request("GET", "/admin/stats", headers=auth(admin_token))
+
+    async def worker():
+        while True:
+            try:
+                op, customer, other = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await timed_call(stats[op], lambda: call(op, customer, other))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return stats, wall
+
+
+async def main_async(args):
+    from app.core.security import create_access_token
+    from main import app
+
+    install_statement_counter()
+    client = ASGIClient(app)
+    await client.startup()
+    try:
+        prefix = f"bench_{uuid.uuid4().hex[:6]}"
+        seed_started = time.perf_counter()
+        customers = await seed_customers(args.customers, args.ledger_rows, prefix, PASSWORD)
+        seed_seconds = time.perf_counter() - seed_started
+        print(f"Seeded {len(customers)} customers and {args.ledger_rows} ledger rows in {seed_seconds:.1f}s")
+
+        admin_token = create_access_token({"sub": "bench_admin", "id": 0, "role": "admin"})
+        await run_workload(client, customers, admin_token, min(200, args.requests), args.concurrency, args.seed + 1)
+        stats, wall = await run_workload(client, customers, admin_token, args.requests, args.concurrency, args.seed)
+    finally:
+        await client.shutdown()
+
+    total = sum(len(s.latencies_ms) for s in stats.values())
+    results = {
+        "benchmark": "endpoints",
+        "environment": environment_info(),
+        "config": vars(args),
+        "wall_seconds": round(wall, 3),
+        "total_throughput_rps": round(total / wall, 1) if wall else 0.0,
+        "endpoints": {name: s.summary(wall) for name, s in stats.items()},
+    }
+
+    print(f"\n{'endpoint':<14}{'reqs':>7}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'stmts':>8}{'redis':>8}")
+    for name, row in results["endpoints"].items():
+        print(
+            f"{name:<14}{row['requests']:>7}{row['errors']:>6}{row['throughput_rps']:>9}"
+            f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['db_statements_per_request']:>8}"
+            f"{row['redis_round_trips_per_request']:>8}"
+        )
+    print(f"total: {total} requests in {wall:.2f}s ({results['total_throughput_rps']} req/s)")
+
+    if args.output:
+        save_results(args.output, results)
+    if args.baseline:
+        compare_to_baseline(results, args.baseline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-workload benchmark for the banking API")
+    parser.add_argument("--customers", type=int, default=100)
+    parser.add_argument("--ledger-rows", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="write JSON results to this path")
+    parser.add_argument("--baseline", default=None, help="compare against a previous JSON result")
+    parser.add_argument("--force", action="store_true", help="allow seeding a database not named *bench")
+    args = parser.parse_args()
+
+    require_bench_database(args.force)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Event push benchmark: hold --idle + --active WebSocket subscribers open on one server worker
+and measure connect time, worker memory, and publish-to-client latency of the fan-out.
+
+Active sockets belong to --active-customers customers that receive --rate events per second
+for --duration seconds; idle sockets belong to other customers and must receive nothing.
+Events go through publish_customer_event(), i.e. the same Redis channel the deposit, withdraw
+and transfer paths publish to after commit, so MySQL is not part of the measured latency.
+
+Both ends run on this host, so raise the open-file limit first (each socket costs two fds):
+
+    ulimit -n 65536
+    DB_NAME=secure_bank_bench python -m benchmarks.bench_events --idle 9000 --active 1000
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+from websockets.asyncio.client import connect
+
+from benchmarks.bench_workers import wait_until_ready
+from benchmarks.harness import (
+    HTTPClient,
+    environment_info,
+    percentile,
+    require_bench_database,
+    save_results,
+    seed_customers,
+)
+
+
+class Collector:
+    def __init__(self):
+        self.latencies_ms = []
+        self.received = 0
+        self.unexpected = 0
+        self.closed_early = 0
+
+
+def rss_mb(pid: int) -> float | None:
+    """Resident memory of a process on Linux; None elsewhere."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+async def consume(ws, collector: Collector, active: bool) -> None:
+    try:
+        async for raw in ws:
+            event = json.loads(raw)
+            if event.get("type") != "transaction":
+                continue
+            collector.received += 1
+            if active:
+                collector.latencies_ms.append((time.time() - event["sent_at"]) * 1000)
+            else:
+                collector.unexpected += 1
+    except Exception:
+        collector.closed_early += 1
+
+
+async def open_sockets(url: str, plan, concurrency: int, collector: Collector):
+    """plan: list of (token, active). Returns the sockets and their consumer tasks."""
+    semaphore = asyncio.Semaphore(concurrency)
+    sockets, consumers = [], []
+
+    async def one(token: str, active: bool):
+        async with semaphore:
+            ws = await connect(f"{url}?token={token}", ping_interval=None, max_queue=None)
+        sockets.append(ws)
+        consumers.append(asyncio.create_task(consume(ws, collector, active)))
+
+    await asyncio.gather(*(one(token, active) for token, active in plan))
+    return sockets, consumers
+
+
+async def publish_load(active_customers, rate: float, duration: float) -> int:
+    from app.core.events import publish_customer_event
+
+    interval = 1.0 / rate
+    published = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        customer = active_customers[published % len(active_customers)]
+        await publish_customer_event(
+            customer["user_id"],
+            "transaction",
+            transaction_type="deposit",
+            account_number=customer["account_number"],
+            amount="1.00",
+            sent_at=time.time(),
+        )
+        published += 1
+        delay = started + published * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    return published
+
+
+async def server_metrics(client: HTTPClient) -> dict:
+    response = await client.request("GET", "/metrics")
+    metrics = {}
+    for line in response["body"].decode().splitlines():
+        if line.startswith("events_"):
+            name, _, value = line.rpartition(" ")
+            metrics[name] = float(value)
+    return metrics
+
+
+async def main_async(args) -> dict:
+    from app.cache.redis_client import close_redis, init_redis
+    from app.core.security import create_access_token
+    from app.database.database import db
+
+    idle_customers = max(1, args.idle_customers)
+    await db.connect()
+    try:
+        customers = await seed_customers(
+            args.active_customers + idle_customers, 0, f"bench_ev_{uuid.uuid4().hex[:6]}", "BenchPass123"
+        )
+    finally:
+        await db.disconnect()
+    active_customers, idle_pool = customers[: args.active_customers], customers[args.active_customers:]
+
+    def token(customer) -> str:
+        return create_access_token({"sub": customer["username"], "id": customer["user_id"], "role": "customer", "epoch": 0})
+
+    plan = [(token(active_customers[i % len(active_customers)]), True) for i in range(args.active)]
+    plan += [(token(idle_pool[i % len(idle_pool)]), False) for i in range(args.idle)]
+    per_customer = max(
+        math.ceil(args.active / len(active_customers)), math.ceil(args.idle / len(idle_pool)) if args.idle else 0
+    )
+
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "1", "--host", "127.0.0.1", "--port", str(args.port)],
+        env=dict(os.environ, LOG_LEVEL="WARNING", EVENTS_MAX_CONNECTIONS_PER_CUSTOMER=str(per_customer)),
+    )
+    client = HTTPClient("127.0.0.1", args.port, connections=4)
+    collector = Collector()
+    sockets, consumers = [], []
+    await init_redis()
+    try:
+        await wait_until_ready(client, 1, args.timeout)
+        rss_before = rss_mb(process.pid)
+
+        started = time.perf_counter()
+        sockets, consumers = await open_sockets(
+            f"ws://127.0.0.1:{args.port}/customers/events", plan, args.connect_concurrency, collector
+        )
+        connect_seconds = time.perf_counter() - started
+        rss_connected = rss_mb(process.pid)
+        print(f"--- {len(sockets)} sockets open in {connect_seconds:.1f}s ---")
+
+        published = await publish_load(active_customers, args.rate, args.duration)
+        await asyncio.sleep(args.drain)
+        metrics = await server_metrics(client)
+    finally:
+        for ws in sockets:
+            await ws.close()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        await close_redis()
+        await client.close()
+        process.terminate()
+        process.wait(timeout=30)
+
+    sockets_per_active = [len(range(i, args.active, len(active_customers))) for i in range(len(active_customers))]
+    expected = sum(sockets_per_active[i % len(active_customers)] for i in range(published))
+    latencies = sorted(collector.latencies_ms)
+    return {
+        "benchmark": "events",
+        "environment": environment_info(),
+        "config": vars(args),
+        "sockets": len(sockets),
+        "connect_seconds": round(connect_seconds, 3),
+        "server_rss_mb": {"before": rss_before, "connected": rss_connected},
+        "published": published,
+        "delivered": collector.received,
+        "expected_deliveries": expected,
+        "unexpected_on_idle": collector.unexpected,
+        "closed_early": collector.closed_early,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "server_metrics": metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fan-out latency and memory with many event subscribers")
+    parser.add_argument("--idle", type=int, default=9000, help="sockets of customers that get no events")
+    parser.add_argument("--active", type=int, default=1000, help="sockets of customers that get events")
+    parser.add_argument("--active-customers", type=int, default=100)
+    parser.add_argument("--idle-customers", type=int, default=900)
+    parser.add_argument("--rate", type=float, default=200.0, help="events published per second")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--drain", type=float, default=2.0, help="seconds to wait for in-flight events")
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--port", type=int, default=18002)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--force", action="store_true", help="allow seeding a database not named *bench")
+    args = parser.parse_args()
+
+    require_bench_database(args.force)
+    results = asyncio.run(main_async(args))
+    print(json.dumps({k: v for k, v in results.items() if k not in ("environment", "config")}, indent=2))
+    if args.output:
+        save_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
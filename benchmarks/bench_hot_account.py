@@ -0,0 +1,113 @@
+"""
+Contention benchmark: many concurrent transfers into a single receiving account.
+
+Runs the same workload twice through UserRepository.transfer_between_accounts, first with
+the receiver as a normal account (every credit waits on its row lock) and then in hot-account
+mode (credits are queued in pending_credits). Afterwards the pending credits are folded and the
+receiver's balance is checked against the exact expected total.
+
+Example:
+    DB_NAME=secure_bank_bench python -m benchmarks.bench_hot_account --senders 200 --transfers 5000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+
+from benchmarks.harness import environment_info, require_bench_database, save_results, seed_customers
+
+AMOUNT = Decimal("1.00")
+
+
+async def run_transfers(senders, receiver_account: str, transfers: int, concurrency: int) -> dict:
+    from app.repositories.user_repo import UserRepository
+
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            sender = senders[i % len(senders)]
+            result = await UserRepository.transfer_between_accounts(sender["user_id"], receiver_account, AMOUNT)
+            if not isinstance(result, Decimal):
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(transfers)))
+    elapsed = time.perf_counter() - started
+    return {
+        "transfers": transfers,
+        "failures": failures,
+        "elapsed_seconds": round(elapsed, 3),
+        "transfers_per_second": round(transfers / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def main_async(args) -> dict:
+    from app.database.database import db
+    from app.repositories.user_repo import UserRepository
+
+    await db.connect()
+    try:
+        prefix = f"bench_hot_{uuid.uuid4().hex[:6]}"
+        customers = await seed_customers(args.senders + 1, args.senders * 2, prefix, "BenchPass123")
+        receiver, senders = customers[0], customers[1:]
+        account = receiver["account_number"]
+        initial = await UserRepository.get_customer_profile_by_user_id(receiver["user_id"])
+        initial_balance = Decimal(str(initial["current_balance"]))
+
+        await UserRepository.set_hot_account(account, False)
+        normal = await run_transfers(senders, account, args.transfers, args.concurrency)
+
+        await UserRepository.set_hot_account(account, True)
+        hot = await run_transfers(senders, account, args.transfers, args.concurrency)
+
+        fold_started = time.perf_counter()
+        await UserRepository.set_hot_account(account, False)
+        await UserRepository.fold_pending_credits(account)
+        fold_seconds = time.perf_counter() - fold_started
+
+        profile = await UserRepository.get_customer_profile_by_user_id(receiver["user_id"])
+        succeeded = (normal["transfers"] - normal["failures"]) + (hot["transfers"] - hot["failures"])
+        expected = initial_balance + AMOUNT * succeeded
+        balance = Decimal(str(profile["current_balance"]))
+    finally:
+        await db.disconnect()
+
+    return {
+        "benchmark": "hot_account",
+        "environment": environment_info(),
+        "config": vars(args),
+        "normal": normal,
+        "hot": hot,
+        "speedup": round(hot["transfers_per_second"] / normal["transfers_per_second"], 2)
+        if normal["transfers_per_second"] else None,
+        "fold_seconds": round(fold_seconds, 3),
+        "receiver_balance": str(balance),
+        "expected_balance": str(expected),
+        "balance_exact": balance == expected,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transfer throughput into one account, normal vs hot-account mode")
+    parser.add_argument("--senders", type=int, default=100)
+    parser.add_argument("--transfers", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--force", action="store_true", help="allow seeding a database not named *bench")
+    args = parser.parse_args()
+
+    require_bench_database(args.force)
+    results = asyncio.run(main_async(args))
+    print(f"normal: {results['normal']['transfers_per_second']} transfers/s")
+    print(f"hot:    {results['hot']['transfers_per_second']} transfers/s (x{results['speedup']})")
+    print(f"receiver balance exact after fold: {results['balance_exact']}")
+    if args.output:
+        save_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Ledger hash-chain benchmark: what chaining costs per ledger row, and how fast the verifier reads.
+
+Runs the same transfer workload through UserRepository.transfer_between_accounts twice, once
+with the plain INSERT that ledger rows used before the chain and once with the chained insert.
+The rounds alternate and the best of --rounds is kept for each, to damp noise. The run exits
+non-zero when the chained insert adds more than --max-overhead-pct to a transfer or more than
+--max-overhead-us per ledger row. The chain is then verified with the ledger_verify job.
+
+The unchained rounds write rows without row_hash, which the verifier would report, so run this
+against a throwaway database only.
+
+Example:
+    DB_NAME=secure_bank_bench python -m benchmarks.bench_ledger_chain --transfers 5000 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from decimal import Decimal
+
+from benchmarks.harness import environment_info, require_bench_database, save_results, seed_customers
+
+AMOUNT = Decimal("1.00")
+CHAINED_INSERT = None
+
+
+async def _plain_insert_transactions(cur, account_number: str, rows) -> None:
+    """The ledger insert as it was before the hash chain (baseline)."""
+    await cur.executemany(
+        """
+        INSERT INTO transactions (
+            user_id, account_number, transaction_type, amount, balance_after, related_account
+        )
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """,
+        [
+            (
+                row["user_id"],
+                account_number,
+                row["transaction_type"],
+                str(row["amount"]),
+                str(row["balance_after"]),
+                row["related_account"],
+            )
+            for row in rows
+        ],
+    )
+
+
+def use_chain(enabled: bool) -> None:
+    """Swap the ledger insert used by every write path (they all go through _insert_transactions)."""
+    from app.repositories import user_repo_hot_accounts, user_repo_transactions
+
+    insert = CHAINED_INSERT if enabled else _plain_insert_transactions
+    user_repo_transactions._insert_transactions = insert
+    user_repo_hot_accounts._insert_transactions = insert
+
+
+async def run_transfers(customers, transfers: int, concurrency: int) -> float:
+    from app.repositories.user_repo import UserRepository
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            sender = customers[i % len(customers)]
+            receiver = customers[(i * 7 + 1) % len(customers)]
+            if receiver is sender:
+                receiver = customers[(i + 1) % len(customers)]
+            await UserRepository.transfer_between_accounts(sender["user_id"], receiver["account_number"], AMOUNT)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(transfers)))
+    return time.perf_counter() - started
+
+
+async def main_async(args) -> dict:
+    global CHAINED_INSERT
+    from app.database.database import db
+    from app.repositories.user_repo_transactions import _insert_transactions
+
+    CHAINED_INSERT = _insert_transactions
+
+    await db.connect()
+    try:
+        customers = await seed_customers(args.customers, args.customers * 2, f"bench_chain_{uuid.uuid4().hex[:6]}", "BenchPass123")
+        best = {"plain": None, "chained": None}
+        for _ in range(args.rounds):
+            for mode in ("plain", "chained"):
+                use_chain(mode == "chained")
+                elapsed = await run_transfers(customers, args.transfers, args.concurrency)
+                best[mode] = elapsed if best[mode] is None else min(best[mode], elapsed)
+        use_chain(True)
+    finally:
+        await db.disconnect()
+
+    # Every transfer writes two ledger rows (sender and receiver).
+    rows = args.transfers * 2
+    overhead_pct = (best["chained"] - best["plain"]) / best["plain"] * 100 if best["plain"] else 0.0
+    overhead_us = (best["chained"] - best["plain"]) / rows * 1_000_000 * args.concurrency
+
+    from app.jobs import ledger_verify
+
+    verify = await asyncio.to_thread(ledger_verify.run, args.workers)
+
+    return {
+        "benchmark": "ledger_chain",
+        "environment": environment_info(),
+        "config": vars(args),
+        "transfers_per_second": {
+            mode: round(args.transfers / elapsed, 1) for mode, elapsed in best.items()
+        },
+        "overhead_pct": round(overhead_pct, 2),
+        # Per row, as seen by one connection: the wall-clock difference times the number of concurrent writers.
+        "overhead_us_per_row": round(overhead_us, 1),
+        "within_budget": overhead_pct <= args.max_overhead_pct and overhead_us <= args.max_overhead_us,
+        "verify": {key: verify[key] for key in ("accounts", "rows", "elapsed_seconds", "rows_per_second")},
+        # Non-zero here comes from the unchained baseline rounds, not from tampering.
+        "verify_unchained_rows": verify["unchained_rows"],
+        "verify_tampered_accounts": len(verify["tampered"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row cost of the ledger hash chain and verifier throughput")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--transfers", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4, help="verifier processes")
+    parser.add_argument("--max-overhead-pct", type=float, default=15.0)
+    parser.add_argument("--max-overhead-us", type=float, default=500.0)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--force", action="store_true", help="allow seeding a database not named *bench")
+    args = parser.parse_args()
+
+    require_bench_database(args.force)
+    results = asyncio.run(main_async(args))
+    print(json.dumps({k: v for k, v in results.items() if k not in ("environment", "config")}, indent=2))
+    if args.output:
+        save_results(args.output, results)
+    raise SystemExit(0 if results["within_budget"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Redis round trips and DB statements per endpoint.
+
+Each endpoint is exercised on its own, sequentially, so the counts are exact rather than
+averaged over a mix. Save the output before and after a change to compare:
+
+    DB_NAME=secure_bank_bench python -m benchmarks.bench_redis_roundtrips --output bench_results/redis_after.json \
+        --baseline bench_results/redis_before.json
+"""
+import argparse
+import asyncio
+import uuid
+
+from benchmarks.bench_endpoints import PASSWORD, WORKLOAD, run_workload
+from benchmarks.harness import (
+    ASGIClient,
+    compare_to_baseline,
+    environment_info,
+    install_statement_counter,
+    require_bench_database,
+    save_results,
+    seed_customers,
+)
+
+
+async def main_async(args) -> dict:
+    from app.core.security import create_access_token
+    from main import app
+
+    install_statement_counter()
+    client = ASGIClient(app)
+    await client.startup()
+    endpoints = {}
+    try:
+        customers = await seed_customers(args.customers, args.customers * 5, f"bench_rt_{uuid.uuid4().hex[:6]}", PASSWORD)
+        admin_token = create_access_token({"sub": "bench_admin", "id": 0, "role": "admin"})
+        # Warm connection pools so connection setup commands are not attributed to an endpoint.
+        await run_workload(client, customers, admin_token, 50, 4, args.seed + 1)
+        for op in WORKLOAD:
+            stats, wall = await run_workload(client, customers, admin_token, args.requests, 1, args.seed, {op: 1})
+            endpoints[op] = stats[op].summary(wall)
+    finally:
+        await client.shutdown()
+
+    return {
+        "benchmark": "redis_roundtrips",
+        "environment": environment_info(),
+        "config": vars(args),
+        "endpoints": endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redis round trips and DB statements per endpoint")
+    parser.add_argument("--customers", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--force", action="store_true", help="allow seeding a database not named *bench")
+    args = parser.parse_args()
+
+    require_bench_database(args.force)
+    results = asyncio.run(main_async(args))
+    print(f"\n{'endpoint':<14}{'redis round trips':>20}{'db statements':>16}")
+    for name, row in results["endpoints"].items():
+        print(f"{name:<14}{row['redis_round_trips_per_request']:>20}{row['db_statements_per_request']:>16}")
+    if args.output:
+        save_results(args.output, results)
+    if args.baseline:
+        compare_to_baseline(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Scheduled-transfer throughput: insert N schedules that are all due now, drain them with the
+worker job (`app.jobs.scheduled_transfers --once`) using 1..P processes, and check that every
+schedule was executed exactly once.
+
+Example:
+    DB_NAME=secure_bank_bench python -m benchmarks.bench_scheduled_transfers --schedules 100000 --processes 1,4
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks.harness import environment_info, require_bench_database, save_results, seed_customers
+
+PASSWORD = "BenchPass123"
+INSERT_CHUNK = 5000
+
+
+async def _max_id(cur, table: str, column: str) -> int:
+    await cur.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+    return int((await cur.fetchone())[0])
+
+
+async def prepare(args, customers) -> dict:
+    """Insert the due schedules directly; returns the id watermarks used by verify()."""
+    from app.database.database import db
+
+    rng = random.Random(args.seed)
+    due = datetime.utcnow() - timedelta(seconds=1)
+    async with db.pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            marks = {
+                "schedule_id": await _max_id(cur, "scheduled_transfers", "schedule_id"),
+                "transaction_id": await _max_id(cur, "transactions", "transaction_id"),
+            }
+            for start in range(0, args.schedules, INSERT_CHUNK):
+                rows = []
+                for _ in range(min(INSERT_CHUNK, args.schedules - start)):
+                    sender, recipient = rng.sample(customers, 2)
+                    rows.append((sender["user_id"], recipient["account_number"], "0.01", "once", due, due))
+                await cur.executemany(
+                    """
+                    INSERT INTO scheduled_transfers (
+                        user_id, to_account_number, amount, frequency, first_run_at, next_run_at
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    """,
+                    rows,
+                )
+                await conn.commit()
+    return marks
+
+
+async def verify(marks: dict) -> dict:
+    from app.database.database import db
+
+    async with db.pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT status, COUNT(*), COALESCE(SUM(run_count), 0), COALESCE(MAX(run_count), 0)
+                FROM scheduled_transfers WHERE schedule_id > %s GROUP BY status
+                """,
+                (marks["schedule_id"],),
+            )
+            by_status = {row[0]: {"schedules": row[1], "runs": int(row[2]), "max_runs": int(row[3])}
+                         for row in await cur.fetchall()}
+            await cur.execute(
+                "SELECT COUNT(*) FROM transactions WHERE transaction_id > %s AND transaction_type = 'transfer_out'",
+                (marks["transaction_id"],),
+            )
+            transfers = (await cur.fetchone())[0]
+            await conn.rollback()
+    return {"by_status": by_status, "transfer_out_rows": transfers}
+
+
+async def _with_db(fn, *args):
+    from app.database.database import db
+
+    await db.connect()
+    try:
+        return await fn(*args)
+    finally:
+        await db.disconnect()
+
+
+async def _seed(args):
+    return await seed_customers(args.customers, args.customers * 2, f"bench_{uuid.uuid4().hex[:6]}", PASSWORD)
+
+
+def run_for_processes(processes: int, args, customers) -> dict:
+    from app.jobs.scheduled_transfers import run_processes
+
+    marks = asyncio.run(_with_db(prepare, args, customers))
+    summary = run_processes(processes, args.batch_size, args.concurrency, 0.1, True)
+    check = asyncio.run(_with_db(verify, marks))
+
+    failures = []
+    completed = check["by_status"].get("completed", {})
+    if check["by_status"].keys() - {"completed", "failed"}:
+        failures.append(f"schedules left unprocessed: {check['by_status']}")
+    if completed.get("max_runs", 0) > 1:
+        failures.append("a one-off schedule ran more than once")
+    if check["transfer_out_rows"] != completed.get("runs", 0):
+        failures.append(f"{check['transfer_out_rows']} transfers for {completed.get('runs', 0)} completed runs")
+    return {"processes": processes, "job": summary, "check": check, "failures": failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure scheduled-transfer execution throughput")
+    parser.add_argument("--schedules", type=int, default=100000)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--processes", default="1,4", help="comma separated worker process counts")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--force", action="store_true", help="allow seeding a database not named *bench")
+    args = parser.parse_args()
+
+    require_bench_database(args.force)
+    customers = asyncio.run(_with_db(_seed, args))
+
+    runs = {}
+    for processes in (int(p) for p in args.processes.split(",")):
+        result = run_for_processes(processes, args, customers)
+        runs[str(processes)] = result
+        job = result["job"]
+        print(f"processes={processes}: {job['schedules']} schedules in {job['elapsed_seconds']}s "
+              f"({job['schedules_per_second']}/s), executed={job['executed']} failed={job['failed']}")
+        for failure in result["failures"]:
+            print(f"FAIL {failure}")
+
+    results = {"benchmark": "scheduled_transfers", "environment": environment_info(), "config": vars(args), "runs": runs}
+    if args.output:
+        save_results(args.output, results)
+    raise SystemExit(1 if any(r["failures"] for r in runs.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
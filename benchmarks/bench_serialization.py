@@ -0,0 +1,155 @@
+"""
+Serialization benchmark for the money and history endpoints, without MySQL or Redis.
+
+Serves the same pre-built rows (a 200-row history page, a large admin customer list and a
+profile) through small FastAPI apps that differ only in how the response is encoded:
+
+  legacy      no response model, JSONResponse (jsonable_encoder walk + json.dumps)
+  model_json  response model, JSONResponse (pydantic-core validate/dump + json.dumps)
+  model_fast  response model, FastJSONResponse (what the app uses: pydantic-core end to end)
+
+Also checks that Decimal amounts come out as exact strings.
+
+Example:
+    python -m benchmarks.bench_serialization --iterations 500 --customers 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+from benchmarks.harness import ASGIClient, environment_info, percentile, save_results
+
+
+def build_rows(history_rows: int, customers: int) -> dict:
+    started = datetime(2024, 1, 1, 9, 30)
+    history = [
+        {
+            "transaction_id": i,
+            "account_number": "9000000001",
+            "transaction_type": ("deposit", "withdraw", "transfer_in", "transfer_out")[i % 4],
+            "amount": Decimal("0.10") + Decimal(i),
+            "balance_after": Decimal("1000000.01") + Decimal(i),
+            "related_account": "9000000002" if i % 2 else None,
+            "created_at": started + timedelta(minutes=i),
+        }
+        for i in range(history_rows)
+    ]
+    customer_list = [
+        {
+            "user_id": i,
+            "username": f"customer_{i}",
+            "email": f"customer_{i}@example.com",
+            "role": "customer",
+            "created_at": started + timedelta(hours=i),
+            "account_number": str(9000000000 + i),
+            "balance": Decimal("12345.67") + Decimal(i),
+            "account_status": "active",
+        }
+        for i in range(customers)
+    ]
+    profile = {
+        "user_id": 1,
+        "username": "customer_1",
+        "email": "customer_1@example.com",
+        "role": "customer",
+        "account_created_at": started,
+        "account_number": "9000000001",
+        "current_balance": Decimal("1000.10"),
+        "account_status": "active",
+    }
+    return {"history": history, "customers": customer_list, "profile": profile}
+
+
+def build_app(variant: str, rows: dict):
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+
+    from app.core.responses import FastJSONResponse
+    from app.models.user import CustomerProfileResponse, CustomerSummaryResponse, TransactionHistoryItem
+
+    response_class = FastJSONResponse if variant == "model_fast" else JSONResponse
+    app = FastAPI(default_response_class=response_class)
+    typed = variant != "legacy"
+
+    @app.get("/history", response_model=List[TransactionHistoryItem] if typed else None)
+    async def history():
+        return rows["history"]
+
+    @app.get("/customers", response_model=List[CustomerSummaryResponse] if typed else None)
+    async def customers():
+        return rows["customers"]
+
+    @app.get("/profile", response_model=CustomerProfileResponse if typed else None)
+    async def profile():
+        return rows["profile"]
+
+    return app
+
+
+async def measure(app, path: str, iterations: int) -> dict:
+    client = ASGIClient(app)
+    await client.request("GET", path)
+    latencies = []
+    body = b""
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = await client.request("GET", path)
+        latencies.append((time.perf_counter() - started) * 1000)
+        body = response["body"]
+    latencies.sort()
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "requests_per_second": round(iterations / (sum(latencies) / 1000), 1),
+        "bytes": len(body),
+        "body": body,
+    }
+
+
+async def main_async(args) -> dict:
+    rows = build_rows(args.history_rows, args.customers)
+    results = {}
+    failures = []
+    for variant in ("legacy", "model_json", "model_fast"):
+        app = build_app(variant, rows)
+        results[variant] = {}
+        for path in ("/history", "/customers", "/profile"):
+            row = await measure(app, path, args.iterations)
+            body = row.pop("body")
+            results[variant][path] = row
+            print(f"{variant:<11}{path:<11} p50={row['p50_ms']:>8}ms p99={row['p99_ms']:>8}ms "
+                  f"{row['requests_per_second']:>9} req/s {row['bytes']:>8} bytes")
+            if variant == "model_fast" and path == "/history":
+                first = json.loads(body)[0]
+                if first["amount"] != "0.10" or first["balance_after"] != "1000000.01":
+                    failures.append(f"Decimal not encoded as exact string: {first}")
+
+    for path in ("/history", "/customers", "/profile"):
+        before, after = results["legacy"][path]["p50_ms"], results["model_fast"][path]["p50_ms"]
+        print(f"{path:<11} legacy -> model_fast p50: {before}ms -> {after}ms ({(after - before) / before * 100:+.1f}%)")
+    return {"benchmark": "serialization", "environment": environment_info(), "config": vars(args),
+            "variants": results, "failures": failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare response encoding paths for large JSON payloads")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--history-rows", type=int, default=200)
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.output:
+        save_results(args.output, results)
+    for failure in results["failures"]:
+        print(f"FAIL {failure}")
+    raise SystemExit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
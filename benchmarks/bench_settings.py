@@ -0,0 +1,137 @@
+"""
+Settings benchmark, without MySQL or Redis.
+
+  import      `import main` in fresh interpreters (--runs of them): median wall time, how often
+              .env was read and how many os.getenv calls the import made
+  requests    os.getenv calls made by the per-request paths that used to read the environment
+              (rate-limit fail policy, token signing, OTP email configuration), and the cost of
+              those lookups as they were (os.getenv + parsing) against get_settings() attributes
+
+Example:
+    python -m benchmarks.bench_settings --runs 10 --iterations 200000 --output bench_results/settings.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import timeit
+
+from benchmarks.harness import environment_info, save_results
+
+# Runs in a fresh interpreter: count .env reads and os.getenv calls made while importing the app.
+_IMPORT_PROBE = """
+import json, os, time
+import dotenv
+counts = {"dotenv_reads": 0, "getenv_calls": 0}
+def counting(fn, key):
+    def wrapper(*args, **kwargs):
+        counts[key] += 1
+        return fn(*args, **kwargs)
+    return wrapper
+dotenv.load_dotenv = counting(dotenv.load_dotenv, "dotenv_reads")
+dotenv.dotenv_values = counting(dotenv.dotenv_values, "dotenv_reads")
+os.getenv = counting(os.getenv, "getenv_calls")
+started = time.perf_counter()
+import main
+counts["import_ms"] = (time.perf_counter() - started) * 1000
+print(json.dumps(counts))
+"""
+
+
+def measure_import(runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE],
+            env=dict(os.environ, LOG_LEVEL="WARNING"),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "runs": runs,
+        "import_ms_median": round(statistics.median(s["import_ms"] for s in samples), 2),
+        "import_ms_min": round(min(s["import_ms"] for s in samples), 2),
+        "dotenv_reads": samples[-1]["dotenv_reads"],
+        "getenv_calls": samples[-1]["getenv_calls"],
+    }
+
+
+def _legacy_lookups():
+    # What AdminService.send_otp_email and get_fail_policy read per call before Settings.
+    smtp = (
+        os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+        int(os.getenv("SMTP_PORT", "587")),
+        os.getenv("SMTP_EMAIL"),
+        os.getenv("SMTP_PASSWORD"),
+    )
+    policy = os.getenv("RATE_LIMIT_FAIL_POLICY_ADMIN_LOGIN") or "closed"
+    return smtp, policy.lower()
+
+
+def measure_requests(iterations: int) -> dict:
+    from app.core import rate_limit
+    from app.core.config import get_settings
+    from app.core.security import create_access_token
+
+    def settings_lookups():
+        settings = get_settings()
+        smtp = (settings.smtp_server, settings.smtp_port, settings.smtp_email, settings.smtp_password)
+        policy = settings.rate_limit_fail_policies.get("admin_login") or "closed"
+        return smtp, policy
+
+    get_settings()
+    calls = 0
+    original = os.getenv
+
+    def counting_getenv(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return original(*args, **kwargs)
+
+    os.getenv = counting_getenv
+    try:
+        rate_limit.get_fail_policy("admin_login")
+        rate_limit.get_fail_policy("customer_login")
+        create_access_token({"sub": "bench", "id": 1, "role": "customer"})
+        settings_lookups()
+    finally:
+        os.getenv = original
+
+    legacy = timeit.timeit(_legacy_lookups, number=iterations) / iterations * 1e9
+    current = timeit.timeit(settings_lookups, number=iterations) / iterations * 1e9
+    return {
+        "getenv_calls_per_request_path": calls,
+        "legacy_lookup_ns": round(legacy, 1),
+        "settings_lookup_ns": round(current, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure settings import cost and per-request environment lookups")
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters for the import measurement")
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "settings",
+        "environment": environment_info(),
+        "config": vars(args),
+        "import": measure_import(args.runs),
+        "requests": measure_requests(args.iterations),
+    }
+    imp, req = results["import"], results["requests"]
+    print(f"--- import main: {imp['import_ms_median']}ms median, {imp['dotenv_reads']} .env read(s), "
+          f"{imp['getenv_calls']} os.getenv call(s) ---")
+    print(f"--- request paths: {req['getenv_calls_per_request_path']} os.getenv call(s); lookups "
+          f"{req['legacy_lookup_ns']}ns as os.getenv -> {req['settings_lookup_ns']}ns from Settings ---")
+    if args.output:
+        save_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Worker-count benchmark: run the mixed endpoint workload over real HTTP against `serve.py`
+with 1 worker and with N workers, using the same seeded customers for both.
+
+The load generator is a single asyncio process; give it enough --concurrency to keep every
+worker busy, and check its own CPU usage when the numbers stop scaling.
+
+Example:
+    DB_NAME=secure_bank_bench python -m benchmarks.bench_workers --workers 1,4 --requests 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+from benchmarks.bench_endpoints import PASSWORD, run_workload
+from benchmarks.harness import HTTPClient, environment_info, require_bench_database, save_results, seed_customers
+
+
+async def wait_until_ready(client: HTTPClient, workers: int, timeout: float) -> None:
+    """Requests land on arbitrary workers, so require a run of consecutive 200s."""
+    deadline = time.perf_counter() + timeout
+    streak = 0
+    while streak < workers * 4:
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"server not ready after {timeout}s")
+        try:
+            response = await client.request("GET", "/health/ready")
+            streak = streak + 1 if response["status"] == 200 else 0
+        except OSError:
+            streak = 0
+        if streak == 0:
+            await asyncio.sleep(0.05)
+
+
+async def run_for_workers(workers: int, args, customers, admin_token: str) -> dict:
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(args.port)],
+        env=dict(os.environ, LOG_LEVEL="WARNING"),
+    )
+    client = HTTPClient("127.0.0.1", args.port, connections=args.concurrency)
+    try:
+        await wait_until_ready(client, workers, args.timeout)
+        await run_workload(client, customers, admin_token, min(500, args.requests), args.concurrency, args.seed + 1)
+        stats, wall = await run_workload(client, customers, admin_token, args.requests, args.concurrency, args.seed)
+    finally:
+        await client.close()
+        process.terminate()
+        process.wait(timeout=30)
+
+    total = sum(len(s.latencies_ms) for s in stats.values())
+    return {
+        "workers": workers,
+        "wall_seconds": round(wall, 3),
+        "total_throughput_rps": round(total / wall, 1) if wall else 0.0,
+        "endpoints": {name: s.summary(wall) for name, s in stats.items()},
+    }
+
+
+async def main_async(args) -> dict:
+    from app.core.security import create_access_token
+    from app.database.database import db
+
+    await db.connect()
+    try:
+        customers = await seed_customers(args.customers, args.ledger_rows, f"bench_{uuid.uuid4().hex[:6]}", PASSWORD)
+    finally:
+        await db.disconnect()
+    admin_token = create_access_token({"sub": "bench_admin", "id": 0, "role": "admin"})
+
+    runs = {}
+    for workers in (int(w) for w in args.workers.split(",")):
+        result = await run_for_workers(workers, args, customers, admin_token)
+        runs[str(workers)] = result
+        print(f"\nworkers={workers}: {result['total_throughput_rps']} req/s")
+        print(f"{'endpoint':<14}{'reqs':>7}{'err':>6}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for name, row in result["endpoints"].items():
+            print(f"{name:<14}{row['requests']:>7}{row['errors']:>6}{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}")
+
+    return {"benchmark": "workers", "environment": environment_info(), "config": vars(args), "runs": runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare throughput and latency across worker counts")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="comma separated worker counts")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--ledger-rows", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=18001)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--force", action="store_true", help="allow seeding a database not named *bench")
+    args = parser.parse_args()
+
+    require_bench_database(args.force)
+    results = asyncio.run(main_async(args))
+    if args.output:
+        save_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Query-plan check: seed a bench database, call every repository method once while recording
+the statements they issue, then EXPLAIN each SELECT/UPDATE/DELETE and fail if any of them
+scans a whole table (type ALL) or a whole index (type index).
+
+Scans that are inherent to the query (table-wide aggregates, unpaginated listings) are listed
+in ALLOWED_SCANS with the reason. Run it after adding a query or a migration:
+
+    DB_NAME=secure_bank_bench python -m app.database.migrate
+    DB_NAME=secure_bank_bench python -m benchmarks.explain_check --customers 500
+"""
+import argparse
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from benchmarks.harness import capture_statements, install_statement_counter, require_bench_database, seed_customers
+
+PASSWORD = "BenchPass123"
+FULL_SCAN_TYPES = {"ALL", "index"}
+
+# (statement substring, table) -> why a full scan is expected
+ALLOWED_SCANS = {
+    ("SUM(balance) as total FROM accounts GROUP BY currency", "accounts"): "statistics sums every account",
+    ("SUM(pc.amount) as total FROM pending_credits", "pc"): "statistics total includes every pending credit",
+    ("SELECT DISTINCT account_number FROM pending_credits", "pending_credits"): "folder job drains the whole queue",
+    ("WHERE u.role = 'customer' AND u.deleted_at IS NULL ORDER BY u.created_at DESC", "u"): "unpaginated admin listing returns every customer",
+    ("u.username LIKE %s", "u"): "substring search cannot use a B-tree index",
+    ("rate, updated_at FROM fx_rates", "fx_rates"): "the rate cache loads the whole (small) table",
+    ("FROM screening_rules ORDER BY rule_name", "screening_rules"): "rule config loads the whole (small) table",
+    ("SELECT COUNT(*) AS accounts FROM accounts", "accounts"): "statement progress counts every account",
+    ("SUM(balance) AS total FROM accounts GROUP BY currency", "accounts"): "the first daily snapshot is seeded from every account",
+    ("FROM daily_stats ORDER BY day DESC LIMIT 1", "daily_stats"): "reads one row from the end of the primary key",
+    ("MAX(interest_posted_on) AS interest", "accounts"): "posting job checks the latest posted date once per run",
+}
+
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+
+
+async def exercise_repository(customers) -> None:
+    """Call each repository method once with realistic arguments."""
+    from app.repositories.user_repo import UserRepository as repo
+
+    first, second = customers[0], customers[1]
+    await repo.get_user_by_username(first["username"])
+    await repo.get_customer_login(first["username"])
+    await repo.get_auth_state(first["user_id"])
+    await repo.get_user_by_email(f"{first['username']}@bench.local")
+    await repo.get_user_by_id(first["user_id"])
+    await repo.check_username_exists(first["username"])
+    await repo.check_username_exists(first["username"], exclude_user_id=first["user_id"])
+    await repo.check_email_exists("nobody@bench.local")
+    await repo.check_email_exists("nobody@bench.local", exclude_user_id=first["user_id"])
+    await repo.get_customer_profile_by_user_id(first["user_id"])
+    await repo.get_customer_by_account_number(first["account_number"])
+    await repo.get_accounts_by_user_id(first["user_id"])
+    await repo.get_transaction_history_by_user_id(first["user_id"], limit=50, offset=50)
+
+    await repo.add_cash_by_account(first["account_number"], Decimal("5.00"))
+    await repo.withdraw_cash_by_account(first["account_number"], Decimal("1.00"))
+    await repo.withdraw_cash_by_user_id(first["user_id"], Decimal("1.00"))
+    await repo.withdraw_cash_by_user_id(first["user_id"], Decimal("1.00"), first["account_number"])
+    await repo.transfer_between_accounts(first["user_id"], second["account_number"], Decimal("1.00"))
+
+    await repo.set_hot_account(second["account_number"], True)
+    await repo.transfer_between_accounts(first["user_id"], second["account_number"], Decimal("1.00"))
+    await repo.get_accounts_with_pending_credits()
+    await repo.withdraw_cash_by_user_id(second["user_id"], Decimal("1.00"))
+    await repo.transfer_between_accounts(first["user_id"], second["account_number"], Decimal("1.00"))
+    await repo.fold_pending_credits(second["account_number"])
+    await repo.set_hot_account(second["account_number"], False)
+
+    await repo.get_all_customers()
+    await repo.get_customer_by_id(first["user_id"])
+    await repo.search_customers(first["username"][-4:])
+    await repo.get_statistics()
+    await repo.update_customer(first["user_id"], email=f"{first['username']}@bench.local")
+    await repo.update_account_status(first["user_id"], "active")
+    await repo.update_user_otp(first["user_id"], "123456", datetime.utcnow() + timedelta(minutes=5), reset_attempts=True)
+    await repo.update_user_otp(first["user_id"], "654321", datetime.utcnow() + timedelta(minutes=5))
+    await repo.increment_otp_attempts(first["user_id"])
+    await repo.update_user_otp(first["user_id"], None)
+
+    now = datetime.utcnow()
+    schedule_id = await repo.create_scheduled_transfer(
+        first["user_id"], second["account_number"], Decimal("1.00"), "monthly", now, None
+    )
+    await repo.get_scheduled_transfer(first["user_id"], schedule_id)
+    await repo.get_scheduled_transfers_by_user_id(first["user_id"])
+    worker_id = f"explain_{uuid.uuid4().hex[:6]}"
+    await repo.claim_due_scheduled_transfers(worker_id, now + timedelta(seconds=1), now + timedelta(minutes=2), 10)
+    await repo.complete_scheduled_run(schedule_id, worker_id, 1, now + timedelta(days=30), "active", now)
+    await repo.record_scheduled_failure(schedule_id, worker_id, "explain", 1, 1, now, "active", now)
+    await repo.cancel_scheduled_transfer(first["user_id"], schedule_id)
+
+    hold_id = await repo.create_hold(first["user_id"], Decimal("2.00"), now + timedelta(minutes=5), "explain")
+    await repo.get_hold(first["user_id"], hold_id)
+    await repo.get_holds_by_user_id(first["user_id"])
+    await repo.capture_hold(first["user_id"], hold_id, Decimal("1.00"), now)
+    hold_id = await repo.create_hold(first["user_id"], Decimal("1.00"), now + timedelta(minutes=5))
+    await repo.release_hold(first["user_id"], hold_id, now)
+    await repo.create_hold(first["user_id"], Decimal("1.00"), now - timedelta(seconds=1))
+    await repo.expire_holds(now, 10)
+
+    await repo.upsert_fx_rates([("EUR", "USD", Decimal("1.08")), ("GBP", "USD", Decimal("1.27"))])
+    await repo.get_fx_rates()
+    await repo.get_customer_account(first["user_id"])
+    await repo.get_customer_account(first["user_id"], first["account_number"])
+    rules = await repo.get_screening_rules()
+    if rules:
+        await repo.update_screening_rule(rules[0]["rule_name"], enabled=rules[0]["enabled"])
+
+    now_utc = datetime.utcnow().replace(microsecond=0)
+    await repo.insert_audit_records(
+        [
+            {"record_id": uuid.uuid4().hex, "actor_id": 1, "actor": "explain", "action": "update_status", "target_type": "customer",
+             "target_id": str(first["user_id"]), "changes": {"status": {"before": "active", "after": "active"}},
+             "request_id": None, "created_at": now_utc},
+        ]
+    )
+    await repo.get_audit_log()
+    await repo.get_audit_log(actor_id=1, before_id=10**12)
+    await repo.get_audit_log(action="update_status")
+    await repo.get_audit_log(target_type="customer", target_id=str(first["user_id"]))
+
+    bounds = await repo.get_account_id_bounds()
+    period_start, period_end = datetime(2000, 1, 1), datetime(2100, 1, 1)
+    pending_statements = await repo.get_statement_accounts("2000-01", bounds["min_id"] - 1, bounds["max_id"], 50)
+    await repo.get_balance_before(first["account_number"], period_end)
+    statement_rows = await repo.get_statement_rows(first["account_number"], period_start, period_end, None, 100)
+    if statement_rows:
+        last = statement_rows[-1]
+        await repo.get_statement_rows(
+            first["account_number"], period_start, period_end, (last["created_at"], last["transaction_id"]), 100
+        )
+    await repo.record_statements(
+        "2000-01",
+        [
+            {**account, "opening_balance": Decimal("0.00"), "closing_balance": Decimal("0.00"),
+             "transaction_count": 0, "files": ""}
+            for account in pending_statements[:1]
+        ],
+    )
+    await repo.get_statement_progress("2000-01")
+    first_account_id = bounds["min_id"]
+    await repo.get_last_posting_dates()
+    await repo.post_interest_chunk(datetime(2000, 1, 1).date(), first_account_id - 1, first_account_id, Decimal("0"))
+    await repo.post_fee_chunk(datetime(2000, 1, 1).date(), first_account_id - 1, first_account_id, Decimal("0"), Decimal("0"))
+    await repo.reconcile_account_chunk(bounds["min_id"] - 1, bounds["max_id"], 50, 500)
+    await repo.verify_ledger_chain_chunk(bounds["min_id"] - 1, bounds["max_id"], 50, 500)
+
+    stats_day = datetime(2000, 1, 1).date()
+    activity = await repo.get_activity(datetime(2000, 1, 1), datetime(2000, 1, 2))
+    totals = await repo.get_current_totals(datetime(2000, 1, 2))
+    await repo.save_daily_stats(
+        stats_day,
+        {"new_customers": activity["new_customers"], "deleted_customers": activity["deleted_customers"],
+         "total_customers": totals["total_customers"], "active_accounts": await repo.count_active_accounts()},
+        totals["balances"],
+        activity["flows"],
+    )
+    await repo.get_latest_daily_stats()
+    await repo.get_earliest_daily_stats_day()
+    await repo.get_daily_stats_range(stats_day, stats_day + timedelta(days=365))
+
+    throwaway = f"explain_{uuid.uuid4().hex[:8]}"
+    user_id = await repo.create_user(throwaway, f"{throwaway}@bench.local", "x")
+    await repo.create_account(user_id, f"EX{uuid.uuid4().hex[:10].upper()}")
+    await repo.create_account(user_id, f"EX{uuid.uuid4().hex[:10].upper()}", "EUR")
+    await repo.delete_customer(user_id)
+    await repo.get_customers_to_purge(datetime.utcnow(), 10)
+    await repo.release_customer_holds(user_id, datetime.utcnow(), 10, 2)
+    await repo.delete_customer_schedules(user_id, 10, 2)
+    await repo.anonymize_customer(user_id, 2)
+
+
+def _allowed(query: str, table: str) -> str | None:
+    for (fragment, allowed_table), reason in ALLOWED_SCANS.items():
+        if fragment in query and table == allowed_table:
+            return reason
+    return None
+
+
+async def explain_all(statements) -> list:
+    """EXPLAIN every captured statement; returns one row per (statement, table) with a full scan."""
+    import aiomysql
+
+    from app.database.database import db
+
+    violations = []
+    async with db.pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            for normalized, (query, args) in sorted(statements.items()):
+                if not normalized.upper().startswith(_EXPLAINABLE) or normalized.upper().startswith("SELECT GET_LOCK"):
+                    continue
+                await cur.execute(f"EXPLAIN {query}", args)
+                for plan in await cur.fetchall():
+                    table = plan.get("table") or ""
+                    if plan.get("type") not in FULL_SCAN_TYPES or table.startswith("<"):
+                        continue
+                    reason = _allowed(normalized, table)
+                    status = f"allowed ({reason})" if reason else "FULL SCAN"
+                    print(f"{status:<12} {table:<16} type={plan['type']:<6} rows={plan.get('rows')} {normalized[:110]}")
+                    if not reason:
+                        violations.append({"statement": normalized, "table": table, "type": plan["type"]})
+        await conn.rollback()
+    return violations
+
+
+async def main_async(args) -> int:
+    from app.database.database import db
+    from app.database.migrate import pending_migrations
+
+    install_statement_counter()
+    await db.connect()
+    try:
+        pending = await pending_migrations()
+        if pending:
+            print("Pending migrations; run python -m app.database.migrate first")
+            return 1
+        customers = await seed_customers(args.customers, args.ledger_rows, f"bench_{uuid.uuid4().hex[:6]}", PASSWORD)
+        # Fresh statistics so the optimizer sees the seeded row counts.
+        async with db.pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("ANALYZE TABLE users, accounts, transactions, pending_credits, scheduled_transfers, holds")
+                await cur.fetchall()
+
+        with capture_statements() as statements:
+            await exercise_repository(customers)
+        print(f"Captured {len(statements)} distinct statements")
+        violations = await explain_all(statements)
+    finally:
+        await db.disconnect()
+
+    print(f"{len(violations)} statement(s) with an unexpected full scan")
+    return 1 if violations else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if any repository query does a full table or index scan")
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--ledger-rows", type=int, default=2000)
+    parser.add_argument("--force", action="store_true", help="allow seeding a database not named *bench")
+    args = parser.parse_args()
+
+    require_bench_database(args.force)
+    raise SystemExit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Local fault-injecting TCP proxy used by the degradation drills.
+
+Modes:
+  pass       forward traffic unchanged
+  delay      forward traffic, sleeping `delay_ms` before every chunk
+  blackhole  accept connections and swallow traffic without answering
+  reset      close new and existing connections immediately
+
+Standalone:
+    python -m benchmarks.fault_proxy --listen 16379 --target 127.0.0.1:6379 --mode delay --delay-ms 300
+"""
+import argparse
+import asyncio
+
+MODES = ("pass", "delay", "blackhole", "reset")
+
+
+class FaultProxy:
+    def __init__(self, listen_port: int, target_host: str, target_port: int, mode: str = "pass", delay_ms: int = 0):
+        self.listen_port = listen_port
+        self.target_host = target_host
+        self.target_port = target_port
+        self.mode = mode
+        self.delay_ms = delay_ms
+        self._server = None
+        self._writers = set()
+
+    def set_mode(self, mode: str, delay_ms: int | None = None) -> None:
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.mode = mode
+        if delay_ms is not None:
+            self.delay_ms = delay_ms
+        if mode == "reset":
+            for writer in list(self._writers):
+                writer.close()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", self.listen_port)
+
+    async def stop(self) -> None:
+        for writer in list(self._writers):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _pipe(self, reader, writer):
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                if self.mode == "blackhole":
+                    continue
+                if self.mode == "reset":
+                    break
+                if self.mode == "delay" and self.delay_ms:
+                    await asyncio.sleep(self.delay_ms / 1000)
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        if self.mode == "reset":
+            client_writer.close()
+            return
+        self._writers.add(client_writer)
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(self.target_host, self.target_port)
+        except OSError:
+            client_writer.close()
+            self._writers.discard(client_writer)
+            return
+        self._writers.add(upstream_writer)
+        await asyncio.gather(
+            self._pipe(client_reader, upstream_writer),
+            self._pipe(upstream_reader, client_writer),
+        )
+        self._writers.discard(client_writer)
+        self._writers.discard(upstream_writer)
+
+
+async def _serve(args):
+    host, port = args.target.rsplit(":", 1)
+    proxy = FaultProxy(args.listen, host, int(port), args.mode, args.delay_ms)
+    await proxy.start()
+    print(f"Proxy 127.0.0.1:{args.listen} -> {args.target} mode={args.mode}")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fault-injecting TCP proxy")
+    parser.add_argument("--listen", type=int, required=True)
+    parser.add_argument("--target", required=True, help="host:port")
+    parser.add_argument("--mode", choices=MODES, default="pass")
+    parser.add_argument("--delay-ms", type=int, default=0)
+    asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Shared helpers for the benchmark scripts.
+
+The benchmarks talk to a real MySQL and Redis (a local docker container or any throwaway
+instance); point DB_* and REDIS_URL at them. Seeding refuses to run unless DB_NAME ends in
+"bench", so a production database is never written to by accident.
+"""
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import random
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import aiomysql
+from redis.asyncio import connection as redis_connection
+
+_statement_counter: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("bench_statements", default=None)
+_original_execute = aiomysql.Cursor.execute
+_redis_connection_cls = getattr(redis_connection, "AbstractConnection", redis_connection.Connection)
+_original_send_packed = _redis_connection_cls.send_packed_command
+_captured_statements: Optional[Dict[str, Tuple[str, Any]]] = None
+
+
+async def _counting_execute(self, query, args=None):
+    counter = _statement_counter.get()
+    if counter is not None:
+        counter["statements"] += 1
+    if _captured_statements is not None:
+        _captured_statements.setdefault(" ".join(query.split()), (query, args))
+    return await _original_execute(self, query, args)
+
+
+async def _counting_send_packed(self, command, *args, **kwargs):
+    counter = _statement_counter.get()
+    if counter is not None:
+        counter["redis_round_trips"] += 1
+    return await _original_send_packed(self, command, *args, **kwargs)
+
+
+def install_statement_counter() -> None:
+    """
+    Count every cursor.execute and every Redis round trip (a pipeline counts once) issued
+    by the app, attributed to the request that issued it.
+    """
+    aiomysql.Cursor.execute = _counting_execute
+    _redis_connection_cls.send_packed_command = _counting_send_packed
+
+
+@contextmanager
+def capture_statements() -> Iterator[Dict[str, Tuple[str, Any]]]:
+    """
+    Record the first (query, args) executed for each distinct statement text while the block runs.
+    Requires install_statement_counter().
+    """
+    global _captured_statements
+    captured: Dict[str, Tuple[str, Any]] = {}
+    _captured_statements = captured
+    try:
+        yield captured
+    finally:
+        _captured_statements = None
+
+
+def require_bench_database(force: bool = False) -> None:
+    from app.core.config import Settings
+
+    name = Settings.from_env().db_name
+    if not force and not name.endswith("bench"):
+        raise SystemExit(f"Refusing to seed DB_NAME={name!r}; use a database whose name ends in 'bench' or pass --force")
+
+
+class ASGIClient:
+    """Minimal in-process HTTP client that drives an ASGI app without sockets."""
+
+    def __init__(self, app):
+        self.app = app
+        self._lifespan_task = None
+        self._lifespan_queue: asyncio.Queue = asyncio.Queue()
+        self._lifespan_events: asyncio.Queue = asyncio.Queue()
+
+    async def startup(self) -> None:
+        async def receive():
+            return await self._lifespan_queue.get()
+
+        async def send(message):
+            await self._lifespan_events.put(message)
+
+        self._lifespan_task = asyncio.create_task(
+            self.app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send)
+        )
+        await self._lifespan_queue.put({"type": "lifespan.startup"})
+        message = await self._lifespan_events.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Application startup failed: {message}")
+
+    async def shutdown(self) -> None:
+        if self._lifespan_task is None:
+            return
+        await self._lifespan_queue.put({"type": "lifespan.shutdown"})
+        await self._lifespan_events.get()
+        await self._lifespan_task
+
+    async def request(self, method: str, path: str, json_body: Any = None, headers: Dict[str, str] | None = None,
+                      query: str = "") -> dict:
+        body = b"" if json_body is None else json.dumps(json_body, default=str).encode()
+        raw_headers = [(b"host", b"bench"), (b"content-length", str(len(body)).encode())]
+        if json_body is not None:
+            raw_headers.append((b"content-type", b"application/json"))
+        for key, value in (headers or {}).items():
+            raw_headers.append((key.lower().encode(), value.encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+            "root_path": "",
+        }
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Event().wait()
+
+        response = {"status": None, "headers": [], "body": b""}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+
+        await self.app(scope, receive, send)
+        return response
+
+
+
+class HTTPClient:
+    """
+    Minimal keep-alive HTTP/1.1 client with the same request() interface as ASGIClient,
+    for driving a real server process (serve.py, uvicorn) over TCP.
+    """
+
+    def __init__(self, host: str, port: int, connections: int = 32):
+        self.host = host
+        self.port = port
+        self._idle: asyncio.LifoQueue = asyncio.LifoQueue()
+        self._slots = asyncio.Semaphore(connections)
+
+    async def close(self) -> None:
+        while not self._idle.empty():
+            _, writer = self._idle.get_nowait()
+            writer.close()
+
+    async def _read_body(self, reader, headers: Dict[str, str]) -> bytes:
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int((await reader.readline()).strip().split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    return body
+                body += await reader.readexactly(size)
+                await reader.readline()
+        return await reader.readexactly(int(headers.get("content-length", "0")))
+
+    async def request(self, method: str, path: str, json_body: Any = None, headers: Dict[str, str] | None = None,
+                      query: str = "") -> dict:
+        body = b"" if json_body is None else json.dumps(json_body, default=str).encode()
+        target = f"{path}?{query}" if query else path
+        lines = [f"{method} {target} HTTP/1.1", f"host: {self.host}:{self.port}", f"content-length: {len(body)}"]
+        if json_body is not None:
+            lines.append("content-type: application/json")
+        lines.extend(f"{key}: {value}" for key, value in (headers or {}).items())
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+        async with self._slots:
+            for attempt in range(2):
+                reused = not self._idle.empty()
+                reader, writer = self._idle.get_nowait() if reused else await asyncio.open_connection(self.host, self.port)
+                try:
+                    writer.write(payload)
+                    await writer.drain()
+                    status_line = await reader.readline()
+                    if not status_line and reused and attempt == 0:
+                        # The server closed the idle connection (keep-alive timeout); retry on a new one.
+                        writer.close()
+                        continue
+                    response_headers: Dict[str, str] = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b""):
+                            break
+                        key, _, value = line.decode("latin-1").partition(":")
+                        response_headers[key.strip().lower()] = value.strip()
+                    response_body = await self._read_body(reader, response_headers)
+                except Exception:
+                    writer.close()
+                    raise
+                break
+            keep_alive = status_line.startswith(b"HTTP/1.1") and response_headers.get("connection", "").lower() != "close"
+            if keep_alive:
+                self._idle.put_nowait((reader, writer))
+            else:
+                writer.close()
+
+        return {
+            "status": int(status_line.split()[1]),
+            "headers": [(k.encode(), v.encode()) for k, v in response_headers.items()],
+            "body": response_body,
+        }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.statements = 0
+        self.redis_round_trips = 0
+        self.errors = 0
+
+    def summary(self, wall_seconds: float) -> dict:
+        values = sorted(self.latencies_ms)
+        count = len(values)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "throughput_rps": round(count / wall_seconds, 1) if wall_seconds else 0.0,
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            "db_statements_per_request": round(self.statements / count, 2) if count else 0.0,
+            "redis_round_trips_per_request": round(self.redis_round_trips / count, 2) if count else 0.0,
+        }
+
+
+async def timed_call(stats: EndpointStats, coro_factory) -> Any:
+    counter = {"statements": 0, "redis_round_trips": 0}
+    token = _statement_counter.set(counter)
+    started = time.perf_counter()
+    try:
+        response = await coro_factory()
+    finally:
+        _statement_counter.reset(token)
+    stats.latencies_ms.append((time.perf_counter() - started) * 1000)
+    stats.statements += counter["statements"]
+    stats.redis_round_trips += counter["redis_round_trips"]
+    status = response.get("status") if isinstance(response, dict) else None
+    if status is not None and status >= 400:
+        stats.errors += 1
+    return response
+
+
+async def seed_customers(count: int, ledger_rows: int, prefix: str, password: str, concurrency: int = 20) -> List[dict]:
+    """
+    Create `count` customers with one account each, then spread `ledger_rows` deposits over them.
+    Everything goes through UserRepository so the seeded data matches what the app writes.
+    """
+    from app.core.security import get_password_hash
+    from app.repositories.user_repo import UserRepository
+
+    password_hash = get_password_hash(password)
+    semaphore = asyncio.Semaphore(concurrency)
+    customers: List[dict] = []
+
+    async def create(i: int):
+        async with semaphore:
+            username = f"{prefix}_{i}"
+            user_id = await UserRepository.create_user(username, f"{username}@bench.local", password_hash)
+            account_number = str(9000000000 + random.randint(0, 999999999))
+            while await UserRepository.get_customer_by_account_number(account_number):
+                account_number = str(9000000000 + random.randint(0, 999999999))
+            await UserRepository.create_account(user_id, account_number)
+            customers.append({"user_id": user_id, "username": username, "account_number": account_number})
+
+    await asyncio.gather(*(create(i) for i in range(count)))
+
+    async def deposit(i: int):
+        async with semaphore:
+            customer = customers[i % len(customers)]
+            await UserRepository.add_cash_by_account(customer["account_number"], Decimal("1000.00"))
+
+    await asyncio.gather(*(deposit(i) for i in range(ledger_rows)))
+    return customers
+
+
+def environment_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(path: str, results: dict) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(results, indent=2))
+    print(f"Results written to {path}")
+
+
+def compare_to_baseline(results: dict, baseline_path: str) -> None:
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\n{'endpoint':<20}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, current in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "db_statements_per_request",
+                       "redis_round_trips_per_request"):
+            old, new = before.get(metric, 0), current.get(metric, 0)
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            print(f"{name:<20}{metric:<16}{old:>12}{new:>12}{change:>10}")
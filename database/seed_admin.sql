@@ -0,0 +1,7 @@
+-- Seed the admin account (run after `python -m app.database.migrate`).
+-- Replace DUMMY_HASH with a bcrypt hash of the admin password.
+USE secure_bank;
+
+INSERT INTO users (username, email, password_hash, role)
+VALUES ('admin', 'admin@example.com', 'DUMMY_HASH', 'admin')
+ON DUPLICATE KEY UPDATE role = 'admin';
@@ -1,18 +1,87 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import signal
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.cache.redis_client import init_redis, close_redis
-from app.core.config import get_list_env
+from app.core.audit import audit_log
+from app.core.compression import CompressionMiddleware
+from app.core.circuit_breaker import DependencyUnavailableError
+from app.core.config import get_settings, reload_settings
+from app.core.events import event_hub
+from app.core.middleware import RequestTracingMiddleware
+from app.core.readiness import warm_up
+from app.core.responses import FastJSONResponse
 from app.database.database import db
-from app.routers import admin_router, user_router
+from app.services.fx_service import FxService
+from app.services.screening_service import ScreeningService
+from app.routers import admin_router, health_router, metrics_router, user_router
+
+# Validate the configuration once, before anything is served.
+logging.basicConfig(
+    level=get_settings().log_level,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+
+
+def _reload_settings() -> None:
+    try:
+        settings = reload_settings()
+    except RuntimeError as e:
+        logging.getLogger("app.config").error("Settings reload rejected, keeping the current settings: %s", e)
+        return
+    logging.getLogger().setLevel(settings.log_level)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # No DDL and no blocking connects here: the schema is applied by `python -m app.database.migrate`,
+    # and the pools warm in the background while /health/ready reports 503.
+    await db.connect()
+    await init_redis()
+    # `kill -HUP <pid>` re-reads .env and the environment in this worker without a restart.
+    loop = asyncio.get_running_loop()
+    if hasattr(signal, "SIGHUP"):
+        loop.add_signal_handler(signal.SIGHUP, _reload_settings)
+    event_hub.start()
+    audit_log.start()
+    warmup = asyncio.create_task(warm_up())
+    refreshers = [
+        asyncio.create_task(FxService.refresh_loop()),
+        asyncio.create_task(ScreeningService.refresh_loop()),
+    ]
+    try:
+        yield
+    finally:
+        if hasattr(signal, "SIGHUP"):
+            loop.remove_signal_handler(signal.SIGHUP)
+        for task in (warmup, *refreshers):
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await event_hub.stop()
+        # Buffered admin audit records still need the database pool.
+        await audit_log.stop()
+        await close_redis()
+        await db.disconnect()
+
 
 app = FastAPI(
     title="Secure Bank API",
     description="A secure banking system with Admin 2FA and Customer Management",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
-cors_origins = get_list_env("CORS_ALLOW_ORIGINS", default=[])
+# Added first, so it is the innermost middleware and compresses exactly what the routes returned.
+app.add_middleware(CompressionMiddleware)
+
+cors_origins = get_settings().cors_allow_origins
 cors_allow_credentials = bool(cors_origins) and "*" not in cors_origins
 
 app.add_middleware(
@@ -22,18 +91,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestTracingMiddleware)
 
-app.include_router(admin_router)
-app.include_router(user_router)
+@app.exception_handler(DependencyUnavailableError)
+async def dependency_unavailable_handler(request: Request, exc: DependencyUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily unavailable. Try again later."},
+        headers={"Retry-After": str(max(1, int(get_settings().cb_reset_timeout_seconds)))},
+    )
 
 
-@app.on_event("startup")
-async def startup():
-    await db.connect()
-    await init_redis()
-
+app.include_router(admin_router)
+app.include_router(user_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
 
-@app.on_event("shutdown")
-async def shutdown():
-    await close_redis()
-    await db.disconnect()
@@ -0,0 +1,147 @@
+"""
+Production entry point: uvicorn with one worker process per available CPU.
+
+    python serve.py                      # workers = WEB_CONCURRENCY or the CPUs this process may use
+    python serve.py --workers 4 --port 8000
+    python serve.py --print-plan         # show worker count and per-worker pool sizes, then exit
+
+Workers share nothing in memory: rate limits, cached profiles and auth state live in Redis,
+and every worker has its own MySQL and Redis pools, circuit breakers and /metrics counters.
+The connection budgets below are totals for the whole server and are divided across workers,
+so adding workers never pushes MySQL past `max_connections`:
+
+    DB_POOL_BUDGET      MySQL connections for all workers together (default 40)
+    REDIS_POOL_BUDGET   Redis connections for all workers together (default 200)
+
+Both, like WEB_CONCURRENCY, HOST and PORT, are read through app.core.config.Settings.
+"""
+import argparse
+import importlib.util
+import os
+
+from app.core.config import Settings, get_settings
+
+# Connections MySQL keeps for everything that is not a web worker (jobs, migrations, admin shells).
+MYSQL_RESERVED_CONNECTIONS = 20
+# Smallest pool a worker can serve with: one connection for a request, one for the background tasks.
+MIN_POOL_PER_WORKER = 2
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects container CPU sets), not the host total."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def default_workers() -> int:
+    return get_settings().web_concurrency or available_cpus()
+
+
+def pool_plan(workers: int, settings: Settings | None = None) -> dict:
+    """
+    Per-worker pool sizes. Raises ValueError when a budget cannot give every worker
+    MIN_POOL_PER_WORKER connections, so the totals never exceed the budgets.
+    """
+    settings = settings or get_settings()
+    db_budget = settings.db_pool_budget
+    redis_budget = settings.redis_pool_budget
+    for name, budget in (("DB_POOL_BUDGET", db_budget), ("REDIS_POOL_BUDGET", redis_budget)):
+        if budget // workers < MIN_POOL_PER_WORKER:
+            fewer = f" or run at most {budget // MIN_POOL_PER_WORKER} worker(s)" if budget >= MIN_POOL_PER_WORKER else ""
+            raise ValueError(
+                f"{name}={budget} cannot give {workers} worker(s) {MIN_POOL_PER_WORKER} connections each; "
+                f"raise it to {workers * MIN_POOL_PER_WORKER}{fewer}"
+            )
+    db_per_worker = db_budget // workers
+    redis_per_worker = redis_budget // workers
+    return {
+        "workers": workers,
+        "DB_POOL_MAX_SIZE": db_per_worker,
+        "DB_POOL_WARM_SIZE": min(settings.db_pool_warm_size, db_per_worker),
+        "REDIS_MAX_CONNECTIONS": redis_per_worker,
+        "REDIS_POOL_WARM_SIZE": min(settings.redis_pool_warm_size, redis_per_worker),
+        "mysql_connections_total": db_per_worker * workers,
+        "redis_connections_total": redis_per_worker * workers,
+    }
+
+
+def mysql_max_connections() -> int | None:
+    """Best effort: ask the server for max_connections so an oversized plan is caught before boot."""
+    try:
+        import pymysql
+
+        settings = get_settings()
+        conn = pymysql.connect(
+            host=settings.db_host,
+            port=settings.db_port,
+            user=settings.db_user,
+            password=settings.db_password,
+            connect_timeout=2,
+        )
+    except Exception:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT @@max_connections")
+            return int(cur.fetchone()[0])
+    finally:
+        conn.close()
+
+
+def event_loop_options() -> dict:
+    """uvloop and httptools when installed, otherwise uvicorn's pure-Python defaults."""
+    return {
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with multiple uvicorn workers")
+    parser.add_argument("--workers", type=int, default=None, help="default: WEB_CONCURRENCY or available CPUs")
+    parser.add_argument("--host", default=get_settings().host)
+    parser.add_argument("--port", type=int, default=get_settings().port)
+    parser.add_argument("--print-plan", action="store_true", help="print worker and pool sizing, then exit")
+    args = parser.parse_args()
+
+    workers = max(1, args.workers or default_workers())
+    try:
+        plan = pool_plan(workers)
+    except ValueError as e:
+        parser.error(str(e))
+    options = event_loop_options()
+    print(
+        f"--- {workers} worker(s), loop={options['loop']} http={options['http']}; per worker: "
+        f"{plan['DB_POOL_MAX_SIZE']} MySQL / {plan['REDIS_MAX_CONNECTIONS']} Redis connections "
+        f"({plan['mysql_connections_total']} / {plan['redis_connections_total']} total) ---"
+    )
+
+    max_connections = mysql_max_connections()
+    if max_connections is not None and plan["mysql_connections_total"] > max_connections - MYSQL_RESERVED_CONNECTIONS:
+        print(
+            f"--- WARNING: {plan['mysql_connections_total']} pooled connections exceed MySQL max_connections "
+            f"({max_connections}) minus {MYSQL_RESERVED_CONNECTIONS} reserved; lower DB_POOL_BUDGET ---"
+        )
+    if args.print_plan:
+        return
+
+    # Workers are spawned processes and inherit the environment, so each one reads its share here.
+    for name in ("DB_POOL_MAX_SIZE", "DB_POOL_WARM_SIZE", "REDIS_MAX_CONNECTIONS", "REDIS_POOL_WARM_SIZE"):
+        os.environ[name] = str(plan[name])
+
+    import uvicorn
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        access_log=False,  # RequestTracingMiddleware already logs one line per request
+        proxy_headers=True,
+        **options,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import pytest
+
+from app.database.database import db
+from fakes import FakePool, FakeServer
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+@pytest.fixture
+def pool(server, monkeypatch):
+    """The application's Database, backed by FakeServer instead of MySQL."""
+    pool = FakePool(server)
+    monkeypatch.setattr(db, "pool", pool)
+    return pool
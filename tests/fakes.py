@@ -0,0 +1,418 @@
+"""
+In-memory stand-ins for the aiomysql pool, so repository code runs unchanged under
+app.database.database.Database without a MySQL server.
+
+FakeServer holds the rows the tests touch (accounts, holds, the ledger, audit records) and InnoDB-style
+row locks: a locking read or an UPDATE locks the row until the connection commits or rolls
+back, and other connections wait for it (or skip it with SKIP LOCKED). Writes are applied at
+once and undone on rollback. Every statement yields to the event loop first, so concurrent
+tasks interleave between statements the way they do against a real server. Statements the
+fake does not know fail the test instead of being ignored.
+
+FakeRedisServer is a real TCP server speaking enough of the Redis protocol for the cache and
+rate-limit helpers, so the redis client (and benchmarks.fault_proxy in front of it) run unchanged.
+"""
+import asyncio
+import re
+from datetime import datetime
+from decimal import Decimal
+
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+class FakeServer:
+    def __init__(self):
+        self.accounts = {}
+        self.holds = {}
+        self.transactions = []
+        self.audit_log = {}
+        self.events = []
+        self._locks = {}
+        self._released = asyncio.Condition()
+
+    def add_account(self, account_number: str, user_id: int, balance="0.00", held_balance="0.00",
+                    status: str = "active"):
+        self.accounts[account_number] = {
+            "account_id": len(self.accounts) + 1,
+            "account_number": account_number,
+            "user_id": user_id,
+            "balance": Decimal(balance),
+            "held_balance": Decimal(held_balance),
+            "status": status,
+            "ledger_hash": None,
+            "interest_accrued": Decimal("0"),
+            "interest_posted_on": None,
+            "fee_charged_for": None,
+        }
+
+    def add_hold(self, hold_id: int, user_id: int, account_number: str, amount, expires_at: datetime,
+                 status: str = "pending"):
+        amount = Decimal(amount)
+        self.holds[hold_id] = {
+            "hold_id": hold_id,
+            "user_id": user_id,
+            "account_number": account_number,
+            "amount": amount,
+            "captured_amount": None,
+            "status": status,
+            "reference": None,
+            "expires_at": expires_at,
+            "created_at": expires_at,
+            "resolved_at": None,
+        }
+        if status == "pending":
+            self.accounts[account_number]["held_balance"] += amount
+
+    def is_locked(self, key, conn) -> bool:
+        return self._locks.get(key, conn) is not conn
+
+    async def lock(self, key, conn) -> None:
+        async with self._released:
+            await self._released.wait_for(lambda: not self.is_locked(key, conn))
+            self._locks[key] = conn
+            conn.locks.add(key)
+
+    async def unlock_all(self, conn) -> None:
+        async with self._released:
+            for key in conn.locks:
+                del self._locks[key]
+            conn.locks.clear()
+            self._released.notify_all()
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.connection = conn
+        self.rowcount = -1
+        self.lastrowid = None
+        self._rows = []
+
+    async def execute(self, query, args=None):
+        await asyncio.sleep(0)
+        sql = _normalize(query)
+        self.connection.statements.append(sql)
+        self.connection.in_transaction = True
+        for pattern, handler in _HANDLERS:
+            match = re.fullmatch(pattern, sql)
+            if match:
+                result = await handler(self.connection.server, self.connection, tuple(args or ()), match)
+                self._rows = result if result is not None else []
+                self.rowcount = len(self._rows) if result is not None else 1
+                return self.rowcount
+        raise AssertionError(f"FakeServer does not know: {sql}")
+
+    async def executemany(self, query, args):
+        for values in args:
+            await self.execute(query, values)
+
+    async def fetchone(self):
+        return dict(self._rows[0]) if self._rows else None
+
+    async def fetchall(self):
+        return [dict(row) for row in self._rows]
+
+    async def close(self):
+        return None
+
+
+class _CursorContext:
+    def __init__(self, conn):
+        self._cursor = FakeCursor(conn)
+
+    def __await__(self):
+        yield from asyncio.sleep(0).__await__()
+        return self._cursor
+
+    async def __aenter__(self):
+        return self._cursor
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._cursor.close()
+
+
+class FakeConnection:
+    def __init__(self, server: FakeServer, name: str):
+        self.server = server
+        self.name = name
+        self.closed = False
+        self.in_transaction = False
+        self.statements = []
+        self.locks = set()
+        self._undo = []
+
+    def cursor(self, *cursors):
+        return _CursorContext(self)
+
+    def get_transaction_status(self) -> bool:
+        return self.in_transaction
+
+    def remember(self, undo) -> None:
+        self._undo.append(undo)
+
+    async def commit(self):
+        self.server.events.append((self.name, "commit"))
+        self._undo.clear()
+        self.in_transaction = False
+        await self.server.unlock_all(self)
+
+    async def rollback(self):
+        self.server.events.append((self.name, "rollback"))
+        for undo in reversed(self._undo):
+            undo()
+        self._undo.clear()
+        self.in_transaction = False
+        await self.server.unlock_all(self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    maxsize = 10
+
+    def __init__(self, server: FakeServer | None = None):
+        self.server = server or FakeServer()
+        self.acquired = 0
+        self.released = 0
+
+    async def acquire(self):
+        self.acquired += 1
+        return FakeConnection(self.server, f"conn{self.acquired}")
+
+    async def release(self, conn):
+        self.released += 1
+
+
+def _set(conn, row: dict, **values) -> None:
+    """Update a row and remember how to undo it."""
+    previous = {column: row[column] for column in values}
+    row.update(values)
+    conn.remember(lambda: row.update(previous))
+
+
+async def _lock_hold(server, conn, args, match):
+    hold_id, user_id = args
+    await server.lock(("holds", hold_id), conn)
+    hold = server.holds.get(hold_id)
+    if hold is None or hold["user_id"] != user_id:
+        return []
+    return [{column: hold[column] for column in ("hold_id", "account_number", "amount", "status", "expires_at")}]
+
+
+async def _read_hold(server, conn, args, match):
+    hold_id, user_id = args
+    hold = server.holds.get(hold_id)
+    if hold is None or hold["user_id"] != user_id:
+        return []
+    return [{column: value for column, value in hold.items() if column != "user_id"}]
+
+
+async def _expired_holds(server, conn, args, match):
+    now, limit = args
+    rows = [
+        hold for hold in sorted(server.holds.values(), key=lambda hold: hold["expires_at"])
+        if hold["status"] == "pending" and hold["expires_at"] <= now and not server.is_locked(("holds", hold["hold_id"]), conn)
+    ][:limit]
+    for hold in rows:
+        await server.lock(("holds", hold["hold_id"]), conn)
+    return [{column: hold[column] for column in ("hold_id", "user_id", "account_number", "amount")} for hold in rows]
+
+
+async def _lock_customer_holds(server, conn, args, match):
+    user_id, limit = args
+    rows = [hold for hold in server.holds.values() if hold["user_id"] == user_id and hold["status"] == "pending"]
+    for hold in rows[:limit]:
+        await server.lock(("holds", hold["hold_id"]), conn)
+    return [{column: hold[column] for column in ("hold_id", "account_number", "amount")} for hold in rows[:limit]]
+
+
+async def _resolve_holds(server, conn, args, match):
+    status = match.group("status")
+    if status == "captured":
+        captured, resolved_at, hold_id = args
+        hold_ids, values = [hold_id], {"captured_amount": Decimal(captured)}
+    else:
+        resolved_at, *hold_ids = args
+        values = {}
+    for hold_id in hold_ids:
+        await server.lock(("holds", hold_id), conn)
+        _set(conn, server.holds[hold_id], status=status, resolved_at=resolved_at, **values)
+    return None
+
+
+async def _update_account(server, conn, args, match):
+    *amounts, account_number = args
+    await server.lock(("accounts", account_number), conn)
+    account = server.accounts[account_number]
+    if match.group("columns") == "balance":
+        debit, release = (Decimal(amount) for amount in amounts)
+        _set(conn, account, balance=account["balance"] - debit, held_balance=account["held_balance"] - release)
+    elif match.group("columns") == "held":
+        _set(conn, account, held_balance=account["held_balance"] - Decimal(amounts[0]))
+    else:
+        _set(conn, account, ledger_hash=amounts[0])
+    return None
+
+
+async def _read_account(server, conn, args, match):
+    (account_number,) = args
+    if match.group("lock"):
+        await server.lock(("accounts", account_number), conn)
+    account = server.accounts[account_number]
+    return [{"balance": account["balance"], "ledger_hash": account["ledger_hash"], "now": datetime(2026, 1, 1)}]
+
+
+async def _insert_ledger_row(server, conn, args, match):
+    columns = ("user_id", "account_number", "transaction_type", "amount", "balance_after", "related_account",
+               "created_at", "row_hash")
+    row = dict(zip(columns, args), transaction_id=len(server.transactions) + 1)
+    server.transactions.append(row)
+    conn.remember(lambda: server.transactions.remove(row))
+    return None
+
+
+async def _no_op(server, conn, args, match):
+    return None
+
+
+# The conditions app.repositories.user_repo_postings selects a chunk's accounts with.
+_POSTING_CONDITIONS = {
+    "balance > 0 AND (interest_posted_on IS NULL OR interest_posted_on < %s)":
+        lambda account, day: account["balance"] > 0
+        and (account["interest_posted_on"] is None or account["interest_posted_on"] < day),
+    "status = 'active' AND (fee_charged_for IS NULL OR fee_charged_for < %s)":
+        lambda account, month: account["status"] == "active"
+        and (account["fee_charged_for"] is None or account["fee_charged_for"] < month),
+}
+
+
+async def _lock_posting_chunk(server, conn, args, match):
+    after_id, max_id, day = args
+    condition = _POSTING_CONDITIONS.get(match.group("condition"))
+    if condition is None:
+        raise AssertionError(f"FakeServer does not know the posting condition: {match.group('condition')}")
+    rows = []
+    for account in sorted(server.accounts.values(), key=lambda account: account["account_id"]):
+        if after_id < account["account_id"] <= max_id and condition(account, day):
+            await server.lock(("accounts", account["account_number"]), conn)
+            rows.append(dict(account, now=datetime(2026, 1, 1)))
+    return rows
+
+
+async def _update_posted_accounts(server, conn, args, match):
+    columns = re.findall(r"%s AS (\w+)", match.group("rows").split(" UNION ALL ")[0])
+    by_id = {account["account_id"]: account for account in server.accounts.values()}
+    for start in range(0, len(args), len(columns)):
+        values = dict(zip(columns, args[start:start + len(columns)]))
+        account = by_id[values.pop("account_id")]
+        await server.lock(("accounts", account["account_number"]), conn)
+        for column in ("balance", "interest_accrued"):
+            if column in values:
+                values[column] = Decimal(values[column])
+        _set(conn, account, **values)
+    return None
+
+
+async def _insert_audit_record(server, conn, args, match):
+    columns = ("record_id", "actor_id", "actor", "action", "target_type", "target_id", "changes", "request_id",
+               "created_at")
+    row = dict(zip(columns, args))
+    if row["record_id"] in server.audit_log:  # ON DUPLICATE KEY UPDATE audit_id = audit_id
+        return None
+    server.audit_log[row["record_id"]] = row
+    conn.remember(lambda: server.audit_log.pop(row["record_id"]))
+    return None
+
+
+_HANDLERS = [
+    (r"SELECT hold_id, account_number, amount, status, expires_at FROM holds "
+     r"WHERE hold_id = %s AND user_id = %s FOR UPDATE", _lock_hold),
+    (r"SELECT hold_id, account_number, amount, captured_amount, status, reference, expires_at, created_at, "
+     r"resolved_at FROM holds WHERE hold_id = %s AND user_id = %s", _read_hold),
+    (r"SELECT hold_id, user_id, account_number, amount FROM holds WHERE status = 'pending' AND expires_at <= %s "
+     r"ORDER BY expires_at LIMIT %s FOR UPDATE SKIP LOCKED", _expired_holds),
+    (r"UPDATE holds SET status = '(?P<status>captured)', captured_amount = %s, resolved_at = %s WHERE hold_id = %s",
+     _resolve_holds),
+    (r"UPDATE holds SET status = '(?P<status>released)', resolved_at = %s WHERE hold_id = %s", _resolve_holds),
+    (r"UPDATE holds SET status = '(?P<status>expired|released)', resolved_at = %s WHERE hold_id IN \(%s(, %s)*\)",
+     _resolve_holds),
+    (r"SELECT hold_id, account_number, amount FROM holds WHERE user_id = %s AND status = 'pending' LIMIT %s "
+     r"FOR UPDATE", _lock_customer_holds),
+    (r"SET SESSION innodb_lock_wait_timeout = (%s|DEFAULT)", _no_op),
+    (r"UPDATE accounts SET (?P<columns>balance) = balance - %s, held_balance = held_balance - %s "
+     r"WHERE account_number = %s", _update_account),
+    (r"UPDATE accounts SET (?P<columns>held)_balance = held_balance - %s WHERE account_number = %s", _update_account),
+    (r"UPDATE accounts SET (?P<columns>ledger)_hash = %s WHERE account_number = %s", _update_account),
+    (r"SELECT balance FROM accounts WHERE account_number = %s(?P<lock>)", _read_account),
+    (r"SELECT ledger_hash, NOW\(\) AS now FROM accounts WHERE account_number = %s (?P<lock>FOR UPDATE)",
+     _read_account),
+    (r"INSERT INTO transactions \( user_id, account_number, transaction_type, amount, balance_after, "
+     r"related_account, created_at, row_hash \) VALUES \(%s, %s, %s, %s, %s, %s, %s, %s\)", _insert_ledger_row),
+    (r"SET TRANSACTION ISOLATION LEVEL READ COMMITTED", _no_op),
+    (r"SELECT account_id, user_id, account_number, balance, held_balance, interest_accrued, ledger_hash, "
+     r"NOW\(\) AS now FROM accounts WHERE account_id > %s AND account_id <= %s AND (?P<condition>.+) "
+     r"ORDER BY account_id FOR UPDATE", _lock_posting_chunk),
+    (r"UPDATE accounts a JOIN \((?P<rows>[^()]+)\) v ON v\.account_id = a\.account_id SET .+",
+     _update_posted_accounts),
+    (r"INSERT INTO audit_log \( record_id, actor_id, actor, action, target_type, target_id, changes, request_id, "
+     r"created_at \) VALUES \(%s, %s, %s, %s, %s, %s, %s, %s, %s\) ON DUPLICATE KEY UPDATE audit_id = audit_id",
+     _insert_audit_record),
+]
+
+
+class FakeRedisServer:
+    """PING, GET, SET (EX, NX), INCRBY and DEL on a dict; every other command answers OK."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self._server = None
+        self._writers = set()
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        for writer in list(self._writers):
+            writer.close()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while line := await reader.readline():
+                args = []
+                for _ in range(int(line[1:])):
+                    size = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(size + 2))[:-2].decode())
+                writer.write(self._execute(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _execute(self, args) -> bytes:
+        command, key = args[0].upper(), args[1] if len(args) > 1 else None
+        self.commands.append(command)
+        if command == "PING":
+            return b"+PONG\r\n"
+        if command == "GET":
+            value = self.data.get(key)
+            return b"$-1\r\n" if value is None else f"${len(value.encode())}\r\n{value}\r\n".encode()
+        if command == "SET":
+            if "NX" in (arg.upper() for arg in args[3:]) and key in self.data:
+                return b"$-1\r\n"
+            self.data[key] = args[2]
+            return b"+OK\r\n"
+        if command == "INCRBY":
+            self.data[key] = str(int(self.data.get(key, 0)) + int(args[2]))
+            return f":{self.data[key]}\r\n".encode()
+        if command == "DEL":
+            return f":{sum(self.data.pop(name, None) is not None for name in args[1:])}\r\n".encode()
+        return b"+OK\r\n"
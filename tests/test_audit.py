@@ -0,0 +1,114 @@
+import asyncio
+import logging
+
+import pytest
+
+from app.core import audit
+from app.core.audit import AuditLog, diff
+from app.database.database import db
+from app.repositories.user_repo import UserRepository
+
+ADMIN = {"id": 1, "sub": "root"}
+
+
+def _record(log: AuditLog, *actions: str) -> None:
+    for action in actions:
+        log.record(ADMIN, action, "customer", 7, {"status": {"before": "active", "after": "suspended"}})
+
+
+def _stored_actions(server) -> list:
+    return [row["action"] for row in server.audit_log.values()]
+
+
+def test_diff_keeps_only_changed_fields():
+    assert diff({"status": "active", "email": "a@x"}, {"status": "suspended", "email": "a@x", "name": "Ada"}) == {
+        "status": {"before": "active", "after": "suspended"},
+        "name": {"before": None, "after": "Ada"},
+    }
+    assert diff(None, None) == {}
+
+
+def test_flush_writes_the_buffer_in_batches(pool, server):
+    log = AuditLog(flush_size=2, max_pending=100)
+    _record(log, "a", "b", "c", "d", "e")
+
+    assert asyncio.run(log.flush()) == 5
+    assert _stored_actions(server) == ["a", "b", "c", "d", "e"]
+    assert pool.acquired == 3
+    assert asyncio.run(log.flush()) == 0
+
+
+def test_reaching_the_flush_size_wakes_the_flusher():
+    log = AuditLog(flush_size=2)
+    _record(log, "a")
+    assert not log._wake.is_set()
+    _record(log, "b")
+    assert log._wake.is_set()
+
+
+def test_full_buffer_drops_the_oldest_records(caplog):
+    log = AuditLog(flush_size=100, max_pending=3)
+    with caplog.at_level(logging.ERROR, logger="app.audit"):
+        _record(log, "a", "b", "c", "d", "e")
+
+    assert [record["action"] for record in log._pending] == ["c", "d", "e"]
+    assert sum("dropping record" in message for message in caplog.messages) == 2
+
+
+def test_failed_flush_keeps_the_records_ahead_of_new_ones(pool, server, monkeypatch):
+    log = AuditLog(flush_size=2, max_pending=100)
+    _record(log, "a", "b", "c")
+    monkeypatch.setattr(db, "pool", None)
+    assert asyncio.run(log.flush()) == 0
+
+    _record(log, "d")
+    monkeypatch.setattr(db, "pool", pool)
+    assert asyncio.run(log.flush()) == 4
+    assert _stored_actions(server) == ["a", "b", "c", "d"]
+
+
+def test_flush_cancelled_after_the_insert_committed_is_not_written_twice(pool, server, monkeypatch):
+    log = AuditLog(flush_size=2, max_pending=100)
+    _record(log, "a", "b", "c")
+    insert = UserRepository.insert_audit_records
+
+    async def insert_then_cancelled(records):
+        await insert(records)
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(UserRepository, "insert_audit_records", insert_then_cancelled)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(log.flush())
+    assert len(log._pending) == 3
+
+    monkeypatch.setattr(UserRepository, "insert_audit_records", insert)
+    assert asyncio.run(log.flush()) == 3
+    assert _stored_actions(server) == ["a", "b", "c"]
+
+
+def test_stop_flushes_and_logs_what_cannot_be_written(pool, server, monkeypatch, caplog):
+    log = AuditLog(flush_size=10, flush_seconds=60.0, max_pending=100)
+
+    async def scenario():
+        log.start()
+        _record(log, "a")
+        await log.stop()
+        monkeypatch.setattr(db, "pool", None)
+        _record(log, "b")
+        await log.stop()
+
+    with caplog.at_level(logging.ERROR, logger="app.audit"):
+        asyncio.run(scenario())
+    assert _stored_actions(server) == ["a"]
+    assert log._pending == []
+    assert any("lost at shutdown" in message and '"b"' in message for message in caplog.messages)
+
+
+def test_limits_follow_the_current_settings(monkeypatch):
+    from app.core import config
+
+    settings = config.get_settings().model_copy(update={"audit_flush_size": 3, "audit_max_pending": 4})
+    monkeypatch.setattr(config, "_settings", settings)
+    log = AuditLog()
+    assert (log.flush_size, log.max_pending) == (3, 4)
+    assert audit.audit_log.flush_size == 3
@@ -0,0 +1,225 @@
+import asyncio
+import os
+import socket
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+from redis.asyncio import Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+
+from app.cache import redis_client
+from app.cache.redis_client import cache_get, cache_set
+from app.core import circuit_breaker, config
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.core.rate_limit import enforce_rate_limit
+from app.database.database import db
+from benchmarks.fault_proxy import FaultProxy
+from fakes import FakeRedisServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(clock, monkeypatch):
+    """The Redis breaker, opening after two failures and probing again after five seconds."""
+    breaker = CircuitBreaker("redis", failure_threshold=2, reset_timeout=5.0)
+    monkeypatch.setattr(redis_client, "redis_breaker", breaker)
+    return breaker
+
+
+def _use_settings(monkeypatch, **env):
+    """Current settings with the rate-limit policies and breaker timeout replaced by `env`."""
+    environ = {
+        name: value for name, value in os.environ.items()
+        if not name.startswith("RATE_LIMIT_FAIL_POLICY") and name != "CB_RESET_TIMEOUT_SECONDS"
+    }
+    monkeypatch.setattr(config, "_settings", config.Settings.from_env(dict(environ, **env)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def _redis_behind_proxy(monkeypatch, socket_timeout: float = 1.0):
+    """The app's Redis client talking to FakeRedisServer through a FaultProxy (mode "pass")."""
+    server = FakeRedisServer()
+    proxy = FaultProxy(_free_port(), "127.0.0.1", await server.start())
+    await proxy.start()
+    # No client-side retries: every failed round trip reaches the breaker.
+    client = Redis.from_url(f"redis://127.0.0.1:{proxy.listen_port}/0", decode_responses=True,
+                            socket_timeout=socket_timeout, retry=Retry(NoBackoff(), 0))
+    monkeypatch.setattr(redis_client, "redis", client)
+    try:
+        yield proxy, server
+    finally:
+        await client.aclose()
+        await proxy.stop()
+        await server.stop()
+
+
+def test_breaker_opens_probes_and_closes(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=5.0, half_open_max_calls=1)
+    breaker.record_failure()
+    assert (breaker.state, breaker.allow()) == (CLOSED, True)
+
+    breaker.record_failure()
+    assert (breaker.state, breaker.allow()) == (OPEN, False)
+    clock.now += 4.9
+    assert breaker.allow() is False
+
+    clock.now += 0.1
+    assert breaker.allow() is True  # the probe
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is False  # only one probe at a time
+
+    breaker.record_success()
+    assert (breaker.state, breaker.allow()) == (CLOSED, True)
+
+
+def test_failed_probe_opens_the_breaker_again(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=5.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 5.0
+    assert breaker.allow() is True
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now += 4.9
+    assert breaker.allow() is False
+    clock.now += 0.1
+    assert breaker.allow() is True
+
+
+def test_probe_that_never_reports_back_is_replaced(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=5.0)
+    breaker.record_failure()
+    clock.now += 5.0
+    assert breaker.allow() is True  # this probe is cancelled and never records a result
+    assert breaker.allow() is False
+    clock.now += 5.0
+    assert breaker.allow() is True
+
+
+def test_breaker_limits_follow_the_current_settings(clock, monkeypatch):
+    breaker = CircuitBreaker("test")
+    _use_settings(monkeypatch, CB_FAILURE_THRESHOLD="1", CB_RESET_TIMEOUT_SECONDS="2")
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now += 2.0
+    assert breaker.allow() is True
+
+
+def test_cache_misses_while_redis_is_down_and_recovers_after_a_probe(breaker, clock, monkeypatch):
+    async def scenario():
+        async with _redis_behind_proxy(monkeypatch) as (proxy, server):
+            await cache_set("profile:1", {"name": "Ada"})
+            assert await cache_get("profile:1") == {"name": "Ada"}
+
+            proxy.set_mode("reset")
+            assert await cache_get("profile:1") is None
+            assert await cache_get("profile:1") is None
+            assert breaker.state == OPEN
+
+            # Redis is back, but until the reset timeout the breaker answers without a round trip.
+            proxy.set_mode("pass")
+            reads = server.commands.count("GET")
+            assert await cache_get("profile:1") is None
+            assert server.commands.count("GET") == reads
+
+            clock.now += 5.0
+            assert await cache_get("profile:1") == {"name": "Ada"}
+            assert breaker.state == CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_unanswered_redis_calls_time_out_and_open_the_breaker(breaker, monkeypatch):
+    async def scenario():
+        async with _redis_behind_proxy(monkeypatch, socket_timeout=0.1) as (proxy, _):
+            await cache_set("profile:1", {"name": "Ada"})
+            proxy.set_mode("blackhole")
+            assert await cache_get("profile:1") is None
+            assert await cache_get("profile:1") is None
+            assert breaker.state == OPEN
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("route, env, policy", [
+    ("customer_login", {}, "open"),
+    ("admin_login", {}, "closed"),
+    ("admin_otp", {}, "closed"),
+    ("customer_login", {"RATE_LIMIT_FAIL_POLICY": "closed"}, "closed"),
+    ("customer_login", {"RATE_LIMIT_FAIL_POLICY_CUSTOMER_LOGIN": "Closed"}, "closed"),
+    ("admin_login", {"RATE_LIMIT_FAIL_POLICY_ADMIN_LOGIN": "open"}, "open"),
+])
+def test_rate_limit_policy_while_redis_is_down(breaker, monkeypatch, route, env, policy):
+    _use_settings(monkeypatch, **env)
+
+    async def scenario():
+        async with _redis_behind_proxy(monkeypatch) as (proxy, _):
+            proxy.set_mode("reset")
+            return await enforce_rate_limit(route, "alice", limit=5, window_seconds=60, detail="slow down")
+
+    if policy == "open":
+        assert asyncio.run(scenario()) == f"rl:{route}:alice"
+    else:
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(scenario())
+        assert raised.value.status_code == 503
+
+
+def test_rate_limit_counts_attempts_while_redis_is_up(breaker, monkeypatch):
+    async def scenario():
+        async with _redis_behind_proxy(monkeypatch) as (_, server):
+            for _ in range(2):
+                await enforce_rate_limit("customer_login", "alice", limit=2, window_seconds=60, detail="slow down")
+            assert server.data["rl:customer_login:alice"] == "2"
+            await enforce_rate_limit("customer_login", "alice", limit=2, window_seconds=60, detail="slow down")
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(scenario())
+    assert (raised.value.status_code, raised.value.detail) == (429, "slow down")
+
+
+def test_unavailable_dependency_is_a_503_with_retry_after(breaker, monkeypatch):
+    from benchmarks.harness import ASGIClient
+    from main import app
+
+    _use_settings(monkeypatch, CB_RESET_TIMEOUT_SECONDS="7.5")
+    monkeypatch.setattr(db, "pool", None)
+    client = ASGIClient(app)
+    credentials = {"username": "alice", "password": "secret"}
+
+    async def scenario():
+        async with _redis_behind_proxy(monkeypatch) as (proxy, _):
+            proxy.set_mode("reset")
+            # The customer login rate limit fails open, then MySQL is unavailable.
+            customer = await client.request("POST", "/customers/login", credentials)
+            # The admin login rate limit fails closed before MySQL is asked.
+            admin = await client.request("POST", "/admin/login-initiate", credentials)
+            return customer, admin
+
+    customer, admin = asyncio.run(scenario())
+    assert customer["status"] == 503
+    assert (b"retry-after", b"7") in customer["headers"]
+    assert admin["status"] == 503
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from app.core import config
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    """A .env of its own; os.environ and the loaded settings are restored afterwards."""
+    path = tmp_path / ".env"
+    monkeypatch.setattr(config, "ENV_PATH", path)
+    monkeypatch.setattr(config, "_from_dotenv", dict(config._from_dotenv))
+    monkeypatch.setenv("DB_PORT", "3306")
+    monkeypatch.setenv("SECRET_KEY", "from-process")
+    # CACHE_TTL_SECONDS came from the previous .env; SECRET_KEY from the process environment.
+    monkeypatch.setenv("CACHE_TTL_SECONDS", "60")
+    config._from_dotenv["CACHE_TTL_SECONDS"] = "60"
+    config._from_dotenv.pop("SECRET_KEY", None)
+    config._from_dotenv.pop("DB_PORT", None)
+    monkeypatch.setattr(config, "_settings", config.Settings.from_env())
+    return path
+
+
+def test_reload_picks_up_env_file_changes(env_file):
+    env_file.write_text("CACHE_TTL_SECONDS=90\nSECRET_KEY=from-file\n")
+    settings = config.reload_settings()
+
+    assert settings is config.get_settings()
+    assert settings.cache_ttl_seconds == 90
+    assert os.environ["CACHE_TTL_SECONDS"] == "90"
+    # The process environment wins over .env.
+    assert settings.secret_key == "from-process"
+
+
+def test_invalid_reload_changes_nothing(env_file):
+    before = config.get_settings()
+    environ = dict(os.environ)
+    env_file.write_text("CACHE_TTL_SECONDS=90\nDB_PORT=not-a-port\n")
+    del os.environ["DB_PORT"]
+    del environ["DB_PORT"]
+
+    with pytest.raises(RuntimeError, match="db_port"):
+        config.reload_settings()
+
+    assert dict(os.environ) == environ
+    assert config.get_settings() is before
+
+
+def test_variable_dropped_from_env_file_is_unset_on_reload(env_file):
+    env_file.write_text("SECRET_KEY=from-file\n")
+    config.reload_settings()
+
+    assert "CACHE_TTL_SECONDS" not in os.environ
+    assert config.get_settings().cache_ttl_seconds == config.Settings.model_fields["cache_ttl_seconds"].default
@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import aiomysql
+import pytest
+
+from app.jobs import customer_purge
+from app.jobs.customer_purge import Purger
+from app.repositories.user_repo import UserRepository
+
+NOW = datetime(2026, 1, 10, 12, 0)
+
+
+@pytest.fixture
+def customers(pool, server, monkeypatch):
+    """Deleted customers 1 and 2 with pending holds; schedule deletion and anonymization are stubbed."""
+    server.add_account("A1", user_id=1, balance="100.00")
+    server.add_account("A2", user_id=2, balance="100.00")
+    for hold_id in range(1, 6):
+        server.add_hold(hold_id, user_id=1, account_number="A1", amount="10.00", expires_at=NOW)
+    server.add_hold(6, user_id=2, account_number="A2", amount="5.00", expires_at=NOW)
+    purged = {"anonymized": [], "pages": [[1, 2]], "deleted_before": []}
+
+    async def get_customers_to_purge(deleted_before, limit):
+        purged["deleted_before"].append(deleted_before)
+        return purged["pages"].pop(0) if purged["pages"] else []
+
+    async def delete_customer_schedules(user_id, limit, lock_wait_timeout):
+        return {"rows": 0, "lock_wait_seconds": 0.0}
+
+    async def anonymize_customer(user_id, lock_wait_timeout):
+        if purged.get("lock_error") == user_id:
+            raise aiomysql.OperationalError(1205, "Lock wait timeout exceeded")
+        purged["anonymized"].append(user_id)
+        return {"rows": 1, "lock_wait_seconds": 0.0}
+
+    monkeypatch.setattr(customer_purge, "utc_now", lambda: NOW)
+    monkeypatch.setattr(UserRepository, "get_customers_to_purge", get_customers_to_purge)
+    monkeypatch.setattr(UserRepository, "delete_customer_schedules", delete_customer_schedules)
+    monkeypatch.setattr(UserRepository, "anonymize_customer", anonymize_customer)
+    return purged
+
+
+def test_holds_are_released_in_batches_before_the_customer_is_anonymized(server, customers):
+    purger = Purger(batch_size=2, pause_ms=0, lock_wait_timeout=2)
+    assert asyncio.run(purger.purge_customer(1)) is True
+
+    assert {hold["status"] for hold in server.holds.values() if hold["user_id"] == 1} == {"released"}
+    assert server.holds[6]["status"] == "pending"
+    assert server.accounts["A1"]["held_balance"] == 0
+    assert server.accounts["A1"]["balance"] == Decimal("100.00")
+    # Three hold batches (2, 2, 1), each its own transaction, then the user row.
+    assert [conn for conn, event in server.events if event == "commit"] == ["conn1", "conn2", "conn3"]
+    assert customers["anonymized"] == [1]
+    assert purger.stats["rows"] == 6 and purger.stats["customers"] == 1
+
+
+def test_sweep_purges_customers_deleted_before_the_grace_period(server, customers):
+    summary = asyncio.run(Purger(batch_size=10, pause_ms=0, lock_wait_timeout=2).sweep(grace_hours=24))
+
+    assert customers["deleted_before"] == [NOW - timedelta(hours=24)] * 2
+    assert customers["anonymized"] == [1, 2]
+    assert (summary["customers"], summary["rows"], summary["lock_timeouts"]) == (2, 8, 0)
+
+
+def test_customer_whose_batch_timed_out_is_left_for_the_next_sweep(server, customers):
+    customers["lock_error"] = 1
+    customers["pages"] = [[1, 2], [1]]
+    summary = asyncio.run(Purger(batch_size=10, pause_ms=0, lock_wait_timeout=2).sweep(grace_hours=0))
+
+    assert customers["anonymized"] == [2]
+    assert (summary["customers"], summary["lock_timeouts"]) == (1, 1)
+
+
+def test_other_database_errors_are_not_swallowed(server, customers, monkeypatch):
+    async def anonymize_customer(user_id, lock_wait_timeout):
+        raise aiomysql.OperationalError(2013, "Lost connection to MySQL server during query")
+
+    monkeypatch.setattr(UserRepository, "anonymize_customer", anonymize_customer)
+    with pytest.raises(aiomysql.OperationalError):
+        asyncio.run(Purger(batch_size=10, pause_ms=0, lock_wait_timeout=2).purge_customer(1))
@@ -0,0 +1,139 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.repositories.user_repo import UserRepository
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def hold(server):
+    server.add_account("A1", user_id=1, balance="100.00")
+    server.add_hold(7, user_id=1, account_number="A1", amount="40.00", expires_at=NOW + timedelta(hours=1))
+    return server.holds[7]
+
+
+def _run_concurrently(*calls):
+    async def scenario():
+        return await asyncio.gather(*calls)
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("capture_first", [True, False])
+def test_capture_and_release_race_resolves_the_hold_once(pool, server, hold, capture_first):
+    capture = UserRepository.capture_hold(1, 7, None, NOW)
+    release = UserRepository.release_hold(1, 7, NOW)
+    if capture_first:
+        captured, released = _run_concurrently(capture, release)
+    else:
+        released, captured = _run_concurrently(release, capture)
+
+    account = server.accounts["A1"]
+    assert account["held_balance"] == 0
+    ledger = [row for row in server.transactions if row["transaction_type"] == "hold_capture"]
+    if capture_first:
+        assert (captured, released) == (Decimal("60.00"), "NOT_PENDING")
+        assert hold["status"] == "captured"
+        assert account["balance"] == Decimal("60.00")
+        assert len(ledger) == 1
+    else:
+        assert (released, captured) == (True, "NOT_PENDING")
+        assert hold["status"] == "released"
+        assert account["balance"] == Decimal("100.00")
+        assert ledger == []
+
+
+def test_concurrent_captures_debit_once(pool, server, hold):
+    results = _run_concurrently(
+        UserRepository.capture_hold(1, 7, Decimal("25.00"), NOW),
+        UserRepository.capture_hold(1, 7, Decimal("25.00"), NOW),
+    )
+
+    assert sorted(results, key=str) == [Decimal("75.00"), "NOT_PENDING"]
+    account = server.accounts["A1"]
+    assert account["balance"] == Decimal("75.00")
+    assert account["held_balance"] == 0  # the uncaptured rest of the hold is released too
+    assert hold["captured_amount"] == Decimal("25.00")
+    assert [row["amount"] for row in server.transactions] == ["25.00"]
+    assert account["ledger_hash"] == server.transactions[0]["row_hash"]
+
+
+def test_capture_above_the_hold_is_refused_and_changes_nothing(pool, server, hold):
+    assert asyncio.run(UserRepository.capture_hold(1, 7, Decimal("40.01"), NOW)) == "EXCEEDS_HOLD"
+    assert hold["status"] == "pending"
+    assert server.accounts["A1"]["held_balance"] == Decimal("40.00")
+    assert server.events == [("conn1", "rollback")]
+
+
+def test_hold_of_another_customer_is_not_found(pool, server, hold):
+    assert asyncio.run(UserRepository.capture_hold(2, 7, None, NOW)) == "NOT_FOUND"
+    assert asyncio.run(UserRepository.release_hold(2, 7, NOW)) == "NOT_FOUND"
+    assert hold["status"] == "pending"
+
+
+def test_expired_hold_can_no_longer_be_captured(pool, server, hold):
+    assert asyncio.run(UserRepository.capture_hold(1, 7, None, hold["expires_at"])) == "NOT_PENDING"
+    assert server.accounts["A1"]["balance"] == Decimal("100.00")
+
+
+def test_sweeper_skips_a_hold_being_released(pool, server, hold):
+    expired_at = hold["expires_at"]
+    # Release with a clock just before expiry while the sweeper runs with one just after it.
+    released, expired = _run_concurrently(
+        UserRepository.release_hold(1, 7, expired_at - timedelta(seconds=1)),
+        UserRepository.expire_holds(expired_at, limit=100),
+    )
+
+    assert released is True
+    assert expired == []
+    assert hold["status"] == "released"
+    assert server.accounts["A1"]["held_balance"] == 0
+
+
+def test_sweeper_releases_expired_holds_once(pool, server, hold):
+    server.add_hold(8, user_id=1, account_number="A1", amount="10.00", expires_at=NOW + timedelta(hours=2))
+    later = NOW + timedelta(hours=3)
+    first, second = _run_concurrently(
+        UserRepository.expire_holds(later, limit=100),
+        UserRepository.expire_holds(later, limit=100),
+    )
+
+    assert sorted(row["hold_id"] for row in first + second) == [7, 8]
+    assert {held["status"] for held in server.holds.values()} == {"expired"}
+    assert server.accounts["A1"]["held_balance"] == 0
+    assert server.accounts["A1"]["balance"] == Decimal("100.00")
+
+
+def test_only_admins_can_capture_holds():
+    from main import app
+
+    paths = {(route.path, method) for route in app.routes for method in getattr(route, "methods", ())}
+    assert ("/admin/customers/{user_id}/holds/{hold_id}/capture", "POST") in paths
+    assert not any(path.endswith("/capture") and not path.startswith("/admin/") for path, _ in paths)
+
+
+def test_full_capture_reports_and_publishes_the_captured_amount(pool, server, hold, monkeypatch):
+    from app.cache import redis_client
+    from app.services import hold_service
+
+    flushed = []
+
+    async def flush(deletes, bumps, publishes=()):
+        flushed.extend(publishes)
+
+    monkeypatch.setattr(redis_client, "_flush_invalidations", flush)
+    monkeypatch.setattr(hold_service, "utc_now", lambda: NOW)
+    result = asyncio.run(hold_service.HoldService.capture_hold(1, 7, None))
+
+    assert result == {"status": "success", "new_balance": Decimal("60.00"), "captured_amount": Decimal("40.00")}
+    [(channel, message)] = flushed
+    assert channel == "events:customer:1"
+    assert json.loads(message) == {
+        "type": "transaction", "user_id": 1, "transaction_type": "hold_capture", "account_number": "A1",
+        "amount": "40.00", "balance": "60.00",
+    }
@@ -0,0 +1,99 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.repositories.user_repo_ledger_chain import _verify_chain_rows
+from app.repositories.user_repo_transactions import GENESIS_HASH, _chain_ledger_values, signed_amount
+
+COLUMNS = ("user_id", "account_number", "transaction_type", "amount", "balance_after", "related_account",
+           "created_at", "row_hash")
+
+
+def _ledger(prev_hash=GENESIS_HASH, first_id=1):
+    """Four chained rows of account A1 as they are stored, plus the new head hash."""
+    rows = [
+        {"user_id": 1, "transaction_type": "deposit", "amount": Decimal("100.00"), "balance_after": Decimal("100.00"),
+         "related_account": None},
+        {"user_id": 1, "transaction_type": "transfer_out", "amount": Decimal("30.00"),
+         "balance_after": Decimal("70.00"), "related_account": "B2"},
+        {"user_id": 1, "transaction_type": "fee", "amount": Decimal("2.00"), "balance_after": Decimal("68.00"),
+         "related_account": None},
+        {"user_id": 1, "transaction_type": "interest", "amount": Decimal("0.05"), "balance_after": Decimal("68.05"),
+         "related_account": None},
+    ]
+    values, head = _chain_ledger_values(prev_hash, "A1", rows, datetime(2026, 1, 1, 9, 30))
+    stored = [dict(zip(COLUMNS, value), transaction_id=first_id + i) for i, value in enumerate(values)]
+    return stored, head
+
+
+def test_untouched_chain_verifies_up_to_the_head():
+    rows, head = _ledger()
+    last_good, prev_hash, unchained, error = _verify_chain_rows(GENESIS_HASH, rows)
+    assert error is None
+    assert (last_good, prev_hash, unchained) == (rows[-1], head, 0)
+
+
+def test_chain_verification_resumes_from_a_checkpoint():
+    rows, head = _ledger()
+    checkpoint = rows[1]["row_hash"]
+    assert _verify_chain_rows(checkpoint, rows[2:]) == (rows[-1], head, 0, None)
+
+
+@pytest.mark.parametrize("column, value", [
+    ("amount", "3.00"),
+    ("balance_after", "1068.00"),
+    ("transaction_type", "deposit"),
+    ("related_account", "C3"),
+    ("created_at", datetime(2026, 1, 2)),
+])
+def test_rewritten_row_is_a_hash_mismatch(column, value):
+    rows, _ = _ledger()
+    rows[2][column] = value
+    last_good, prev_hash, _, error = _verify_chain_rows(GENESIS_HASH, rows)
+    assert error == "transaction 3: hash mismatch"
+    assert last_good is rows[1]
+    assert prev_hash == rows[1]["row_hash"]
+
+
+def test_rewritten_row_with_a_recomputed_hash_breaks_the_next_link():
+    rows, _ = _ledger()
+    forged, _ = _chain_ledger_values(rows[0]["row_hash"], "A1", [dict(rows[1], amount=Decimal("3.00"))],
+                                     rows[1]["created_at"])
+    rows[1] = dict(zip(COLUMNS, forged[0]), transaction_id=2)
+    assert _verify_chain_rows(GENESIS_HASH, rows)[3] == "transaction 3: hash mismatch"
+
+
+def test_deleted_row_is_detected_at_its_successor():
+    rows, _ = _ledger()
+    del rows[1]
+    assert _verify_chain_rows(GENESIS_HASH, rows)[3] == "transaction 3: hash mismatch"
+
+
+def test_removed_hash_is_reported():
+    rows, _ = _ledger()
+    rows[2]["row_hash"] = None
+    assert _verify_chain_rows(GENESIS_HASH, rows)[3] == "transaction 3: hash removed"
+
+
+def test_rows_before_the_chain_started_are_counted_as_unchained():
+    legacy = [
+        {"transaction_id": 1, "user_id": 1, "account_number": "A1", "transaction_type": "deposit",
+         "amount": Decimal("5.00"), "balance_after": Decimal("5.00"), "related_account": None,
+         "created_at": datetime(2020, 1, 1), "row_hash": None},
+    ]
+    rows, head = _ledger(first_id=2)
+    last_good, prev_hash, unchained, error = _verify_chain_rows(None, legacy + rows)
+    assert (last_good, prev_hash, unchained, error) == (rows[-1], head, 1, None)
+
+
+def test_signed_amount_signs_current_and_legacy_types():
+    amount = Decimal("12.50")
+    assert signed_amount("deposit", amount) == amount
+    assert signed_amount("transfer_in", amount) == amount
+    assert signed_amount("hold_capture", amount) == -amount
+    assert signed_amount("withdrawal", amount) == -amount
+    with pytest.raises(ValueError, match="apply migration 0016"):
+        signed_amount("transfer", amount)
+    with pytest.raises(ValueError, match="Unknown transaction type"):
+        signed_amount("refund", amount)
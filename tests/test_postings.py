@@ -0,0 +1,122 @@
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.jobs import postings
+from app.repositories.user_repo import UserRepository
+from app.repositories.user_repo_ledger_chain import _verify_chain_rows
+from app.repositories.user_repo_transactions import GENESIS_HASH
+
+DAY = date(2026, 1, 10)
+MONTH = date(2026, 1, 1)
+RATE = Decimal("0.0001")
+
+
+def _interest(day=DAY, after_id=0, max_id=100):
+    return asyncio.run(UserRepository.post_interest_chunk(day, after_id, max_id, RATE))
+
+
+def _fees(month=MONTH):
+    return asyncio.run(UserRepository.post_fee_chunk(month, 0, 100, Decimal("5.00"), Decimal("500.00")))
+
+
+def _ledger(server, account_number):
+    return [row for row in server.transactions if row["account_number"] == account_number]
+
+
+def test_interest_is_posted_once_per_date(pool, server):
+    server.add_account("A1", user_id=1, balance="1000.00")
+    server.add_account("A2", user_id=2, balance="0.00")
+
+    first = _interest()
+    assert (first["accounts"], first["postings"], first["amount"], first["user_ids"]) == (1, 1, Decimal("0.10"), {1})
+    assert _interest()["accounts"] == 0  # rerun of the same date
+    assert _interest(date(2026, 1, 9))["accounts"] == 0  # and of an earlier one
+
+    _interest(date(2026, 1, 11))
+    account = server.accounts["A1"]
+    assert account["balance"] == Decimal("1000.20")
+    assert account["interest_posted_on"] == date(2026, 1, 11)
+    rows = _ledger(server, "A1")
+    assert [(row["transaction_type"], row["amount"]) for row in rows] == [("interest", "0.10")] * 2
+    assert _verify_chain_rows(GENESIS_HASH, rows)[1:] == (account["ledger_hash"], 0, None)
+
+
+def test_interest_below_a_cent_is_carried_to_the_next_day(pool, server):
+    server.add_account("A1", user_id=1, balance="33.33")
+    for day in range(1, 4):
+        assert _interest(date(2026, 1, day))["postings"] == 0
+    assert server.accounts["A1"]["interest_accrued"] == Decimal("0.009999")
+
+    assert _interest(date(2026, 1, 4))["amount"] == Decimal("0.01")
+    assert server.accounts["A1"]["interest_accrued"] == Decimal("0.003332")
+    assert server.accounts["A1"]["balance"] == Decimal("33.34")
+
+
+def test_chunk_only_touches_its_account_id_range(pool, server):
+    for number in range(1, 5):
+        server.add_account(f"A{number}", user_id=number, balance="1000.00")
+    assert _interest(after_id=1, max_id=3)["user_ids"] == {2, 3}
+    assert _interest()["user_ids"] == {1, 4}
+
+
+def test_monthly_fee_is_charged_once_and_waived_or_skipped(pool, server):
+    server.add_account("RICH", user_id=1, balance="900.00")
+    server.add_account("HELD", user_id=2, balance="50.00", held_balance="46.00")
+    server.add_account("PAYS", user_id=3, balance="100.00")
+    server.add_account("SUSP", user_id=4, balance="100.00", status="suspended")
+
+    result = _fees()
+    assert (result["accounts"], result["postings"], result["user_ids"]) == (3, 1, {3})
+    assert server.accounts["PAYS"]["balance"] == Decimal("95.00")
+    assert [row["transaction_type"] for row in server.transactions] == ["fee"]
+    # Waived and uncovered accounts are done for the month too; suspended ones are not touched.
+    assert {n: a["fee_charged_for"] for n, a in server.accounts.items()} == {
+        "RICH": MONTH, "HELD": MONTH, "PAYS": MONTH, "SUSP": None,
+    }
+    assert _fees()["accounts"] == 0
+
+
+@pytest.fixture
+def plan(monkeypatch):
+    """use(last_posted, bounds) stubs the plan run() reads; it returns the calls run_partitioned got."""
+    calls = []
+
+    def use(last_posted, bounds=None):
+        async def get_plan():
+            return bounds or {"min_id": 1, "max_id": 10}, last_posted
+
+        def run_partitioned(func, ranges, workers, *args):
+            calls.append((ranges, args))
+            return [{"accounts": 10, "postings": 3, "amount": Decimal("1.50"), "chunks": 1}]
+
+        monkeypatch.setattr(postings, "_get_plan", get_plan)
+        monkeypatch.setattr(postings, "run_partitioned", run_partitioned)
+        return calls
+
+    return use
+
+
+def test_run_rejects_a_date_before_the_latest_posted(plan):
+    calls = plan({"interest": DAY, "fee": None})
+    with pytest.raises(ValueError, match="interest was already posted for 2026-01-10; 2026-01-09 is earlier"):
+        postings.run("interest", date(2026, 1, 9))
+    assert calls == []
+
+
+@pytest.mark.parametrize("kind, run_date", [("interest", DAY), ("interest", date(2026, 1, 11)), ("fee", MONTH)])
+def test_run_accepts_the_latest_date_again_and_later_ones(plan, kind, run_date):
+    calls = plan({"interest": DAY, "fee": MONTH})
+    summary = postings.run(kind, run_date, workers=2, chunk_size=500)
+    assert (summary["postings"], summary["amount"]) == (3, "1.50")
+    [(ranges, args)] = calls
+    assert len(ranges) == 2
+    assert args == (kind, run_date, 500)
+
+
+def test_run_without_accounts_posts_nothing(plan):
+    calls = plan(None, bounds={"min_id": None, "max_id": None})
+    assert postings.run("fee", MONTH)["postings"] == 0
+    assert calls == []
@@ -0,0 +1,126 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import config
+from app.repositories.user_repo import UserRepository
+from app.services import scheduled_transfer_service
+from app.services.scheduled_transfer_service import (
+    EXECUTED, FAILED, LEASE_LOST, ScheduledTransferService, _add_months, next_occurrence, occurrence_at,
+)
+from app.services.user_service import UserService
+
+NOW = datetime(2026, 1, 5, 10, 0)
+
+
+def _schedule(frequency="daily", first_run_at=datetime(2026, 1, 1, 9, 0), occurrence=0, end_at=None, attempts=0):
+    return {
+        "schedule_id": 3, "user_id": 1, "to_account_number": "B1", "amount": Decimal("25.00"),
+        "frequency": frequency, "first_run_at": first_run_at, "end_at": end_at, "occurrence": occurrence,
+        "attempts": attempts,
+    }
+
+
+@pytest.mark.parametrize("start, months, expected", [
+    (datetime(2026, 1, 31, 8), 1, datetime(2026, 2, 28, 8)),
+    (datetime(2026, 1, 31, 8), 2, datetime(2026, 3, 31, 8)),
+    (datetime(2028, 1, 31, 8), 1, datetime(2028, 2, 29, 8)),
+    (datetime(2026, 11, 30, 8), 3, datetime(2027, 2, 28, 8)),
+    (datetime(2026, 12, 15, 8), 12, datetime(2027, 12, 15, 8)),
+])
+def test_add_months_clamps_to_the_end_of_shorter_months(start, months, expected):
+    assert _add_months(start, months) == expected
+
+
+def test_monthly_occurrences_do_not_drift_after_a_short_month():
+    first = datetime(2026, 1, 31, 8)
+    assert [occurrence_at(first, "monthly", n).day for n in range(4)] == [31, 28, 31, 30]
+
+
+def test_next_occurrence_skips_the_ones_missed_while_no_worker_ran():
+    assert next_occurrence(_schedule(), NOW) == (5, datetime(2026, 1, 6, 9, 0), "active")
+    assert next_occurrence(_schedule(occurrence=4), datetime(2026, 1, 5, 9, 0)) == (5, datetime(2026, 1, 6, 9), "active")
+
+
+@pytest.mark.parametrize("schedule", [
+    _schedule(frequency="once"),
+    _schedule(frequency="weekly", end_at=datetime(2026, 1, 8, 8, 59)),
+])
+def test_schedule_completes_after_its_last_occurrence(schedule):
+    occurrence, next_run_at, status = next_occurrence(schedule, NOW)
+    assert (next_run_at, status) == (None, "completed")
+
+
+@pytest.fixture
+def worker(pool, monkeypatch):
+    """execute() with the transfer path stubbed; records what reached each step."""
+    calls = {"screening": [], "transfers": [], "failures": [], "complete": True}
+
+    @asynccontextmanager
+    async def screened_transfer(user_id, to_account_number, amount):
+        try:
+            yield "A1"
+        except BaseException as e:
+            calls["screening"].append(("abort", type(e).__name__))
+            raise
+        calls["screening"].append(("commit", None))
+
+    async def complete_scheduled_run(schedule_id, worker_id, occurrence, next_run_at, status, now):
+        return calls["complete"]
+
+    async def execute_transfer(user_id, to_account_number, amount, from_account_number):
+        calls["transfers"].append((from_account_number, to_account_number, amount))
+        if "transfer_error" in calls:
+            raise calls["transfer_error"]
+
+    async def record_scheduled_failure(schedule_id, worker_id, error, attempts, occurrence, next_run_at, status, now):
+        calls["failures"].append((error, attempts, occurrence, next_run_at, status))
+        return True
+
+    settings = config.get_settings().model_copy(update={"schedule_max_attempts": 3, "schedule_retry_base_seconds": 60})
+    monkeypatch.setattr(config, "_settings", settings)
+    monkeypatch.setattr(scheduled_transfer_service, "utc_now", lambda: NOW)
+    monkeypatch.setattr(UserService, "screened_transfer", screened_transfer)
+    monkeypatch.setattr(UserService, "execute_transfer", execute_transfer)
+    monkeypatch.setattr(UserRepository, "complete_scheduled_run", complete_scheduled_run)
+    monkeypatch.setattr(UserRepository, "record_scheduled_failure", record_scheduled_failure)
+    return calls
+
+
+def _execute(schedule):
+    return asyncio.run(ScheduledTransferService.execute(schedule, "worker-1"))
+
+
+def test_executed_occurrence_commits_the_screening(worker):
+    assert _execute(_schedule()) == EXECUTED
+    assert worker["transfers"] == [("A1", "B1", Decimal("25.00"))]
+    assert worker["screening"] == [("commit", None)]
+
+
+def test_lost_lease_pays_nothing_and_releases_the_screening(worker):
+    worker["complete"] = False
+    assert _execute(_schedule()) == LEASE_LOST
+    assert worker["transfers"] == []
+    assert worker["screening"] == [("abort", "_LeaseLost")]
+    assert worker["failures"] == []  # the new lease holder owns the schedule now
+
+
+def test_failed_occurrence_is_retried_with_backoff(worker):
+    worker["transfer_error"] = HTTPException(status_code=400, detail="Insufficient funds")
+    assert _execute(_schedule(occurrence=4, attempts=1)) == FAILED
+    assert worker["screening"] == [("abort", "HTTPException")]
+    assert worker["failures"] == [("Insufficient funds", 2, 4, NOW + timedelta(seconds=120), "active")]
+
+
+def test_occurrence_is_given_up_after_the_last_attempt(worker):
+    worker["transfer_error"] = HTTPException(status_code=400, detail="Insufficient funds")
+    _execute(_schedule(occurrence=4, attempts=2))
+    _execute(_schedule(frequency="once", attempts=2))
+    assert worker["failures"] == [
+        ("Insufficient funds", 0, 5, datetime(2026, 1, 6, 9, 0), "active"),
+        ("Insufficient funds", 0, 1, None, "failed"),
+    ]
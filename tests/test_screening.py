@@ -0,0 +1,212 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import config
+from app.core.fx import DEFAULT_CURRENCY
+from app.services import screening_service
+from app.services.screening_service import (
+    TRANSFER, WITHDRAW, Rule, ScreeningConfig, ScreeningService, _evaluate, screening_config,
+)
+
+ACCOUNT = {"account_number": "A1", "currency": DEFAULT_CURRENCY}
+
+
+class FakeCounters:
+    """redis_pipeline() over dicts, for the commands the screening rules queue."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.windows = {}
+
+    async def pipeline(self, build):
+        queued = []
+
+        class Pipe:
+            def __getattr__(self, command):
+                return lambda *args: queued.append((command, args))
+
+        build(Pipe())
+        await asyncio.sleep(0)
+        return [getattr(self, command)(*args) for command, args in queued]
+
+    def incrby(self, key, amount):
+        self.values[key] = self.values.get(key, 0) + amount
+        return self.values[key]
+
+    def decrby(self, key, amount):
+        return self.incrby(key, -amount)
+
+    def incr(self, key):
+        return self.incrby(key, 1)
+
+    def decr(self, key):
+        return self.incrby(key, -1)
+
+    def expire(self, key, seconds):
+        return True
+
+    def sismember(self, key, member):
+        return member in self.sets.get(key, set())
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    def zremrangebyscore(self, key, low, high):
+        window = self.windows.setdefault(key, {})
+        for member in [m for m, score in window.items() if low <= score <= high]:
+            del window[member]
+
+    def zadd(self, key, mapping):
+        self.windows.setdefault(key, {}).update(mapping)
+
+    def zcard(self, key):
+        return len(self.windows.get(key, {}))
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    counters = FakeCounters()
+    monkeypatch.setattr(screening_service, "redis_pipeline", counters.pipeline)
+    return counters
+
+
+@pytest.fixture
+def rules(monkeypatch):
+    """Enable rules as the screening_rules table would: use(name, params, fail_policy="open")."""
+    monkeypatch.setattr(screening_config, "rules", {})
+    rows = []
+
+    def use(name, params, fail_policy="open"):
+        rows.append({"rule_name": name, "enabled": True, "fail_policy": fail_policy, "params": params})
+        screening_config.replace(rows)
+
+    return use
+
+
+def _screen(operation, amount, payee=None, account=ACCOUNT, fail=False):
+    async def scenario():
+        async with ScreeningService.screened(operation, 1, account, Decimal(amount), payee):
+            if fail:
+                raise RuntimeError("the transfer failed")
+
+    asyncio.run(scenario())
+
+
+def _declined(operation, amount, payee=None) -> str:
+    with pytest.raises(HTTPException) as raised:
+        _screen(operation, amount, payee)
+    assert raised.value.status_code == 403
+    return raised.value.detail
+
+
+def test_daily_limit_declines_once_the_day_is_used_up(counters, rules):
+    rules("daily_limit", {"limit": "100.00"})
+    _screen(WITHDRAW, "60.00")
+    assert _declined(WITHDRAW, "40.01") == "Transaction declined: daily limit exceeded"
+    _screen(WITHDRAW, "40.00")
+
+    [(key, total)] = counters.values.items()
+    assert key.startswith("scr:daily:A1:") and total == 10000
+
+
+def test_reservation_is_released_when_the_operation_fails(counters, rules):
+    rules("daily_limit", {"limit": "100.00"})
+    with pytest.raises(RuntimeError):
+        _screen(WITHDRAW, "60.00", fail=True)
+    assert list(counters.values.values()) == [0]
+    _screen(WITHDRAW, "100.00")
+
+
+def test_new_payee_rule_caps_amount_and_count_per_day(counters, rules):
+    rules("new_payee", {"max_amount": "50.00", "max_per_day": 1})
+    assert _declined(TRANSFER, "50.01", "B1") == "Transaction declined: amount exceeds the limit for a new payee"
+    _screen(TRANSFER, "50.00", "B1")
+    assert _declined(TRANSFER, "10.00", "C1") == "Transaction declined: too many new payees today"
+
+    # B1 is known now: no cap, and it does not count as a new payee.
+    _screen(TRANSFER, "500.00", "B1")
+    assert counters.sets == {"scr:payees:A1": {"B1"}}
+
+
+def test_new_payee_rule_ignores_withdrawals(counters, rules):
+    rules("new_payee", {"max_amount": "0", "max_per_day": 0})
+    _screen(WITHDRAW, "500.00")
+
+
+def test_decline_by_one_rule_releases_the_reservation_of_another(counters, rules):
+    rules("daily_limit", {"limit": "1000.00"})
+    rules("new_payee", {"max_amount": "50.00", "max_per_day": 5})
+    _declined(TRANSFER, "80.00", "B1")
+    assert set(counters.values.values()) == {0}
+
+
+def test_burst_rule_counts_declined_attempts(counters, rules):
+    rules("burst", {"count": 2, "seconds": 60})
+    _screen(WITHDRAW, "1.00")
+    _screen(WITHDRAW, "1.00")
+    assert _declined(WITHDRAW, "1.00") == "Transaction declined: more than 2 operations in 60 seconds"
+    assert counters.zcard("scr:burst:A1") == 3
+
+
+def test_invalid_unknown_and_disabled_rules_are_skipped():
+    rules = ScreeningConfig()
+    rules.replace([
+        {"rule_name": "daily_limit", "enabled": True, "fail_policy": "open", "params": {"limit": "-1"}},
+        {"rule_name": "new_payee", "enabled": True, "fail_policy": "closed", "params": {"max_amount": "5"}},
+        {"rule_name": "burst", "enabled": False, "fail_policy": "open", "params": {"count": 1, "seconds": 1}},
+        {"rule_name": "geo_fence", "enabled": True, "fail_policy": "open", "params": {}},
+    ])
+    assert rules.rules == {}
+
+
+class SlowRule(Rule):
+    name = "slow"
+
+    async def evaluate(self, request, params):
+        await asyncio.sleep(1)
+        return "too slow to matter"
+
+
+def _evaluate_with(rule, fail_policy, account=ACCOUNT):
+    request = screening_service.ScreeningRequest(WITHDRAW, 1, account, Decimal("10.00"))
+    return asyncio.run(_evaluate(rule, {"fail_policy": fail_policy, "params": {}}, request))
+
+
+@pytest.fixture
+def short_timeout(monkeypatch):
+    settings = config.get_settings().model_copy(update={"screening_rule_timeout_ms": 10})
+    monkeypatch.setattr(config, "_settings", settings)
+
+
+def test_rule_that_runs_out_of_time_passes_when_it_fails_open(short_timeout):
+    assert _evaluate_with(SlowRule(), "open") is None
+
+
+def test_rule_that_runs_out_of_time_declines_when_it_fails_closed(short_timeout):
+    with pytest.raises(HTTPException) as raised:
+        _evaluate_with(SlowRule(), "closed")
+    assert raised.value.status_code == 503
+
+
+@pytest.mark.parametrize("fail_policy", ["open", "closed"])
+def test_rule_without_an_fx_rate_follows_its_fail_policy(counters, fail_policy):
+    rule = screening_service.RULES["daily_limit"]
+    account = {"account_number": "A1", "currency": "XTS"}
+    if fail_policy == "open":
+        assert _evaluate_with(rule, fail_policy, account) is None
+    else:
+        with pytest.raises(HTTPException):
+            _evaluate_with(rule, fail_policy, account)
+    assert counters.values == {}
+
+
+def test_rule_must_implement_evaluate():
+    class Incomplete(Rule):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
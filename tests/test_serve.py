@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from app.core.config import Settings
+from serve import MIN_POOL_PER_WORKER, pool_plan
+
+
+BUDGETS = ("DB_POOL_BUDGET", "REDIS_POOL_BUDGET", "DB_POOL_WARM_SIZE", "REDIS_POOL_WARM_SIZE")
+
+
+def _settings(**env) -> Settings:
+    """The current environment with only the given budget and warm-size variables set."""
+    environ = {name: value for name, value in os.environ.items() if name not in BUDGETS}
+    return Settings.from_env(dict(environ, **{name: str(value) for name, value in env.items()}))
+
+
+@pytest.mark.parametrize("db_budget, redis_budget", [(40, 200), (7, 9), (64, 64), (2, 2)])
+def test_plan_never_exceeds_the_budgets(db_budget, redis_budget):
+    settings = _settings(DB_POOL_BUDGET=db_budget, REDIS_POOL_BUDGET=redis_budget)
+    for workers in range(1, min(db_budget, redis_budget) // MIN_POOL_PER_WORKER + 1):
+        plan = pool_plan(workers, settings)
+        assert plan["workers"] == workers
+        assert plan["mysql_connections_total"] == plan["DB_POOL_MAX_SIZE"] * workers <= db_budget
+        assert plan["redis_connections_total"] == plan["REDIS_MAX_CONNECTIONS"] * workers <= redis_budget
+        assert plan["DB_POOL_MAX_SIZE"] >= MIN_POOL_PER_WORKER
+        assert plan["REDIS_MAX_CONNECTIONS"] >= MIN_POOL_PER_WORKER
+
+
+def test_default_budgets_are_divided_across_workers():
+    plan = pool_plan(3, _settings())
+    assert plan["DB_POOL_MAX_SIZE"] == 13
+    assert plan["REDIS_MAX_CONNECTIONS"] == 66
+    assert plan["mysql_connections_total"] == 39
+    assert plan["redis_connections_total"] == 198
+
+
+@pytest.mark.parametrize("name, budget, workers", [
+    ("DB_POOL_BUDGET", 40, 21),
+    ("DB_POOL_BUDGET", 1, 1),
+    ("REDIS_POOL_BUDGET", 10, 6),
+])
+def test_budget_too_small_for_the_workers_is_refused(name, budget, workers):
+    with pytest.raises(ValueError, match=name):
+        pool_plan(workers, _settings(**{name: budget}))
+
+
+def test_refusal_suggests_a_worker_count_that_fits():
+    settings = _settings(DB_POOL_BUDGET=9)
+    with pytest.raises(ValueError, match=r"raise it to 10 or run at most 4 worker\(s\)"):
+        pool_plan(5, settings)
+    assert pool_plan(4, settings)["mysql_connections_total"] == 8
+
+
+def test_warm_sizes_are_capped_by_the_pool_size():
+    plan = pool_plan(4, _settings(DB_POOL_BUDGET=12, REDIS_POOL_WARM_SIZE=50))
+    assert plan["DB_POOL_WARM_SIZE"] == 3  # default 5, but each pool holds only 3
+    assert plan["REDIS_POOL_WARM_SIZE"] == plan["REDIS_MAX_CONNECTIONS"] == 50
+
+    assert pool_plan(4, _settings(DB_POOL_BUDGET=12, DB_POOL_WARM_SIZE=1))["DB_POOL_WARM_SIZE"] == 1
+
+
+def test_budgets_are_read_from_the_current_settings(monkeypatch):
+    from app.core import config
+
+    monkeypatch.setattr(config, "_settings", _settings(DB_POOL_BUDGET=8))
+    assert pool_plan(2)["DB_POOL_MAX_SIZE"] == 4
@@ -0,0 +1,106 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.fx import DEFAULT_CURRENCY, FxRates
+from app.repositories.user_repo import UserRepository
+from app.services import stats_service
+from app.services.stats_service import StatsService, _point
+
+START = date(2026, 1, 1)
+
+
+def _day(offset: int, balance="100.00", **values) -> dict:
+    row = {"day": START + timedelta(days=offset), "new_customers": 1, "deleted_customers": 0,
+           "total_customers": 10 + offset, "active_accounts": 20 + offset,
+           "balances": {DEFAULT_CURRENCY: Decimal(balance)}}
+    row.update(values)
+    return row
+
+
+@pytest.fixture
+def history(monkeypatch):
+    """get_history() over the given snapshot rows, with an empty cache."""
+    state = {"rows": [], "reads": [], "cache": {}}
+
+    async def get_daily_stats_range(start, end):
+        state["reads"].append((start, end))
+        return [row for row in state["rows"] if start <= row["day"] <= end]
+
+    async def cache_get(key):
+        return state["cache"].get(key)
+
+    async def cache_set(key, value, ttl=None):
+        state["cache"][key] = value
+
+    monkeypatch.setattr(UserRepository, "get_daily_stats_range", get_daily_stats_range)
+    monkeypatch.setattr(stats_service, "cache_get", cache_get)
+    monkeypatch.setattr(stats_service, "cache_set", cache_set)
+    monkeypatch.setattr(stats_service, "fx_rates", FxRates())
+    return state
+
+
+def _history(start=START, end=START + timedelta(days=9), max_points=4):
+    return asyncio.run(StatsService.get_history(start, end, max_points))
+
+
+def test_point_sums_flows_and_takes_levels_from_the_last_day(history):
+    stats_service.fx_rates.replace([{"base_currency": "XTS", "quote_currency": DEFAULT_CURRENCY, "rate": "2"}])
+    bucket = [_day(0, new_customers=2), _day(1, deleted_customers=1)]
+    bucket[-1]["balances"] = {DEFAULT_CURRENCY: Decimal("100.00"), "XTS": Decimal("10.00"), "XXX": Decimal("5")}
+
+    assert _point(bucket) == {
+        "day": "2026-01-02", "days": 2, "new_customers": 3, "deleted_customers": 1,
+        "total_customers": 11, "active_accounts": 21,
+        "total_balance": 120.0,  # XXX has no rate and is left out
+    }
+
+
+def test_history_is_downsampled_into_equal_buckets(history):
+    history["rows"] = [_day(offset, balance=str(offset)) for offset in range(10)]
+    data = _history()
+
+    assert data["bucket_days"] == 3
+    assert [(point["day"], point["days"], point["new_customers"]) for point in data["points"]] == [
+        ("2026-01-03", 3, 3), ("2026-01-06", 3, 3), ("2026-01-09", 3, 3), ("2026-01-10", 1, 1),
+    ]
+    assert [point["total_balance"] for point in data["points"]] == [2.0, 5.0, 8.0, 9.0]
+
+
+def test_missing_days_leave_their_bucket_short_or_out(history):
+    history["rows"] = [_day(offset) for offset in (0, 1, 7, 8, 9)]
+    points = _history()["points"]
+    assert [(point["day"], point["days"]) for point in points] == [
+        ("2026-01-02", 2), ("2026-01-09", 2), ("2026-01-10", 1),
+    ]
+
+
+def test_short_range_keeps_one_point_per_day(history):
+    history["rows"] = [_day(offset) for offset in range(3)]
+    data = _history(end=START + timedelta(days=2), max_points=90)
+    assert data["bucket_days"] == 1
+    assert len(data["points"]) == 3
+
+
+def test_default_range_is_the_last_90_days_up_to_yesterday(history, monkeypatch):
+    monkeypatch.setattr(stats_service, "utc_now", lambda: datetime(2026, 4, 1, 0, 30))
+    data = asyncio.run(StatsService.get_history(None, None, 30))
+    assert (data["start"], data["end"], data["bucket_days"]) == ("2026-01-01", "2026-03-31", 3)
+
+
+def test_start_after_end_is_rejected(history):
+    with pytest.raises(HTTPException) as raised:
+        _history(start=START + timedelta(days=1), end=START)
+    assert raised.value.status_code == 400
+    assert history["reads"] == []
+
+
+def test_cached_history_is_served_without_a_read(history):
+    history["rows"] = [_day(0)]
+    first = _history()
+    history["rows"] = []
+    assert _history() == first
+    assert len(history["reads"]) == 1
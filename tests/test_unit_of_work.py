@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from app.core.config import get_settings
+from app.database.database import db
+
+
+class Boom(Exception):
+    pass
+
+
+async def _release_held(amount: str, account_number: str = "A1"):
+    """A repository-style write: its own cursor and its own commit."""
+    async with await db.get_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "UPDATE accounts SET held_balance = held_balance - %s WHERE account_number = %s",
+                (amount, account_number),
+            )
+            await conn.commit()
+
+
+async def _release_held_then_roll_back(amount: str, account_number: str = "A1"):
+    """A repository-style guard that gives up after writing, like a failed balance check."""
+    async with await db.get_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "UPDATE accounts SET held_balance = held_balance - %s WHERE account_number = %s",
+                (amount, account_number),
+            )
+            await conn.rollback()
+            return "INSUFFICIENT"
+
+
+@pytest.fixture
+def account(server):
+    server.add_account("A1", user_id=1, balance="100.00", held_balance="50.00")
+    return server.accounts["A1"]
+
+
+def test_transaction_commits_once_when_the_block_exits(pool, server, account):
+    async def scenario():
+        async with db.unit_of_work(transaction=True):
+            await _release_held("10.00")
+            assert server.events == []  # the repository commit was deferred
+            await _release_held("5.00")
+
+    asyncio.run(scenario())
+    assert server.events == [("conn1", "commit")]
+    assert account["held_balance"] == 35
+    assert pool.acquired == pool.released == 1
+
+
+def test_transaction_rolls_back_everything_when_the_block_raises(pool, server, account):
+    async def scenario():
+        async with db.unit_of_work(transaction=True):
+            await _release_held("10.00")
+            await _release_held("5.00")
+            raise Boom()
+
+    with pytest.raises(Boom):
+        asyncio.run(scenario())
+    assert server.events == [("conn1", "rollback")]
+    assert account["held_balance"] == 50
+
+
+def test_repository_rollback_is_deferred_to_the_unit_of_work(pool, server, account):
+    async def scenario():
+        async with db.unit_of_work(transaction=True) as uow:
+            await _release_held("10.00")
+            result = await _release_held_then_roll_back("5.00")
+            # Nothing was undone yet: the block's earlier write is still in place for what follows.
+            assert server.events == []
+            assert account["held_balance"] == 35
+            assert uow.rollback_only
+            return result
+
+    assert asyncio.run(scenario()) == "INSUFFICIENT"
+    # The block did not raise, but it must not commit half of its work either.
+    assert server.events == [("conn1", "rollback")]
+    assert account["held_balance"] == 50
+
+
+def test_nested_blocks_join_the_outermost_transaction(pool, server, account):
+    async def scenario():
+        async with db.unit_of_work(transaction=True) as outer:
+            await _release_held("10.00")
+            async with db.unit_of_work(transaction=True) as inner:
+                assert inner is outer
+                await _release_held("5.00")
+            assert server.events == []
+            raise Boom()
+
+    with pytest.raises(Boom):
+        asyncio.run(scenario())
+    assert server.events == [("conn1", "rollback")]
+    assert account["held_balance"] == 50
+    assert pool.acquired == 1
+
+
+def test_without_transaction_repository_commits_and_rollbacks_apply_immediately(pool, server, account):
+    async def scenario():
+        async with db.unit_of_work() as uow:
+            await _release_held("10.00")
+            await _release_held_then_roll_back("5.00")
+            assert not uow.rollback_only
+
+    asyncio.run(scenario())
+    assert server.events == [("conn1", "commit"), ("conn1", "rollback")]
+    assert account["held_balance"] == 40
+    assert pool.acquired == 1
+
+
+def test_connections_outside_a_unit_of_work_are_independent(pool, server, account):
+    async def scenario():
+        await _release_held("10.00")
+        await _release_held("5.00")
+
+    asyncio.run(scenario())
+    assert server.events == [("conn1", "commit"), ("conn2", "commit")]
+    assert pool.acquired == pool.released == 2
+
+
+def test_statement_timeout_defaults_to_settings_and_can_be_overridden(pool):
+    async def timeouts():
+        seen = {}
+        async with await db.get_conn() as conn:
+            seen["default"] = conn.statement_timeout
+        async with await db.get_conn(statement_timeout=None) as conn:
+            seen["disabled"] = conn.statement_timeout
+        with db.statement_timeout(30):
+            async with await db.get_conn() as conn:
+                seen["scoped"] = conn.statement_timeout
+            async with db.unit_of_work(transaction=True, statement_timeout=5):
+                async with await db.get_conn() as conn:
+                    seen["unit_of_work"] = conn.statement_timeout
+
+            async def task():
+                async with await db.get_conn() as conn:
+                    return conn.statement_timeout
+
+            seen["task"] = await asyncio.create_task(task())
+        async with await db.get_conn() as conn:
+            seen["after"] = conn.statement_timeout
+        return seen
+
+    default = get_settings().db_statement_timeout
+    assert asyncio.run(timeouts()) == {
+        "default": default,
+        "disabled": None,
+        "scoped": 30,
+        "unit_of_work": 5,
+        "task": 30,
+        "after": default,
+    }